@@ -11,13 +11,55 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 app.autodiscover_tasks()
 
 app.conf.beat_schedule = {
-    'monthly-parsers-update-reports-api-info': {
+    # ежедневная проверка: каждая форма загружается, только когда по её календарю вышла новая публикация
+    # (settings.INGESTION_FORM_CADENCE); в остальные дни задача сразу завершается
+    'daily-parsers-update-reports-api-info': {
         'task': 'core.tasks.update_all_reports_api_info',
-        'schedule': crontab(minute=0, hour=0, day_of_month='1'),
+        'schedule': crontab(minute=0, hour=0),
     },
-    'monthly-parsers-update-bank-api-info': {
+    'daily-parsers-update-f101': {
         'task': 'core.tasks.update_all_bank_api_info',
-        'schedule': crontab(minute=0, hour=0, day_of_month='1'),
+        'schedule': crontab(minute=0, hour=0),
+        'kwargs': {'forms': ['F101']},
+    },
+    'daily-parsers-update-f123': {
+        'task': 'core.tasks.update_all_bank_api_info',
+        'schedule': crontab(minute=20, hour=0),
+        'kwargs': {'forms': ['F123']},
+    },
+    'daily-parsers-update-f810': {
+        'task': 'core.tasks.update_all_bank_api_info',
+        'schedule': crontab(minute=40, hour=0),
+        'kwargs': {'forms': ['F810']},
+    },
+    'daily-parsers-update-f813': {
+        'task': 'core.tasks.update_all_bank_api_info',
+        'schedule': crontab(minute=50, hour=0),
+        'kwargs': {'forms': ['F813']},
+    },
+    'daily-drain-ingestion-backlog': {
+        'task': 'core.tasks.drain_ingestion_backlog',
+        'schedule': crontab(minute=0, hour=1),
+    },
+    'flush-indicator-access': {
+        'task': 'core.tasks.flush_indicator_access',
+        'schedule': crontab(minute='*'),
+    },
+    'redrive-failed-fetches': {
+        'task': 'core.tasks.redrive_failed_fetches',
+        'schedule': crontab(minute='*/5'),
+    },
+    'weekly-collect-orphan-payloads': {
+        'task': 'core.tasks.collect_orphan_payloads',
+        'schedule': crontab(minute=0, hour=4, day_of_week=0),
+    },
+    'weekly-compact-indicator-ranges': {
+        'task': 'core.tasks.compact_indicator_ranges',
+        'schedule': crontab(minute=0, hour=3, day_of_week=0),
+    },
+    'monthly-maintain-partitions': {
+        'task': 'core.tasks.maintain_partitions',
+        'schedule': crontab(minute=30, hour=3, day_of_month=1),
     },
     'daily-cleanup-tokens': {
         'task': 'accounts.tasks.cleanup_old_tokens',
@@ -28,10 +70,30 @@ app.conf.beat_schedule = {
 
 @beat_init.connect
 def send_initial_task(sender, **kwargs):
-    from core.tasks import update_all_bank_api_info, update_all_reports_api_info
+    """
+    При старте beat ставит полные загрузки, только если последний успешный запуск устарел
+    (settings.INGESTION_FRESHNESS_DAYS); загрузка форм банков проверяется и ставится по каждой форме отдельно.
+    Уже выполняющийся запуск задачи сами отсекают по блокировке.
+    """
+    import logging
+
+    from core.helpers.ledger_functions import _is_last_run_fresh
+    from core.helpers.ingestion_functions import ALL_BANK_FORMS
+    from core.tasks import update_all_bank_api_info, update_all_reports_api_info, warm_indicator_cache
+
+    logger = logging.getLogger(__name__)
     try:
-        update_all_reports_api_info.apply_async()
-        update_all_bank_api_info.apply_async(countdown=30)
+        if _is_last_run_fresh(update_all_reports_api_info.name):
+            logger.info('Skip initial %s: last successful run is fresh', update_all_reports_api_info.name)
+        else:
+            update_all_reports_api_info.apply_async()
+        for form in ALL_BANK_FORMS:
+            if _is_last_run_fresh(update_all_bank_api_info.name, form=form):
+                logger.info('Skip initial %s for %s: last successful run is fresh', update_all_bank_api_info.name,
+                            form)
+                continue
+            update_all_bank_api_info.apply_async(kwargs={'forms': [form]}, countdown=30)
+        # после деплоя кэш пуст — прогреваем его до окончания загрузки
+        warm_indicator_cache.apply_async()
     except Exception as e:
-        import logging
-        logging.getLogger(__name__).exception('Failed to enqueue initial monthly tasks: %s', e)
+        logger.exception('Failed to enqueue initial monthly tasks: %s', e)
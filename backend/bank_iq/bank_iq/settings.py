@@ -49,7 +49,7 @@ INSTALLED_APPS = [
     'storages',
     'rest_framework_simplejwt.token_blacklist',
 
-    'core',
+    'core.apps.CoreConfig',
     'reports.apps.ReportsConfig',
     'indicators.apps.IndicatorsConfig',
     'exports.apps.ExportsConfig',
@@ -181,6 +181,167 @@ SPECTACULAR_SETTINGS = {
 CELERY_BROKER_URL = os.environ.get("CELERY_BROKER", "redis://redis:6379/0")
 CELERY_RESULT_BACKEND = os.environ.get("CELERY_BROKER", "redis://redis:6379/0")
 
+# Очереди загрузки данных ЦБ РФ:
+# - interactive — только внеочередное обновление банков по запросу пользователя (свой пул воркеров,
+#   пакетные задачи сюда не попадают и не занимают его слоты на часы);
+# - priority — ежемесячное инкрементальное обновление, справочник, прогрев кэша и догрузка отложенного;
+# - backfill — медленная историческая загрузка (отдельный пул, не мешает priority);
+# - celery (по умолчанию) — служебные задачи (токены, аватары и т.п.).
+INGESTION_INTERACTIVE_QUEUE = os.getenv('INGESTION_INTERACTIVE_QUEUE', 'ingestion_interactive')
+INGESTION_PRIORITY_QUEUE = os.getenv('INGESTION_PRIORITY_QUEUE', 'ingestion_priority')
+INGESTION_BACKFILL_QUEUE = os.getenv('INGESTION_BACKFILL_QUEUE', 'ingestion_backfill')
+
+CELERY_TASK_DEFAULT_QUEUE = 'celery'
+CELERY_TASK_ROUTES = {
+    'core.tasks.update_all_bank_api_info': {'queue': INGESTION_PRIORITY_QUEUE},
+    'core.tasks.update_all_reports_api_info': {'queue': INGESTION_PRIORITY_QUEUE},
+    'core.tasks.backfill_bank_api_info': {'queue': INGESTION_BACKFILL_QUEUE},
+    'core.tasks.refresh_banks_api_info': {'queue': INGESTION_INTERACTIVE_QUEUE},
+    'core.tasks.sync_bank_registry': {'queue': INGESTION_PRIORITY_QUEUE},
+    'core.tasks.warm_indicator_cache': {'queue': INGESTION_PRIORITY_QUEUE},
+    'core.tasks.drain_ingestion_backlog': {'queue': INGESTION_PRIORITY_QUEUE},
+}
+# Приоритеты сообщений внутри очереди (redis: 0 — наивысший).
+# visibility_timeout: при acks_late брокер redis заново выдаёт неподтверждённое сообщение по его истечении
+# (по умолчанию через час), поэтому он должен быть больше самого долгого запуска (полная загрузка F101 — сутки
+# и дольше); иначе копия задачи с тем же task_id стартует параллельно с ещё идущей
+CELERY_VISIBILITY_TIMEOUT_SECONDS = int(os.getenv('CELERY_VISIBILITY_TIMEOUT_SECONDS', 7 * 24 * 60 * 60))
+CELERY_BROKER_TRANSPORT_OPTIONS = {'queue_order_strategy': 'priority', 'priority_steps': list(range(10)),
+                                   'visibility_timeout': CELERY_VISIBILITY_TIMEOUT_SECONDS}
+INGESTION_REFRESH_PRIORITY = 0
+# Долгие задачи: не забираем пачку сообщений заранее, подтверждаем после выполнения
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_TASK_ACKS_LATE = True
+CELERY_TASK_TRACK_STARTED = True
+# Защита от параллельных полных запусков: аренда блокировки (продлевается heartbeat'ом) и
+# «свежесть» последнего успешного запуска, при которой beat при старте не ставит задачу повторно
+INGESTION_LOCK_LEASE_SECONDS = int(os.getenv('INGESTION_LOCK_LEASE_SECONDS', 600))
+INGESTION_FRESHNESS_DAYS = int(os.getenv('INGESTION_FRESHNESS_DAYS', 25))
+# Окно ежемесячной загрузки в секундах (пусто — без ограничения): по его исчерпании невыполненные шаги
+# (банк + форма) откладываются в IngestionBacklogItem и догружаются задачей drain_ingestion_backlog
+INGESTION_WINDOW_SECONDS = float(os.getenv('INGESTION_WINDOW_SECONDS')) if os.getenv('INGESTION_WINDOW_SECONDS') else None
+
+# Календарь публикации форм: отчётные даты (1-е число месяцев months) и задержка публикации lag_days.
+# Инкрементальная загрузка формы выполняется, только если после её последней полной загрузки вышла новая публикация
+INGESTION_FORM_CADENCE = {
+    'F101': {'months': tuple(range(1, 13)), 'lag_days': int(os.getenv('INGESTION_F101_LAG_DAYS', 30))},
+    'F123': {'months': tuple(range(1, 13)), 'lag_days': int(os.getenv('INGESTION_F123_LAG_DAYS', 30))},
+    'F810': {'months': (1, 4), 'lag_days': int(os.getenv('INGESTION_F810_LAG_DAYS', 60))},
+    'F813': {'months': tuple(range(1, 13)), 'lag_days': int(os.getenv('INGESTION_F813_LAG_DAYS', 30))},
+    'reports': {'months': tuple(range(1, 13)), 'lag_days': int(os.getenv('INGESTION_REPORTS_LAG_DAYS', 40))},
+}
+
+# Dormant-банки: банк без новых отчётных дат DORMANT_BANK_IDLE_PERIODS отчётных периодов подряд (или пропавший
+# из EnumBIC_XML) проверяется только раз в DORMANT_BANK_CHECK_DAYS дней
+DORMANT_BANK_IDLE_PERIODS = int(os.getenv('DORMANT_BANK_IDLE_PERIODS', 6))
+DORMANT_BANK_CHECK_DAYS = int(os.getenv('DORMANT_BANK_CHECK_DAYS', 90))
+
+# Сбойные обращения к ЦБ (FailedFetch) и их повтор задачей redrive_failed_fetches: экспоненциальная задержка
+# base * 2^attempts (не больше max), предел попыток, размер пачки, остановка после N сбоев подряд
+DEAD_LETTER_MAX_ATTEMPTS = int(os.getenv('DEAD_LETTER_MAX_ATTEMPTS', 8))
+DEAD_LETTER_BACKOFF_SECONDS = int(os.getenv('DEAD_LETTER_BACKOFF_SECONDS', 60))
+DEAD_LETTER_BACKOFF_MAX_SECONDS = int(os.getenv('DEAD_LETTER_BACKOFF_MAX_SECONDS', 6 * 3600))
+DEAD_LETTER_REDRIVE_BATCH = int(os.getenv('DEAD_LETTER_REDRIVE_BATCH', 200))
+DEAD_LETTER_REDRIVE_BUDGET_SECONDS = float(os.getenv('DEAD_LETTER_REDRIVE_BUDGET_SECONDS', 240))
+DEAD_LETTER_FAIL_FAST = int(os.getenv('DEAD_LETTER_FAIL_FAST', 5))
+
+# Планировщик (plan_ingestion): число последних запусков журнала, по которым берётся фактическая стоимость
+# вызова SOAP, и стоимость вызова по умолчанию (секунды), если в журнале нет запусков режима
+INGESTION_PLAN_HISTORY_RUNS = int(os.getenv('INGESTION_PLAN_HISTORY_RUNS', 5))
+INGESTION_PLAN_CALL_SECONDS = float(os.getenv('INGESTION_PLAN_CALL_SECONDS', 1.0))
+
+# Порядок обработки банков внутри запуска: сначала закреплённые (по умолчанию — банки главной страницы
+# фронтенда), затем по оценке из спроса (обращения к API) и размера банка (капитал по F123)
+INGESTION_PINNED_BANKS = [int(r) for r in os.getenv('INGESTION_PINNED_BANKS', '1481,2673,1000,1326').split(',')
+                          if r.strip()]
+INGESTION_PRIORITY_WEIGHTS = {
+    'demand': float(os.getenv('INGESTION_PRIORITY_DEMAND_WEIGHT', 0.7)),
+    'size': float(os.getenv('INGESTION_PRIORITY_SIZE_WEIGHT', 0.3)),
+}
+
+INGESTION_MODES = {
+    'incremental': {
+        'only_new_dates': True,
+        'max_workers': int(os.getenv('INGESTION_INCREMENTAL_MAX_WORKERS', 10)),
+        'batch_submit': 300,
+        'throttle_seconds': float(os.getenv('INGESTION_INCREMENTAL_THROTTLE_SECONDS', 0)),
+        'f101_start_year': 2018,
+        'f810_lookback_years': 1,
+        'f813_lookback_years': 1,
+    },
+    'backfill': {
+        'only_new_dates': False,
+        'max_workers': int(os.getenv('INGESTION_BACKFILL_MAX_WORKERS', 2)),
+        'batch_submit': 50,
+        'throttle_seconds': float(os.getenv('INGESTION_BACKFILL_THROTTLE_SECONDS', 0.5)),
+        'f101_start_year': int(os.getenv('INGESTION_BACKFILL_START_YEAR', 2018)),
+        'f810_start_year': 2000,
+        'f810_lookback_years': None,
+        'f813_start_year': int(os.getenv('INGESTION_BACKFILL_F813_START_YEAR', 2019)),
+        'f813_lookback_years': None,
+    },
+}
+
+# Кэш ответов API (данные банков по формам); без CACHE_REDIS_URL — локальный кэш процесса
+CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', 'redis://redis:6379/1')
+if CACHE_REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Данные обновляются только загрузчиком: при изменении ответа он меняет версию области (форма, банк, индикатор),
+# входящую в ключ, и все закэшированные периоды этой области сразу перестают читаться; таймаут — страховка
+INDICATOR_CACHE_TIMEOUT = int(os.getenv('INDICATOR_CACHE_TIMEOUT', 60 * 60 * 24 * 7))
+# Учёт обращений к ключам (reg_number, форма, ind_code, период) и прогрев самых запрашиваемых после загрузки
+INDICATOR_ACCESS_TRACKING = os.getenv('INDICATOR_ACCESS_TRACKING', '1') != '0'
+INDICATOR_ACCESS_WINDOW_DAYS = int(os.getenv('INDICATOR_ACCESS_WINDOW_DAYS', 30))
+INDICATOR_CACHE_WARM_TOP_N = int(os.getenv('INDICATOR_CACHE_WARM_TOP_N', 500))
+INDICATOR_CACHE_WARM_BUDGET_SECONDS = float(os.getenv('INDICATOR_CACHE_WARM_BUDGET_SECONDS', 300))
+
+# Хранение JSON ответов (CompressedJSONField, bytea): none — без сжатия, zstd — zstd (пакет zstandard) с общим
+# словарём из CompressionDictionary (train_payload_dictionary); тела короче PAYLOAD_COMPRESSION_MIN_BYTES не сжимаются
+PAYLOAD_COMPRESSION = os.getenv('PAYLOAD_COMPRESSION', 'none')
+PAYLOAD_COMPRESSION_LEVEL = int(os.getenv('PAYLOAD_COMPRESSION_LEVEL', 3))
+PAYLOAD_COMPRESSION_MIN_BYTES = int(os.getenv('PAYLOAD_COMPRESSION_MIN_BYTES', 256))
+# Как часто (секунды) процесс перечитывает, какой словарь сжатия активен
+PAYLOAD_COMPRESSION_DICT_TTL_SECONDS = int(os.getenv('PAYLOAD_COMPRESSION_DICT_TTL_SECONDS', 300))
+
+# Тела ответов по индикаторам хранятся один раз (IndicatorPayload по sha256); еженедельная задача удаляет блобы
+# без ссылок старше INDICATOR_PAYLOAD_GC_GRACE_HOURS часов
+INDICATOR_PAYLOAD_GC_GRACE_HOURS = int(os.getenv('INDICATOR_PAYLOAD_GC_GRACE_HOURS', 24))
+
+# Еженедельное сжатие истории F101: запросы по диапазонам, вложенным в другой сохранённый диапазон с теми же
+# данными, удаляются пакетами по INDICATOR_COMPACTION_BATCH_SIZE с паузой INDICATOR_COMPACTION_PAUSE_SECONDS
+INDICATOR_COMPACTION_BATCH_SIZE = int(os.getenv('INDICATOR_COMPACTION_BATCH_SIZE', 500))
+INDICATOR_COMPACTION_PAUSE_SECONDS = float(os.getenv('INDICATOR_COMPACTION_PAUSE_SECONDS', 1.0))
+
+# Секционирование таблицы значений F101 (BankIndicatorValue) по годам отчётной даты — только PostgreSQL.
+# Ежемесячная задача создаёт секции на INDICATOR_PARTITIONS_AHEAD_YEARS лет вперёд и отсоединяет секции старше
+# INDICATOR_PARTITIONS_RETENTION_YEARS лет (0 — хранить всё); INDICATOR_PARTITIONS_DROP_EXPIRED=1 — удалять их
+INDICATOR_PARTITIONS_START_YEAR = int(os.getenv('INDICATOR_PARTITIONS_START_YEAR', 2010))
+INDICATOR_PARTITIONS_AHEAD_YEARS = int(os.getenv('INDICATOR_PARTITIONS_AHEAD_YEARS', 2))
+INDICATOR_PARTITIONS_RETENTION_YEARS = int(os.getenv('INDICATOR_PARTITIONS_RETENTION_YEARS', 0))
+INDICATOR_PARTITIONS_DROP_EXPIRED = os.getenv('INDICATOR_PARTITIONS_DROP_EXPIRED', '0') != '0'
+
+# Архив сырых ответов ЦБ (SOAP / REST) в MinIO: повторный разбор истории без обращений к ЦБ (reparse_raw_archive)
+RAW_ARCHIVE_ENABLED = os.getenv('RAW_ARCHIVE_ENABLED', '1') != '0'
+RAW_ARCHIVE_BUCKET = os.getenv('RAW_ARCHIVE_BUCKET', 'bankiq-raw')
+RAW_ARCHIVE_REPARSE_WORKERS = int(os.getenv('RAW_ARCHIVE_REPARSE_WORKERS', 8))
+# Выгрузка в архив идёт фоновым потоком: таймауты обращения к MinIO (без повторов), пауза после ошибки
+# и предел очереди ответов, ожидающих выгрузки (при переполнении ответ не архивируется)
+RAW_ARCHIVE_TIMEOUT_SECONDS = float(os.getenv('RAW_ARCHIVE_TIMEOUT_SECONDS', 2))
+RAW_ARCHIVE_COOLDOWN_SECONDS = int(os.getenv('RAW_ARCHIVE_COOLDOWN_SECONDS', 300))
+RAW_ARCHIVE_QUEUE_SIZE = int(os.getenv('RAW_ARCHIVE_QUEUE_SIZE', 1000))
+
 DEFAULT_FILE_STORAGE = "storages.backends.s3boto3.S3Boto3Storage"
 
 AWS_S3_ENDPOINT_URL = os.environ.get("MINIO_ENDPOINT", "http://127.0.0.1:9000")
@@ -10,6 +10,7 @@ urlpatterns = [
     path('api/', include('banks.urls')),
     path('api/', include('indicators.urls')),
     path('api/', include('accounts.urls')),
+    path('api/', include('core.urls')),
 
     # Генерация OpenAPI схемы
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('banks', '0004_alter_bank_name_alter_bank_unique_together'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bank',
+            name='dormant_since',
+            field=models.DateTimeField(blank=True, help_text='С какого момента банк считается dormant.', null=True),
+        ),
+        migrations.AddField(
+            model_name='bank',
+            name='idle_periods',
+            field=models.IntegerField(default=0, help_text='Сколько загрузок подряд у банка не появлялось новых отчётных дат.'),
+        ),
+        migrations.AddField(
+            model_name='bank',
+            name='in_registry',
+            field=models.BooleanField(default=True, help_text='Присутствовал ли банк в справочнике EnumBIC_XML при последней сверке.'),
+        ),
+        migrations.AddField(
+            model_name='bank',
+            name='last_checked_at',
+            field=models.DateTimeField(blank=True, help_text='Последняя (редкая) проверка dormant-банка.', null=True),
+        ),
+        migrations.AddField(
+            model_name='bank',
+            name='last_new_dates_at',
+            field=models.DateTimeField(blank=True, help_text='Когда у банка последний раз появлялись новые отчётные даты.', null=True),
+        ),
+        migrations.AddField(
+            model_name='bank',
+            name='status',
+            field=models.CharField(choices=[('active', 'Публикует отчётность'), ('dormant', 'Не публикует (отозвана лицензия / нет новых дат)')], db_index=True, default='active', help_text='Активен ли банк для загрузки: dormant-банки проверяются редко, их сохранённые данные остаются доступны.', max_length=16),
+        ),
+    ]
@@ -0,0 +1,42 @@
+from django.db import migrations, models
+
+import core.utils.payload_codec
+from core.utils.payload_codec import copy_field_values
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_compressiondictionary'),
+        ('banks', '0005_bank_dormant_since_bank_idle_periods_and_more'),
+    ]
+
+    operations = [
+        # bankdatesresponse.datetimes: JSONField -> CompressedJSONField (bytea) через временный столбец datetimes_packed
+        migrations.AddField(
+            model_name='bankdatesresponse',
+            name='datetimes_packed',
+            field=core.utils.payload_codec.CompressedJSONField(help_text='Список доступных дат', null=True),
+        ),
+        migrations.AlterField(
+            model_name='bankdatesresponse',
+            name='datetimes',
+            field=models.JSONField(help_text='Список доступных дат', null=True),
+        ),
+        migrations.RunPython(copy_field_values('banks', 'bankdatesresponse', 'datetimes', 'datetimes_packed'),
+                             copy_field_values('banks', 'bankdatesresponse', 'datetimes_packed', 'datetimes')),
+        migrations.RemoveField(
+            model_name='bankdatesresponse',
+            name='datetimes',
+        ),
+        migrations.RenameField(
+            model_name='bankdatesresponse',
+            old_name='datetimes_packed',
+            new_name='datetimes',
+        ),
+        migrations.AlterField(
+            model_name='bankdatesresponse',
+            name='datetimes',
+            field=core.utils.payload_codec.CompressedJSONField(help_text='Список доступных дат'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+from core.utils.request_keys import dates_request_key, fill_request_keys
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('banks', '0006_compress_payloads'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bankdatesrequest',
+            name='request_key',
+            field=models.CharField(help_text='sha256 нормализованных параметров запроса (core.utils.request_keys)', max_length=64, null=True),
+        ),
+        migrations.RunPython(
+            fill_request_keys('banks', 'bankdatesrequest', ('bank_id', 'form_type_id', 'reg_number'),
+                              lambda r: dates_request_key(r['bank_id'], r['form_type_id'], r['reg_number'])),
+            migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='bankdatesrequest',
+            name='request_key',
+            field=models.CharField(help_text='sha256 нормализованных параметров запроса (core.utils.request_keys)', max_length=64, unique=True),
+        ),
+        migrations.AlterUniqueTogether(
+            name='bankdatesrequest',
+            unique_together=set(),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('banks', '0007_request_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bank',
+            name='idle_period',
+            field=models.DateField(blank=True, help_text='Отчётный период (первое число месяца), за который последним засчитан простой.', null=True),
+        ),
+        migrations.AlterField(
+            model_name='bank',
+            name='idle_periods',
+            field=models.IntegerField(default=0, help_text='Сколько отчётных периодов (месяцев) подряд у банка не появлялось новых отчётных дат.'),
+        ),
+    ]
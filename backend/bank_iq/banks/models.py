@@ -1,7 +1,13 @@
 from django.db import models
 
+from core.utils.payload_codec import CompressedJSONField
+
 
 class Bank(models.Model):
+    class Status(models.TextChoices):
+        ACTIVE = 'active', 'Публикует отчётность'
+        DORMANT = 'dormant', 'Не публикует (отозвана лицензия / нет новых дат)'
+
     reg_number = models.IntegerField(unique=True, db_index=True,
                                      help_text='Регистрационный номер банка в базе ЦБ (рег. номер). '
                                                'Уникальный строковый идентификатор, например "1481".')
@@ -19,6 +25,23 @@ class Bank(models.Model):
                               help_text='Идентификатор налогоплательщика (ИНН) или другой налоговый идентификатор. '
                                         'Уникален для организации.')
 
+    status = models.CharField(max_length=16, choices=Status, default=Status.ACTIVE, db_index=True,
+                              help_text='Активен ли банк для загрузки: dormant-банки проверяются редко, '
+                                        'их сохранённые данные остаются доступны.')
+    in_registry = models.BooleanField(default=True,
+                                      help_text='Присутствовал ли банк в справочнике EnumBIC_XML при последней сверке.')
+    idle_periods = models.IntegerField(default=0,
+                                       help_text='Сколько отчётных периодов (месяцев) подряд у банка не появлялось '
+                                                 'новых отчётных дат.')
+    idle_period = models.DateField(null=True, blank=True,
+                                   help_text='Отчётный период (первое число месяца), за который последним засчитан '
+                                             'простой.')
+    last_new_dates_at = models.DateTimeField(null=True, blank=True,
+                                             help_text='Когда у банка последний раз появлялись новые отчётные даты.')
+    dormant_since = models.DateTimeField(null=True, blank=True, help_text='С какого момента банк считается dormant.')
+    last_checked_at = models.DateTimeField(null=True, blank=True,
+                                           help_text='Последняя (редкая) проверка dormant-банка.')
+
     updated_at = models.DateTimeField(auto_now=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -37,6 +60,8 @@ class BankDatesRequest(models.Model):
                                   help_text='FK -> FormType',
                                   null=True)
     reg_number = models.IntegerField(help_text='Регистрационный номер банка в базе ЦБ')
+    request_key = models.CharField(max_length=64, unique=True,
+                                   help_text='sha256 нормализованных параметров запроса (core.utils.request_keys)')
 
     updated_at = models.DateTimeField(auto_now=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -46,13 +71,12 @@ class BankDatesRequest(models.Model):
 
     class Meta:
         ordering = ('-created_at',)
-        unique_together = (('bank', 'form_type'),)
 
 
 class BankDatesResponse(models.Model):
     request = models.OneToOneField(BankDatesRequest, on_delete=models.CASCADE, help_text='Ответ',
                                    related_name='response')
-    datetimes = models.JSONField(help_text='Список доступных дат')
+    datetimes = CompressedJSONField(help_text='Список доступных дат')
 
     data_hash = models.CharField(max_length=64, null=True, blank=True, db_index=True,
                                  help_text='sha256 хэш представления datetimes')
@@ -54,3 +54,34 @@ class DateTimesSerializer(serializers.Serializer):
                 "Если исходный объект содержит tzinfo, DRF может конвертировать в UTC (с суффиксом 'Z')."
             )
     )
+
+
+class BankRefreshRequestSerializer(serializers.Serializer):
+    FORM_CHOICES = ('F101', 'F123', 'F810', 'F813')
+
+    reg_numbers = serializers.ListField(
+            child=serializers.IntegerField(min_value=1),
+            min_length=1,
+            max_length=50,
+            help_text="Регистрационные номера банков, которые нужно обновить. Пример: [1481, 2673]."
+    )
+    forms = serializers.ListField(
+            child=serializers.ChoiceField(choices=FORM_CHOICES),
+            required=False,
+            allow_empty=False,
+            help_text="Формы для обновления (подмножество F101, F123, F810, F813). По умолчанию — все формы."
+    )
+
+
+class BankRefreshJobSerializer(serializers.Serializer):
+    job_id = serializers.CharField(help_text="Идентификатор задачи обновления (Celery task id).")
+    state = serializers.CharField(
+            help_text="Состояние задачи: PENDING, STARTED, PROGRESS, SUCCESS, FAILURE, RETRY.")
+    progress = serializers.DictField(
+            required=False, allow_null=True,
+            help_text="Прогресс выполнения: `{done, total, current_reg_number}` (только для PROGRESS).")
+    result = serializers.DictField(
+            required=False, allow_null=True,
+            help_text="Итог выполнения (только для SUCCESS): `{mode, banks, not_found}`.")
+    error = serializers.CharField(required=False, allow_null=True,
+                                  help_text="Текст ошибки (только для FAILURE).")
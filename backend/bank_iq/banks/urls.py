@@ -1,6 +1,7 @@
 from django.urls import path
 
-from .views import AllBanksAPIView, Datetimes101APIView, Datetimes123APIView
+from .views import AllBanksAPIView, BankRefreshAPIView, BankRefreshStatusAPIView, Datetimes101APIView, \
+    Datetimes123APIView
 
 
 urlpatterns = [
@@ -14,4 +15,11 @@ urlpatterns = [
     path("indicators/f123/bank-datetimes/",
          Datetimes123APIView.as_view(),
          name='indicators.f123.bank_datetimes'),
+
+    path("banks/refresh/",
+         BankRefreshAPIView.as_view(),
+         name='banks.refresh'),
+    path("banks/refresh/<str:job_id>/",
+         BankRefreshStatusAPIView.as_view(),
+         name='banks.refresh.status'),
 ]
@@ -1,16 +1,18 @@
 from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiResponse
-from rest_framework import status
+from rest_framework import permissions, status
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from core.helpers.indicators_db_functions import _create_banks_from_api, \
     _create_or_get_datetimes_request_atomic, _find_existing_dates_request, _get_all_banks_from_db
+from core.helpers.jobs_functions import _enqueue_bank_refresh, _get_job_status
 from core.parsers.soap.form101_parser import Form101Parser
 from core.parsers.soap.form123_parser import Form123Parser
 from indicators.models import FormType
 from .models import Bank, BankDatesResponse
-from .serializers import AllBanksSerializer, DateTimesSerializer, RegNumberSerializer
+from .serializers import AllBanksSerializer, BankRefreshJobSerializer, BankRefreshRequestSerializer, \
+    DateTimesSerializer, RegNumberSerializer
 
 
 class AllBanksAPIView(APIView):
@@ -258,3 +260,85 @@ class Datetimes123APIView(APIView):
 
         BankDatesResponse.objects.create(request=req_obj, datetimes=processed_data)
         return Response(processed_data, status=status.HTTP_200_OK)
+
+
+class BankRefreshAPIView(APIView):
+    permission_classes = (permissions.IsAuthenticated,)
+
+    @extend_schema(
+            summary="Внеочередное обновление данных банков",
+            description=(
+                    "Ставит в отдельную интерактивную очередь обновление форм F810/F123/F101/F813 для указанных банков.\n\n"
+                    "Используется тот же конвейер, что и в ежемесячной задаче `update_all_bank_api_info` "
+                    "(инкрементальный режим: для банка без сохранённых данных загружается вся история).\n\n"
+                    "Возвращает `job_id`, статус которого можно опрашивать через "
+                    "`GET /api/banks/refresh/<job_id>/`.\n\n"
+                    "Требуется действительный `access-token` в заголовке Authorization."
+            ),
+            request=BankRefreshRequestSerializer,
+            examples=[
+                OpenApiExample(
+                        name="Пример запроса",
+                        value={"reg_numbers": [1481], "forms": ["F101", "F123"]},
+                        request_only=True,
+                        media_type='application/json')
+            ],
+            responses={
+                202: OpenApiResponse(
+                        response=BankRefreshJobSerializer,
+                        description="Задача поставлена в очередь.",
+                        examples=[
+                            OpenApiExample(
+                                    name="Пример ответа",
+                                    value={"job_id": "5b6f1c1e-7a0d-4c36-9f5e-0a2b8c1d2e3f", "state": "PENDING",
+                                           "progress": None, "result": None, "error": None}
+                            )
+                        ]
+                ),
+                400: OpenApiResponse(description="Ошибка валидации запроса."),
+                401: OpenApiResponse(description="Unauthorized"),
+                500: OpenApiResponse(description='Ошибка сервера', )
+            }
+    )
+    def post(self, request: Request, *args, **kwargs) -> Response:
+        in_serializer = BankRefreshRequestSerializer(data=request.data)
+        in_serializer.is_valid(raise_exception=True)
+        params = in_serializer.validated_data
+
+        job_id = _enqueue_bank_refresh(params['reg_numbers'], params.get('forms'))
+        out_serializer = BankRefreshJobSerializer(instance=_get_job_status(job_id))
+        return Response(out_serializer.data, status=status.HTTP_202_ACCEPTED)
+
+
+class BankRefreshStatusAPIView(APIView):
+    permission_classes = (permissions.IsAuthenticated,)
+
+    @extend_schema(
+            summary="Статус внеочередного обновления банков",
+            description=(
+                    "Возвращает состояние задачи обновления, поставленной через `POST /api/banks/refresh/`.\n\n"
+                    "- `PROGRESS` — в поле `progress` указано `{done, total, current_reg_number}`;\n"
+                    "- `SUCCESS` — в поле `result` итог выполнения;\n"
+                    "- `FAILURE` — в поле `error` текст ошибки.\n\n"
+                    "Неизвестный `job_id` возвращается в состоянии `PENDING`."
+            ),
+            responses={
+                200: OpenApiResponse(
+                        response=BankRefreshJobSerializer,
+                        description="Статус задачи.",
+                        examples=[
+                            OpenApiExample(
+                                    name="Пример ответа",
+                                    value={"job_id": "5b6f1c1e-7a0d-4c36-9f5e-0a2b8c1d2e3f", "state": "PROGRESS",
+                                           "progress": {"done": 0, "total": 1, "current_reg_number": 1481},
+                                           "result": None, "error": None}
+                            )
+                        ]
+                ),
+                401: OpenApiResponse(description="Unauthorized"),
+                500: OpenApiResponse(description='Ошибка сервера', )
+            }
+    )
+    def get(self, request: Request, job_id: str, *args, **kwargs) -> Response:
+        out_serializer = BankRefreshJobSerializer(instance=_get_job_status(job_id))
+        return Response(out_serializer.data, status=status.HTTP_200_OK)
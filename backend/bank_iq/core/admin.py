@@ -0,0 +1,52 @@
+from django.contrib import admin
+
+from .models import FailedFetch, IngestionBacklogItem, IngestionRun, IngestionRunItem
+
+
+class IngestionRunItemInline(admin.TabularInline):
+    model = IngestionRunItem
+    extra = 0
+    can_delete = False
+    ordering = ('-wall_seconds',)
+    fields = ("reg_number", "form_type", "status", "wall_seconds", "soap_calls", "bytes_received", "cache_hits",
+              "changed", "unchanged", "errors")
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(IngestionRun)
+class IngestionRunAdmin(admin.ModelAdmin):
+    list_display = ("id", "task_name", "mode", "status", "started_at", "wall_seconds", "banks_processed",
+                    "bytes_received", "cache_hits", "changed", "unchanged")
+    list_filter = ("mode", "status", "task_name")
+    readonly_fields = [f.name for f in IngestionRun._meta.fields]
+    inlines = (IngestionRunItemInline,)
+
+
+@admin.register(IngestionRunItem)
+class IngestionRunItemAdmin(admin.ModelAdmin):
+    list_display = ("id", "run", "reg_number", "form_type", "status", "wall_seconds", "bytes_received",
+                    "cache_hits", "changed", "unchanged", "errors")
+    list_filter = ("form_type", "status", "run__mode")
+    search_fields = ("reg_number",)
+    ordering = ("-wall_seconds",)
+    readonly_fields = [f.name for f in IngestionRunItem._meta.fields]
+
+
+@admin.register(IngestionBacklogItem)
+class IngestionBacklogItemAdmin(admin.ModelAdmin):
+    list_display = ("id", "reg_number", "form_type", "mode", "deferrals", "run", "created_at", "updated_at")
+    list_filter = ("form_type", "mode")
+    search_fields = ("reg_number",)
+    ordering = ("created_at",)
+
+
+@admin.register(FailedFetch)
+class FailedFetchAdmin(admin.ModelAdmin):
+    list_display = ("id", "source", "stage", "reg_number", "error_class", "status", "attempts", "next_attempt_at",
+                    "created_at")
+    list_filter = ("status", "source", "stage", "error_class")
+    search_fields = ("reg_number", "error")
+    ordering = ("-created_at",)
@@ -0,0 +1,51 @@
+import logging
+from typing import Iterable
+
+from django.db.models import F
+
+from core.models import IngestionBacklogItem, IngestionRun
+
+
+logger = logging.getLogger(__name__)
+
+
+def _load_backlog(mode: str) -> dict[int, list[str]]:
+    """Отложенные шаги режима: {reg_number: [формы]} в порядке откладывания (самые старые — первыми)."""
+    backlog: dict[int, list[str]] = {}
+    for reg, form in IngestionBacklogItem.objects.filter(mode=mode).values_list('reg_number', 'form_type'):
+        backlog.setdefault(reg, []).append(form)
+    return backlog
+
+
+def _defer_to_backlog(run: IngestionRun | None, mode: str, items: Iterable[tuple[int, str]]) -> int:
+    """
+    Сохраняет невыполненные шаги (банк, форма) в очередь отложенных: новые — вставкой,
+    уже отложенные ранее — увеличивает счётчик deferrals. Возвращает число отложенных шагов.
+    """
+    items = list(dict.fromkeys(items))
+    if not items:
+        return 0
+
+    regs = {reg for reg, _ in items}
+    existing = set(IngestionBacklogItem.objects.filter(mode=mode, reg_number__in=regs)
+                   .values_list('reg_number', 'form_type'))
+    IngestionBacklogItem.objects.bulk_create(
+            [IngestionBacklogItem(reg_number=reg, form_type=form, mode=mode, run=run)
+             for reg, form in items if (reg, form) not in existing],
+            ignore_conflicts=True, batch_size=500)
+    # повторно отложенные: одно обновление на форму
+    for form in {form for _, form in items}:
+        again = [reg for reg, f in items if f == form and (reg, f) in existing]
+        if again:
+            IngestionBacklogItem.objects.filter(mode=mode, form_type=form, reg_number__in=again).update(
+                    run=run, deferrals=F('deferrals') + 1)
+
+    logger.info('Deferred %d ingestion steps (mode=%s) to backlog', len(items), mode)
+    return len(items)
+
+
+def _clear_backlog(mode: str, reg_number: int, forms: Iterable[str] | None = None) -> None:
+    qs = IngestionBacklogItem.objects.filter(mode=mode, reg_number=reg_number)
+    if forms is not None:
+        qs = qs.filter(form_type__in=list(forms))
+    qs.delete()
@@ -0,0 +1,99 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from django.conf import settings
+from django.utils import timezone
+
+from core.models import IngestionBacklogItem, IngestionRun
+
+
+logger = logging.getLogger(__name__)
+
+REPORTS = 'reports'
+BANK_RUN_MODES = ('incremental', 'backfill')
+
+
+def _naive(value: datetime) -> datetime:
+    return timezone.make_naive(value) if timezone.is_aware(value) else value
+
+
+def _get_form_cadence(form: str) -> dict:
+    """Календарь публикации формы из settings.INGESTION_FORM_CADENCE: {'months': (...), 'lag_days': N}."""
+    cadence = getattr(settings, 'INGESTION_FORM_CADENCE', {})
+    if form not in cadence:
+        raise ValueError(f'Для формы {form} не задан календарь публикации. Доступны: {sorted(cadence)}')
+    return cadence[form]
+
+
+def _publication_dates(form: str, start: datetime, end: datetime) -> list[datetime]:
+    """
+    Моменты публикации формы в интервале (start, end]: отчётная дата (1-е число месяца из cadence['months'])
+    плюс задержка публикации cadence['lag_days'].
+    """
+    cadence = _get_form_cadence(form)
+    lag = timedelta(days=cadence['lag_days'])
+    dates = []
+    for year in range((start - lag).year, end.year + 1):
+        for month in sorted(cadence['months']):
+            published = datetime(year, month, 1) + lag
+            if start < published <= end:
+                dates.append(published)
+    return dates
+
+
+def _next_publication(form: str, after: datetime) -> datetime:
+    cadence = _get_form_cadence(form)
+    # хотя бы одна отчётная дата попадает в окно длиной 12 месяцев + задержка
+    horizon = after + timedelta(days=366 + cadence['lag_days'])
+    return _publication_dates(form, after, horizon)[0]
+
+
+def _is_form_complete(run: IngestionRun, form: str) -> bool:
+    """Запуск загрузил форму по всем банкам: полный (без reg_numbers), не только очередь и без хвоста в очереди."""
+    params = run.params or {}
+    if params.get('reg_numbers') or params.get('backlog_only'):
+        return False
+    if params.get('forms') and form not in params['forms']:
+        return False
+    if (run.summary or {}).get('deferred'):
+        return not IngestionBacklogItem.objects.filter(mode=run.mode, form_type=form).exists()
+    return True
+
+
+def _last_form_ingestion(form: str) -> datetime | None:
+    """Начало последнего успешного запуска, полностью загрузившего форму (для reports — задачи ставок)."""
+    runs = IngestionRun.objects.filter(status=IngestionRun.Status.SUCCESS).exclude(summary__has_key='skipped')
+    if form == REPORTS:
+        last = runs.filter(mode=REPORTS).order_by('-started_at').first()
+        return last.started_at if last else None
+    for run in runs.filter(mode__in=BANK_RUN_MODES).order_by('-started_at')[:100]:
+        if _is_form_complete(run, form):
+            return run.started_at
+    return None
+
+
+def _form_schedule(form: str, now: datetime | None = None) -> dict:
+    """
+    Состояние формы: последняя полная загрузка, ближайшая публикация после неё и пора ли загружать.
+    Форма, которую ещё ни разу не загружали полностью, считается к загрузке.
+    """
+    now = _naive(now or timezone.now())
+    last = _last_form_ingestion(form)
+    if last is None:
+        return {'form': form, 'last_ingestion': None, 'next_publication': None, 'due': True}
+    last = _naive(last)
+    next_publication = _next_publication(form, last)
+    return {'form': form, 'last_ingestion': last, 'next_publication': next_publication,
+            'due': next_publication <= now}
+
+
+def _due_forms(forms: Iterable[str]) -> tuple[list[str], dict[str, dict]]:
+    """Формы, по которым после последней полной загрузки вышла новая публикация, и расписание всех форм."""
+    schedule = {form: _form_schedule(form) for form in forms}
+    due = [form for form, state in schedule.items() if state['due']]
+    for form, state in schedule.items():
+        if not state['due']:
+            logger.info('Form %s is not due: last ingestion %s, next publication %s', form,
+                        state['last_ingestion'], state['next_publication'])
+    return due, schedule
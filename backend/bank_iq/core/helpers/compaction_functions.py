@@ -0,0 +1,149 @@
+import logging
+from collections import Counter, defaultdict
+from functools import reduce
+from itertools import groupby
+from operator import itemgetter, or_
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.db.models.functions import Length
+
+from core.helpers.indicators_db_functions import _delete_orphan_payloads, _orphan_payloads
+from core.helpers.indicator_values_functions import _naive_dt, _to_decimal
+from core.utils.throttle import Throttle
+from indicators.models import BankIndicatorDataRequest, BankIndicatorDataResponse, IndicatorPayload
+
+
+logger = logging.getLogger(__name__)
+
+
+def _subsumed_ranges(ranges: list[dict]) -> list[tuple[dict, dict]]:
+    """
+    Интервальный проход по диапазонам одного (банк, индикатор): после сортировки по (date_from, -date_to)
+    диапазон вложен в ранее встреченный с наибольшим date_to, если не выходит за его конец.
+    Возвращает пары (вложенный, охватывающий); охватывающие сами никогда не вложены.
+    """
+    result = []
+    container = None
+    for item in sorted(ranges, key=lambda r: (r['date_from'], -r['date_to'].timestamp(), r['pk'])):
+        if container is not None and item['date_to'] <= container['date_to']:
+            result.append((item, container))
+        else:
+            container = item
+    return result
+
+
+def _value_rows(items: list[dict], date_from=None, date_to=None) -> Counter:
+    """Строки ответа F101 как мультимножество (дата, pln, ap, vitg, iitg), опционально за [date_from, date_to]."""
+    rows = Counter()
+    for item in items or []:
+        report_date = _naive_dt(item.get('date'))
+        if date_from is not None and (report_date is None or not date_from <= report_date <= date_to):
+            continue
+        rows[(report_date, str(item.get('pln')), int(item.get('ap') or 0),
+              _to_decimal(item.get('vitg')), _to_decimal(item.get('iitg')))] += 1
+    return rows
+
+
+def _delete_redundant(items: list[dict], dry_run: bool) -> dict:
+    """
+    Удаляет вложенные запросы (ответы удаляются каскадом) и блобы IndicatorPayload, на которые ссылались только они.
+    items — {'pk', 'hash', 'container_pk', 'container_hash'}: хэши ответов, которые сравнивались. Запрос удаляется,
+    только если и его ответ, и ответ охватывающего запроса на момент удаления всё ещё с теми же хэшами
+    (иначе ответ перезаписали после сравнения — пара остаётся до следующего прохода).
+    Блобы удаляются тем же способом, что и в collect_orphan_payloads (под блокировкой, с перепроверкой ссылок
+    и возраста): недавно переиспользованные писателем остаются до следующей сборки.
+    Возвращает число удалённых запросов, блобов и байт тел (длина сохранённого значения).
+    """
+    data_hashes = {item['hash'] for item in items}
+    if dry_run:
+        request_ids = [item['pk'] for item in items]
+        still_used = set(BankIndicatorDataResponse.objects.filter(payload_id__in=data_hashes).exclude(
+                request_id__in=request_ids).values_list('payload_id', flat=True))
+        orphans = IndicatorPayload.objects.filter(data_hash__in=data_hashes - still_used)
+        reclaimed = orphans.aggregate(total=Sum(Length('payload')))['total'] or 0
+        return {'requests': len(request_ids), 'payloads': orphans.count(), 'bytes': reclaimed}
+
+    with transaction.atomic():
+        # ответы обеих сторон пар блокируются: upsert ответа дождётся конца транзакции, а не перепишет его
+        # между проверкой хэша и удалением
+        current = dict(BankIndicatorDataResponse.objects.select_for_update().filter(
+                request_id__in={pk for item in items for pk in (item['pk'], item['container_pk'])}).values_list(
+                'request_id', 'data_hash'))
+        unchanged = [item for item in items if current.get(item['pk']) == item['hash']
+                     and current.get(item['container_pk']) == item['container_hash']]
+        by_hash = defaultdict(list)
+        for item in unchanged:
+            by_hash[item['hash']].append(item['pk'])
+        deleted = {}
+        if by_hash:
+            _, deleted = BankIndicatorDataRequest.objects.filter(reduce(or_, (
+                    Q(pk__in=pks, response__data_hash=data_hash) for data_hash, pks in by_hash.items()))).delete()
+    payloads, reclaimed = _delete_orphan_payloads(_orphan_payloads(data_hashes=data_hashes))
+    return {'requests': deleted.get(BankIndicatorDataRequest._meta.label, 0), 'payloads': payloads,
+            'bytes': reclaimed}
+
+
+def _compact_indicator_ranges(reg_numbers: list[int] | None = None, batch_size: int | None = None,
+                              pause_seconds: float | None = None, dry_run: bool = False) -> dict:
+    """
+    Сжатие истории запросов F101: запрос по диапазону, строго вложенному в другой сохранённый диапазон того же
+    банка и индикатора, избыточен — срезы отвечаются из BankIndicatorValue, а недостающие даты ищутся
+    по охватывающему диапазону. Вложенный запрос удаляется, только если его строки совпадают со строками
+    охватывающего ответа за те же даты (иначе ЦБ исправил данные — пара остаётся и попадает в mismatched).
+    Диапазоны читаются одним потоком, упорядоченным по (банк, индикатор), а тела ответов загружаются только
+    для текущей группы, поэтому память не зависит от числа индикаторов банка.
+    Удаление идёт пакетами по batch_size запросов с паузой pause_seconds между ними; dry_run — только отчёт.
+    Возвращает число проверенных банков, найденных/удалённых запросов, блобов и байт освобождённых тел.
+    """
+    batch_size = batch_size or settings.INDICATOR_COMPACTION_BATCH_SIZE
+    pause_seconds = settings.INDICATOR_COMPACTION_PAUSE_SECONDS if pause_seconds is None else pause_seconds
+    throttle = Throttle(pause_seconds)
+
+    requests = BankIndicatorDataRequest.objects.filter(
+            form_type__title='F101', date_from__isnull=False, date_to__isnull=False, response__isnull=False)
+    if reg_numbers:
+        requests = requests.filter(bank__reg_number__in=reg_numbers)
+
+    result = {'banks': 0, 'subsumed': 0, 'mismatched': 0, 'requests': 0, 'payloads': 0, 'bytes': 0}
+    batch = []
+
+    def _flush():
+        throttle.wait()
+        deleted = _delete_redundant(batch, dry_run)
+        for field in ('requests', 'payloads', 'bytes'):
+            result[field] += deleted[field]
+        batch.clear()
+
+    rows = requests.order_by('bank_id', 'form_type_id', 'ind_code').values(
+            'pk', 'bank_id', 'form_type_id', 'ind_code', 'date_from', 'date_to', 'response__data_hash')
+    last_bank_id = None
+    for (bank_id, _, _), ranges in groupby(rows.iterator(chunk_size=2000),
+                                           key=itemgetter('bank_id', 'form_type_id', 'ind_code')):
+        if bank_id != last_bank_id:
+            result['banks'] += 1
+            last_bank_id = bank_id
+        pairs = _subsumed_ranges(list(ranges))
+        if not pairs:
+            continue
+        payloads = dict(IndicatorPayload.objects.filter(
+                data_hash__in={r['response__data_hash'] for pair in pairs for r in pair}).values_list(
+                'data_hash', 'payload'))
+        for item, container in pairs:
+            result['subsumed'] += 1
+            item_hash, container_hash = item['response__data_hash'], container['response__data_hash']
+            if item_hash not in payloads or container_hash not in payloads or _value_rows(
+                    payloads[item_hash]) != _value_rows(payloads[container_hash], item['date_from'], item['date_to']):
+                result['mismatched'] += 1
+                continue
+            batch.append({'pk': item['pk'], 'hash': item_hash, 'container_pk': container['pk'],
+                          'container_hash': container_hash})
+            if len(batch) >= batch_size:
+                _flush()
+    if batch:
+        _flush()
+
+    result['dry_run'] = dry_run
+    logger.info('Indicator range compaction: %s', result)
+    return result
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from django.conf import settings
+from django.db.models import Count
+from django.utils import timezone
+
+from core.models import FailedFetch
+
+
+logger = logging.getLogger(__name__)
+
+# (source, stage, reg_number, params, message)
+FailedUnit = tuple[str, str, int | None, dict, str]
+
+# Ответ ЦБ «данных нет» — штатная ситуация (например, F810 на будущую дату), а не сбой
+NO_DATA_PREFIXES = ('Данных для указанных параметров',)
+
+
+def _error_class(message: str | None) -> str:
+    message = str(message or '')
+    if message.startswith(NO_DATA_PREFIXES):
+        return 'no_data'
+    if message.startswith('Ошибка внешнего API'):
+        return 'external'
+    if message.startswith('Внутренняя ошибка'):
+        return 'internal'
+    if message.startswith('exception'):
+        return 'exception'
+    return 'other'
+
+
+def _normalize_params(params: dict) -> dict:
+    return {k: v.isoformat() if isinstance(v, datetime) else v for k, v in sorted(params.items())}
+
+
+def _failed_fetch_key(source: str, stage: str, reg_number: int | None, params: dict) -> str:
+    raw = json.dumps([source, stage, reg_number, params], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _backoff(attempts: int) -> timedelta:
+    """Экспоненциальная задержка перед следующей попыткой: base * 2^attempts, не больше max."""
+    seconds = settings.DEAD_LETTER_BACKOFF_SECONDS * (2 ** attempts)
+    return timedelta(seconds=min(seconds, settings.DEAD_LETTER_BACKOFF_MAX_SECONDS))
+
+
+def _record_failed_fetches(failures: Iterable[FailedUnit]) -> int:
+    """
+    Записывает сбойные единицы работы в FailedFetch одной вставкой. Уже известная единица снова становится
+    ожидающей повтора со сброшенным счётчиком попыток. Ответы «данных нет» не записываются.
+    Возвращает число записанных единиц; ошибки записи не прерывают загрузку.
+    """
+    now = timezone.now()
+    objs = {}
+    for source, stage, reg_number, params, message in failures:
+        error_class = _error_class(message)
+        if error_class == 'no_data':
+            continue
+        params = _normalize_params(params)
+        key = _failed_fetch_key(source, stage, reg_number, params)
+        objs[key] = FailedFetch(key=key, source=source, stage=stage, reg_number=reg_number, params=params,
+                                error_class=error_class, error=str(message)[:2000],
+                                status=FailedFetch.Status.PENDING, attempts=0, next_attempt_at=now + _backoff(0),
+                                updated_at=now, created_at=now)
+    if not objs:
+        return 0
+    try:
+        FailedFetch.objects.bulk_create(
+                list(objs.values()), update_conflicts=True, unique_fields=['key'],
+                update_fields=['error_class', 'error', 'status', 'attempts', 'next_attempt_at', 'updated_at'])
+    except Exception:
+        logger.exception('Failed to record %d failed fetches', len(objs))
+        return 0
+    return len(objs)
+
+
+def _record_failed_fetch(source: str, stage: str, reg_number: int | None, params: dict, message: str) -> None:
+    _record_failed_fetches([(source, stage, reg_number, params, message)])
+
+
+def _get_due_failed_fetches(limit: int) -> list[FailedFetch]:
+    return list(FailedFetch.objects.filter(status=FailedFetch.Status.PENDING, next_attempt_at__lte=timezone.now())
+                .order_by('next_attempt_at')[:limit])
+
+
+def _mark_failed_fetch_resolved(item: FailedFetch) -> None:
+    now = timezone.now()
+    item.status, item.attempts = FailedFetch.Status.RESOLVED, item.attempts + 1
+    item.last_attempt_at = item.resolved_at = now
+    item.save(update_fields=['status', 'attempts', 'last_attempt_at', 'resolved_at', 'updated_at'])
+
+
+def _mark_failed_fetch_retry(item: FailedFetch, message: str) -> None:
+    """Неудачный повтор: откладывает следующую попытку с экспоненциальной задержкой или сдаётся."""
+    now = timezone.now()
+    item.attempts += 1
+    item.last_attempt_at = now
+    item.error_class, item.error = _error_class(message), str(message)[:2000]
+    if item.attempts >= settings.DEAD_LETTER_MAX_ATTEMPTS:
+        item.status = FailedFetch.Status.ABANDONED
+    item.next_attempt_at = now + _backoff(item.attempts)
+    item.save(update_fields=['attempts', 'last_attempt_at', 'error_class', 'error', 'status', 'next_attempt_at',
+                             'updated_at'])
+
+
+def _failed_fetch_stats() -> dict:
+    """Счётчики FailedFetch: по статусам, по источникам и классам ошибок среди ожидающих."""
+    by_status = {row['status']: row['n'] for row in
+                 FailedFetch.objects.values('status').annotate(n=Count('id')).order_by()}
+    pending = FailedFetch.objects.filter(status=FailedFetch.Status.PENDING)
+    return {
+        'by_status': by_status,
+        'pending_by_source': {row['source']: row['n'] for row in
+                              pending.values('source').annotate(n=Count('id')).order_by()},
+        'pending_by_error_class': {row['error_class']: row['n'] for row in
+                                   pending.values('error_class').annotate(n=Count('id')).order_by()},
+        'next_attempt_at': pending.order_by('next_attempt_at').values_list('next_attempt_at', flat=True).first(),
+    }
@@ -0,0 +1,93 @@
+import logging
+from datetime import date, datetime, timedelta
+from typing import Iterable
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from banks.models import Bank, BankDatesResponse
+from core.models import FailedFetch
+from core.one_time_tasks import form_f101, form_f123
+
+
+logger = logging.getLogger(__name__)
+
+# Формы, у которых есть список доступных отчётных дат (по нему судим о новых публикациях)
+DATED_FORMS = (form_f123()['title'], form_f101()['title'])
+
+
+def _mark_registry_presence(present: Iterable[int], vanished: Iterable[int]) -> None:
+    """
+    Банк, пропавший из EnumBIC_XML (отозвана лицензия), сразу становится dormant;
+    вернувшийся в справочник — снова active.
+    """
+    now = timezone.now()
+    gone = Bank.objects.filter(reg_number__in=list(vanished), in_registry=True).update(
+            in_registry=False, status=Bank.Status.DORMANT, dormant_since=now)
+    back = Bank.objects.filter(reg_number__in=list(present), in_registry=False).update(
+            in_registry=True, status=Bank.Status.ACTIVE, idle_periods=0, dormant_since=None)
+    if gone or back:
+        logger.info('Bank registry presence: %d banks became dormant, %d returned', gone, back)
+
+
+def _publication_period(moment: datetime) -> date:
+    """Отчётный период (первое число месяца), к которому относится загрузка, начатая в moment."""
+    return moment.date().replace(day=1)
+
+
+def _split_dormant(banks_list: list[dict]) -> tuple[list[dict], list[int]]:
+    """
+    Убирает из списка dormant-банки, которые проверялись недавно (settings.DORMANT_BANK_CHECK_DAYS).
+    Проверка, начатая сегодня, остаётся открытой до конца дня: запуски остальных форм (они идут по одной)
+    тоже загружают банк. Возвращает (банки к загрузке, пропущенные рег. номера).
+    """
+    now = timezone.now()
+    since = now - timedelta(days=settings.DORMANT_BANK_CHECK_DAYS)
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    resting = set(Bank.objects.filter(status=Bank.Status.DORMANT).filter(
+            Q(last_checked_at__gte=since, last_checked_at__lt=today)
+            | Q(last_checked_at__isnull=True, dormant_since__gte=since)
+    ).values_list('reg_number', flat=True))
+    if not resting:
+        return banks_list, []
+    kept = [b for b in banks_list if b['reg_number'] not in resting]
+    skipped = sorted(b['reg_number'] for b in banks_list if b['reg_number'] in resting)
+    logger.info('Skipping %d dormant banks until their next check', len(skipped))
+    return kept, skipped
+
+
+def _update_bank_activity(bank_obj: Bank, started_at: datetime, forms: Iterable[str]) -> None:
+    """
+    После загрузки банка: появились ли новые отчётные даты (BankDatesResponse изменился с started_at).
+    Простой засчитывается не чаще раза за отчётный период и только если в этом периоде новых дат ещё не было,
+    поэтому запуски по отдельным формам не умножают счётчик. Нет новых дат settings.DORMANT_BANK_IDLE_PERIODS
+    периодов подряд — банк становится dormant; новые даты у dormant-банка — снова active.
+    Сбой получения списка дат периодом простоя не считается.
+    """
+    if not set(forms) & set(DATED_FORMS):
+        return
+    if FailedFetch.objects.filter(reg_number=bank_obj.reg_number, stage='dates', updated_at__gte=started_at,
+                                  status=FailedFetch.Status.PENDING).exists():
+        return
+
+    now = timezone.now()
+    qs = Bank.objects.filter(pk=bank_obj.pk)
+    if bank_obj.status == Bank.Status.DORMANT:
+        qs.update(last_checked_at=now)
+
+    if BankDatesResponse.objects.filter(request__bank=bank_obj, updated_at__gte=started_at).exists():
+        fields = {'idle_periods': 0, 'last_new_dates_at': now}
+        if bank_obj.status == Bank.Status.DORMANT and bank_obj.in_registry:
+            fields.update(status=Bank.Status.ACTIVE, dormant_since=None)
+            logger.info('Bank %s has new reporting dates again: active', bank_obj.reg_number)
+        qs.update(**fields)
+        return
+
+    period = _publication_period(started_at)
+    counted = (qs.exclude(idle_period=period).exclude(last_new_dates_at__gte=period)
+               .update(idle_periods=F('idle_periods') + 1, idle_period=period))
+    if counted and qs.filter(status=Bank.Status.ACTIVE, idle_periods__gte=settings.DORMANT_BANK_IDLE_PERIODS
+                             ).update(status=Bank.Status.DORMANT, dormant_since=now):
+        logger.info('Bank %s had no new reporting dates for %d periods: dormant', bank_obj.reg_number,
+                    settings.DORMANT_BANK_IDLE_PERIODS)
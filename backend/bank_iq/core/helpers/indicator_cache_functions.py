@@ -0,0 +1,219 @@
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Iterable
+
+import redis
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import F
+from django.utils import timezone
+
+from banks.models import Bank
+from core.helpers.indicators_db_functions import _find_existing_bank_indicators_data_request, \
+    _update_or_create_bank_indicator_data_response
+from core.helpers.indicator_values_functions import _contiguous_runs, _expected_report_dates, _get_indicator_values, \
+    _missing_report_dates, _naive_dt
+from core.models import IndicatorAccessStat
+from core.parsers.soap.form101_parser import Form101Parser
+from core.parsers.soap.form123_parser import Form123Parser
+from core.parsers.soap.form810_parser import Form810Parser
+from core.utils.indicator_cache import cache_get, cache_set, cache_version, indicator_cache_key, \
+    indicator_cache_scope, indicator_key_params
+from indicators.models import FormType
+
+
+logger = logging.getLogger(__name__)
+
+# Форма -> запрос к ЦБ по параметрам; F101 — см. _get_f101_range
+_FETCHERS = {
+    'F123': lambda p: Form123Parser.get_data123_form_full(p['reg_number'], p['dt']),
+    'F810': lambda p: Form810Parser.parse(p['reg_number'], p['dt']),
+}
+# Буфер обращений к ключам (см. _record_indicator_access) и буфер, переносимый в БД (см. _flush_indicator_access)
+_ACCESS_BUFFER_KEY = 'indicators:access:buffer'
+_ACCESS_FLUSHING_KEY = 'indicators:access:flushing'
+_access_redis = None
+
+
+def _get_bank_indicator_data(form_title: str, params: dict, use_cache: bool = True) -> list[dict] | dict:
+    """
+    Возвращает данные банка по форме: кэш -> БД -> внешний API ЦБ (с сохранением в БД).
+    F101 на любой диапазон собирается из таблицы значений BankIndicatorValue (см. _get_f101_range).
+    Результат кладётся в кэш под ключом indicator_cache_key(form_title, params) и версией области
+    (форма, банк, индикатор), которую загрузчик меняет при изменении данных.
+    use_cache=False — не читать кэш (используется при прогреве).
+    В случае ошибки внешнего API возвращает {'message': ...}.
+    """
+    params = indicator_key_params(form_title, params)
+    key = indicator_cache_key(form_title, params)
+    version = cache_version(indicator_cache_scope(form_title, params))
+    if use_cache:
+        cached = cache_get(key, version)
+        if cached is not None:
+            return cached
+
+    bank = Bank.objects.get(reg_number=params['reg_number'])
+    form_type = FormType.objects.get(title=form_title)
+    if form_title == 'F101':
+        data = _get_f101_range(bank, form_type, params)
+        if 'message' not in data:
+            cache_set(key, version, data)
+        return data
+
+    existing = _find_existing_bank_indicators_data_request(bank, form_type, **params)
+    if existing and hasattr(existing, 'response'):
+        data = existing.response.bank_indicator_data
+        cache_set(key, version, data)
+        return data
+
+    data = _FETCHERS[form_title](params)
+    if 'message' in data:
+        return data
+
+    # та же запись, что и у загрузчика: сверка хэша, блоб тела и производные ряды (BankCapitalValue,
+    # BankCapitalChangeRow); ответ хранится в форме парсера, как и у загруженных данных
+    _, _, _, processed_data = _update_or_create_bank_indicator_data_response(
+            bank=bank, form_type=form_type, params=params, bank_indicator_obj=data)
+    # запись могла сменить версию области — кладём под актуальную
+    cache_set(key, cache_version(indicator_cache_scope(form_title, params)), processed_data)
+    return processed_data
+
+
+def _get_f101_range(bank: Bank, form_type: FormType, params: dict) -> list[dict] | dict:
+    """
+    Данные индикатора F101 за произвольный диапазон: срез сохранённых помесячных значений BankIndicatorValue.
+    К ЦБ уходят только отчётные даты, которых ещё нет в БД, — по одному запросу на непрерывный отрезок таких дат;
+    ответы сохраняются (вместе со значениями) и попадают в тот же срез. Ошибка ЦБ — {'message': ...}.
+    """
+    ind_code = params['ind_code']
+    date_from, date_to = _naive_dt(params['date_from']), _naive_dt(params['date_to'])
+    missing = _missing_report_dates(bank, form_type, ind_code, date_from, date_to)
+    if missing:
+        expected = _expected_report_dates(bank, form_type, date_from, date_to)
+        for run_from, run_to in _contiguous_runs(missing, expected):
+            data = Form101Parser.get_indicator_data(reg_number=bank.reg_number, ind_code=ind_code,
+                                                    date_from=run_from, date_to=run_to)
+            if 'message' in data:
+                return data
+            # пустой ответ тоже сохраняется: отрезок отмечается как проверенный и не запрашивается повторно
+            _update_or_create_bank_indicator_data_response(
+                    bank=bank, form_type=form_type, bank_indicator_obj=data,
+                    params={'reg_number': bank.reg_number, 'ind_code': ind_code, 'date_from': run_from,
+                            'date_to': run_to})
+    return _get_indicator_values(bank, form_type, ind_code, date_from, date_to)
+
+
+def _access_buffer():
+    """
+    Клиент Redis буфера обращений (тот же Redis, что и кэш, settings.CACHE_REDIS_URL). Таймауты короткие:
+    недоступный Redis не должен задерживать ответ API — обращение тогда просто не учитывается.
+    """
+    global _access_redis
+    if _access_redis is None:
+        _access_redis = redis.Redis.from_url(settings.CACHE_REDIS_URL, socket_timeout=1, socket_connect_timeout=1)
+    return _access_redis
+
+
+def _record_indicator_access(form_title: str, params: dict) -> None:
+    """
+    Учитывает обращение к ключу (форма + параметры) — основа для прогрева кэша после загрузки.
+    Обращение копится в Redis (HINCRBY в хэше буфера, поле — ключ с параметрами) и переносится
+    в IndicatorAccessStat задачей flush_indicator_access; без Redis (CACHE_REDIS_URL пуст) пишется в БД сразу.
+    """
+    if not getattr(settings, 'INDICATOR_ACCESS_TRACKING', True):
+        return
+
+    params = indicator_key_params(form_title, params)
+    key = indicator_cache_key(form_title, params)
+    if not settings.CACHE_REDIS_URL:
+        _store_indicator_access(key, form_title, params, 1, timezone.now())
+        return
+    field = json.dumps([key, form_title, params], sort_keys=True, ensure_ascii=False, default=str)
+    try:
+        _access_buffer().hincrby(_ACCESS_BUFFER_KEY, field, 1)
+    except redis.RedisError as e:
+        logger.warning('Indicator access buffering failed: %s', e)
+
+
+def _store_indicator_access(key: str, form_title: str, params: dict, hits: int, accessed_at: datetime) -> None:
+    if IndicatorAccessStat.objects.filter(key=key).update(hits=F('hits') + hits, last_accessed_at=accessed_at):
+        return
+    try:
+        IndicatorAccessStat.objects.create(key=key, form_type=form_title, hits=hits, last_accessed_at=accessed_at,
+                                           **params)
+    except IntegrityError:
+        IndicatorAccessStat.objects.filter(key=key).update(hits=F('hits') + hits, last_accessed_at=accessed_at)
+
+
+def _flush_indicator_access() -> dict:
+    """
+    Переносит накопленные в Redis обращения в IndicatorAccessStat (hits += накопленное, last_accessed_at — время
+    переноса). Буфер атомарно переименовывается (RENAME), так что обращения во время переноса копятся в новом.
+    Поле удаляется из переименованного буфера сразу после записи в БД: упавший перенос дописывает остаток
+    следующим запуском, не учитывая уже перенесённое дважды.
+    Возвращает число перенесённых ключей и обращений.
+    """
+    if not settings.CACHE_REDIS_URL:
+        return {'keys': 0, 'hits': 0}
+    client = _access_buffer()
+    if not client.exists(_ACCESS_FLUSHING_KEY):
+        try:
+            client.rename(_ACCESS_BUFFER_KEY, _ACCESS_FLUSHING_KEY)
+        except redis.ResponseError:
+            # буфер пуст — обращений с прошлого переноса не было
+            return {'keys': 0, 'hits': 0}
+
+    now = timezone.now()
+    keys = hits_total = 0
+    for field, hits in client.hscan_iter(_ACCESS_FLUSHING_KEY, count=500):
+        key, form_title, params = json.loads(field)
+        _store_indicator_access(key, form_title, params, int(hits), now)
+        client.hdel(_ACCESS_FLUSHING_KEY, field)
+        keys, hits_total = keys + 1, hits_total + int(hits)
+    return {'keys': keys, 'hits': hits_total}
+
+
+def _get_hot_indicator_keys(top_n: int, reg_numbers: Iterable[int] | None = None) -> list[IndicatorAccessStat]:
+    """Самые запрашиваемые ключи за окно settings.INDICATOR_ACCESS_WINDOW_DAYS."""
+    since = timezone.now() - timedelta(days=getattr(settings, 'INDICATOR_ACCESS_WINDOW_DAYS', 30))
+    qs = IndicatorAccessStat.objects.filter(last_accessed_at__gte=since)
+    if reg_numbers:
+        qs = qs.filter(reg_number__in=list(reg_numbers))
+    return list(qs.order_by('-hits', '-last_accessed_at')[:top_n])
+
+
+def _warm_indicator_cache(top_n: int | None = None, time_budget: float | None = None,
+                          reg_numbers: Iterable[int] | None = None) -> dict:
+    """
+    Прогрев кэша: для top_n самых запрашиваемых ключей данные материализуются в БД (при необходимости —
+    запросом к ЦБ) и кладутся в кэш. Прогрев останавливается по исчерпании time_budget секунд.
+    reg_numbers — прогревать только ключи указанных банков.
+    """
+    top_n = top_n if top_n is not None else settings.INDICATOR_CACHE_WARM_TOP_N
+    time_budget = time_budget if time_budget is not None else settings.INDICATOR_CACHE_WARM_BUDGET_SECONDS
+    deadline = time.monotonic() + time_budget
+
+    stats = _get_hot_indicator_keys(top_n, reg_numbers)
+    warmed = failed = 0
+    out_of_budget = False
+    for stat in stats:
+        if time.monotonic() >= deadline:
+            out_of_budget = True
+            break
+        params = {f: getattr(stat, f) for f in ('reg_number', 'ind_code', 'date_from', 'date_to', 'dt')}
+        try:
+            data = _get_bank_indicator_data(stat.form_type, params, use_cache=False)
+        except Exception as e:
+            logger.warning('Cache warm failed for %s reg=%s: %s', stat.form_type, stat.reg_number, e)
+            failed += 1
+            continue
+        if isinstance(data, dict) and 'message' in data:
+            failed += 1
+            continue
+        warmed += 1
+
+    summary = {'candidates': len(stats), 'warmed': warmed, 'failed': failed, 'out_of_budget': out_of_budget}
+    logger.info('Indicator cache warm: %s', summary)
+    return summary
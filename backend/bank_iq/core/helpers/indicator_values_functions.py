@@ -0,0 +1,361 @@
+import logging
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Iterable
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from banks.models import Bank, BankDatesResponse
+from core.helpers.priority_functions import F123_CAPITAL_PREFIX
+from core.one_time_tasks import form_f101, form_f123, form_f810
+from indicators.models import BankCapitalChangeRow, BankCapitalValue, BankIndicatorDataRequest, \
+    BankIndicatorDataResponse, BankIndicatorValue, FormType
+
+
+logger = logging.getLogger(__name__)
+
+VALUE_KEY_FIELDS = ('bank', 'form_type', 'ind_code', 'report_date', 'pln', 'ap')
+# Итоговые строки F123, материализуемые в BankCapitalValue: поле -> начало названия строки формы
+F123_CAPITAL_ITEMS = {
+    'own_funds': F123_CAPITAL_PREFIX,
+    'base_capital': 'Базовый капитал, итого',
+    'additional_capital': 'Дополнительный капитал, итого',
+}
+# Числовые столбцы F810 (Form810Parser) -> поля BankCapitalChangeRow
+F810_VALUE_COLUMNS = {
+    'USTKAP': 'ustkap', 'SOB_AK': 'sob_ak', 'EMIS_DOH': 'emis_doh', 'PER_CB': 'per_cb', 'PER_OS': 'per_os',
+    'DELTADVR': 'deltadvr', 'PER_IH': 'per_ih', 'REZERVF': 'rezervf', 'VKL_V_IM': 'vkl_v_im',
+    'NERASP_PU': 'nerasp_pu', 'ITOGO_IK': 'itogo_ik',
+}
+
+
+def _naive_dt(value) -> datetime | None:
+    parsed = value if isinstance(value, datetime) else parse_datetime(str(value or ''))
+    if parsed is not None and timezone.is_aware(parsed):
+        parsed = parsed.replace(tzinfo=None)
+    return parsed
+
+
+def _to_decimal(value) -> Decimal | None:
+    """Число из ответа ЦБ; отсутствующее или нечисловое значение — None: «нет данных» не равно нулю."""
+    if value in (None, ''):
+        return None
+    try:
+        number = Decimal(str(value))
+    except InvalidOperation:
+        return None
+    return number if number.is_finite() else None
+
+
+def _upsert_indicator_values(bank: Bank, form_type: FormType, ind_code: str, items: Iterable[dict]) -> int:
+    """
+    Переносит ответ F101 по индикатору (список {date, pln, ap, vitg, iitg}) в BankIndicatorValue одной
+    вставкой INSERT ... ON CONFLICT DO UPDATE. Возвращает число записанных строк.
+    """
+    now = timezone.now()
+    rows: dict[tuple, BankIndicatorValue] = {}
+    for item in items or []:
+        if not isinstance(item, dict):
+            continue
+        report_date = _naive_dt(item.get('date'))
+        if report_date is None:
+            continue
+        pln, ap = str(item.get('pln') or ''), int(item.get('ap') or 0)
+        rows[(report_date, pln, ap)] = BankIndicatorValue(
+                bank=bank, form_type=form_type, ind_code=ind_code, report_date=report_date, pln=pln, ap=ap,
+                vitg=_to_decimal(item.get('vitg')), iitg=_to_decimal(item.get('iitg')),
+                updated_at=now, created_at=now)
+    if not rows:
+        return 0
+    BankIndicatorValue.objects.bulk_create(list(rows.values()), update_conflicts=True,
+                                           unique_fields=list(VALUE_KEY_FIELDS),
+                                           update_fields=['vitg', 'iitg', 'updated_at'])
+    return len(rows)
+
+
+def _month_starts(date_from: datetime, date_to: datetime) -> list[datetime]:
+    """Первые числа месяцев в [date_from, date_to] (не позже текущего месяца)."""
+    date_to = min(date_to, timezone.now().replace(tzinfo=None))
+    current = datetime(date_from.year, date_from.month, 1)
+    if current < date_from:
+        current = datetime(current.year + current.month // 12, current.month % 12 + 1, 1)
+    months = []
+    while current <= date_to:
+        months.append(current)
+        current = datetime(current.year + current.month // 12, current.month % 12 + 1, 1)
+    return months
+
+
+def _expected_report_dates(bank: Bank, form_type: FormType, date_from: datetime, date_to: datetime) -> list[datetime]:
+    """
+    Отчётные даты банка в диапазоне: из сохранённого списка доступных дат формы (BankDatesResponse),
+    а если его нет — первые числа месяцев диапазона.
+    """
+    stored = BankDatesResponse.objects.filter(request__bank=bank, request__form_type=form_type).values_list(
+            'datetimes', flat=True).first()
+    if isinstance(stored, dict) and stored.get('datetimes'):
+        known = {_naive_dt(d) for d in stored['datetimes']}
+        return sorted(d for d in known if d is not None and date_from <= d <= date_to)
+    return _month_starts(date_from, date_to)
+
+
+def _missing_report_dates(bank: Bank, form_type: FormType, ind_code: str, date_from: datetime,
+                          date_to: datetime) -> list[datetime]:
+    """
+    Отчётные даты диапазона, по которым индикатор ещё ни разу не запрашивался: нет значений в BankIndicatorValue
+    и дата не входит ни в один сохранённый диапазон ответа (пустой ответ ЦБ тоже считается загруженным).
+    """
+    expected = _expected_report_dates(bank, form_type, date_from, date_to)
+    if not expected:
+        return []
+    present = set(BankIndicatorValue.objects.filter(
+            bank=bank, form_type=form_type, ind_code=ind_code, report_date__range=(expected[0], expected[-1]),
+    ).values_list('report_date', flat=True))
+    missing = [d for d in expected if d not in present]
+    if not missing:
+        return []
+    ranges = list(BankIndicatorDataRequest.objects.filter(
+            bank=bank, form_type=form_type, ind_code=ind_code, response__isnull=False,
+            date_from__lte=missing[-1], date_to__gte=missing[0],
+    ).values_list('date_from', 'date_to'))
+    return [d for d in missing if not any(df <= d <= dt for df, dt in ranges)]
+
+
+def _contiguous_runs(dates: list[datetime], expected: list[datetime]) -> list[tuple[datetime, datetime]]:
+    """Группирует даты в отрезки, соседние в списке expected: один запрос к ЦБ на отрезок."""
+    position = {d: i for i, d in enumerate(expected)}
+    runs: list[list[datetime]] = []
+    for d in sorted(dates):
+        if runs and position.get(d) == position.get(runs[-1][-1], -2) + 1:
+            runs[-1].append(d)
+        else:
+            runs.append([d])
+    return [(run[0], run[-1]) for run in runs]
+
+
+def _get_indicator_values(bank: Bank, form_type: FormType, ind_code: str, date_from: datetime,
+                          date_to: datetime) -> list[dict]:
+    """
+    Срез значений индикатора за [date_from, date_to] из BankIndicatorValue в формате ответа F101
+    (vitg/iitg — None, если в ответе ЦБ значения не было).
+    """
+    values = BankIndicatorValue.objects.filter(
+            bank=bank, form_type=form_type, ind_code=ind_code, report_date__range=(date_from, date_to),
+    ).order_by('report_date', 'pln', 'ap').values('report_date', 'pln', 'ap', 'vitg', 'iitg')
+    reg = str(bank.reg_number)
+    return [{'bank_reg_number': reg, 'date': v['report_date'].isoformat(), 'pln': v['pln'], 'ap': v['ap'],
+             **{f: None if v[f] is None else float(v[f]) for f in ('vitg', 'iitg')}} for v in values]
+
+
+def _rebuild_indicator_values(reg_numbers: Iterable[int] | None = None) -> dict:
+    """
+    Заполняет BankIndicatorValue из уже сохранённых ответов F101 (BankIndicatorDataResponse) —
+    для данных, загруженных до появления таблицы значений. Повторный запуск безопасен (upsert).
+    """
+    form101_obj = FormType.objects.get(title=form_f101()['title'])
+    qs = BankIndicatorDataResponse.objects.filter(request__form_type=form101_obj, request__ind_code__isnull=False)
+    if reg_numbers:
+        qs = qs.filter(request__reg_number__in=list(reg_numbers))
+    banks_map = {b.pk: b for b in Bank.objects.all()}
+
+    responses = written = 0
+    for bank_id, ind_code, items in qs.values_list('request__bank_id', 'request__ind_code',
+                                                   'payload__payload').iterator(chunk_size=500):
+        bank = banks_map.get(bank_id)
+        if bank is None:
+            continue
+        written += _upsert_indicator_values(bank, form101_obj, ind_code, items)
+        responses += 1
+    logger.info('Rebuilt F101 indicator values: %d responses, %d rows written', responses, written)
+    return {'responses': responses, 'rows_written': written,
+            'rows_total': BankIndicatorValue.objects.filter(form_type=form101_obj).count()}
+
+
+def _capital_value(bank_id: int, report_date: datetime, items: Iterable[dict]) -> BankCapitalValue | None:
+    """Строка BankCapitalValue из ответа F123 (список {name, value}); None — итоговых строк капитала нет."""
+    values = {}
+    for item in items or []:
+        if not isinstance(item, dict):
+            continue
+        name = str(item.get('name', ''))
+        for field, prefix in F123_CAPITAL_ITEMS.items():
+            if field not in values and name.startswith(prefix):
+                values[field] = _to_decimal(item.get('value'))
+    if not values:
+        return None
+    now = timezone.now()
+    return BankCapitalValue(bank_id=bank_id, report_date=report_date, updated_at=now, created_at=now,
+                            **{field: values.get(field) for field in F123_CAPITAL_ITEMS})
+
+
+def _upsert_capital_values(rows: list[BankCapitalValue]) -> int:
+    if not rows:
+        return 0
+    BankCapitalValue.objects.bulk_create(rows, update_conflicts=True, unique_fields=['bank', 'report_date'],
+                                         update_fields=[*F123_CAPITAL_ITEMS, 'updated_at'])
+    return len(rows)
+
+
+def _upsert_capital_value(bank: Bank, report_date: datetime, items: Iterable[dict]) -> int:
+    """Переносит ответ F123 на дату в ряд капитала BankCapitalValue (upsert). Возвращает число записанных строк."""
+    row = _capital_value(bank.pk, _naive_dt(report_date), items)
+    return _upsert_capital_values([row] if row else [])
+
+
+def _rebuild_capital_values(reg_numbers: Iterable[int] | None = None, batch_size: int = 500) -> dict:
+    """
+    Заполняет BankCapitalValue из уже сохранённых ответов F123 — для данных, загруженных до появления ряда.
+    Повторный запуск безопасен (upsert).
+    """
+    qs = BankIndicatorDataResponse.objects.filter(request__form_type__title=form_f123()['title'],
+                                                  request__dt__isnull=False)
+    if reg_numbers:
+        qs = qs.filter(request__reg_number__in=list(reg_numbers))
+
+    responses = written = 0
+    batch: dict[tuple, BankCapitalValue] = {}
+    for bank_id, dt, items in qs.values_list('request__bank_id', 'request__dt',
+                                             'payload__payload').iterator(chunk_size=batch_size):
+        responses += 1
+        row = _capital_value(bank_id, _naive_dt(dt), items)
+        if row is not None:
+            batch[(bank_id, row.report_date)] = row
+        if len(batch) >= batch_size:
+            written += _upsert_capital_values(list(batch.values()))
+            batch = {}
+    written += _upsert_capital_values(list(batch.values()))
+    logger.info('Rebuilt F123 capital values: %d responses, %d rows written', responses, written)
+    return {'responses': responses, 'rows_written': written, 'rows_total': BankCapitalValue.objects.count()}
+
+
+def _get_capital_series(reg_numbers: Iterable[int], date_from: datetime | None = None,
+                        date_to: datetime | None = None) -> list[dict]:
+    """
+    Ряды капитала F123 для банков одним запросом по индексу (bank, report_date): строки упорядочены по банку
+    и дате, значения — float (None, если строки капитала не было в отчёте).
+    """
+    qs = BankCapitalValue.objects.filter(bank__reg_number__in=list(reg_numbers))
+    if date_from is not None:
+        qs = qs.filter(report_date__gte=date_from)
+    if date_to is not None:
+        qs = qs.filter(report_date__lte=date_to)
+    rows = qs.order_by('bank_id', 'report_date').values('bank__reg_number', 'report_date', *F123_CAPITAL_ITEMS)
+    return [{'bank_reg_number': str(row['bank__reg_number']), 'date': row['report_date'].isoformat(),
+             **{field: None if row[field] is None else float(row[field]) for field in F123_CAPITAL_ITEMS}}
+            for row in rows]
+
+
+def _optional_decimal(value) -> Decimal | None:
+    """Число из F810 (float или строка парсера); пусто, '-' и прочий текст — None."""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        number = Decimal(str(value).strip().replace(' ', '').replace(',', '.'))
+    except InvalidOperation:
+        return None
+    return number if number.is_finite() else None
+
+
+def _num_str(value) -> str:
+    """
+    Номер строки F810 как ключ: 1.0 и '1' -> '1', 5.1 и '5.1' -> '5.1'.
+    Номер длиннее столбца num_str не обрезается (обрезанные номера совпали бы), а отбрасывается с предупреждением.
+    """
+    number = _optional_decimal(value)
+    num_str = str(value or '').strip() if number is None else format(number.normalize(), 'f')
+    if len(num_str) > BankCapitalChangeRow._meta.get_field('num_str').max_length:
+        logger.warning('F810 NUM_STR %r is too long, row skipped', value)
+        return ''
+    return num_str
+
+
+def _capital_change_rows(bank_id: int, report_date: datetime, items: Iterable[dict]) -> list[BankCapitalChangeRow]:
+    """Строки BankCapitalChangeRow из ответа F810 (строки Form810Parser); строки без NUM_STR пропускаются."""
+    now = timezone.now()
+    rows: dict[str, BankCapitalChangeRow] = {}
+    for item in items or []:
+        if not isinstance(item, dict):
+            continue
+        num_str = _num_str(item.get('NUM_STR'))
+        if not num_str:
+            continue
+        rows[num_str] = BankCapitalChangeRow(
+                bank_id=bank_id, report_date=report_date, num_str=num_str,
+                label=str(item.get('LABEL') or '')[:512], num_p=str(item.get('NUM_P') or '')[:64],
+                updated_at=now, created_at=now,
+                **{field: _optional_decimal(item.get(column)) for column, field in F810_VALUE_COLUMNS.items()})
+    return list(rows.values())
+
+
+def _upsert_capital_change_rows(rows: list[BankCapitalChangeRow]) -> int:
+    if not rows:
+        return 0
+    BankCapitalChangeRow.objects.bulk_create(rows, update_conflicts=True,
+                                             unique_fields=['bank', 'report_date', 'num_str'],
+                                             update_fields=['label', 'num_p', *F810_VALUE_COLUMNS.values(),
+                                                            'updated_at'])
+    return len(rows)
+
+
+def _replace_capital_change_rows(bank: Bank, report_date: datetime, items: Iterable[dict]) -> int:
+    """
+    Переносит ответ F810 на дату в BankCapitalChangeRow: строки upsert-ятся, а строки, пропавшие
+    из нового ответа, удаляются. Возвращает число записанных строк.
+    """
+    report_date = _naive_dt(report_date)
+    rows = _capital_change_rows(bank.pk, report_date, items)
+    # удаление и запись — одной транзакцией: читатель не видит дату с частью строк
+    with transaction.atomic():
+        BankCapitalChangeRow.objects.filter(bank=bank, report_date=report_date).exclude(
+                num_str__in=[row.num_str for row in rows]).delete()
+        return _upsert_capital_change_rows(rows)
+
+
+def _rebuild_capital_change_rows(reg_numbers: Iterable[int] | None = None, batch_size: int = 500) -> dict:
+    """
+    Заполняет BankCapitalChangeRow из уже сохранённых ответов F810 — для данных, загруженных до появления
+    таблицы. Повторный запуск безопасен (upsert).
+    """
+    qs = BankIndicatorDataResponse.objects.filter(request__form_type__title=form_f810()['title'],
+                                                  request__dt__isnull=False)
+    if reg_numbers:
+        qs = qs.filter(request__reg_number__in=list(reg_numbers))
+
+    responses = written = 0
+    batch: dict[tuple, BankCapitalChangeRow] = {}
+    for bank_id, dt, items in qs.values_list('request__bank_id', 'request__dt',
+                                             'payload__payload').iterator(chunk_size=100):
+        responses += 1
+        for row in _capital_change_rows(bank_id, _naive_dt(dt), items):
+            batch[(bank_id, row.report_date, row.num_str)] = row
+        if len(batch) >= batch_size:
+            written += _upsert_capital_change_rows(list(batch.values()))
+            batch = {}
+    written += _upsert_capital_change_rows(list(batch.values()))
+    logger.info('Rebuilt F810 rows: %d responses, %d rows written', responses, written)
+    return {'responses': responses, 'rows_written': written, 'rows_total': BankCapitalChangeRow.objects.count()}
+
+
+def _get_capital_change_rows(reg_numbers: Iterable[int], date_from: datetime | None = None,
+                             date_to: datetime | None = None, num_strs: Iterable[str] | None = None) -> list[dict]:
+    """
+    Строки F810 банков за период одним запросом по индексу (bank, report_date, num_str), опционально только
+    строки num_strs (по индексу (num_str, report_date) — сравнение банков по строке). Формат строк —
+    как у ответа F810 (NUM_STR, LABEL, NUM_P, USTKAP, ...) плюс bank_reg_number и date.
+    """
+    qs = BankCapitalChangeRow.objects.filter(bank__reg_number__in=list(reg_numbers))
+    if date_from is not None:
+        qs = qs.filter(report_date__gte=date_from)
+    if date_to is not None:
+        qs = qs.filter(report_date__lte=date_to)
+    if num_strs:
+        qs = qs.filter(num_str__in=[_num_str(value) for value in num_strs])
+    rows = qs.order_by('bank_id', 'report_date', 'pk').values(
+            'bank__reg_number', 'report_date', 'num_str', 'label', 'num_p', *F810_VALUE_COLUMNS.values())
+    return [{'bank_reg_number': str(row['bank__reg_number']), 'date': row['report_date'].isoformat(),
+             'NUM_STR': row['num_str'], 'LABEL': row['label'], 'NUM_P': row['num_p'],
+             **{column: None if row[field] is None else float(row[field])
+                for column, field in F810_VALUE_COLUMNS.items()}}
+            for row in rows]
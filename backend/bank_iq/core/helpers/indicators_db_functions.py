@@ -1,14 +1,31 @@
 import json
-from datetime import datetime
+import logging
+from datetime import datetime, timedelta
+from typing import Callable
 
+from django.conf import settings
 from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, QuerySet, Sum
+from django.db.models.functions import Length
+from django.utils import timezone
 
 from banks.models import Bank, BankDatesRequest, BankDatesResponse
 from banks.serializers import BankInfoSerializer
+from core.helpers.dormancy_functions import _mark_registry_presence
+from core.helpers.indicator_values_functions import _replace_capital_change_rows, _upsert_capital_value, \
+    _upsert_indicator_values
+from core.one_time_tasks import form_f101, form_f123, form_f810
 from core.parsers.soap.all_banks_parser import CbrAllBanksParser
 from core.utils.hash_utils import canonical_obj_and_hash
+from core.utils.indicator_cache import bump_cache_version, indicator_cache_scope
+from core.utils.ingestion_meter import record_write
+from core.utils.request_keys import dates_request_key, indicator_data_request_key, indicators_request_key
+from core.utils.upsert import upsert_if_hash_changed
 from indicators.models import BankIndicatorDataRequest, BankIndicatorDataResponse, BankIndicatorsRequest, \
-    BankIndicatorsResponse, FormType
+    BankIndicatorsResponse, FormType, IndicatorPayload
+
+
+logger = logging.getLogger(__name__)
 
 
 def _get_all_banks_from_db():
@@ -18,42 +35,94 @@ def _get_all_banks_from_db():
     return {'banks': q}
 
 
-def _create_banks_from_api():
-    data = CbrAllBanksParser.parse()
-    if 'message' in data:
-        return data
+BANK_SYNC_FIELDS = ('bic', 'name', 'internal_code', 'registration_date', 'region_code', 'tax_id')
 
-    saved_banks = []
-    for bank_data in data.get('banks', []):
+
+def _sync_bank_registry(banks_data: list[dict] | None = None) -> dict:
+    """
+    Сверяет справочник EnumBIC_XML со справочником Bank и применяет разницу пакетными запросами:
+    новые банки — bulk_create, изменившиеся (наименование, БИК, регион и т.д.) — bulk_update.
+    Банки, пропавшие из справочника ЦБ, не удаляются (на них ссылаются сохранённые отчёты), а помечаются
+    dormant (_mark_registry_presence) и попадают в отчёт.
+    banks_data — уже полученный список банков (результат CbrAllBanksParser.parse()['banks']);
+    если не передан, справочник запрашивается у ЦБ.
+    Возвращает {'inserted': [...], 'updated': [...], 'vanished': [...], 'skipped': [...]} (рег. номера)
+    либо {'message': ...} при ошибке внешнего API.
+    """
+    if banks_data is None:
+        data = CbrAllBanksParser.parse()
+        if 'message' in data:
+            return data
+        banks_data = data.get('banks', [])
+
+    incoming: dict[int, dict] = {}
+    skipped: list[int] = []
+    for bank_data in banks_data:
         serializer = BankInfoSerializer(data=bank_data)
-        if serializer.is_valid():
-            validated = serializer.validated_data
-            reg_number = validated['reg_number']
-            try:
-                with transaction.atomic():
-                    obj, created = Bank.objects.get_or_create(
-                            reg_number=reg_number,
-                            defaults={
-                                'bic': validated['bic'],
-                                'name': validated['name'],
-                                'internal_code': validated['internal_code'],
-                                'registration_date': validated['registration_date'],
-                                'region_code': validated['region_code'],
-                                'tax_id': validated['tax_id'],
-                            }
-                    )
-                saved_banks.append(serializer.data)
-            except (ValueError, IntegrityError):
-                continue
-
-    return {'banks': saved_banks}
+        if not serializer.is_valid():
+            logger.warning('Bank serializer invalid for reg %s: %s', bank_data.get('reg_number'), serializer.errors)
+            skipped.append(bank_data.get('reg_number'))
+            continue
+        validated = serializer.validated_data
+        incoming[validated['reg_number']] = {field: validated[field] for field in BANK_SYNC_FIELDS}
+
+    existing = {b.reg_number: b for b in Bank.objects.only('id', 'reg_number', *BANK_SYNC_FIELDS)}
+    tax_owner = {b.tax_id: reg for reg, b in existing.items()}
+
+    to_create: list[Bank] = []
+    to_update: list[Bank] = []
+    now = timezone.now()
+    for reg, values in incoming.items():
+        # ИНН уникален: банк, чей ИНН уже занят другим рег. номером, пропускаем (требует ручного разбора)
+        owner = tax_owner.get(values['tax_id'])
+        if owner is not None and owner != reg:
+            logger.warning('Bank reg %s: tax_id %s already belongs to reg %s, skipped', reg, values['tax_id'], owner)
+            skipped.append(reg)
+            continue
+
+        obj = existing.get(reg)
+        if obj is None:
+            to_create.append(Bank(reg_number=reg, **values))
+            tax_owner[values['tax_id']] = reg
+            continue
+
+        changed = [field for field, value in values.items() if getattr(obj, field) != value]
+        if changed:
+            for field in changed:
+                setattr(obj, field, values[field])
+            obj.updated_at = now
+            to_update.append(obj)
+            tax_owner[values['tax_id']] = reg
+
+    with transaction.atomic():
+        if to_create:
+            Bank.objects.bulk_create(to_create, batch_size=500)
+        if to_update:
+            Bank.objects.bulk_update(to_update, fields=[*BANK_SYNC_FIELDS, 'updated_at'], batch_size=500)
+
+    vanished = sorted(set(existing) - set(incoming))
+    _mark_registry_presence(incoming, vanished)
+    summary = {
+        'inserted': sorted(b.reg_number for b in to_create),
+        'updated': sorted(b.reg_number for b in to_update),
+        'vanished': vanished,
+        'skipped': sorted(r for r in skipped if r is not None),
+    }
+    logger.info('Bank registry sync: inserted=%d, updated=%d, vanished=%d, skipped=%d',
+                len(summary['inserted']), len(summary['updated']), len(vanished), len(summary['skipped']))
+    return summary
+
+
+def _create_banks_from_api():
+    result = _sync_bank_registry()
+    if 'message' in result:
+        return result
+    return {'banks': Bank.objects.all()}
 
 
 def _find_existing_dates_request(bank: Bank, form_type: FormType, params: dict) -> BankDatesRequest:
     return BankDatesRequest.objects.filter(
-            bank=bank,
-            form_type=form_type,
-            reg_number=params.get('reg_number')
+            request_key=dates_request_key(bank.pk, form_type.pk, params.get('reg_number')),
     ).select_related('response').first()
 
 
@@ -61,9 +130,8 @@ def _create_or_get_datetimes_request_atomic(bank: Bank, form_type: FormType, par
     try:
         with transaction.atomic():
             obj, created = BankDatesRequest.objects.get_or_create(
-                    bank=bank,
-                    form_type=form_type,
-                    reg_number=params.get('reg_number')
+                    request_key=dates_request_key(bank.pk, form_type.pk, params.get('reg_number')),
+                    defaults={'bank': bank, 'form_type': form_type, 'reg_number': params.get('reg_number')},
             )
     except IntegrityError:
         obj = _find_existing_dates_request(bank, form_type, params)
@@ -72,20 +140,18 @@ def _create_or_get_datetimes_request_atomic(bank: Bank, form_type: FormType, par
 
 def _find_existing_indicators_request(bank: Bank, form_type: FormType, params: dict) -> BankIndicatorsRequest:
     return BankIndicatorsRequest.objects.filter(
-            bank=bank,
-            form_type=form_type,
-            reg_number=params.get('reg_number'),
-            dt=params.get('dt')).first()
+            request_key=indicators_request_key(bank.pk, form_type.pk, params.get('reg_number'), params.get('dt')),
+    ).first()
 
 
 def _create_or_get_indicators_request_atomic(bank: Bank, form_type: FormType, params: dict):
     try:
         with transaction.atomic():
             obj, created = BankIndicatorsRequest.objects.get_or_create(
-                    bank=bank,
-                    form_type=form_type,
-                    reg_number=params.get('reg_number'),
-                    dt=params.get('dt')
+                    request_key=indicators_request_key(bank.pk, form_type.pk, params.get('reg_number'),
+                                                       params.get('dt')),
+                    defaults={'bank': bank, 'form_type': form_type, 'reg_number': params.get('reg_number'),
+                              'dt': params.get('dt')},
             )
     except IntegrityError:
         obj = _find_existing_indicators_request(bank, form_type, params)
@@ -97,13 +163,9 @@ def _find_existing_bank_indicators_data_request(bank: Bank, form_type: FormType,
                                                 date_from: datetime | None = None, date_to: datetime | None = None,
                                                 dt: datetime | None = None) -> BankIndicatorDataRequest:
     return BankIndicatorDataRequest.objects.filter(
-            bank=bank,
-            form_type=form_type,
-            reg_number=reg_number,
-            ind_code=ind_code,
-            date_from=date_from,
-            date_to=date_to,
-            dt=dt).first()
+            request_key=indicator_data_request_key(bank.pk, form_type.pk, reg_number, ind_code, date_from,
+                                                   date_to, dt),
+    ).first()
 
 
 def _create_or_get_bank_indicators_data_request_atomic(bank: Bank, form_type: FormType,
@@ -114,13 +176,11 @@ def _create_or_get_bank_indicators_data_request_atomic(bank: Bank, form_type: Fo
     try:
         with transaction.atomic():
             obj, created = BankIndicatorDataRequest.objects.get_or_create(
-                    bank=bank,
-                    form_type=form_type,
-                    reg_number=reg_number,
-                    ind_code=ind_code,
-                    date_from=date_from,
-                    date_to=date_to,
-                    dt=dt)
+                    request_key=indicator_data_request_key(bank.pk, form_type.pk, reg_number, ind_code, date_from,
+                                                           date_to, dt),
+                    defaults={'bank': bank, 'form_type': form_type, 'reg_number': reg_number, 'ind_code': ind_code,
+                              'date_from': date_from, 'date_to': date_to, 'dt': dt},
+            )
     except IntegrityError:
         obj = _find_existing_bank_indicators_data_request(
                 bank=bank, form_type=form_type, reg_number=reg_number, ind_code=ind_code,
@@ -130,6 +190,94 @@ def _create_or_get_bank_indicators_data_request_atomic(bank: Bank, form_type: Fo
     return obj
 
 
+def _upsert_hashed_response(response_model, request_pk: int, payload_field: str,
+                            canonical_obj, new_hash: str, old_payload_field: str | None = None,
+                            before_write: Callable[[], None] | None = None) -> tuple[bool, object]:
+    """
+    Сохраняет ответ (OneToOne к request) без select_for_update:
+    1) оптимистично сверяет data_hash — если не изменился, сразу выходим (самый частый случай);
+    2) иначе пишет одной инструкцией upsert, которая сама пропускает запись при совпадающем хэше
+       (если параллельный воркер успел записать те же данные).
+    before_write — подготовка перед записью (например, сохранение блоба тела); при неизменном хэше не вызывается.
+    Если запись нарушила FK (блоб удалил сборщик сирот между подготовкой и записью), подготовка и запись
+    повторяются один раз.
+    Возвращает (created_or_updated, old_payload); old_payload читается без блокировки (из old_payload_field,
+    по умолчанию payload_field) и нужен только для вычисления добавленных/удалённых ключей.
+    """
+    qs = response_model.objects.filter(request_id=request_pk)
+    if qs.filter(data_hash=new_hash).exists():
+        record_write(changed=False)
+        return False, None
+    old_payload = qs.values_list(old_payload_field or payload_field, flat=True).first()
+
+    values = {'request_id': request_pk, payload_field: canonical_obj, 'data_hash': new_hash}
+    if before_write is not None:
+        before_write()
+    try:
+        written = upsert_if_hash_changed(response_model, 'request_id', values)
+    except IntegrityError:
+        if before_write is None:
+            raise
+        before_write()
+        written = upsert_if_hash_changed(response_model, 'request_id', values)
+    record_write(changed=written)
+    return written, old_payload
+
+
+def _store_indicator_payload(canonical_obj, data_hash: str) -> None:
+    """Сохраняет тело ответа в IndicatorPayload, если блоба с таким хэшем ещё нет (гонки — ON CONFLICT DO NOTHING)."""
+    if IndicatorPayload.objects.filter(pk=data_hash).exists():
+        return
+    IndicatorPayload.objects.bulk_create([IndicatorPayload(data_hash=data_hash, payload=canonical_obj)],
+                                         ignore_conflicts=True)
+
+
+def _orphan_payloads(grace_hours: int | None = None, data_hashes=None) -> QuerySet:
+    """Блобы без ссылок из ответов старше grace_hours часов (опционально — только среди data_hashes)."""
+    grace_hours = settings.INDICATOR_PAYLOAD_GC_GRACE_HOURS if grace_hours is None else grace_hours
+    qs = IndicatorPayload.objects.filter(
+            ~Exists(BankIndicatorDataResponse.objects.filter(payload_id=OuterRef('pk'))),
+            created_at__lt=timezone.now() - timedelta(hours=grace_hours))
+    if data_hashes is not None:
+        qs = qs.filter(data_hash__in=list(data_hashes))
+    return qs
+
+
+def _delete_orphan_payloads(orphans: QuerySet, batch_size: int = 1000) -> tuple[int, int]:
+    """
+    Удаляет блобы orphans пакетами. Каждый пакет в своей транзакции: строки блокируются (SELECT ... FOR UPDATE
+    SKIP LOCKED — блоб, на который сейчас ссылается записываемый ответ, пропускается), а само удаление —
+    одна инструкция DELETE с тем же условием orphans (NOT EXISTS ссылок и возраст больше grace), так что
+    ссылку, появившуюся после выборки, проверяет уже DELETE. Возвращает (число удалённых блобов, байт тел).
+    """
+    deleted = reclaimed = 0
+    while True:
+        with transaction.atomic():
+            pks = list(orphans.select_for_update(skip_locked=True).values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            batch = orphans.filter(pk__in=pks)
+            reclaimed += batch.aggregate(total=Sum(Length('payload')))['total'] or 0
+            # без Collector: ON DELETE PROTECT проверяет сама СУБД, условие NOT EXISTS остаётся в DELETE
+            count = batch._raw_delete(batch.db)
+        deleted += count
+        if len(pks) < batch_size:
+            break
+    return deleted, reclaimed
+
+
+def _collect_orphan_payloads(grace_hours: int | None = None) -> dict:
+    """
+    Удаляет блобы IndicatorPayload, на которые не ссылается ни один ответ (ответ обновился или удалён).
+    Блобы моложе grace_hours часов не трогаются: их могли сохранить перед записью ответа, который ещё не записан.
+    Переиспользуемый старый блоб защищает повтор записи в _upsert_hashed_response.
+    """
+    deleted, reclaimed = _delete_orphan_payloads(_orphan_payloads(grace_hours))
+    result = {'deleted': deleted, 'bytes': reclaimed, 'remaining': IndicatorPayload.objects.count()}
+    logger.info('Orphan payload collection: %s', result)
+    return result
+
+
 def _update_or_create_datetimes_response(bank: Bank,
                                          form_type: FormType,
                                          datetimes_obj) -> tuple[bool, list[str], list[str], dict]:
@@ -141,20 +289,10 @@ def _update_or_create_datetimes_response(bank: Bank,
     req = _create_or_get_datetimes_request_atomic(bank, form_type, {'reg_number': bank.reg_number})
     canonical_obj, new_hash = canonical_obj_and_hash(datetimes_obj)
 
-    with transaction.atomic():
-        req_locked = BankDatesRequest.objects.select_for_update().get(pk=req.pk)
-        existing_resp = getattr(req_locked, 'response', None)
-        if existing_resp and getattr(existing_resp, 'data_hash', None) == new_hash:
-            return False, [], [], canonical_obj
-        old = existing_resp.datetimes if existing_resp else None
-        if existing_resp:
-            existing_resp.datetimes = canonical_obj
-            existing_resp.data_hash = new_hash
-            existing_resp.save(update_fields=('datetimes', 'data_hash', 'updated_at'))
-            created_or_updated = True
-        else:
-            BankDatesResponse.objects.create(request=req_locked, datetimes=canonical_obj, data_hash=new_hash)
-            created_or_updated = True
+    created_or_updated, old = _upsert_hashed_response(BankDatesResponse, req.pk, 'datetimes', canonical_obj, new_hash)
+    if not created_or_updated:
+        return False, [], [], canonical_obj
+    old = old or {}
 
     try:
         old_set = set(old.get('datetimes', []) or [])
@@ -188,22 +326,11 @@ def _update_or_create_indicators_response(
     req = _create_or_get_indicators_request_atomic(bank=bank, form_type=form_type, params=params)
     canonical_obj, new_hash = canonical_obj_and_hash(indicators_obj)
 
-    with transaction.atomic():
-        req_locked = BankIndicatorsRequest.objects.select_for_update().get(pk=req.pk)
-        existing_resp = getattr(req_locked, 'response', None)
-        if existing_resp and getattr(existing_resp, 'data_hash', None) == new_hash:
-            return False, [], [], canonical_obj
-        old_indicators = []
-        if existing_resp:
-            old_indicators = getattr(existing_resp, 'indicators', []) or []
-
-            existing_resp.indicators = canonical_obj
-            existing_resp.data_hash = new_hash
-            existing_resp.save(update_fields=('indicators', 'data_hash', 'updated_at'))
-            created_or_updated = True
-        else:
-            BankIndicatorsResponse.objects.create(request=req_locked, indicators=canonical_obj, data_hash=new_hash)
-            created_or_updated = True
+    created_or_updated, old_resp = _upsert_hashed_response(BankIndicatorsResponse, req.pk, 'indicators',
+                                                           canonical_obj, new_hash)
+    if not created_or_updated:
+        return False, [], [], canonical_obj
+    old_indicators = old_resp.get('indicators', []) if isinstance(old_resp, dict) else []
 
     try:
         old_codes = {item.get('ind_code') for item in old_indicators if
@@ -241,7 +368,8 @@ def _update_or_create_bank_indicator_data_response(
          removed: list[str],  # список ключей, которые удалились
          canonical_obj)       # нормализованный payload (той формы, что записан в JSONField)
 
-    Защита от гонок: используется transaction.atomic + select_for_update на request.
+    Защита от гонок: без блокировок — хэш проверяется заранее, а запись выполняется одной инструкцией
+    INSERT ... ON CONFLICT ... DO UPDATE ... WHERE data_hash <> EXCLUDED.data_hash (см. _upsert_hashed_response).
     """
 
     req = _create_or_get_bank_indicators_data_request_atomic(
@@ -256,27 +384,27 @@ def _update_or_create_bank_indicator_data_response(
 
     canonical_obj, new_hash = canonical_obj_and_hash(bank_indicator_obj)
 
-    with transaction.atomic():
-        req_locked = BankIndicatorDataRequest.objects.select_for_update().get(pk=req.pk)
-        existing_response = getattr(req_locked, 'response', None)
-
-        if existing_response and getattr(existing_response, 'data_hash', None) == new_hash:
-            return False, [], [], canonical_obj
-
-        old_list = []
-        if existing_response:
-            old_list = getattr(existing_response, 'bank_indicator_data', []) or []
-
-            existing_response.bank_indicator_data = canonical_obj
-            existing_response.data_hash = new_hash
-            existing_response.save(update_fields=('bank_indicator_data', 'data_hash', 'updated_at'))
-            created_or_updated = True
-        else:
-            BankIndicatorDataResponse.objects.create(
-                    request=req_locked,
-                    bank_indicator_data=canonical_obj,
-                    data_hash=new_hash)
-            created_or_updated = True
+    # тело хранится один раз в IndicatorPayload, ответ ссылается на него по хэшу; блоб сохраняется только
+    # после сверки хэша — неизменившийся ответ не трогает IndicatorPayload
+    created_or_updated, old_list = _upsert_hashed_response(
+            BankIndicatorDataResponse, req.pk, 'payload_id', new_hash, new_hash, old_payload_field='payload__payload',
+            before_write=lambda: _store_indicator_payload(canonical_obj, new_hash))
+    if not created_or_updated:
+        return False, [], [], canonical_obj
+
+    # F101 по индикатору дополнительно раскладывается в таблицу значений (по отчётным датам)
+    if form_type.title == form_f101()['title'] and params.get('ind_code'):
+        _upsert_indicator_values(bank, form_type, params['ind_code'], canonical_obj)
+    # F123 на дату — в ряд капитала (собственные средства, базовый и дополнительный капитал)
+    elif form_type.title == form_f123()['title'] and params.get('dt'):
+        _upsert_capital_value(bank, params['dt'], canonical_obj)
+    # F810 на дату — в типизированные строки формы
+    elif form_type.title == form_f810()['title'] and params.get('dt'):
+        _replace_capital_change_rows(bank, params['dt'], canonical_obj)
+
+    # Устарели закэшированные ответы за все диапазоны/даты этого банка и индикатора (в т.ч. пересекающиеся
+    # с загруженным), а не только за сохранённый; горячие ключи заново заполнит прогрев после загрузки
+    bump_cache_version(indicator_cache_scope(form_type.title, params))
 
     try:
         def _key_of(item) -> str:
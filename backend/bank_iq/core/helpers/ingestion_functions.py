@@ -0,0 +1,711 @@
+import contextvars
+import logging
+import time
+from concurrent.futures import as_completed, ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Iterable
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from banks.models import Bank
+from core.helpers.backlog_functions import _clear_backlog, _defer_to_backlog, _load_backlog
+from core.helpers.deadletter_functions import _record_failed_fetch, _record_failed_fetches
+from core.helpers.dormancy_functions import _split_dormant, _update_bank_activity
+from core.helpers.indicators_db_functions import (
+    _find_existing_dates_request, _sync_bank_registry, _update_or_create_bank_indicator_data_response,
+    _update_or_create_datetimes_response, _update_or_create_indicators_response)
+from core.helpers.ledger_functions import _finish_ingestion_run, _metered_step, _start_ingestion_run
+from core.helpers.priority_functions import _order_banks_by_priority
+from core.models import IngestionRun
+from core.one_time_tasks import form_f101, form_f123, form_f810, form_f813
+from core.parsers.soap import all_banks_parser
+from core.parsers.soap.form101_parser import Form101Parser
+from core.parsers.soap.form123_parser import Form123Parser
+from core.parsers.soap.form810_parser import Form810Parser
+from core.parsers.soap.form_813_parser import CbrF813MParser
+from core.utils.ingestion_meter import record_cache_hit
+from core.utils.throttle import Throttle
+from indicators.models import BankIndicatorDataRequest, FormType
+
+
+logger = logging.getLogger(__name__)
+
+INCREMENTAL = 'incremental'
+BACKFILL = 'backfill'
+
+ALL_BANK_FORMS = (form_f810()['title'], form_f123()['title'], form_f101()['title'], form_f813()['title'])
+
+# Разделы F813 (параметр par GetF813MXml); в BankIndicatorDataRequest.ind_code хранится номер раздела
+F813_PARS = (1, 2, 3, 4)
+
+
+def _get_mode_config(mode: str) -> dict:
+    """
+    Возвращает настройки режима загрузки из settings.INGESTION_MODES.
+    incremental — ежемесячная дозагрузка только новых отчётных дат (быстро, без троттлинга);
+    backfill — полная историческая загрузка (медленно, с троттлингом и меньшим числом потоков).
+    """
+    modes = getattr(settings, 'INGESTION_MODES', {})
+    if mode not in modes:
+        raise ValueError(f'Неизвестный режим загрузки: {mode}. Доступны: {sorted(modes)}')
+    return modes[mode]
+
+
+def _deadline_passed(deadline: float | None) -> bool:
+    """Истёк ли бюджет времени запуска (deadline — момент time.monotonic(), None — без ограничения)."""
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def _parse_naive_dt(value) -> datetime | None:
+    parsed = value if isinstance(value, datetime) else parse_datetime(str(value))
+    if parsed is None:
+        return None
+    if timezone.is_aware(parsed):
+        parsed = parsed.replace(tzinfo=None)
+    return parsed
+
+
+def _generate_f810_dates(start_year: int = 2000, end_year: int | None = None) -> list[datetime]:
+    """
+    Генерирует даты 1 января и 1 апреля каждого года в диапазоне [start_year, end_year].
+    По умолчанию end_year — текущий год (в часовом поясе Django).
+    """
+    if end_year is None:
+        end_year = timezone.now().year
+    dates: list[datetime] = []
+    for y in range(start_year, end_year + 1):
+        dates.append(datetime(y, 1, 1))
+        dates.append(datetime(y, 4, 1))
+    return dates
+
+
+def _get_stored_datetimes(bank: Bank, form_type: FormType) -> set[str]:
+    """Возвращает множество уже сохранённых в БД отчётных дат (канонические ISO-строки) для банка и формы."""
+    req = _find_existing_dates_request(bank, form_type, {'reg_number': bank.reg_number})
+    resp = getattr(req, 'response', None) if req else None
+    if resp is None or not isinstance(resp.datetimes, dict):
+        return set()
+    return set(resp.datetimes.get('datetimes', []) or [])
+
+
+def _select_target_dates(all_dates: list[str], stored: set[str], cfg: dict) -> list[str]:
+    """
+    В инкрементальном режиме оставляет только новые даты (которых ещё нет в БД).
+    Если для банка ещё ничего не сохранено — возвращает все даты (первичная загрузка).
+    """
+    if cfg.get('only_new_dates') and stored:
+        target = [d for d in all_dates if d not in stored]
+        record_cache_hit(len(all_dates) - len(target))
+        return target
+    return list(all_dates)
+
+
+def _ingest_bank_f810(bank_obj: Bank, cfg: dict, throttle: Throttle, deadline: float | None = None) -> bool:
+    """Загрузка F810 банка по датам. Возвращает False, если загрузка прервана по дедлайну."""
+    reg = bank_obj.reg_number
+    form810_obj = FormType.objects.get(title=form_f810()['title'])
+
+    lookback = cfg.get('f810_lookback_years')
+    if lookback is not None:
+        start_year = timezone.now().year - int(lookback)
+    else:
+        start_year = int(cfg.get('f810_start_year', 2000))
+
+    for parsed_dt in _generate_f810_dates(start_year=start_year):
+        if _deadline_passed(deadline):
+            return False
+        error = _ingest_f810_date(bank_obj, form810_obj, parsed_dt, throttle)
+        if error:
+            _record_failed_fetch(form810_obj.title, 'date', reg, {'dt': parsed_dt}, error)
+    return True
+
+
+def _ingest_f810_date(bank_obj: Bank, form810_obj: FormType, parsed_dt: datetime, throttle: Throttle) -> str | None:
+    """Загрузка F810 банка на одну дату. Возвращает текст ошибки ЦБ (None — успешно или данных нет)."""
+    reg = bank_obj.reg_number
+    throttle.wait()
+    bank_indicator_data = Form810Parser.parse(reg, parsed_dt)
+    if 'message' in bank_indicator_data or not bank_indicator_data:
+        logger.warning(
+                f'[!!] RETURN EMPTY bank indicator data for form810 and bank {bank_obj.name}. '
+                f'STOP update bank indicator data. Message: {str(bank_indicator_data)} [!!]')
+        return bank_indicator_data.get('message') if isinstance(bank_indicator_data, dict) else None
+
+    created_or_updated, added, removed, canonical_obj = _update_or_create_bank_indicator_data_response(
+            bank=bank_obj,
+            form_type=form810_obj,
+            bank_indicator_obj=bank_indicator_data,
+            params={'reg_number': reg, 'dt': parsed_dt}
+    )
+    logger.debug(
+            "Saved F810 for bank %s dt=%s -> upd=%s added=%d removed=%d",
+            bank_obj.name, parsed_dt.isoformat(), created_or_updated,
+            len(added) if added is not None else 0,
+            len(removed) if removed is not None else 0
+    )
+    return None
+
+
+def _generate_f813_dates(start_year: int, end: datetime | None = None) -> list[datetime]:
+    """Ежемесячные отчётные даты F813 (1-е число месяца) с января start_year по текущий месяц включительно."""
+    end = end or timezone.now().replace(tzinfo=None)
+    return [datetime(y, m, 1) for y in range(start_year, end.year + 1) for m in range(1, 13)
+            if datetime(y, m, 1) <= end]
+
+
+def _get_stored_f813_units(bank_ids: list[int]) -> dict[int, set[tuple[datetime, int]]]:
+    """Уже сохранённые единицы F813 по банкам: {bank_id: {(отчётная дата, par)}}."""
+    rows = BankIndicatorDataRequest.objects.filter(
+            form_type__title=form_f813()['title'], bank_id__in=bank_ids, response__isnull=False,
+    ).values_list('bank_id', 'dt', 'ind_code')
+    units: dict[int, set[tuple[datetime, int]]] = {}
+    for bank_id, dt, par in rows:
+        parsed_dt = _parse_naive_dt(dt)
+        if parsed_dt is not None and str(par).isdigit():
+            units.setdefault(bank_id, set()).add((parsed_dt, int(par)))
+    return units
+
+
+def _select_f813_units(stored: set[tuple[datetime, int]], cfg: dict) -> list[tuple[datetime, int]]:
+    """
+    Сетка (отчётная дата, par) к загрузке. В инкрементальном режиме — только даты после последней
+    сохранённой (водяной знак); банк без сохранённых данных загружается за f813_lookback_years лет.
+    В режиме backfill — вся сетка с f813_start_year (неизменившиеся ответы отсекаются по хэшу).
+    """
+    lookback = cfg.get('f813_lookback_years')
+    if lookback is not None:
+        start_year = timezone.now().year - int(lookback)
+    else:
+        start_year = int(cfg.get('f813_start_year', 2019))
+    grid = [(dt, par) for dt in _generate_f813_dates(start_year) for par in F813_PARS]
+    if cfg.get('only_new_dates') and stored:
+        watermark = max(dt for dt, _ in stored)
+        target = [(dt, par) for dt, par in grid if dt > watermark]
+        record_cache_hit(len(grid) - len(target))
+        return target
+    return grid
+
+
+def _ingest_bank_f813(bank_obj: Bank, cfg: dict, throttle: Throttle, deadline: float | None = None) -> bool:
+    """
+    Загрузка F813 банка: сетка (отчётная дата, par) запрашивается параллельно пулом потоков (max_workers),
+    ответы сохраняются в основном потоке с дедупликацией по хэшу. Сбои записываются в FailedFetch одной вставкой.
+    По дедлайну ещё не начатые запросы отменяются. Возвращает False, если загрузка прервана по дедлайну.
+    """
+    reg = bank_obj.reg_number
+    form813_obj = FormType.objects.get(title=form_f813()['title'])
+    units = _select_f813_units(_get_stored_f813_units([bank_obj.pk]).get(bank_obj.pk, set()), cfg)
+    logger.info('F813 bank=%s: %d (date, par) units to process', reg, len(units))
+    if not units:
+        return True
+
+    def _fetch(parsed_dt: datetime, par: int) -> dict:
+        throttle.wait()
+        try:
+            return CbrF813MParser.parse(reg, parsed_dt, par)
+        except Exception as e:
+            return {'message': f'exception: {e}'}
+
+    failed = []
+    completed = True
+    with ThreadPoolExecutor(max_workers=int(cfg.get('max_workers', 10))) as executor:
+        # потоки пула не наследуют contextvars — передаём контекст (учёт обращений к ЦБ)
+        futures = {executor.submit(contextvars.copy_context().run, _fetch, parsed_dt, par): (parsed_dt, par)
+                   for parsed_dt, par in units}
+        for fut in as_completed(futures):
+            if _deadline_passed(deadline):
+                completed = False
+                for pending in futures:
+                    pending.cancel()
+                break
+            parsed_dt, par = futures[fut]
+            error = _save_f813_unit(bank_obj, form813_obj, parsed_dt, par, fut.result())
+            if error:
+                failed.append((form813_obj.title, 'date', reg, {'dt': parsed_dt, 'par': par}, error))
+    _record_failed_fetches(failed)
+    return completed
+
+
+def _save_f813_unit(bank_obj: Bank, form813_obj: FormType, parsed_dt: datetime, par: int,
+                    parsed: dict) -> str | None:
+    """Сохраняет строки раздела par F813 на дату. Возвращает текст ошибки ЦБ (None — успешно или данных нет)."""
+    if 'message' in parsed:
+        logger.warning('[!!] F813 error for bank %s dt=%s par=%s: %s [!!]', bank_obj.reg_number,
+                       parsed_dt.date(), par, parsed['message'])
+        return parsed['message']
+    rows = parsed.get('rows') or []
+    if not rows:
+        return None
+    created_or_updated, _, _, _ = _update_or_create_bank_indicator_data_response(
+            bank=bank_obj, form_type=form813_obj, bank_indicator_obj=rows,
+            params={'reg_number': bank_obj.reg_number, 'ind_code': str(par), 'dt': parsed_dt})
+    logger.debug('Saved F813 for bank %s dt=%s par=%s -> upd=%s rows=%d', bank_obj.reg_number,
+                 parsed_dt.date(), par, created_or_updated, len(rows))
+    return None
+
+
+def _ingest_f813_date(bank_obj: Bank, form813_obj: FormType, parsed_dt: datetime, par: int,
+                      throttle: Throttle) -> str | None:
+    """Загрузка одного раздела F813 на дату вне пула потоков. Возвращает текст ошибки ЦБ или None."""
+    throttle.wait()
+    try:
+        parsed = CbrF813MParser.parse(bank_obj.reg_number, parsed_dt, par)
+    except Exception as e:
+        parsed = {'message': f'exception: {e}'}
+    return _save_f813_unit(bank_obj, form813_obj, parsed_dt, par, parsed)
+
+
+def _ingest_bank_f123(bank_obj: Bank, cfg: dict, throttle: Throttle, deadline: float | None = None) -> bool:
+    """Загрузка F123 банка: список отчётных дат и данные на новые даты. False — прервана по дедлайну."""
+    reg = bank_obj.reg_number
+    form123_obj = FormType.objects.get(title=form_f123()['title'])
+
+    stored = _get_stored_datetimes(bank_obj, form123_obj)
+    throttle.wait()
+    datetimes_data = Form123Parser.get_dates_for_f123(reg)
+    if 'message' in datetimes_data or not datetimes_data.get('datetimes'):
+        logger.warning(f'[!!] RETURN EMPTY datetimes for form123 and bank {bank_obj.name}. '
+                       f'STOP update datetimes. Message: {str(datetimes_data)} [!!]')
+        if 'message' in datetimes_data:
+            _record_failed_fetch(form123_obj.title, 'dates', reg, {}, datetimes_data['message'])
+        return True
+
+    created_or_updated, added, removed, datetimes_data = _update_or_create_datetimes_response(
+            bank=bank_obj, form_type=form123_obj, datetimes_obj=datetimes_data)
+    if not datetimes_data:
+        return True
+    logger.debug(f'Updated datetimes for form123 and bank {bank_obj.name} = {created_or_updated}'
+                 f' Added = {added}, removed = {removed}')
+
+    target_dates = _select_target_dates(datetimes_data.get('datetimes', []), stored, cfg)
+    logger.info('F123 bank=%s: %d dates to process', reg, len(target_dates))
+
+    for dt in target_dates:
+        if _deadline_passed(deadline):
+            return False
+        parsed_dt = _parse_naive_dt(dt)
+        if parsed_dt is None:
+            logger.warning("Can't parse datetime %s for bank %s", dt, reg)
+            continue
+        error = _ingest_f123_date(bank_obj, form123_obj, parsed_dt, throttle)
+        if error:
+            _record_failed_fetch(form123_obj.title, 'date', reg, {'dt': parsed_dt}, error)
+    return True
+
+
+def _ingest_f123_date(bank_obj: Bank, form123_obj: FormType, parsed_dt: datetime, throttle: Throttle) -> str | None:
+    """
+    Загрузка F123 банка на одну отчётную дату: список индикаторов и полная форма.
+    Возвращает текст ошибки ЦБ (None — успешно или данных нет).
+    """
+    reg = bank_obj.reg_number
+    throttle.wait()
+    indicators_data = Form123Parser.get_form123_indicators_from_data123(reg, parsed_dt)
+    if 'message' in indicators_data or not indicators_data.get('indicators'):
+        logger.warning(f'[!!] RETURN EMPTY indicators for form123 and bank {bank_obj.name}. '
+                       f'STOP update indicators. Message: {str(indicators_data)} [!!]')
+        return indicators_data.get('message')
+
+    created_or_updated, added, removed, indicators_data = _update_or_create_indicators_response(
+            bank=bank_obj, form_type=form123_obj, indicators_obj=indicators_data, params={
+                'reg_number': reg, 'dt': parsed_dt})
+    if not indicators_data:
+        return None
+    logger.debug(f'Updated indicators for form123 and bank {bank_obj.name} = {created_or_updated}'
+                 f' Added = {added}, removed = {removed}')
+
+    throttle.wait()
+    bank_indicator_data = Form123Parser.get_data123_form_full(reg, parsed_dt)
+    if 'message' in bank_indicator_data or not bank_indicator_data:
+        logger.warning(
+                f'[!!] RETURN EMPTY bank indicator data for form123 and bank {bank_obj.name}. '
+                f'STOP update bank indicator data. Message: {str(bank_indicator_data)} [!!]')
+        return bank_indicator_data.get('message') if isinstance(bank_indicator_data, dict) else None
+
+    created_or_updated, added, removed, bank_indicator_data = _update_or_create_bank_indicator_data_response(
+            bank=bank_obj, form_type=form123_obj,
+            bank_indicator_obj=bank_indicator_data,
+            params={'reg_number': reg, 'dt': parsed_dt})
+    logger.debug(f'Updated bank indicator data for form123 and bank {bank_obj.name} = {created_or_updated}'
+                 f' Added = {added}, removed = {removed}')
+    return None
+
+
+def _generate_all_pairs(dates_list: list[datetime]):
+    length = len(dates_list)
+    for i in range(length):
+        di = dates_list[i]
+        for j in range(i, length):
+            yield di, dates_list[j]
+
+
+def _ingest_bank_f101(bank_obj: Bank, cfg: dict, throttle: Throttle, deadline: float | None = None) -> bool:
+    """
+    Загрузка F101 банка: список отчётных дат, индикаторы на новые даты и диапазоны по каждому индикатору.
+    Дедлайн проверяется перед каждой датой, индикатором и пачкой диапазонов (batch_submit); уже отправленная
+    пачка сохраняется. Возвращает False, если загрузка прервана по дедлайну.
+    """
+    reg = bank_obj.reg_number
+    form101_obj = FormType.objects.get(title=form_f101()['title'])
+    max_workers = int(cfg.get('max_workers', 10))
+    batch_submit = int(cfg.get('batch_submit', 300))
+    start_year = int(cfg.get('f101_start_year', 2018))
+
+    stored = _get_stored_datetimes(bank_obj, form101_obj)
+    throttle.wait()
+    datetimes_data = Form101Parser.get_dates_for_f101(reg)
+    if 'message' in datetimes_data or not datetimes_data.get('datetimes'):
+        logger.warning(f'[!!] RETURN EMPTY datetimes for form101 and bank {bank_obj.name}. '
+                       f'STOP update datetimes. Message: {str(datetimes_data)} [!!]')
+        if 'message' in datetimes_data:
+            _record_failed_fetch(form101_obj.title, 'dates', reg, {}, datetimes_data['message'])
+        return True
+
+    created_or_updated, added, removed, datetimes_data = _update_or_create_datetimes_response(
+            bank=bank_obj, form_type=form101_obj, datetimes_obj=datetimes_data)
+    if not datetimes_data:
+        return True
+    logger.debug(f'Updated datetimes for form101 and bank {bank_obj.name} = {created_or_updated}'
+                 f' Added = {added}, removed = {removed}')
+
+    target_dates = _select_target_dates(datetimes_data.get('datetimes', []), stored, cfg)
+    logger.info('F101 bank=%s: %d dates to process', reg, len(target_dates))
+
+    indicators_map: dict[str, list[datetime]] = {}
+    unique_codes = set()
+    for dt in target_dates:
+        if _deadline_passed(deadline):
+            return False
+        parsed_dt = _parse_naive_dt(dt)
+        if parsed_dt is None:
+            logger.warning("Can't parse datetime %s for bank %s", dt, reg)
+            continue
+        throttle.wait()
+        indicators_data = Form101Parser.get_form101_indicators_from_data101(reg, parsed_dt)
+        if 'message' in indicators_data or not indicators_data.get('indicators'):
+            logger.warning(f'[!!] RETURN EMPTY indicators for form101 and bank {bank_obj.name}. '
+                           f'STOP update indicators. Message: {str(indicators_data)} [!!]')
+            if 'message' in indicators_data:
+                _record_failed_fetch(form101_obj.title, 'date', reg, {'dt': parsed_dt}, indicators_data['message'])
+            continue
+        for ind in indicators_data.get('indicators', []):
+            code = ind.get('ind_code')
+            if not code:
+                continue
+            if code not in unique_codes:
+                unique_codes.add(code)
+                indicators_map.setdefault(code, []).append(parsed_dt)
+
+    fetch_cache: dict[tuple, list | dict] = {}
+
+    def _fetch_range(ind_code_local, date_from, date_to):
+        """
+        Возвращает (key, payload) — key для кеша, payload: list|dict (если ошибка — dict с 'message').
+        """
+        key = (ind_code_local, date_from.isoformat(), date_to.isoformat())
+        if key in fetch_cache:
+            record_cache_hit()
+            return key, fetch_cache[key]
+        throttle.wait()
+        try:
+            res = Form101Parser.get_indicator_data(reg_number=reg,
+                                                   ind_code=ind_code_local,
+                                                   date_from=date_from,
+                                                   date_to=date_to)
+        except Exception as e:
+            res = {'message': f'exception: {e}'}
+        fetch_cache[key] = res
+        return key, res
+
+    def _drain(ind_code_local, batch, futures_map) -> int:
+        processed = 0
+        failed = []
+        for fut_done in as_completed(batch):
+            key, res = fut_done.result()
+            df, dt = futures_map.pop(fut_done)
+            processed += 1
+
+            if isinstance(res, dict) and res.get('message'):
+                logger.warning('Fetch error for %s %s..%s: %s', ind_code_local, df, dt, res.get('message'))
+                failed.append((form101_obj.title, 'range', reg,
+                               {'ind_code': ind_code_local, 'date_from': df, 'date_to': dt}, res['message']))
+                continue
+            if not isinstance(res, list):
+                continue
+
+            params_pair = {
+                'reg_number': reg,
+                'ind_code': ind_code_local,
+                'date_from': df,
+                'date_to': dt,
+            }
+            try:
+                created_or_updated, added, removed, canonical_obj = _update_or_create_bank_indicator_data_response(
+                        bank=bank_obj,
+                        form_type=form101_obj,
+                        params=params_pair,
+                        bank_indicator_obj=res
+                )
+                logger.debug(f'Updated bank indicator data for form101 bank={bank_obj.name}. '
+                             'Pair %s..%s saved: upd=%s added=%d removed=%d',
+                             df.isoformat(), dt.isoformat(), created_or_updated, len(added), len(removed))
+            except Exception as e:
+                logger.exception('DB save error for %s %s..%s: %s', ind_code_local, df, dt, e)
+        _record_failed_fetches(failed)
+        return processed
+
+    for ind_code, dates_sorted in indicators_map.items():
+        if _deadline_passed(deadline):
+            return False
+        dates_sorted = [i for i in dates_sorted if i.year >= start_year]
+        if not dates_sorted:
+            continue
+
+        n = len(dates_sorted)
+        logger.debug('Indicator %s: %d dates -> %d pairs', ind_code, n, n * (n + 1) // 2)
+
+        processed_pairs = 0
+        interrupted = False
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures_map = {}
+            batch = []
+            for date_from, date_to in _generate_all_pairs(dates_sorted):
+                # потоки пула не наследуют contextvars — передаём контекст (учёт обращений к ЦБ)
+                fut = executor.submit(contextvars.copy_context().run, _fetch_range, ind_code, date_from, date_to)
+                futures_map[fut] = (date_from, date_to)
+                batch.append(fut)
+                if len(batch) >= batch_submit:
+                    processed_pairs += _drain(ind_code, batch, futures_map)
+                    batch = []
+                    if _deadline_passed(deadline):
+                        interrupted = True
+                        break
+            if batch:
+                processed_pairs += _drain(ind_code, batch, futures_map)
+
+        logger.debug('Finished indicator %s: processed pairs=%d', ind_code, processed_pairs)
+        if interrupted:
+            return False
+    return True
+
+
+def _ingest_f101_range(bank_obj: Bank, form101_obj: FormType, ind_code: str, date_from: datetime,
+                       date_to: datetime, throttle: Throttle) -> str | None:
+    """Загрузка диапазона индикатора F101 (вне пула потоков). Возвращает текст ошибки ЦБ или None."""
+    throttle.wait()
+    try:
+        res = Form101Parser.get_indicator_data(reg_number=bank_obj.reg_number, ind_code=ind_code,
+                                               date_from=date_from, date_to=date_to)
+    except Exception as e:
+        res = {'message': f'exception: {e}'}
+    if isinstance(res, dict) and res.get('message'):
+        return res['message']
+    if isinstance(res, list):
+        _update_or_create_bank_indicator_data_response(
+                bank=bank_obj, form_type=form101_obj, bank_indicator_obj=res,
+                params={'reg_number': bank_obj.reg_number, 'ind_code': ind_code, 'date_from': date_from,
+                        'date_to': date_to})
+    return None
+
+
+def _ingest_f101_date(bank_obj: Bank, form101_obj: FormType, parsed_dt: datetime, throttle: Throttle) -> str | None:
+    """
+    Дозагрузка F101 на одну отчётную дату: список индикаторов и диапазоны (dt, dt) для кодов, по которым
+    у банка ещё нет данных. Ошибки по отдельным диапазонам записываются в FailedFetch.
+    Возвращает текст ошибки ЦБ для списка индикаторов или None.
+    """
+    reg = bank_obj.reg_number
+    throttle.wait()
+    indicators_data = Form101Parser.get_form101_indicators_from_data101(reg, parsed_dt)
+    if 'message' in indicators_data:
+        return indicators_data['message']
+
+    codes = {ind.get('ind_code') for ind in indicators_data.get('indicators', []) if ind.get('ind_code')}
+    stored = set(BankIndicatorDataRequest.objects.filter(bank=bank_obj, form_type=form101_obj, ind_code__in=codes)
+                 .values_list('ind_code', flat=True))
+    failed = []
+    for ind_code in sorted(codes - stored):
+        error = _ingest_f101_range(bank_obj, form101_obj, ind_code, parsed_dt, parsed_dt, throttle)
+        if error:
+            failed.append((form101_obj.title, 'range', reg,
+                           {'ind_code': ind_code, 'date_from': parsed_dt, 'date_to': parsed_dt}, error))
+    _record_failed_fetches(failed)
+    return None
+
+
+def _ingest_bank(bank_obj: Bank, mode: str = INCREMENTAL, forms: Iterable[str] | None = None,
+                 throttle: Throttle | None = None, run: IngestionRun | None = None,
+                 deadline: float | None = None) -> list[str]:
+    """
+    Полный конвейер загрузки SOAP-форм (F810, F123, F101, F813) для одного банка.
+    forms — подмножество ALL_BANK_FORMS (по умолчанию все формы).
+    run — запуск, в который пишутся метрики каждого шага (банк + форма).
+    deadline — момент time.monotonic(), после которого загрузка останавливается: новые формы не начинаются,
+    а начатая прерывается на ближайшей проверке внутри своих циклов (по датам, индикаторам, пачкам диапазонов).
+    Возвращает список форм, которые из-за дедлайна не начаты или прерваны (их откладывают в очередь целиком —
+    уже сохранённое повторный проход отсечёт по датам и хэшу).
+    """
+    cfg = _get_mode_config(mode)
+    throttle = throttle or Throttle(cfg.get('throttle_seconds', 0))
+    forms = set(forms or ALL_BANK_FORMS)
+
+    logger.info(f"{'=' * 10} START PARSE {', '.join(sorted(forms))} FORMS "
+                f"for bank {bank_obj.reg_number} (mode={mode}) {'=' * 10}")
+
+    pipelines = (
+        (form_f810()['title'], _ingest_bank_f810),
+        (form_f123()['title'], _ingest_bank_f123),
+        (form_f101()['title'], _ingest_bank_f101),
+        (form_f813()['title'], _ingest_bank_f813),
+    )
+    pending = [(title, pipeline) for title, pipeline in pipelines if title in forms]
+    for idx, (form_title, pipeline) in enumerate(pending):
+        if _deadline_passed(deadline):
+            return [title for title, _ in pending[idx:]]
+        with _metered_step(run, bank_obj, form_title):
+            completed = pipeline(bank_obj, cfg, throttle, deadline)
+        if not completed:
+            logger.info('Form %s for bank %s interrupted by time budget', form_title, bank_obj.reg_number)
+            return [title for title, _ in pending[idx:]]
+    return []
+
+
+def _run_bank_ingestion(mode: str = INCREMENTAL, reg_numbers: Iterable[int] | None = None,
+                        forms: Iterable[str] | None = None,
+                        progress: Callable[[int, int, int | None], None] | None = None,
+                        task_name: str = 'manual', task_id: str | None = None,
+                        time_budget: float | None = None, use_backlog: bool = False,
+                        backlog_only: bool = False) -> dict:
+    """
+    Берёт список банков и для каждого запускает конвейер _ingest_bank в заданном режиме.
+    reg_numbers — ограничить загрузку указанными банками (None — все банки). Если все указанные банки уже
+    есть в БД, справочник EnumBIC_XML не запрашивается; иначе справочник Bank предварительно
+    синхронизируется с EnumBIC_XML пакетно (_sync_bank_registry).
+    Банки обрабатываются в порядке приоритета (_order_banks_by_priority).
+    time_budget — бюджет времени в секундах: по его исчерпании начатый шаг (банк + форма) прерывается, новые
+    не начинаются, а прерванный и оставшиеся сохраняются в очередь отложенных (IngestionBacklogItem).
+    use_backlog — сначала выполнить отложенные шаги прошлых запусков; backlog_only — только их.
+    progress — callback(done, total, current_reg_number) для отображения прогресса.
+    Каждый запуск фиксируется в IngestionRun (с метриками по банкам и формам в IngestionRunItem).
+    Возвращает краткую сводку по запуску.
+    """
+    wanted = {int(r) for r in reg_numbers} if reg_numbers else None
+    run = _start_ingestion_run(task_name, mode, task_id=task_id, params={
+        'reg_numbers': sorted(wanted) if wanted else None,
+        'forms': sorted(forms) if forms else None,
+        'time_budget': time_budget,
+        'use_backlog': use_backlog,
+        'backlog_only': backlog_only,
+    })
+    try:
+        result = _ingest_banks(run, mode, wanted, forms, progress, time_budget=time_budget,
+                               use_backlog=use_backlog or backlog_only, backlog_only=backlog_only)
+    except Exception as e:
+        _finish_ingestion_run(run, IngestionRun.Status.FAILED, error=str(e))
+        raise
+
+    status = IngestionRun.Status.FAILED if 'message' in result else IngestionRun.Status.SUCCESS
+    _finish_ingestion_run(run, status, summary=result, error=result.get('message', ''))
+    result['run_id'] = run.pk
+    return result
+
+
+def _ingest_banks(run: IngestionRun, mode: str, wanted: set[int] | None, forms: Iterable[str] | None,
+                  progress: Callable[[int, int, int | None], None] | None, time_budget: float | None = None,
+                  use_backlog: bool = False, backlog_only: bool = False) -> dict:
+    cfg = _get_mode_config(mode)
+    throttle = Throttle(cfg.get('throttle_seconds', 0))
+    deadline = time.monotonic() + time_budget if time_budget else None
+    # активность банков (active / dormant) отслеживается только по плановым загрузкам всех банков;
+    # разбор очереди отложенных шагов её не меняет
+    full_run = wanted is None and not backlog_only
+
+    started = timezone.now()
+    logger.info(f'[!] START bank ingestion mode={mode} at {started} [!]')
+
+    backlog = _load_backlog(mode) if use_backlog else {}
+    if backlog_only:
+        wanted = set(backlog) & wanted if wanted is not None else set(backlog)
+        if not wanted:
+            logger.info('Ingestion backlog (mode=%s) is empty', mode)
+            return {'mode': mode, 'banks': 0, 'not_found': [], 'deferred': 0, 'out_of_budget': False,
+                    'dormant_skipped': 0}
+
+    registry = None
+    banks_map = {b.reg_number: b for b in Bank.objects.all()}
+    if wanted is not None and wanted <= set(banks_map):
+        banks_list = [{'reg_number': reg, 'name': banks_map[reg].name} for reg in sorted(wanted)]
+    else:
+        banks: dict = all_banks_parser.CbrAllBanksParser.parse()
+        if 'message' in banks or not banks.get('banks'):
+            logger.warning(f'[!!] RETURN EMPTY banks... STOP parsing. Message: {str(banks)} [!!]')
+            return {'mode': mode, 'banks': 0, 'message': str(banks.get('message', 'empty banks'))}
+        logger.info('[!!!] GOT %d banks [!!!]', len(banks['banks']))
+        registry = _sync_bank_registry(banks['banks'])
+        banks_map = {b.reg_number: b for b in Bank.objects.all()}
+        banks_list = [b for b in banks['banks'] if wanted is None or b['reg_number'] in wanted]
+
+    # dormant-банки (нет в справочнике / давно нет новых дат) проверяются только раз в DORMANT_BANK_CHECK_DAYS
+    dormant_skipped = []
+    if full_run:
+        banks_list, dormant_skipped = _split_dormant(banks_list)
+
+    # сначала закреплённые и самые востребованные банки, затем остальные — в рамках того же запуска
+    banks_list = _order_banks_by_priority(banks_list)
+
+    # отложенные прошлыми запусками шаги выполняются первыми
+    selected_forms = [f for f in ALL_BANK_FORMS if f in set(forms or ALL_BANK_FORMS)]
+    by_reg = {b['reg_number']: b for b in banks_list}
+    work = [(by_reg[reg], [f for f in selected_forms if f in backlog_forms])
+            for reg, backlog_forms in backlog.items() if reg in by_reg]
+    backlog_steps = len(work)
+    if not backlog_only:
+        work += [(b, selected_forms) for b in banks_list]
+    for reg in set(backlog) - set(by_reg) - (wanted or set()):
+        # банк пропал из справочника ЦБ — отложенные шаги больше не нужны
+        _clear_backlog(mode, reg)
+
+    total = run.banks_total = len(work)
+    processed = deferred = 0
+    done_steps: set[tuple[int, str]] = set()
+    for done, (bank_data, bank_forms) in enumerate(work):
+        reg = bank_data['reg_number']
+        bank_forms = [f for f in bank_forms if (reg, f) not in done_steps]
+        bank_obj = banks_map.get(reg)
+        if not bank_forms or bank_obj is None:
+            continue
+        if progress is not None:
+            progress(done, total, reg)
+        logger.info(f'PARSING data for bank: name={bank_data["name"]}, reg_number={reg}')
+        bank_started = timezone.now()
+        unfinished = _ingest_bank(bank_obj, mode=mode, forms=bank_forms, throttle=throttle, run=run,
+                                  deadline=deadline)
+        finished = [f for f in bank_forms if f not in unfinished]
+        done_steps.update((reg, f) for f in finished)
+        if full_run and finished and done >= backlog_steps:
+            _update_bank_activity(bank_obj, bank_started, finished)
+        if reg in backlog and finished:
+            _clear_backlog(mode, reg, finished)
+        if unfinished:
+            rest = [(reg, f) for f in unfinished]
+            rest += [(b['reg_number'], f) for b, fs in work[done + 1:] for f in fs
+                     if (b['reg_number'], f) not in done_steps]
+            deferred = _defer_to_backlog(run, mode, rest)
+            logger.warning('[!] Time budget %.0fs exhausted: %d steps deferred to backlog [!]', time_budget, deferred)
+            break
+        processed = run.banks_processed = processed + 1
+
+    if progress is not None:
+        progress(total, total, None)
+    not_found = sorted(wanted - {b['reg_number'] for b in banks_list}) if wanted is not None else []
+    if not_found:
+        logger.warning('Banks not found in EnumBIC_XML: %s', not_found)
+
+    logger.info('[!] FINISHED bank ingestion mode=%s at %s, banks processed=%d [!]', mode, timezone.now(), processed)
+    result = {'mode': mode, 'banks': processed, 'not_found': not_found, 'deferred': deferred,
+              'out_of_budget': bool(deferred), 'dormant_skipped': len(dormant_skipped)}
+    if registry is not None:
+        result['registry'] = {key: len(value) for key, value in registry.items()}
+    return result
@@ -0,0 +1,35 @@
+from celery.result import AsyncResult
+from django.conf import settings
+
+
+def _enqueue_bank_refresh(reg_numbers: list[int], forms: list[str] | None = None) -> str:
+    """
+    Ставит внеочередное обновление банков в интерактивную очередь (settings.INGESTION_INTERACTIVE_QUEUE):
+    её пул воркеров не занят ежемесячными и прочими пакетными загрузками.
+    Возвращает идентификатор задачи (job id) для последующего опроса статуса.
+    """
+    from core.tasks import refresh_banks_api_info
+
+    result = refresh_banks_api_info.apply_async(
+            kwargs={'reg_numbers': sorted(set(reg_numbers)), 'forms': forms or None},
+            queue=settings.INGESTION_INTERACTIVE_QUEUE,
+            priority=getattr(settings, 'INGESTION_REFRESH_PRIORITY', 0),
+    )
+    return result.id
+
+
+def _get_job_status(job_id: str) -> dict:
+    """
+    Возвращает статус фоновой задачи в формате
+    {'job_id', 'state', 'progress', 'result', 'error'}.
+    """
+    res = AsyncResult(job_id)
+    state = res.state
+    info = res.info
+    return {
+        'job_id': job_id,
+        'state': state,
+        'progress': info if state == 'PROGRESS' and isinstance(info, dict) else None,
+        'result': info if state == 'SUCCESS' and isinstance(info, dict) else None,
+        'error': str(info) if state == 'FAILURE' else None,
+    }
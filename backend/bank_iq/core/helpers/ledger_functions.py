@@ -0,0 +1,162 @@
+import functools
+import inspect
+import logging
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable
+
+from django.conf import settings
+from django.db.models import Sum
+from django.utils import timezone
+
+from banks.models import Bank
+from core.models import IngestionRun, IngestionRunItem
+from core.utils.ingestion_meter import IngestionMeter, metering
+from core.utils.run_lock import RunLock
+
+
+logger = logging.getLogger(__name__)
+
+
+def _start_ingestion_run(task_name: str, mode: str, task_id: str | None = None,
+                         params: dict | None = None) -> IngestionRun:
+    return IngestionRun.objects.create(task_name=task_name, task_id=task_id, mode=mode, params=params or {},
+                                       started_at=timezone.now())
+
+
+@contextmanager
+def _metered_step(run: IngestionRun | None, bank: Bank, form_title: str):
+    """
+    Шаг загрузки (банк + форма): собирает метрики в IngestionMeter и по завершении
+    (в том числе при ошибке) пишет строку IngestionRunItem. При run=None метрики не сохраняются.
+    """
+    meter = IngestionMeter()
+    started_at = timezone.now()
+    started = time.monotonic()
+    status, error = IngestionRun.Status.SUCCESS, ''
+    try:
+        with metering(meter):
+            yield meter
+    except Exception as e:
+        status, error = IngestionRun.Status.FAILED, str(e)
+        raise
+    finally:
+        if run is not None:
+            _record_run_item(run, bank, form_title, started_at, time.monotonic() - started, meter, status, error)
+
+
+def _record_run_item(run: IngestionRun, bank: Bank, form_title: str, started_at: datetime, wall_seconds: float,
+                     meter: IngestionMeter, status: str, error: str = '') -> None:
+    stats = meter.snapshot()
+    try:
+        IngestionRunItem.objects.create(run=run, bank=bank, reg_number=bank.reg_number, form_type=form_title,
+                                        status=status, started_at=started_at, wall_seconds=wall_seconds,
+                                        error=error, **stats)
+    except Exception:
+        # учёт не должен ломать загрузку
+        logger.exception('Failed to record ingestion run item for bank %s form %s', bank.reg_number, form_title)
+
+
+def _finish_ingestion_run(run: IngestionRun, status: str, summary: dict | None = None,
+                          error: str = '') -> IngestionRun:
+    """
+    Закрывает запуск: итоговые счётчики агрегируются по строкам IngestionRunItem.
+    banks_total / banks_processed заполняются по ходу загрузки на объекте run.
+    """
+    totals = run.items.aggregate(bytes_received=Sum('bytes_received'), cache_hits=Sum('cache_hits'),
+                                 changed=Sum('changed'), unchanged=Sum('unchanged'))
+    calls: Counter[str] = Counter()
+    for item_calls in run.items.values_list('soap_calls', flat=True):
+        calls.update(item_calls or {})
+
+    run.status = status
+    run.finished_at = timezone.now()
+    run.wall_seconds = (run.finished_at - run.started_at).total_seconds()
+    run.soap_calls = dict(calls)
+    run.summary = summary or {}
+    run.error = error
+    for field, value in totals.items():
+        setattr(run, field, value or 0)
+    run.save()
+    return run
+
+
+def _last_successful_run(task_name: str) -> IngestionRun | None:
+    return IngestionRun.objects.filter(task_name=task_name, status=IngestionRun.Status.SUCCESS,
+                                       finished_at__isnull=False).exclude(summary__has_key='skipped').order_by(
+            '-finished_at').first()
+
+
+def _is_last_run_fresh(task_name: str, max_age: timedelta | None = None, form: str | None = None) -> bool:
+    """
+    Последний успешный запуск задачи завершился не раньше max_age назад (settings.INGESTION_FRESHNESS_DAYS).
+    form — учитывать только запуски, загружавшие эту форму (params['forms'] содержит её или пуст — все формы).
+    """
+    if max_age is None:
+        max_age = timedelta(days=settings.INGESTION_FRESHNESS_DAYS)
+    if form is None:
+        last = _last_successful_run(task_name)
+        return last is not None and last.finished_at >= timezone.now() - max_age
+    recent = IngestionRun.objects.filter(task_name=task_name, status=IngestionRun.Status.SUCCESS,
+                                         finished_at__gte=timezone.now() - max_age).exclude(
+            summary__has_key='skipped').values_list('params', flat=True)
+    return any(not (params or {}).get('forms') or form in params['forms'] for params in recent)
+
+
+def _exclusive_task(lock_name: str | Callable[[dict], str | list[str]], ledger_mode: str | None = None):
+    """
+    Декоратор задачи Celery (bind=True): одновременно выполняется не больше одного запуска с lock_name.
+    Повторный запуск, пока блокировка удерживается, ничего не делает и возвращает id задачи, которая
+    уже выполняется (к ней можно «присоединиться» через AsyncResult).
+    lock_name — имя блокировки или функция от аргументов вызова (dict с учётом значений по умолчанию),
+    возвращающая одно или несколько имён: запуск берёт их все или ни одного.
+    ledger_mode — если задан, запуск фиксируется в IngestionRun (для задач, которые не пишут журнал сами).
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        def _lock_names(task, args, kwargs) -> list[str]:
+            if not callable(lock_name):
+                return [lock_name]
+            bound = signature.bind(task, *args, **kwargs)
+            bound.apply_defaults()
+            names = lock_name(bound.arguments)
+            return sorted({names} if isinstance(names, str) else set(names))
+
+        @functools.wraps(func)
+        def wrapper(task, *args, **kwargs):
+            owner = task.request.id or f'manual-{uuid.uuid4()}'
+            locks = []
+            for name in _lock_names(task, args, kwargs):
+                lock = RunLock(name, owner, lease_seconds=settings.INGESTION_LOCK_LEASE_SECONDS)
+                if not lock.acquire():
+                    holder = lock.holder()
+                    for acquired in locks:
+                        acquired.release()
+                    logger.info('Task %s skipped: %s is already running (task_id=%s)', task.name, name, holder)
+                    return {'skipped': True, 'reason': 'already_running', 'running_task_id': holder}
+                locks.append(lock)
+
+            run = _start_ingestion_run(task.name, ledger_mode, task_id=task.request.id) if ledger_mode else None
+            try:
+                result = func(task, *args, **kwargs)
+            except Exception as e:
+                if run is not None:
+                    _finish_ingestion_run(run, IngestionRun.Status.FAILED, error=str(e))
+                raise
+            finally:
+                for lock in locks:
+                    lock.release()
+
+            if run is not None:
+                _finish_ingestion_run(run, IngestionRun.Status.SUCCESS,
+                                      summary=result if isinstance(result, dict) else None)
+            return result
+
+        return wrapper
+
+    return decorator
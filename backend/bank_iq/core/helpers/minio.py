@@ -10,9 +10,10 @@ from storages.backends.s3boto3 import S3Boto3Storage
 logger = logging.getLogger(__name__)
 
 
-def get_s3_client():
+def get_s3_client(**config_kwargs):
     """
     Возвращает настроенный boto3 client, учитывая endpoint, region и addressing style.
+    config_kwargs — дополнительные параметры botocore Config (connect_timeout, read_timeout, retries и т.п.).
     """
     aws_endpoint = getattr(settings, "AWS_S3_ENDPOINT_URL", None)
     aws_region = getattr(settings, "AWS_S3_REGION_NAME", None) or getattr(settings, "AWS_S3_REGION", None)
@@ -22,8 +23,7 @@ def get_s3_client():
     if addressing_style:
         botocore_config["s3"] = {"addressing_style": addressing_style}
 
-    config = BotoConfig(signature_version="s3v4", **botocore_config) if botocore_config else BotoConfig(
-            signature_version="s3v4")
+    config = BotoConfig(signature_version="s3v4", **botocore_config, **config_kwargs)
 
     client = boto3.client(
             "s3",
@@ -37,12 +37,13 @@ def get_s3_client():
     return client
 
 
-def ensure_bucket_exists(bucket_name: str) -> bool:
+def ensure_bucket_exists(bucket_name: str, client=None) -> bool:
     """
     Проверяет наличие бакета и создаёт его при отсутствии.
+    client — готовый клиент (например, с короткими таймаутами); по умолчанию создаётся новый.
     Возвращает True — если бакет существует (либо был успешно создан).
     """
-    client = get_s3_client()
+    client = client or get_s3_client()
     aws_region = getattr(settings, "AWS_S3_REGION_NAME", None) or getattr(settings, "AWS_S3_REGION", None)
 
     try:
@@ -0,0 +1,41 @@
+import logging
+
+from django.conf import settings
+from django.utils import timezone
+
+from core.utils.partitions import (
+    PARTITIONED_TABLES, create_year_partition, detach_year_partition, is_partitioned, year_partitions)
+
+
+logger = logging.getLogger(__name__)
+
+
+def _maintain_partitions(ahead_years: int | None = None, retention_years: int | None = None,
+                         drop: bool | None = None) -> dict:
+    """
+    Обслуживание секционированных таблиц (PARTITIONED_TABLES): создаёт годовые секции до текущего года
+    + ahead_years, чтобы новые отчётные даты не попадали в секцию по умолчанию, и отсоединяет секции старше
+    retention_years лет (0 — хранить всё). drop=True — отсоединённые секции удаляются.
+    Таблицы, не секционированные в текущей БД (SQLite, миграция не применена), пропускаются.
+    """
+    ahead_years = settings.INDICATOR_PARTITIONS_AHEAD_YEARS if ahead_years is None else ahead_years
+    retention_years = settings.INDICATOR_PARTITIONS_RETENTION_YEARS if retention_years is None else retention_years
+    drop = settings.INDICATOR_PARTITIONS_DROP_EXPIRED if drop is None else drop
+    current_year = timezone.now().year
+
+    result = {}
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(table):
+            result[table] = {'skipped': True, 'reason': 'not_partitioned'}
+            continue
+        existing = year_partitions(table)
+        created = [year for year in range(min(existing, default=current_year), current_year + ahead_years + 1)
+                   if create_year_partition(table, year)]
+        expired = []
+        if retention_years > 0:
+            expired = [detach_year_partition(table, year, drop=drop)
+                       for year in sorted(existing) if year <= current_year - retention_years]
+        result[table] = {'created': created, 'dropped' if drop else 'detached': expired,
+                         'partitions': len(year_partitions(table))}
+    logger.info('Partition maintenance: %s', result)
+    return result
@@ -0,0 +1,131 @@
+import json
+import logging
+import statistics
+import time
+import zlib
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import Length
+
+from banks.models import BankDatesResponse
+from core.models import CompressionDictionary
+from core.utils.payload_codec import (
+    decode_payload, dump_json, encode_payload, NONE, register_dict, reset_dict_cache, zstd_module, ZSTD_MODE)
+from indicators.models import BankIndicatorsResponse, IndicatorPayload
+from reports.models import CbrApiDataResponse
+
+
+logger = logging.getLogger(__name__)
+
+# Модели и поля CompressedJSONField: на них обучается словарь и их пересжимает recompress_payloads
+PAYLOAD_FIELDS = (
+    (IndicatorPayload, 'payload'),
+    (BankIndicatorsResponse, 'indicators'),
+    (BankDatesResponse, 'datetimes'),
+    (CbrApiDataResponse, 'processed_data'),
+)
+
+
+def _sample_payloads(limit: int) -> list[bytes]:
+    """Свежие payload всех полей (JSON, utf-8), поровну на поле: выборка для обучения словаря и бенчмарка."""
+    per_field = max(limit // len(PAYLOAD_FIELDS), 1)
+    samples = []
+    for model, field in PAYLOAD_FIELDS:
+        for value in model.objects.exclude(**{f'{field}__isnull': True}).order_by('-pk').values_list(
+                field, flat=True)[:per_field]:
+            samples.append(dump_json(value))
+    return samples
+
+
+def _train_payload_dictionary(samples: int = 2000, dict_size: int = 112_640) -> dict:
+    """
+    Обучает общий словарь zstd на последних payload и делает его активным: новые значения сжимаются с ним
+    (при PAYLOAD_COMPRESSION=zstd). Прежние словари остаются в БД — ими читаются уже записанные значения.
+    """
+    zstd = zstd_module()
+    data = _sample_payloads(samples)
+    trained = zstd.train_dictionary(dict_size, data)
+    with transaction.atomic():
+        CompressionDictionary.objects.filter(is_active=True).update(is_active=False)
+        row = CompressionDictionary.objects.create(dict_id=trained.dict_id(), data=trained.as_bytes(),
+                                                   samples=len(data), is_active=True)
+    reset_dict_cache()
+    result = {'dict_id': row.dict_id, 'size': len(trained.as_bytes()), 'samples': len(data)}
+    logger.info('Trained payload dictionary: %s', result)
+    return result
+
+
+def _payload_bytes(model, field: str) -> int:
+    return model.objects.aggregate(total=Sum(Length(field)))['total'] or 0
+
+
+def _recompress_payloads(batch_size: int = 500) -> dict:
+    """
+    Перезаписывает все значения CompressedJSONField в текущем режиме (settings.PAYLOAD_COMPRESSION) и с активным
+    словарём — после включения сжатия или обучения нового словаря. Возвращает размеры до/после по полям.
+    """
+    result = {}
+    for model, field in PAYLOAD_FIELDS:
+        before = _payload_bytes(model, field)
+        batch, rows = [], 0
+        for obj in model.objects.only('pk', field).order_by('pk').iterator(chunk_size=batch_size):
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                model.objects.bulk_update(batch, [field])
+                rows += len(batch)
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, [field])
+            rows += len(batch)
+        result[f'{model._meta.label}.{field}'] = {'rows': rows, 'bytes_before': before,
+                                                  'bytes_after': _payload_bytes(model, field)}
+    logger.info('Recompressed payloads (%s): %s', settings.PAYLOAD_COMPRESSION, result)
+    return result
+
+
+def _decode_stats(encoded: list[bytes], repeat: int) -> dict:
+    timings = []
+    for blob in encoded:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            decode_payload(blob)
+        timings.append((time.perf_counter() - started) / repeat * 1e6)
+    timings.sort()
+    return {'bytes': sum(len(blob) for blob in encoded),
+            'decode_us_median': round(statistics.median(timings), 1),
+            'decode_us_p95': round(timings[min(int(len(timings) * 0.95), len(timings) - 1)], 1)}
+
+
+def _benchmark_payload_compression(samples: int = 1000, level: int | None = None, dict_size: int = 112_640,
+                                   repeat: int = 5) -> dict:
+    """
+    Бенчмарк размера и задержки декодирования (включая json.loads) на реальных payload: без сжатия, zstd,
+    zstd со словарём (обучается на половине выборки, измеряется на другой) и gzip для сравнения.
+    """
+    zstd = zstd_module()
+    level = level if level is not None else settings.PAYLOAD_COMPRESSION_LEVEL
+    data = _sample_payloads(samples)
+    train, test = data[::2], data[1::2]
+    if not test:
+        return {'samples': len(data), 'message': 'Недостаточно payload для бенчмарка'}
+    objs = [json.loads(raw) for raw in test]
+    trained = zstd.train_dictionary(dict_size, train)
+    register_dict(trained)
+
+    modes = {
+        NONE: [encode_payload(obj, mode=NONE) for obj in objs],
+        ZSTD_MODE: [encode_payload(obj, mode=ZSTD_MODE, level=level, use_dict=False) for obj in objs],
+        'zstd+dict': [encode_payload(obj, mode=ZSTD_MODE, level=level, zstd_dict=trained) for obj in objs],
+    }
+
+    plain_bytes = sum(len(raw) for raw in test)
+    result = {'samples': len(test), 'level': level, 'dict_size': len(trained.as_bytes()), 'modes': {}}
+    for name, encoded in modes.items():
+        stats = _decode_stats(encoded, repeat)
+        result['modes'][name] = {**stats, 'ratio': round(plain_bytes / max(stats['bytes'], 1), 2)}
+    gzip_bytes = sum(len(zlib.compress(raw, 6)) for raw in test)
+    result['modes']['gzip'] = {'bytes': gzip_bytes, 'ratio': round(plain_bytes / max(gzip_bytes, 1), 2)}
+    return result
+
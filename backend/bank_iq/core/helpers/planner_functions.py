@@ -0,0 +1,265 @@
+import logging
+import statistics
+from collections import Counter
+from datetime import datetime
+from typing import Iterable
+
+from django.conf import settings
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from banks.models import Bank, BankDatesResponse
+from core.helpers.dormancy_functions import _split_dormant
+from core.helpers.ingestion_functions import (
+    _generate_f810_dates, _get_mode_config, _get_stored_f813_units, _parse_naive_dt, _select_f813_units,
+    ALL_BANK_FORMS, INCREMENTAL)
+from core.helpers.reports_db_functions import (
+    _generate_year_pairs, CREDIT_PUBLICATIONS, DEPOSIT_PUBLICATIONS, PUBLICATION_MEASURES, REPORTS_MIN_START_YEAR)
+from core.models import IngestionRun, IngestionRunItem
+from core.one_time_tasks import form_f101, form_f123, form_f810, form_f813
+from indicators.models import BankIndicatorsRequest, BankIndicatorsResponse
+from reports.models import CbrApiDataRequest
+
+
+logger = logging.getLogger(__name__)
+
+F810, F123, F101, F813 = form_f810()['title'], form_f123()['title'], form_f101()['title'], form_f813()['title']
+
+
+def _observed_call_seconds(mode: str) -> dict[str, float]:
+    """
+    Фактическая стоимость одного обращения к SOAP по формам (секунды стены на вызов) по последним
+    успешным запускам режима mode из журнала (settings.INGESTION_PLAN_HISTORY_RUNS).
+    Учитывает реальный параллелизм, троттлинг и запись в БД.
+    """
+    runs = list(IngestionRun.objects.filter(mode=mode, status=IngestionRun.Status.SUCCESS)
+                .order_by('-started_at').values_list('id', flat=True)[:settings.INGESTION_PLAN_HISTORY_RUNS])
+    wall: Counter[str] = Counter()
+    calls: Counter[str] = Counter()
+    for form, seconds, soap_calls in IngestionRunItem.objects.filter(
+            run_id__in=runs, status=IngestionRun.Status.SUCCESS).values_list('form_type', 'wall_seconds',
+                                                                            'soap_calls'):
+        wall[form] += seconds
+        calls[form] += sum((soap_calls or {}).values())
+    return {form: wall[form] / calls[form] for form in calls if calls[form]}
+
+
+def _expected_new_dates(stored: Iterable[str], now: datetime | None = None) -> int:
+    """
+    Оценка числа отчётных дат, появившихся после последней сохранённой: прошедшее время,
+    делённое на медианный интервал между последними сохранёнными датами (оценка сверху).
+    """
+    dates = sorted(d for d in (_parse_naive_dt(v) for v in stored) if d is not None)
+    if not dates:
+        return 0
+    now = now or timezone.now().replace(tzinfo=None)
+    gaps = [(b - a).days for a, b in zip(dates[-13:], dates[-12:]) if (b - a).days > 0]
+    step = statistics.median(gaps) if gaps else 30
+    return max(int((now - dates[-1]).days // step), 0)
+
+
+def _stored_dates_map(form_title: str, bank_ids: list[int]) -> dict[int, list[str]]:
+    rows = BankDatesResponse.objects.filter(request__form_type__title=form_title,
+                                            request__bank_id__in=bank_ids).values_list('request__bank_id',
+                                                                                        'datetimes')
+    return {bank_id: list((data or {}).get('datetimes', []) or []) for bank_id, data in rows
+            if isinstance(data, dict)}
+
+
+def _f101_codes_map(bank_ids: list[int]) -> dict[int, int]:
+    """Число кодов индикаторов F101 по последнему сохранённому списку индикаторов банка."""
+    latest_dt = BankIndicatorsRequest.objects.filter(
+            form_type_id=OuterRef('request__form_type_id'),
+            bank_id=OuterRef('request__bank_id'),
+    ).order_by('-dt').values('dt')[:1]
+    qs = BankIndicatorsResponse.objects.filter(request__form_type__title=F101, request__bank_id__in=bank_ids,
+                                               request__dt=Subquery(latest_dt))
+    return {bank_id: len(data or []) for bank_id, data in qs.values_list('request__bank_id', 'indicators')}
+
+
+def _estimate_dates(stored: list[str], cfg: dict, reference: int) -> tuple[int, int]:
+    """(даты к загрузке, даты из БД, которые будут пропущены) для одного банка и формы."""
+    if not stored:
+        return reference, 0
+    new = _expected_new_dates(stored)
+    if cfg.get('only_new_dates'):
+        return new, len(stored)
+    return len(stored) + new, 0
+
+
+def _step_seconds(form: str, serial_calls: int, parallel_calls: int, cfg: dict, observed: dict[str, float]) -> float:
+    """
+    Время шага (банк + форма). Если в журнале есть запуски этого режима — по фактической стоимости вызова,
+    иначе по settings.INGESTION_PLAN_CALL_SECONDS с учётом троттлинга и пула потоков F101.
+    """
+    if form in observed:
+        return (serial_calls + parallel_calls) * observed[form]
+    call = settings.INGESTION_PLAN_CALL_SECONDS
+    throttle = float(cfg.get('throttle_seconds', 0) or 0)
+    workers = max(int(cfg.get('max_workers', 1)), 1)
+    return serial_calls * (call + throttle) + parallel_calls * max(call / workers, throttle)
+
+
+def _plan_bank_ingestion(mode: str = INCREMENTAL, reg_numbers: Iterable[int] | None = None,
+                         forms: Iterable[str] | None = None, top: int = 20) -> dict:
+    """
+    План загрузки SOAP-форм без обращений к ЦБ: по банкам и датам из БД оценивает число вызовов SOAP,
+    записей в БД (upsert), пропускаемых (уже сохранённых) дат и длительность запуска в режиме mode.
+    Возвращает итоги, разбивку по формам и top самых дорогих банков.
+    """
+    cfg = _get_mode_config(mode)
+    forms = [f for f in ALL_BANK_FORMS if f in set(forms or ALL_BANK_FORMS)]
+    wanted = set(reg_numbers) if reg_numbers else None
+
+    banks = list(Bank.objects.order_by('reg_number').values('id', 'reg_number', 'name'))
+    dormant_skipped = []
+    if wanted is not None:
+        banks = [b for b in banks if b['reg_number'] in wanted]
+    else:
+        banks, dormant_skipped = _split_dormant(banks)
+    bank_ids = [b['id'] for b in banks]
+    observed = _observed_call_seconds(mode)
+    assumptions = []
+
+    stored = {form: _stored_dates_map(form, bank_ids) for form in (F123, F101) if form in forms}
+    references = {}
+    for form, stored_map in stored.items():
+        counts = [len(v) for v in stored_map.values() if v]
+        if counts:
+            references[form] = int(statistics.median(counts))
+        else:
+            start = int(cfg.get('f101_start_year', REPORTS_MIN_START_YEAR))
+            references[form] = (timezone.now().year - start + 1) * 12
+            assumptions.append(f'{form}: в БД нет сохранённых дат — для первичной загрузки взято '
+                               f'{references[form]} ежемесячных дат с {start} года')
+
+    codes = _f101_codes_map(bank_ids) if F101 in forms else {}
+    codes_reference = int(statistics.median(codes.values())) if codes else 0
+    if F101 in forms and not codes:
+        assumptions.append('F101: в БД нет списков индикаторов — вызовы по кодам индикаторов не учтены')
+
+    lookback = cfg.get('f810_lookback_years')
+    f810_start = (timezone.now().year - int(lookback)) if lookback is not None else int(cfg.get('f810_start_year',
+                                                                                               2000))
+    f810_dates = len(_generate_f810_dates(start_year=f810_start))
+    f813_stored = _get_stored_f813_units(bank_ids) if F813 in forms else {}
+    f813_grid = len(_select_f813_units(set(), cfg)) if F813 in forms else 0
+
+    per_form = {form: {'banks': 0, 'calls': 0, 'cached': 0, 'writes': 0, 'seconds': 0.0,
+                       'seconds_per_call': observed.get(form), 'rate_source': 'ledger' if form in observed
+                       else 'default'} for form in forms}
+    per_bank = []
+    for bank in banks:
+        bank_plan = {'reg_number': bank['reg_number'], 'name': bank['name'], 'calls': 0, 'cached': 0,
+                     'writes': 0, 'seconds': 0.0, 'forms': {}}
+        for form in forms:
+            if form == F810:
+                serial, parallel, cached = f810_dates, 0, 0
+                writes = f810_dates
+            elif form == F813:
+                # сетка (дата, par) запрашивается пулом потоков; в incremental — только после водяного знака
+                serial, parallel = 0, len(_select_f813_units(f813_stored.get(bank['id'], set()), cfg))
+                cached = f813_grid - parallel if cfg.get('only_new_dates') else 0
+                writes = parallel
+            else:
+                dates, cached = _estimate_dates(stored[form].get(bank['id'], []), cfg, references[form])
+                if form == F123:
+                    # GetDatesForF123 + на каждую дату список индикаторов и полная форма
+                    serial, parallel = 1 + 2 * dates, 0
+                    writes = 1 + 2 * dates
+                else:
+                    # GetDatesForF101 + список индикаторов на каждую дату + по одному диапазону на код индикатора
+                    serial = 1 + dates
+                    parallel = codes.get(bank['id'], codes_reference) if dates else 0
+                    writes = 1 + parallel
+            seconds = _step_seconds(form, serial, parallel, cfg, observed)
+            step = {'calls': serial + parallel, 'cached': cached, 'writes': writes, 'seconds': round(seconds, 1)}
+            bank_plan['forms'][form] = step
+            for key in ('calls', 'cached', 'writes', 'seconds'):
+                bank_plan[key] += step[key]
+                per_form[form][key] += step[key]
+            per_form[form]['banks'] += 1
+        bank_plan['seconds'] = round(bank_plan['seconds'], 1)
+        per_bank.append(bank_plan)
+
+    # без явного списка банков запуск сначала обновляет справочник (EnumBIC_XML)
+    registry_calls = 0 if wanted is not None and len(banks) == len(wanted) else 1
+    seconds = sum(p['seconds'] for p in per_form.values())
+    for plan in per_form.values():
+        plan['seconds'] = round(plan['seconds'], 1)
+    if not observed:
+        assumptions.append(f'в журнале нет успешных запусков режима {mode} — время оценено по '
+                           f'{settings.INGESTION_PLAN_CALL_SECONDS} с на вызов')
+    not_found = sorted(wanted - {b['reg_number'] for b in banks}) if wanted is not None else []
+
+    return {
+        'task': 'update_all_bank_api_info',
+        'mode': mode,
+        'forms': forms,
+        'banks': len(banks),
+        'not_found': not_found,
+        'dormant_skipped': len(dormant_skipped),
+        'totals': {
+            'calls': sum(p['calls'] for p in per_form.values()) + registry_calls,
+            'cached': sum(p['cached'] for p in per_form.values()),
+            'writes': sum(p['writes'] for p in per_form.values()),
+            'seconds': round(seconds, 1),
+            'hours': round(seconds / 3600, 2),
+        },
+        'per_form': per_form,
+        'per_bank': sorted(per_bank, key=lambda b: b['seconds'], reverse=True)[:top],
+        'assumptions': assumptions,
+    }
+
+
+def _plan_reports_ingestion() -> dict:
+    """
+    План update_all_reports_api_info без обращений к API ЦБ: проверки параметров и запросы ставок,
+    для которых в БД ещё нет ответа. Запрос ставок уникален по (тип, публикация, набор, разрез),
+    поэтому на комбинацию без ответа приходится один вызов, а остальные подпериоды берутся из БД.
+    """
+    responded = {}
+    for rate_type, pub, ds, m, data in CbrApiDataRequest.objects.filter(response__isnull=False).values_list(
+            'rate_type', 'publication_id', 'dataset_id', 'measure_id', 'response__processed_data'):
+        responded[(rate_type, pub, ds, m)] = data
+
+    checks = [(None, None, None)]
+    combos = []
+    for pub in sorted(set(PUBLICATION_MEASURES) | set(CREDIT_PUBLICATIONS) | set(DEPOSIT_PUBLICATIONS)):
+        checks.append((pub, None, None))
+        for rate_type, publications in ((CbrApiDataRequest.RateType.CREDIT, CREDIT_PUBLICATIONS),
+                                        (CbrApiDataRequest.RateType.DEPOSIT, DEPOSIT_PUBLICATIONS)):
+            for ds in publications.get(pub, {}).get('datasets', ()):
+                checks.append((pub, ds, None))
+                for m in PUBLICATION_MEASURES.get(pub, ()):
+                    checks.append((pub, ds, m))
+                    combos.append((rate_type, pub, ds, m))
+
+    check_calls = sum(1 for key in checks if (CbrApiDataRequest.RateType.PARAMS_CHECK, *key) not in responded)
+    current_year = timezone.now().year
+    per_rate_type = {}
+    for rate_type, pub, ds, m in combos:
+        plan = per_rate_type.setdefault(str(rate_type), {'combinations': 0, 'periods': 0, 'calls': 0, 'cached': 0})
+        years = (responded.get((CbrApiDataRequest.RateType.PARAMS_CHECK, pub, ds, m)) or {}).get('years')
+        pairs = len(_generate_year_pairs(*years) if years else _generate_year_pairs(REPORTS_MIN_START_YEAR,
+                                                                                    current_year))
+        calls = 0 if (rate_type, pub, ds, m) in responded else 1
+        plan['combinations'] += 1
+        plan['periods'] += pairs
+        plan['calls'] += calls
+        plan['cached'] += pairs - calls
+
+    calls = check_calls + sum(p['calls'] for p in per_rate_type.values())
+    seconds = calls * settings.INGESTION_PLAN_CALL_SECONDS
+    return {
+        'task': 'update_all_reports_api_info',
+        'params_checks': {'total': len(checks), 'calls': check_calls, 'cached': len(checks) - check_calls},
+        'per_rate_type': per_rate_type,
+        'totals': {
+            'calls': calls,
+            'cached': len(checks) - check_calls + sum(p['cached'] for p in per_rate_type.values()),
+            'writes': calls,
+            'seconds': round(seconds, 1),
+            'hours': round(seconds / 3600, 2),
+        },
+    }
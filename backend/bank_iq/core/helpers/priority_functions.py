@@ -0,0 +1,98 @@
+import logging
+import math
+from datetime import timedelta
+from typing import Iterable
+
+from django.conf import settings
+from django.db.models import OuterRef, Subquery, Sum
+from django.utils import timezone
+
+from core.models import IndicatorAccessStat
+from core.one_time_tasks import form_f123
+from indicators.models import BankIndicatorDataRequest, BankIndicatorDataResponse
+
+
+logger = logging.getLogger(__name__)
+
+# Строка формы F123 с итогом собственных средств (капитала)
+F123_CAPITAL_PREFIX = 'Собственные средства (капитал), итого'
+
+
+def _get_bank_demand(reg_numbers: Iterable[int] | None = None) -> dict[int, int]:
+    """Суммарное число обращений к данным банка за окно settings.INDICATOR_ACCESS_WINDOW_DAYS."""
+    since = timezone.now() - timedelta(days=getattr(settings, 'INDICATOR_ACCESS_WINDOW_DAYS', 30))
+    qs = IndicatorAccessStat.objects.filter(last_accessed_at__gte=since)
+    if reg_numbers is not None:
+        qs = qs.filter(reg_number__in=list(reg_numbers))
+    return {row['reg_number']: row['hits'] for row in qs.values('reg_number').annotate(hits=Sum('hits')).order_by()}
+
+
+def _get_bank_capital(reg_numbers: Iterable[int] | None = None) -> dict[int, float]:
+    """
+    Размер банка: собственные средства (капитал) из последнего сохранённого отчёта F123.
+    Используется как доступная в БД замена размеру активов.
+    """
+    latest_dt = BankIndicatorDataRequest.objects.filter(
+            form_type_id=OuterRef('request__form_type_id'),
+            reg_number=OuterRef('request__reg_number'),
+            dt__isnull=False,
+    ).order_by('-dt').values('dt')[:1]
+    qs = BankIndicatorDataResponse.objects.filter(
+            request__form_type__title=form_f123()['title'],
+            request__dt=Subquery(latest_dt),
+    )
+    if reg_numbers is not None:
+        qs = qs.filter(request__reg_number__in=list(reg_numbers))
+
+    capital: dict[int, float] = {}
+    for reg, data in qs.values_list('request__reg_number', 'payload__payload').order_by():
+        for item in data or []:
+            if isinstance(item, dict) and str(item.get('name', '')).startswith(F123_CAPITAL_PREFIX):
+                try:
+                    capital[reg] = max(float(item.get('value') or 0), 0.0)
+                except (TypeError, ValueError):
+                    pass
+                break
+    return capital
+
+
+def _bank_priority_scores(reg_numbers: list[int]) -> dict[int, float]:
+    """
+    Оценка приоритета банка в [0, 1]: взвешенная сумма нормированного спроса (обращения к API)
+    и нормированного размера (капитал, в логарифмической шкале). Веса — settings.INGESTION_PRIORITY_WEIGHTS.
+    """
+    weights = getattr(settings, 'INGESTION_PRIORITY_WEIGHTS', {'demand': 0.7, 'size': 0.3})
+    demand = _get_bank_demand(reg_numbers)
+    capital = _get_bank_capital(reg_numbers)
+
+    max_demand = max(demand.values(), default=0)
+    max_capital = max((math.log1p(v) for v in capital.values()), default=0)
+
+    scores = {}
+    for reg in reg_numbers:
+        demand_norm = demand.get(reg, 0) / max_demand if max_demand else 0.0
+        size_norm = math.log1p(capital.get(reg, 0)) / max_capital if max_capital else 0.0
+        scores[reg] = weights.get('demand', 0) * demand_norm + weights.get('size', 0) * size_norm
+    return scores
+
+
+def _order_banks_by_priority(banks_list: list[dict]) -> list[dict]:
+    """
+    Упорядочивает банки для загрузки: сначала закреплённые (settings.INGESTION_PINNED_BANKS, в заданном порядке),
+    затем остальные по убыванию оценки _bank_priority_scores. Банки с одинаковой оценкой сохраняют исходный
+    порядок; ни один банк не отбрасывается.
+    """
+    if len(banks_list) < 2:
+        return list(banks_list)
+
+    pinned = {reg: idx for idx, reg in enumerate(getattr(settings, 'INGESTION_PINNED_BANKS', []))}
+    scores = _bank_priority_scores([b['reg_number'] for b in banks_list])
+
+    def _key(item):
+        idx, bank = item
+        reg = bank['reg_number']
+        return reg not in pinned, pinned.get(reg, 0), -scores.get(reg, 0.0), idx
+
+    ordered = [bank for _, bank in sorted(enumerate(banks_list), key=_key)]
+    logger.info('Bank ingestion order (head): %s', [b['reg_number'] for b in ordered[:10]])
+    return ordered
@@ -0,0 +1,133 @@
+import logging
+from datetime import datetime
+from typing import Iterable
+
+from django.db.models import Max, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from core.helpers.indicator_values_functions import _naive_dt, _to_decimal
+from reports.models import CbrApiDataRequest, CbrApiDataResponse, RateElement, RateObservation
+
+
+logger = logging.getLogger(__name__)
+
+OBSERVATION_KEY_FIELDS = ('dataset_id', 'measure_id', 'element_id', 'date')
+# Измерения, по которым строится сводная таблица (одно — в столбцы, остальные — в строки вместе с датой)
+PIVOT_DIMENSIONS = {'dataset': 'dataset_id', 'measure': 'measure_id', 'element': 'element_id'}
+RATE_TYPES = (CbrApiDataRequest.RateType.CREDIT, CbrApiDataRequest.RateType.DEPOSIT)
+
+
+def _upsert_rate_observations(rate_type: str, params: dict, processed: dict, batch_size: int = 1000) -> int:
+    """
+    Переносит ответ API ЦБ по ставкам (ResponseSerializer: RawData, headerData, units) в RateObservation
+    и названия элементов в RateElement вставкой INSERT ... ON CONFLICT DO UPDATE.
+    params — {publication_id, dataset_id, measure_id, ...} запроса. Возвращает число записанных наблюдений.
+    """
+    if not isinstance(processed, dict):
+        return 0
+    dataset_id, publication_id = params.get('dataset_id'), params.get('publication_id')
+    now = timezone.now()
+    units = {unit.get('id'): str(unit.get('val') or '') for unit in processed.get('units') or []
+             if isinstance(unit, dict)}
+
+    elements = {}
+    for header in processed.get('headerData') or []:
+        if isinstance(header, dict) and header.get('id') is not None:
+            elements[int(header['id'])] = RateElement(dataset_id=dataset_id, element_id=int(header['id']),
+                                                      name=str(header.get('elname') or '')[:255],
+                                                      updated_at=now, created_at=now)
+
+    rows: dict[tuple, RateObservation] = {}
+    for item in processed.get('RawData') or []:
+        if not isinstance(item, dict):
+            continue
+        date = _naive_dt(item.get('date'))
+        measure_id = item.get('measure_id') or params.get('measure_id')
+        obs_val = _to_decimal(item.get('obs_val'))
+        if date is None or item.get('element_id') is None or measure_id is None or obs_val is None:
+            continue
+        element_id = int(item['element_id'])
+        rows[(int(measure_id), element_id, date)] = RateObservation(
+                rate_type=rate_type, publication_id=publication_id, dataset_id=dataset_id,
+                measure_id=int(measure_id), element_id=element_id, date=date, obs_val=obs_val,
+                unit=units.get(item.get('unit_id'), '')[:64], updated_at=now, created_at=now)
+
+    if elements:
+        RateElement.objects.bulk_create(list(elements.values()), update_conflicts=True,
+                                        unique_fields=['dataset_id', 'element_id'],
+                                        update_fields=['name', 'updated_at'], batch_size=batch_size)
+    if rows:
+        RateObservation.objects.bulk_create(list(rows.values()), update_conflicts=True,
+                                            unique_fields=list(OBSERVATION_KEY_FIELDS),
+                                            update_fields=['obs_val', 'unit', 'updated_at'], batch_size=batch_size)
+    return len(rows)
+
+
+def _rebuild_rate_observations() -> dict:
+    """
+    Заполняет RateObservation из уже сохранённых ответов по ставкам — для данных, загруженных до появления
+    таблицы. Ответы применяются от старых к новым, поэтому при пересечении подпериодов остаётся последнее значение.
+    """
+    qs = CbrApiDataResponse.objects.filter(request__rate_type__in=RATE_TYPES).order_by('updated_at', 'pk')
+    responses = written = 0
+    for rate_type, publication_id, dataset_id, measure_id, processed in qs.values_list(
+            'request__rate_type', 'request__publication_id', 'request__dataset_id', 'request__measure_id',
+            'processed_data').iterator(chunk_size=100):
+        written += _upsert_rate_observations(rate_type, {'publication_id': publication_id, 'dataset_id': dataset_id,
+                                                         'measure_id': measure_id}, processed)
+        responses += 1
+    logger.info('Rebuilt rate observations: %d responses, %d rows written', responses, written)
+    return {'responses': responses, 'rows_written': written, 'rows_total': RateObservation.objects.count()}
+
+
+def _rate_observations(dataset_ids: Iterable[int], measure_ids: Iterable[int] | None = None,
+                       element_ids: Iterable[int] | None = None, from_year: int | None = None,
+                       to_year: int | None = None):
+    """
+    Наблюдения по наборам данных (и, опционально, разрезам и элементам) за годы [from_year, to_year].
+    Дата наблюдения в API ЦБ — первое число следующего месяца («Декабрь 2024» -> 2025-01-01),
+    поэтому год Y — это даты в (Y-01-01, (Y+1)-01-01].
+    """
+    qs = RateObservation.objects.filter(dataset_id__in=list(dataset_ids))
+    if measure_ids:
+        qs = qs.filter(measure_id__in=list(measure_ids))
+    if element_ids:
+        qs = qs.filter(element_id__in=list(element_ids))
+    if from_year is not None:
+        qs = qs.filter(date__gt=datetime(from_year, 1, 1))
+    if to_year is not None:
+        qs = qs.filter(date__lte=datetime(to_year + 1, 1, 1))
+    return qs
+
+
+def _get_rate_series(dataset_ids: Iterable[int], measure_ids: Iterable[int] | None = None,
+                     element_ids: Iterable[int] | None = None, from_year: int | None = None,
+                     to_year: int | None = None) -> list[dict]:
+    """Ряды наблюдений одним запросом (название элемента — подзапросом к RateElement), по ряду и дате."""
+    element_name = RateElement.objects.filter(dataset_id=OuterRef('dataset_id'),
+                                              element_id=OuterRef('element_id')).values('name')[:1]
+    rows = _rate_observations(dataset_ids, measure_ids, element_ids, from_year, to_year).annotate(
+            element_name=Subquery(element_name)).order_by(*OBSERVATION_KEY_FIELDS).values(
+            'publication_id', *OBSERVATION_KEY_FIELDS, 'element_name', 'obs_val', 'unit')
+    return [{**row, 'date': row['date'].isoformat(), 'obs_val': float(row['obs_val'])} for row in rows]
+
+
+def _pivot_rate_observations(pivot: str, dataset_ids: Iterable[int], measure_ids: Iterable[int] | None = None,
+                             element_ids: Iterable[int] | None = None, from_year: int | None = None,
+                             to_year: int | None = None) -> dict:
+    """
+    Сводная таблица: значения измерения pivot ('dataset' | 'measure' | 'element') — столбцы
+    '<pivot>_<id>', строки — остальные измерения и дата. Сведение выполняется в SQL (MAX(...) FILTER (WHERE ...)).
+    Возвращает {'columns': [...], 'rows': [...]}.
+    """
+    field = PIVOT_DIMENSIONS[pivot]
+    qs = _rate_observations(dataset_ids, measure_ids, element_ids, from_year, to_year)
+    keys = sorted(qs.order_by().values_list(field, flat=True).distinct())
+    columns = {f'{pivot}_{key}': Max('obs_val', filter=Q(**{field: key})) for key in keys}
+    group_by = [f for f in PIVOT_DIMENSIONS.values() if f != field] + ['date']
+    rows = qs.order_by(*group_by).values(*group_by).annotate(**columns)
+    return {
+        'columns': list(columns),
+        'rows': [{**{f: row[f] for f in group_by}, 'date': row['date'].isoformat(),
+                  **{c: None if row[c] is None else float(row[c]) for c in columns}} for row in rows],
+    }
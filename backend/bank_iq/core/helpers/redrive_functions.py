@@ -0,0 +1,91 @@
+import logging
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+from banks.models import Bank
+from core.helpers.deadletter_functions import (
+    _error_class, _failed_fetch_stats, _get_due_failed_fetches, _mark_failed_fetch_resolved, _mark_failed_fetch_retry)
+from core.helpers.ingestion_functions import (
+    _get_mode_config, _ingest_bank_f101, _ingest_bank_f123, _ingest_f101_date, _ingest_f101_range,
+    _ingest_f123_date, _ingest_f810_date, _ingest_f813_date, _parse_naive_dt, INCREMENTAL)
+from core.helpers.reports_ingestion_functions import _ingest_rates_period
+from core.models import FailedFetch
+from core.utils.throttle import Throttle
+from indicators.models import FormType
+
+
+logger = logging.getLogger(__name__)
+
+# Конвейер формы целиком (повтор списка дат) сам записывает сбои в FailedFetch: если та же единица
+# записана заново во время повтора — повтор не удался; сбои по отдельным датам становятся новыми единицами
+_BANK_FORM_PIPELINES = {'F123': _ingest_bank_f123, 'F101': _ingest_bank_f101}
+_BANK_DATE_UNITS = {'F810': _ingest_f810_date, 'F123': _ingest_f123_date, 'F101': _ingest_f101_date}
+
+
+def _redrive_one(item: FailedFetch, cfg: dict, throttle: Throttle) -> str | None:
+    """Повторяет одну единицу работы. Возвращает текст ошибки или None."""
+    if item.reg_number is None:
+        return _ingest_rates_period(item.source, item.params)
+
+    bank_obj = Bank.objects.filter(reg_number=item.reg_number).first()
+    if bank_obj is None:
+        return f'Внутренняя ошибка: банк {item.reg_number} не найден'
+    form_obj = FormType.objects.get(title=item.source)
+
+    if item.stage == 'dates':
+        started = timezone.now()
+        _BANK_FORM_PIPELINES[item.source](bank_obj, cfg, throttle)
+        return FailedFetch.objects.filter(pk=item.pk, updated_at__gte=started).values_list('error', flat=True).first()
+    if item.stage == 'date' and 'par' in item.params:
+        return _ingest_f813_date(bank_obj, form_obj, _parse_naive_dt(item.params['dt']), int(item.params['par']),
+                                 throttle)
+    if item.stage == 'date':
+        return _BANK_DATE_UNITS[item.source](bank_obj, form_obj, _parse_naive_dt(item.params['dt']), throttle)
+    if item.stage == 'range':
+        return _ingest_f101_range(bank_obj, form_obj, item.params['ind_code'],
+                                  _parse_naive_dt(item.params['date_from']),
+                                  _parse_naive_dt(item.params['date_to']), throttle)
+    return f'Внутренняя ошибка: неизвестная единица работы {item.source}/{item.stage}'
+
+
+def _redrive_failed_fetches(limit: int | None = None, time_budget: float | None = None) -> dict:
+    """
+    Повторяет сбойные единицы работы, у которых наступило время следующей попытки (от самых «старых»).
+    Успешные помечаются resolved, неудачные откладываются с экспоненциальной задержкой, после
+    settings.DEAD_LETTER_MAX_ATTEMPTS попыток — abandoned. Если подряд не удались
+    settings.DEAD_LETTER_FAIL_FAST попыток (ЦБ всё ещё недоступен), остальные не трогаются до следующего запуска.
+    """
+    limit = limit or settings.DEAD_LETTER_REDRIVE_BATCH
+    cfg = _get_mode_config(INCREMENTAL)
+    throttle = Throttle(cfg.get('throttle_seconds', 0))
+    deadline = time.monotonic() + time_budget if time_budget else None
+
+    resolved = failed = consecutive = 0
+    stopped = None
+    for item in _get_due_failed_fetches(limit):
+        if deadline is not None and time.monotonic() >= deadline:
+            stopped = 'out_of_budget'
+            break
+        try:
+            error = _redrive_one(item, cfg, throttle)
+        except Exception as e:
+            logger.exception('Re-drive of %s failed', item)
+            error = f'exception: {e}'
+
+        if error and _error_class(error) != 'no_data':
+            _mark_failed_fetch_retry(item, error)
+            failed += 1
+            consecutive += 1
+            if consecutive >= settings.DEAD_LETTER_FAIL_FAST:
+                stopped = 'upstream_failing'
+                logger.warning('[!] Re-drive stopped after %d consecutive failures: %s [!]', consecutive, error)
+                break
+        else:
+            _mark_failed_fetch_resolved(item)
+            resolved += 1
+            consecutive = 0
+
+    logger.info('Re-drive finished: resolved=%d failed=%d stopped=%s', resolved, failed, stopped)
+    return {'resolved': resolved, 'failed': failed, 'stopped': stopped, 'stats': _failed_fetch_stats()}
@@ -0,0 +1,158 @@
+import contextvars
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+
+from django.conf import settings
+from django.db import connections
+
+from banks.models import Bank, BankDatesRequest
+from core.helpers.deadletter_functions import _error_class
+from core.helpers.indicators_db_functions import _sync_bank_registry, _update_or_create_datetimes_response
+from core.helpers.ingestion_functions import (
+    _ingest_f101_range, _ingest_f123_date, _ingest_f810_date, _ingest_f813_date, _parse_naive_dt, ALL_BANK_FORMS)
+from core.helpers.reports_ingestion_functions import _ingest_rates_period
+from core.one_time_tasks import form_f101, form_f123, form_f810, form_f813
+from core.parsers.soap.form101_parser import Form101Parser
+from core.parsers.soap.form123_parser import Form123Parser
+from core.utils.ingestion_meter import IngestionMeter, metering
+from core.utils.raw_archive import ARCHIVE_MISS_MESSAGE, replaying
+from core.utils.throttle import Throttle
+from indicators.models import BankIndicatorDataRequest, FormType
+from reports.models import CbrApiDataRequest
+
+
+logger = logging.getLogger(__name__)
+
+F810, F123, F101, F813 = form_f810()['title'], form_f123()['title'], form_f101()['title'], form_f813()['title']
+RATE_SOURCES = (CbrApiDataRequest.RateType.CREDIT.value, CbrApiDataRequest.RateType.DEPOSIT.value)
+REGISTRY = 'registry'
+# Источники по умолчанию; справочник банков разбирается только по явному запросу (влияет на статус банков)
+DEFAULT_SOURCES = ALL_BANK_FORMS + RATE_SOURCES
+
+_DATES_PARSERS = {F123: Form123Parser.get_dates_for_f123, F101: Form101Parser.get_dates_for_f101}
+
+# (source, stage, reg_number, params) — те же единицы работы, что и в FailedFetch
+ReparseUnit = tuple[str, str, int | None, dict]
+
+
+def _reparse_units(sources: Iterable[str], reg_numbers: Iterable[int] | None = None) -> list[ReparseUnit]:
+    """Единицы работы для повторного разбора — все запросы, ответы на которые уже сохранены в БД."""
+    sources = set(sources)
+    wanted = set(reg_numbers) if reg_numbers else None
+    units: list[ReparseUnit] = []
+    if REGISTRY in sources and wanted is None:
+        units.append((REGISTRY, REGISTRY, None, {}))
+
+    dates = BankDatesRequest.objects.filter(form_type__title__in=sources & set(_DATES_PARSERS),
+                                            response__isnull=False)
+    data = BankIndicatorDataRequest.objects.filter(form_type__title__in=sources & set(ALL_BANK_FORMS),
+                                                   response__isnull=False)
+    if wanted is not None:
+        dates, data = dates.filter(reg_number__in=wanted), data.filter(reg_number__in=wanted)
+    for form, reg in dates.values_list('form_type__title', 'reg_number'):
+        units.append((form, 'dates', reg, {}))
+    for form, reg, ind_code, date_from, date_to, dt in data.values_list(
+            'form_type__title', 'reg_number', 'ind_code', 'date_from', 'date_to', 'dt').order_by('reg_number'):
+        if form == F101:
+            if ind_code and date_from and date_to:
+                units.append((form, 'range', reg, {'ind_code': ind_code, 'date_from': date_from,
+                                                   'date_to': date_to}))
+        elif form == F813:
+            units.append((form, 'date', reg, {'dt': dt, 'par': int(ind_code)}))
+        elif dt is not None:
+            units.append((form, 'date', reg, {'dt': dt}))
+
+    if wanted is None and sources & set(RATE_SOURCES):
+        for row in CbrApiDataRequest.objects.filter(rate_type__in=sources & set(RATE_SOURCES),
+                                                    response__isnull=False).values(
+                'rate_type', 'publication_id', 'dataset_id', 'measure_id', 'from_year', 'to_year'):
+            units.append((row.pop('rate_type'), 'period', None, row))
+    return units
+
+
+def _reparse_unit(unit: ReparseUnit, banks_map: dict[int, Bank], forms_map: dict[str, FormType],
+                  throttle: Throttle) -> str | None:
+    """Разбирает одну единицу работы заново по ответам из архива. Возвращает текст ошибки или None."""
+    source, stage, reg, params = unit
+    if source == REGISTRY:
+        return _sync_bank_registry().get('message')
+    if source in RATE_SOURCES:
+        return _ingest_rates_period(source, params, overwrite=True)
+
+    bank_obj, form_obj = banks_map.get(reg), forms_map[source]
+    if bank_obj is None:
+        return f'Внутренняя ошибка: банк {reg} не найден'
+    if stage == 'dates':
+        datetimes_data = _DATES_PARSERS[source](reg)
+        if 'message' in datetimes_data:
+            return datetimes_data['message']
+        _update_or_create_datetimes_response(bank=bank_obj, form_type=form_obj, datetimes_obj=datetimes_data)
+        return None
+    if stage == 'range':
+        return _ingest_f101_range(bank_obj, form_obj, params['ind_code'], _parse_naive_dt(params['date_from']),
+                                  _parse_naive_dt(params['date_to']), throttle)
+    if source == F813:
+        return _ingest_f813_date(bank_obj, form_obj, _parse_naive_dt(params['dt']), params['par'], throttle)
+    date_units = {F810: _ingest_f810_date, F123: _ingest_f123_date}
+    return date_units[source](bank_obj, form_obj, _parse_naive_dt(params['dt']), throttle)
+
+
+def _reparse_chunk(units: list[ReparseUnit], banks_map: dict[int, Bank], forms_map: dict[str, FormType]) -> Counter:
+    """Разбирает часть единиц в потоке пула; соединения с БД потока закрываются по завершении."""
+    counts: Counter[str] = Counter()
+    meter, throttle = IngestionMeter(), Throttle(0)
+    try:
+        with metering(meter):
+            for unit in units:
+                try:
+                    error = _reparse_unit(unit, banks_map, forms_map, throttle)
+                except Exception as e:
+                    logger.exception('Re-parse of %s failed', unit)
+                    error = f'exception: {e}'
+                if error is None:
+                    counts['reparsed'] += 1
+                elif ARCHIVE_MISS_MESSAGE in error:
+                    counts['missing'] += 1
+                elif _error_class(error) == 'no_data':
+                    counts['no_data'] += 1
+                else:
+                    counts['failed'] += 1
+                    logger.warning('Re-parse of %s returned error: %s', unit, error)
+    finally:
+        connections.close_all()
+    snapshot = meter.snapshot()
+    counts.update(changed=snapshot['changed'], unchanged=snapshot['unchanged'],
+                  upstream_calls=sum(snapshot['soap_calls'].values()))
+    return counts
+
+
+def _reparse_raw_archive(sources: Iterable[str] | None = None, reg_numbers: Iterable[int] | None = None,
+                         workers: int | None = None) -> dict:
+    """
+    Пересобирает таблицы ответов из архива сырых ответов ЦБ (raw_archive) текущими парсерами — без обращений
+    к ЦБ: каждая сохранённая единица работы (список дат, отчётная дата, диапазон F101, раздел F813,
+    подпериод ставок) разбирается заново, записываются только изменившиеся ответы (хэш).
+    Единицы делятся между workers потоками (по умолчанию settings.RAW_ARCHIVE_REPARSE_WORKERS).
+    Вызовы, которых нет в архиве, считаются в missing.
+    """
+    sources = list(sources or DEFAULT_SOURCES)
+    workers = max(int(workers or settings.RAW_ARCHIVE_REPARSE_WORKERS), 1)
+    units = _reparse_units(sources, reg_numbers)
+    logger.info('[!] START re-parse of raw archive: %d units, %d workers [!]', len(units), workers)
+
+    banks_map = {b.reg_number: b for b in Bank.objects.all()}
+    forms_map = {f.title: f for f in FormType.objects.filter(title__in=ALL_BANK_FORMS)}
+    totals: Counter[str] = Counter()
+    with replaying(), ThreadPoolExecutor(max_workers=workers) as executor:
+        # потоки пула не наследуют contextvars — передаём контекст (режим воспроизведения архива)
+        futures = [executor.submit(contextvars.copy_context().run, _reparse_chunk, units[i::workers], banks_map,
+                                   forms_map) for i in range(workers) if units[i::workers]]
+        for future in futures:
+            totals.update(future.result())
+
+    result = {'units': len(units), 'sources': sources, **{key: totals[key] for key in (
+        'reparsed', 'no_data', 'missing', 'failed', 'changed', 'unchanged', 'upstream_calls')}}
+    logger.info('[!] FINISHED re-parse of raw archive: %s [!]', result)
+    return result
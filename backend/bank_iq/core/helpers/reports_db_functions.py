@@ -1,22 +1,63 @@
 from django.db import IntegrityError, transaction
 
-from reports.models import CbrApiDataRequest
+from core.utils.hash_utils import canonical_obj_and_hash
+from core.utils.ingestion_meter import record_write
+from core.utils.request_keys import rates_request_key
+from core.utils.upsert import upsert_if_hash_changed
+from reports.models import CbrApiDataRequest, CbrApiDataResponse
+
+
+# Комбинации publication/dataset/measure, которые загружает update_all_reports_api_info
+CREDIT_PUBLICATIONS = {
+    14: {'datasets': (25, 26, 27, 28, 29)},
+    15: {'datasets': (30, 31, 32, 33, 34)},
+    16: {'datasets': (35, 36)}
+}
+DEPOSIT_PUBLICATIONS = {
+    18: {'datasets': (37, 38)},
+    19: {'datasets': (39, 40)}
+}
+PUBLICATION_MEASURES = {
+    14: (2, 3, 4),
+    15: (23, 42, 55, 64, 72, 87, 95, 106),
+    16: (7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21),
+    18: (2, 3, 4),
+    19: (23, 42, 55, 64, 72, 87, 95, 106)
+}
+REPORTS_MIN_START_YEAR = 2018
+
+
+def _generate_year_pairs(available_from: int, available_to: int,
+                         min_start: int = REPORTS_MIN_START_YEAR) -> list[tuple[int, int]]:
+    start = max(available_from, min_start)
+    if start > available_to:
+        return []
+    pairs = []
+    for fy in range(start, available_to + 1):
+        for ty in range(fy, available_to + 1):
+            pairs.append((fy, ty))
+    return pairs
+
+
+def _request_key(rate_type: str, params: dict, with_years: bool) -> str:
+    years = (params.get('from_year'), params.get('to_year')) if with_years else (None, None)
+    return rates_request_key(rate_type, params.get('publication_id'), params.get('dataset_id'),
+                             params.get('measure_id'), *years)
 
 
 def _find_existing_request(rate_type: str, params: dict, with_years: bool = False) -> CbrApiDataRequest:
-    q = CbrApiDataRequest.objects.filter(
-            rate_type=rate_type,
-            publication_id=params.get('publication_id'),
-            dataset_id=params.get('dataset_id'),
-            measure_id=params.get('measure_id'),
-    )
-    if with_years:
-        q = q.filter(from_year=params.get('from_year'), to_year=params.get('to_year'))
-    return q.select_related('response').first()
+    return CbrApiDataRequest.objects.filter(
+            request_key=_request_key(rate_type, params, with_years),
+    ).select_related('response').first()
 
 
 def _create_or_get_request_atomic(rate_type: str, params: dict, with_years: bool = False) -> CbrApiDataRequest:
-    defaults = {}
+    defaults = {
+        'rate_type': rate_type,
+        'publication_id': params.get('publication_id'),
+        'dataset_id': params.get('dataset_id'),
+        'measure_id': params.get('measure_id'),
+    }
     if with_years:
         defaults.update({
             'from_year': params.get('from_year'),
@@ -25,12 +66,36 @@ def _create_or_get_request_atomic(rate_type: str, params: dict, with_years: bool
     try:
         with transaction.atomic():
             obj, created = CbrApiDataRequest.objects.get_or_create(
-                    rate_type=rate_type,
-                    publication_id=params.get('publication_id'),
-                    dataset_id=params.get('dataset_id'),
-                    measure_id=params.get('measure_id'),
+                    request_key=_request_key(rate_type, params, with_years),
                     defaults=defaults
             )
     except IntegrityError:
         obj = _find_existing_request(rate_type, params, with_years=with_years)
     return obj
+
+
+def _create_response_if_absent(req: CbrApiDataRequest, processed_data) -> None:
+    """
+    Сохраняет ответ для запроса, если его ещё нет: INSERT ... ON CONFLICT (request_id) DO NOTHING,
+    без select_for_update на запрос (если параллельный воркер уже сохранил ответ — ничего не делаем).
+    """
+    processed_data, data_hash = canonical_obj_and_hash(processed_data)
+    CbrApiDataResponse.objects.bulk_create(
+            [CbrApiDataResponse(request=req, processed_data=processed_data, data_hash=data_hash)],
+            ignore_conflicts=True)
+
+
+def _update_response_if_changed(req: CbrApiDataRequest, processed_data) -> bool:
+    """
+    Перезаписывает ответ запроса, только если изменился хэш данных: совпадение проверяется заранее, а запись —
+    одной инструкцией upsert, пропускающей строку с тем же хэшем (см. upsert_if_hash_changed).
+    Возвращает True, если ответ создан или обновлён.
+    """
+    processed_data, data_hash = canonical_obj_and_hash(processed_data)
+    if CbrApiDataResponse.objects.filter(request=req, data_hash=data_hash).exists():
+        record_write(changed=False)
+        return False
+    written = upsert_if_hash_changed(CbrApiDataResponse, 'request_id', {
+        'request_id': req.pk, 'processed_data': processed_data, 'data_hash': data_hash})
+    record_write(changed=written)
+    return written
@@ -0,0 +1,56 @@
+import logging
+
+from core.helpers.rate_values_functions import _upsert_rate_observations
+from core.helpers.reports_db_functions import _create_or_get_request_atomic, _create_response_if_absent, \
+    _update_response_if_changed
+from core.parsers.rest.cbr_parser import CbrAPIParser
+from reports.serializers import ResponseSerializer
+
+
+logger = logging.getLogger(__name__)
+
+
+def _ingest_rates_period(rate_type: str, params: dict, overwrite: bool = False) -> str | None:
+    """
+    Загрузка ставок (CREDIT / DEPOSIT) за подпериод params = {publication_id, dataset_id, measure_id,
+    from_year, to_year}. Если ответ уже сохранён — ничего не делает (overwrite — перезаписать, для
+    повторного разбора архива; неизменившийся по хэшу ответ и его наблюдения не перезаписываются).
+    Возвращает текст ошибки API ЦБ (None — успешно или загружать нечего).
+    """
+    label = str(rate_type).upper()
+    try:
+        req_obj = _create_or_get_request_atomic(rate_type, params, with_years=True)
+    except Exception:
+        logger.exception('Failed to create/get %s request for %s', label, params)
+        return None
+
+    if not overwrite and hasattr(req_obj, 'response') and req_obj.response is not None:
+        return None
+
+    try:
+        data = CbrAPIParser.parse(**params)
+    except Exception as e:
+        logger.exception('CbrAPIParser.parse exception for %s %s: %s', label, params, e)
+        return f'exception: {e}'
+
+    if isinstance(data, dict) and data.get('message'):
+        logger.warning('CbrAPIParser.parse returned message for %s %s: %s', label, params, data.get('message'))
+        return data['message']
+
+    try:
+        processed = ResponseSerializer(instance=data).data
+    except Exception as e:
+        logger.exception('Failed to serialize %s response for %s: %s', label, params, e)
+        return None
+
+    try:
+        if overwrite:
+            if not _update_response_if_changed(req_obj, processed):
+                return None
+        else:
+            _create_response_if_absent(req_obj, processed)
+        _upsert_rate_observations(rate_type, params, processed)
+        logger.debug('Saved %s response for %s', label, params)
+    except Exception:
+        logger.exception('Failed to save %s response for %s', label, params)
+    return None
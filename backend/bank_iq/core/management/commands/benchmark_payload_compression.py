@@ -0,0 +1,29 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Benchmark payload size and decode latency: plain JSON vs zstd vs zstd with a trained dictionary'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--samples', type=int, default=1000, help='Сколько payload взять из БД')
+        parser.add_argument('--level', type=int, default=None, help='Уровень zstd (по умолчанию settings)')
+        parser.add_argument('--size', type=int, default=112_640, help='Размер словаря в байтах')
+        parser.add_argument('--repeat', type=int, default=5, help='Повторов декодирования на payload')
+        parser.add_argument('--json', action='store_true', help='Вывести результат в JSON')
+
+    def handle(self, *args, **options):
+        from core.helpers.payload_compression_functions import _benchmark_payload_compression
+
+        result = _benchmark_payload_compression(samples=options['samples'], level=options['level'],
+                                                dict_size=options['size'], repeat=options['repeat'])
+        if options['json'] or 'message' in result:
+            self.stdout.write(json.dumps(result, ensure_ascii=False, indent=2))
+            return
+        self.stdout.write(self.style.MIGRATE_HEADING(
+                f'payload: {result["samples"]}, zstd level {result["level"]}, словарь {result["dict_size"]} байт'))
+        for name, stats in result['modes'].items():
+            latency = (f', декодирование {stats["decode_us_median"]} мкс (p95 {stats["decode_us_p95"]})'
+                       if 'decode_us_median' in stats else '')
+            self.stdout.write(f'  {name}: {stats["bytes"]} байт, x{stats["ratio"]}{latency}')
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Delete F101 range requests subsumed by another stored range with matching data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('reg_numbers', nargs='*', type=int,
+                            help='Регистрационные номера банков (по умолчанию — все банки)')
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Запросов в пакете удаления (по умолчанию settings)')
+        parser.add_argument('--pause', type=float, default=None,
+                            help='Пауза между пакетами, секунд (по умолчанию settings)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Только посчитать, что было бы удалено')
+
+    def handle(self, *args, **options):
+        from core.helpers.compaction_functions import _compact_indicator_ranges
+
+        result = _compact_indicator_ranges(reg_numbers=options['reg_numbers'] or None,
+                                           batch_size=options['batch_size'], pause_seconds=options['pause'],
+                                           dry_run=options['dry_run'])
+        self.stdout.write(self.style.SUCCESS(f'Сжатие диапазонов F101: {result}'))
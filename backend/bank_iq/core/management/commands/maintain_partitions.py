@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming yearly partitions and detach/drop expired ones (PostgreSQL only)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ahead', type=int, default=None,
+                            help='На сколько лет вперёд создавать секции (по умолчанию settings)')
+        parser.add_argument('--retention', type=int, default=None,
+                            help='Сколько лет хранить; 0 — хранить всё (по умолчанию settings)')
+        parser.add_argument('--drop', action='store_true', default=None,
+                            help='Удалять отсоединённые секции, а не оставлять отдельными таблицами')
+
+    def handle(self, *args, **options):
+        from core.helpers.partition_functions import _maintain_partitions
+
+        result = _maintain_partitions(ahead_years=options['ahead'], retention_years=options['retention'],
+                                      drop=options['drop'])
+        self.stdout.write(self.style.SUCCESS(f'Обслуживание секций: {result}'))
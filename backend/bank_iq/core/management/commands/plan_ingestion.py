@@ -0,0 +1,65 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Dry-run: estimate SOAP/REST calls, DB writes and duration of an ingestion run without calling the CBR'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--task', choices=('banks', 'reports', 'all'), default='all',
+                            help='Какую загрузку оценить: SOAP-формы банков, ставки (REST) или обе')
+        parser.add_argument('--mode', nargs='+', choices=('incremental', 'backfill'), default=['incremental'],
+                            help='Режим(ы) загрузки банков; несколько режимов выводятся для сравнения')
+        parser.add_argument('--banks', nargs='+', type=int, dest='reg_numbers',
+                            help='Ограничить план указанными банками (по умолчанию — все банки из БД)')
+        parser.add_argument('--forms', nargs='+', choices=('F101', 'F123', 'F810', 'F813'),
+                            help='Формы (по умолчанию — все)')
+        parser.add_argument('--top', type=int, default=10, help='Сколько самых дорогих банков вывести')
+        parser.add_argument('--json', action='store_true', help='Вывести план целиком в JSON')
+
+    def handle(self, *args, **options):
+        from core.helpers.planner_functions import _plan_bank_ingestion, _plan_reports_ingestion
+
+        plans = []
+        if options['task'] in ('banks', 'all'):
+            plans += [_plan_bank_ingestion(mode=mode, reg_numbers=options['reg_numbers'], forms=options['forms'],
+                                           top=options['top']) for mode in options['mode']]
+        if options['task'] in ('reports', 'all'):
+            plans.append(_plan_reports_ingestion())
+
+        if options['json']:
+            self.stdout.write(json.dumps(plans, ensure_ascii=False, indent=2))
+            return
+        for plan in plans:
+            self._write_plan(plan)
+
+    def _write_plan(self, plan: dict):
+        totals = plan['totals']
+        title = plan['task'] + (f' (mode={plan["mode"]}, банков: {plan["banks"]})' if 'mode' in plan else '')
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        self.stdout.write(f'  вызовов: {totals["calls"]}, из БД: {totals["cached"]}, записей: {totals["writes"]}, '
+                          f'время: ~{totals["hours"]} ч')
+
+        for form, step in plan.get('per_form', {}).items():
+            self.stdout.write(f'  {form}: банков {step["banks"]}, вызовов {step["calls"]}, из БД {step["cached"]}, '
+                              f'записей {step["writes"]}, ~{step["seconds"]} с ({step["rate_source"]})')
+        for rate_type, step in plan.get('per_rate_type', {}).items():
+            self.stdout.write(f'  {rate_type}: комбинаций {step["combinations"]}, подпериодов {step["periods"]}, '
+                              f'вызовов {step["calls"]}, из БД {step["cached"]}')
+        if plan.get('params_checks'):
+            checks = plan['params_checks']
+            self.stdout.write(f'  params_check: всего {checks["total"]}, вызовов {checks["calls"]}')
+
+        if plan.get('per_bank'):
+            self.stdout.write('  Самые дорогие банки:')
+            for bank in plan['per_bank']:
+                forms = ', '.join(f'{form}={step["calls"]}' for form, step in bank['forms'].items())
+                self.stdout.write(f'    {bank["reg_number"]} {bank["name"]}: вызовов {bank["calls"]} ({forms}), '
+                                  f'~{bank["seconds"]} с')
+        if plan.get('not_found'):
+            self.stdout.write(self.style.WARNING(f'  Банки не найдены в БД: {plan["not_found"]}'))
+        if plan.get('dormant_skipped'):
+            self.stdout.write(f'  Пропущено dormant-банков: {plan["dormant_skipped"]}')
+        for note in plan.get('assumptions', []):
+            self.stdout.write(self.style.WARNING(f'  Допущение: {note}'))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = ('Populate the F101 indicator value table (BankIndicatorValue), the F123 capital series '
+            '(BankCapitalValue) and the typed F810 rows (BankCapitalChangeRow) from stored responses')
+
+    def add_arguments(self, parser):
+        parser.add_argument('reg_numbers', nargs='*', type=int,
+                            help='Регистрационные номера банков (по умолчанию — все банки)')
+
+    def handle(self, *args, **options):
+        from core.helpers.indicator_values_functions import (
+            _rebuild_capital_change_rows, _rebuild_capital_values, _rebuild_indicator_values)
+
+        summary = _rebuild_indicator_values(options['reg_numbers'] or None)
+        self.stdout.write(self.style.SUCCESS(f'Таблица значений F101 заполнена: {summary}'))
+        summary = _rebuild_capital_values(options['reg_numbers'] or None)
+        self.stdout.write(self.style.SUCCESS(f'Ряд капитала F123 заполнен: {summary}'))
+        summary = _rebuild_capital_change_rows(options['reg_numbers'] or None)
+        self.stdout.write(self.style.SUCCESS(f'Строки F810 заполнены: {summary}'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Populate the interest-rate observation table (RateObservation) from stored CBR rate responses'
+
+    def handle(self, *args, **options):
+        from core.helpers.rate_values_functions import _rebuild_rate_observations
+
+        summary = _rebuild_rate_observations()
+        self.stdout.write(self.style.SUCCESS(f'Таблица наблюдений ставок заполнена: {summary}'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Rewrite all compressed JSON payloads with the current PAYLOAD_COMPRESSION mode and active dictionary'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', type=int, default=500, help='Размер пакета обновления')
+
+    def handle(self, *args, **options):
+        from core.helpers.payload_compression_functions import _recompress_payloads
+
+        for field, stats in _recompress_payloads(batch_size=options['batch']).items():
+            self.stdout.write(f'{field}: строк {stats["rows"]}, байт {stats["bytes_before"]} -> '
+                              f'{stats["bytes_after"]}')
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Retry failed CBR fetches recorded in the dead-letter store (FailedFetch)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None,
+                            help='Сколько единиц повторить (по умолчанию DEAD_LETTER_REDRIVE_BATCH)')
+        parser.add_argument('--budget', type=float, default=None,
+                            help='Бюджет времени в секундах (по умолчанию без ограничения)')
+        parser.add_argument('--async', action='store_true', dest='run_async',
+                            help='Поставить задачу в очередь Celery вместо выполнения в текущем процессе')
+
+    def handle(self, *args, **options):
+        if options['run_async']:
+            from core.tasks import redrive_failed_fetches
+
+            result = redrive_failed_fetches.apply_async(kwargs={'limit': options['limit'],
+                                                                'time_budget': options['budget']})
+            self.stdout.write(self.style.SUCCESS(f'Повтор сбойных обращений поставлен в очередь: task_id={result.id}'))
+            return
+
+        from core.helpers.redrive_functions import _redrive_failed_fetches
+
+        summary = _redrive_failed_fetches(limit=options['limit'], time_budget=options['budget'])
+        self.stdout.write(self.style.SUCCESS(f'Повтор завершён: {summary}'))
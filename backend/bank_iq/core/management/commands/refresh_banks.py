@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from banks.serializers import BankRefreshRequestSerializer
+
+
+class Command(BaseCommand):
+    help = 'Enqueue on-demand refresh of SOAP forms (F810/F123/F101/F813) for selected banks into the interactive queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('reg_numbers', nargs='+', type=int,
+                            help='Регистрационные номера банков')
+        parser.add_argument('--forms', nargs='+', choices=BankRefreshRequestSerializer.FORM_CHOICES,
+                            help='Формы для обновления (по умолчанию — все)')
+
+    def handle(self, *args, **options):
+        from core.helpers.jobs_functions import _enqueue_bank_refresh
+
+        job_id = _enqueue_bank_refresh(options['reg_numbers'], options['forms'])
+        self.stdout.write(self.style.SUCCESS(
+                f'Обновление поставлено в очередь: job_id={job_id}, банки={options["reg_numbers"]}'))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Rebuild stored CBR responses from the raw response archive in MinIO without calling the CBR'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sources', nargs='+',
+                            choices=('F101', 'F123', 'F810', 'F813', 'credit', 'deposit', 'registry'),
+                            help='Что разобрать заново (по умолчанию — все формы и ставки; справочник банков '
+                                 '— только явно)')
+        parser.add_argument('--banks', nargs='+', type=int, dest='reg_numbers',
+                            help='Ограничить разбор указанными банками')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Число потоков (по умолчанию RAW_ARCHIVE_REPARSE_WORKERS)')
+
+    def handle(self, *args, **options):
+        from core.helpers.reparse_functions import _reparse_raw_archive
+
+        summary = _reparse_raw_archive(sources=options['sources'], reg_numbers=options['reg_numbers'],
+                                       workers=options['workers'])
+        self.stdout.write(self.style.SUCCESS(f'Повторный разбор завершён: {summary}'))
+        if summary['missing']:
+            self.stdout.write(self.style.WARNING(f'Нет в архиве: {summary["missing"]} единиц (загружены до '
+                                                 f'включения архива) — их можно обновить только из ЦБ'))
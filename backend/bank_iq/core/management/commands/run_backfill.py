@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Enqueue historical backfill of SOAP forms (F810/F123/F101/F813) into the dedicated backfill queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('reg_numbers', nargs='*', type=int,
+                            help='Регистрационные номера банков (по умолчанию — все банки)')
+
+    def handle(self, *args, **options):
+        from core.tasks import backfill_bank_api_info
+
+        reg_numbers = options['reg_numbers'] or None
+        result = backfill_bank_api_info.apply_async(kwargs={'reg_numbers': reg_numbers})
+        self.stdout.write(self.style.SUCCESS(
+                f'Backfill поставлен в очередь: task_id={result.id}, '
+                f'банки={reg_numbers if reg_numbers else "все"}'))
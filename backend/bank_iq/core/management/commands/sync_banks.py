@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Synchronize the Bank registry with CBR EnumBIC_XML using bulk inserts/updates'
+
+    def handle(self, *args, **options):
+        from core.helpers.indicators_db_functions import _sync_bank_registry
+
+        result = _sync_bank_registry()
+        if 'message' in result:
+            raise CommandError(result['message'])
+
+        for key in ('inserted', 'updated', 'vanished', 'skipped'):
+            regs = result[key]
+            self.stdout.write(f'{key}: {len(regs)}' + (f' {regs}' if regs else ''))
+        self.stdout.write(self.style.SUCCESS('Справочник банков синхронизирован'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Train a shared zstd dictionary on stored JSON payloads and make it active for compression'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--samples', type=int, default=2000, help='Сколько payload взять для обучения')
+        parser.add_argument('--size', type=int, default=112_640, help='Размер словаря в байтах')
+
+    def handle(self, *args, **options):
+        from core.helpers.payload_compression_functions import _train_payload_dictionary
+
+        result = _train_payload_dictionary(samples=options['samples'], dict_size=options['size'])
+        self.stdout.write(self.style.SUCCESS(f'Словарь обучен и активирован: {result}'))
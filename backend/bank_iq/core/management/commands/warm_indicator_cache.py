@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Pre-materialize and pre-cache the most requested bank indicator keys'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=None,
+                            help='Сколько ключей прогревать (по умолчанию INDICATOR_CACHE_WARM_TOP_N)')
+        parser.add_argument('--budget', type=float, default=None,
+                            help='Бюджет времени в секундах (по умолчанию INDICATOR_CACHE_WARM_BUDGET_SECONDS)')
+        parser.add_argument('--async', action='store_true', dest='run_async',
+                            help='Поставить задачу в очередь Celery вместо выполнения в текущем процессе')
+
+    def handle(self, *args, **options):
+        if options['run_async']:
+            from core.tasks import warm_indicator_cache
+
+            result = warm_indicator_cache.apply_async(kwargs={'top_n': options['top'], 'time_budget': options['budget']})
+            self.stdout.write(self.style.SUCCESS(f'Прогрев кэша поставлен в очередь: task_id={result.id}'))
+            return
+
+        from core.helpers.indicator_cache_functions import _warm_indicator_cache
+
+        summary = _warm_indicator_cache(top_n=options['top'], time_budget=options['budget'])
+        self.stdout.write(self.style.SUCCESS(f'Прогрев кэша завершён: {summary}'))
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndicatorAccessStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='sha256 от канонического представления параметров запроса (ключ кэша)', max_length=64, unique=True)),
+                ('form_type', models.CharField(help_text='Код формы ("F101", "F123", "F810")', max_length=16)),
+                ('reg_number', models.IntegerField(help_text='Регистрационный номер банка в базе ЦБ')),
+                ('ind_code', models.CharField(blank=True, help_text='Код индикатора', null=True)),
+                ('date_from', models.DateTimeField(blank=True, help_text='Дата начала периода', null=True)),
+                ('date_to', models.DateTimeField(blank=True, help_text='Дата окончания периода', null=True)),
+                ('dt', models.DateTimeField(blank=True, help_text='Целевая дата', null=True)),
+                ('hits', models.PositiveBigIntegerField(default=0, help_text='Количество обращений к ключу')),
+                ('last_accessed_at', models.DateTimeField(db_index=True, help_text='Время последнего обращения')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ('-hits',),
+                'indexes': [models.Index(fields=['-hits', '-last_accessed_at'], name='core_indica_hits_47a309_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('banks', '0004_alter_bank_name_alter_bank_unique_together'),
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestionRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_name', models.CharField(help_text='Имя задачи Celery, запустившей загрузку', max_length=128)),
+                ('task_id', models.CharField(blank=True, db_index=True, help_text='ID задачи Celery', max_length=64, null=True)),
+                ('mode', models.CharField(help_text='Режим загрузки (incremental / backfill)', max_length=16)),
+                ('params', models.JSONField(blank=True, default=dict, help_text='Параметры запуска: reg_numbers, forms и т.п.')),
+                ('status', models.CharField(choices=[('running', 'Выполняется'), ('success', 'Успешно'), ('failed', 'Ошибка')], db_index=True, default='running', help_text='Статус запуска', max_length=16)),
+                ('started_at', models.DateTimeField(db_index=True, help_text='Время начала')),
+                ('finished_at', models.DateTimeField(blank=True, help_text='Время окончания', null=True)),
+                ('wall_seconds', models.FloatField(blank=True, help_text='Длительность запуска, сек', null=True)),
+                ('banks_total', models.IntegerField(default=0, help_text='Банков к обработке')),
+                ('banks_processed', models.IntegerField(default=0, help_text='Банков обработано')),
+                ('soap_calls', models.JSONField(blank=True, default=dict, help_text='Обращения к SOAP по методам (итого)')),
+                ('bytes_received', models.BigIntegerField(default=0, help_text='Получено байт от ЦБ (итого)')),
+                ('cache_hits', models.IntegerField(default=0, help_text='Обращений, обслуженных без запроса к ЦБ (итого)')),
+                ('changed', models.IntegerField(default=0, help_text='Изменённых/новых записей (итого)')),
+                ('unchanged', models.IntegerField(default=0, help_text='Записей без изменений (итого)')),
+                ('summary', models.JSONField(blank=True, default=dict, help_text='Сводка, возвращённая задачей')),
+                ('error', models.TextField(blank=True, default='', help_text='Текст ошибки, если запуск упал')),
+            ],
+            options={
+                'ordering': ('-started_at',),
+            },
+        ),
+        migrations.CreateModel(
+            name='IngestionRunItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reg_number', models.IntegerField(db_index=True, help_text='Регистрационный номер банка в базе ЦБ')),
+                ('form_type', models.CharField(db_index=True, help_text='Код формы ("F101", "F123", "F810")', max_length=16)),
+                ('status', models.CharField(choices=[('running', 'Выполняется'), ('success', 'Успешно'), ('failed', 'Ошибка')], default='success', help_text='Статус шага', max_length=16)),
+                ('started_at', models.DateTimeField(help_text='Время начала шага')),
+                ('wall_seconds', models.FloatField(help_text='Длительность шага, сек')),
+                ('soap_calls', models.JSONField(blank=True, default=dict, help_text='Обращения к SOAP по методам')),
+                ('bytes_received', models.BigIntegerField(default=0, help_text='Получено байт от ЦБ')),
+                ('cache_hits', models.IntegerField(default=0, help_text='Обращений, обслуженных без запроса к ЦБ (уже сохранённые даты, повторные диапазоны)')),
+                ('changed', models.IntegerField(default=0, help_text='Изменённых/новых записей')),
+                ('unchanged', models.IntegerField(default=0, help_text='Записей без изменений')),
+                ('errors', models.IntegerField(default=0, help_text='Ошибок обращения к ЦБ')),
+                ('error', models.TextField(blank=True, default='', help_text='Текст ошибки, если шаг упал')),
+                ('bank', models.ForeignKey(help_text='FK -> Bank', null=True, on_delete=django.db.models.deletion.SET_NULL, to='banks.bank')),
+                ('run', models.ForeignKey(help_text='FK -> IngestionRun', on_delete=django.db.models.deletion.CASCADE, related_name='items', to='core.ingestionrun')),
+            ],
+            options={
+                'ordering': ('run', 'started_at'),
+                'indexes': [models.Index(fields=['form_type', '-wall_seconds'], name='core_ingest_form_ty_2629e7_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_ingestionrun_ingestionrunitem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestionBacklogItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reg_number', models.IntegerField(db_index=True, help_text='Регистрационный номер банка в базе ЦБ')),
+                ('form_type', models.CharField(help_text='Код формы ("F101", "F123", "F810")', max_length=16)),
+                ('mode', models.CharField(help_text='Режим загрузки (incremental / backfill)', max_length=16)),
+                ('deferrals', models.IntegerField(default=1, help_text='Сколько раз шаг откладывался из-за бюджета времени')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('run', models.ForeignKey(blank=True, help_text='Запуск, который последним отложил шаг', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deferred_items', to='core.ingestionrun')),
+            ],
+            options={
+                'ordering': ('created_at', 'id'),
+                'unique_together': {('reg_number', 'form_type', 'mode')},
+            },
+        ),
+    ]
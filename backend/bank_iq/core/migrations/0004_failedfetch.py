@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_ingestionbacklogitem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FailedFetch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='sha256 от (source, stage, reg_number, params)', max_length=64, unique=True)),
+                ('source', models.CharField(db_index=True, help_text='Источник: форма ("F101", "F123", "F810") или тип ставок ("credit", "deposit")', max_length=16)),
+                ('stage', models.CharField(help_text='Единица работы: dates — список дат, date — отчётная дата, range — диапазон индикатора F101, period — подпериод ставок', max_length=16)),
+                ('reg_number', models.IntegerField(blank=True, db_index=True, help_text='Регистрационный номер банка в базе ЦБ', null=True)),
+                ('params', models.JSONField(blank=True, default=dict, help_text='Параметры запроса (dt, ind_code, годы и т.п.)')),
+                ('error_class', models.CharField(db_index=True, help_text='Класс ошибки: external / internal / exception / other', max_length=32)),
+                ('error', models.TextField(blank=True, default='', help_text='Текст последней ошибки')),
+                ('status', models.CharField(choices=[('pending', 'Ожидает повтора'), ('resolved', 'Загружено повторно'), ('abandoned', 'Исчерпаны попытки')], db_index=True, default='pending', help_text='Статус', max_length=16)),
+                ('attempts', models.IntegerField(default=0, help_text='Число повторных попыток')),
+                ('next_attempt_at', models.DateTimeField(db_index=True, help_text='Не раньше какого момента повторять')),
+                ('last_attempt_at', models.DateTimeField(blank=True, help_text='Время последней повторной попытки', null=True)),
+                ('resolved_at', models.DateTimeField(blank=True, help_text='Когда данные удалось загрузить', null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ('-created_at',),
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='core_failed_status_03bd81_idx')],
+            },
+        ),
+    ]
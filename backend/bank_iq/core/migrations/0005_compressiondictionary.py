@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_failedfetch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompressionDictionary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dict_id', models.BigIntegerField(help_text='Идентификатор словаря zstd (записывается в каждое значение)', unique=True)),
+                ('data', models.BinaryField(help_text='Содержимое словаря')),
+                ('samples', models.IntegerField(help_text='Сколько payload использовано для обучения')),
+                ('is_active', models.BooleanField(db_index=True, default=False, help_text='Используется для сжатия новых значений (активен один словарь)')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ('-created_at',),
+            },
+        ),
+    ]
@@ -0,0 +1,159 @@
+from django.db import models
+
+
+class IndicatorAccessStat(models.Model):
+    key = models.CharField(max_length=64, unique=True,
+                           help_text='sha256 от канонического представления параметров запроса (ключ кэша)')
+    form_type = models.CharField(max_length=16, help_text='Код формы ("F101", "F123", "F810")')
+    reg_number = models.IntegerField(help_text='Регистрационный номер банка в базе ЦБ')
+    ind_code = models.CharField(null=True, blank=True, help_text='Код индикатора')
+    date_from = models.DateTimeField(null=True, blank=True, help_text='Дата начала периода')
+    date_to = models.DateTimeField(null=True, blank=True, help_text='Дата окончания периода')
+    dt = models.DateTimeField(null=True, blank=True, help_text='Целевая дата')
+
+    hits = models.PositiveBigIntegerField(default=0, help_text='Количество обращений к ключу')
+    last_accessed_at = models.DateTimeField(db_index=True, help_text='Время последнего обращения')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'IndicatorAccessStat:{self.form_type} ({self.reg_number}) hits={self.hits}'
+
+    class Meta:
+        ordering = ('-hits',)
+        indexes = [models.Index(fields=['-hits', '-last_accessed_at'])]
+
+
+class IngestionRun(models.Model):
+    class Status(models.TextChoices):
+        RUNNING = 'running', 'Выполняется'
+        SUCCESS = 'success', 'Успешно'
+        FAILED = 'failed', 'Ошибка'
+
+    task_name = models.CharField(max_length=128, help_text='Имя задачи Celery, запустившей загрузку')
+    task_id = models.CharField(max_length=64, null=True, blank=True, db_index=True, help_text='ID задачи Celery')
+    mode = models.CharField(max_length=16, help_text='Режим загрузки (incremental / backfill)')
+    params = models.JSONField(default=dict, blank=True,
+                              help_text='Параметры запуска: reg_numbers, forms и т.п.')
+    status = models.CharField(max_length=16, choices=Status, default=Status.RUNNING, db_index=True,
+                              help_text='Статус запуска')
+
+    started_at = models.DateTimeField(db_index=True, help_text='Время начала')
+    finished_at = models.DateTimeField(null=True, blank=True, help_text='Время окончания')
+    wall_seconds = models.FloatField(null=True, blank=True, help_text='Длительность запуска, сек')
+
+    banks_total = models.IntegerField(default=0, help_text='Банков к обработке')
+    banks_processed = models.IntegerField(default=0, help_text='Банков обработано')
+    soap_calls = models.JSONField(default=dict, blank=True, help_text='Обращения к SOAP по методам (итого)')
+    bytes_received = models.BigIntegerField(default=0, help_text='Получено байт от ЦБ (итого)')
+    cache_hits = models.IntegerField(default=0, help_text='Обращений, обслуженных без запроса к ЦБ (итого)')
+    changed = models.IntegerField(default=0, help_text='Изменённых/новых записей (итого)')
+    unchanged = models.IntegerField(default=0, help_text='Записей без изменений (итого)')
+    summary = models.JSONField(default=dict, blank=True, help_text='Сводка, возвращённая задачей')
+    error = models.TextField(blank=True, default='', help_text='Текст ошибки, если запуск упал')
+
+    def __str__(self):
+        return f'IngestionRun:{self.mode} {self.started_at:%Y-%m-%d %H:%M} ({self.status})'
+
+    class Meta:
+        ordering = ('-started_at',)
+
+
+class IngestionRunItem(models.Model):
+    run = models.ForeignKey(IngestionRun, on_delete=models.CASCADE, related_name='items', help_text='FK -> IngestionRun')
+    bank = models.ForeignKey('banks.Bank', on_delete=models.SET_NULL, null=True, help_text='FK -> Bank')
+    reg_number = models.IntegerField(db_index=True, help_text='Регистрационный номер банка в базе ЦБ')
+    form_type = models.CharField(max_length=16, db_index=True, help_text='Код формы ("F101", "F123", "F810")')
+    status = models.CharField(max_length=16, choices=IngestionRun.Status, default=IngestionRun.Status.SUCCESS,
+                              help_text='Статус шага')
+
+    started_at = models.DateTimeField(help_text='Время начала шага')
+    wall_seconds = models.FloatField(help_text='Длительность шага, сек')
+    soap_calls = models.JSONField(default=dict, blank=True, help_text='Обращения к SOAP по методам')
+    bytes_received = models.BigIntegerField(default=0, help_text='Получено байт от ЦБ')
+    cache_hits = models.IntegerField(default=0,
+                                     help_text='Обращений, обслуженных без запроса к ЦБ (уже сохранённые даты, '
+                                               'повторные диапазоны)')
+    changed = models.IntegerField(default=0, help_text='Изменённых/новых записей')
+    unchanged = models.IntegerField(default=0, help_text='Записей без изменений')
+    errors = models.IntegerField(default=0, help_text='Ошибок обращения к ЦБ')
+    error = models.TextField(blank=True, default='', help_text='Текст ошибки, если шаг упал')
+
+    def __str__(self):
+        return f'IngestionRunItem:{self.form_type} ({self.reg_number}) {self.wall_seconds:.1f}s'
+
+    class Meta:
+        ordering = ('run', 'started_at')
+        indexes = [models.Index(fields=['form_type', '-wall_seconds'])]
+
+
+class IngestionBacklogItem(models.Model):
+    reg_number = models.IntegerField(db_index=True, help_text='Регистрационный номер банка в базе ЦБ')
+    form_type = models.CharField(max_length=16, help_text='Код формы ("F101", "F123", "F810")')
+    mode = models.CharField(max_length=16, help_text='Режим загрузки (incremental / backfill)')
+    run = models.ForeignKey(IngestionRun, on_delete=models.SET_NULL, null=True, blank=True,
+                            related_name='deferred_items', help_text='Запуск, который последним отложил шаг')
+    deferrals = models.IntegerField(default=1, help_text='Сколько раз шаг откладывался из-за бюджета времени')
+
+    updated_at = models.DateTimeField(auto_now=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'IngestionBacklogItem:{self.form_type} ({self.reg_number}) x{self.deferrals}'
+
+    class Meta:
+        ordering = ('created_at', 'id')
+        unique_together = (('reg_number', 'form_type', 'mode'),)
+
+
+class FailedFetch(models.Model):
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Ожидает повтора'
+        RESOLVED = 'resolved', 'Загружено повторно'
+        ABANDONED = 'abandoned', 'Исчерпаны попытки'
+
+    key = models.CharField(max_length=64, unique=True, help_text='sha256 от (source, stage, reg_number, params)')
+    source = models.CharField(max_length=16, db_index=True,
+                              help_text='Источник: форма ("F101", "F123", "F810") или тип ставок ("credit", "deposit")')
+    stage = models.CharField(max_length=16,
+                             help_text='Единица работы: dates — список дат, date — отчётная дата, '
+                                       'range — диапазон индикатора F101, period — подпериод ставок')
+    reg_number = models.IntegerField(null=True, blank=True, db_index=True,
+                                     help_text='Регистрационный номер банка в базе ЦБ')
+    params = models.JSONField(default=dict, blank=True, help_text='Параметры запроса (dt, ind_code, годы и т.п.)')
+    error_class = models.CharField(max_length=32, db_index=True,
+                                   help_text='Класс ошибки: external / internal / exception / other')
+    error = models.TextField(blank=True, default='', help_text='Текст последней ошибки')
+    status = models.CharField(max_length=16, choices=Status, default=Status.PENDING, db_index=True,
+                              help_text='Статус')
+    attempts = models.IntegerField(default=0, help_text='Число повторных попыток')
+    next_attempt_at = models.DateTimeField(db_index=True, help_text='Не раньше какого момента повторять')
+    last_attempt_at = models.DateTimeField(null=True, blank=True, help_text='Время последней повторной попытки')
+    resolved_at = models.DateTimeField(null=True, blank=True, help_text='Когда данные удалось загрузить')
+
+    updated_at = models.DateTimeField(auto_now=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'FailedFetch:{self.source}/{self.stage} ({self.reg_number}) {self.status}'
+
+    class Meta:
+        ordering = ('-created_at',)
+        indexes = [models.Index(fields=['status', 'next_attempt_at'])]
+
+
+class CompressionDictionary(models.Model):
+    """Общий словарь zstd для CompressedJSONField (обучается командой train_payload_dictionary)."""
+    dict_id = models.BigIntegerField(unique=True,
+                                     help_text='Идентификатор словаря zstd (записывается в каждое значение)')
+    data = models.BinaryField(help_text='Содержимое словаря')
+    samples = models.IntegerField(help_text='Сколько payload использовано для обучения')
+    is_active = models.BooleanField(default=False, db_index=True,
+                                    help_text='Используется для сжатия новых значений (активен один словарь)')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'CompressionDictionary:{self.dict_id}{" (active)" if self.is_active else ""}'
+
+    class Meta:
+        ordering = ('-created_at',)
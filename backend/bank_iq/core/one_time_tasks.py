@@ -19,10 +19,18 @@ def form_f810():
     }
 
 
+def form_f813():
+    return {
+        'title': 'F813',
+        'description': 'Форма 813 — сведения об обязательных нормативах (по разделам par 1–4)'
+    }
+
+
 REGISTRY = [
     form_f101,
     form_f123,
     form_f810,
+    form_f813,
 ]
 
 
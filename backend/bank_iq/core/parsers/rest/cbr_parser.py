@@ -1,9 +1,10 @@
 import logging
 from types import SimpleNamespace
 
-import requests
 from requests.exceptions import RequestException
 
+from core.utils.raw_archive import ArchivingSession
+
 
 logger = logging.getLogger(__name__)
 
@@ -37,7 +38,7 @@ class CbrAPIParser:
                     f'publication_id={publication_id}, dataset_id={dataset_id}, measure_id={measure_id}')
         res: list[dict] = []
         try:
-            session = requests.Session()
+            session = ArchivingSession()
 
             if publication_id is None:
                 resp = session.get(f"{cls.BASE_URL}/publications", timeout=cls.REQUEST_TIMEOUT)
@@ -102,7 +103,7 @@ class CbrAPIParser:
                     f'publication_id={publication_id}, dataset_id={dataset_id}, '
                     f'measure_id={measure_id}, from_year={from_year}, to_year={to_year}')
         try:
-            session = requests.Session()
+            session = ArchivingSession()
 
             years_params = {'measureId': measure_id, 'datasetId': dataset_id}
             resp_years = session.get(f"{cls.BASE_URL}/years", params=years_params, timeout=cls.REQUEST_TIMEOUT)
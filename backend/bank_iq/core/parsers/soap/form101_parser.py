@@ -7,7 +7,8 @@ import zeep
 from requests import RequestException
 from zeep import Settings
 from zeep.helpers import serialize_object
-from zeep.transports import Transport
+
+from core.utils.ingestion_meter import MeteredTransport
 
 
 logger = logging.getLogger(__name__)
@@ -24,7 +25,7 @@ class Form101Parser:
             return
         session = requests.Session()
         session.verify = True
-        transport = Transport(session=session, timeout=cls.REQUEST_TIMEOUT)
+        transport = MeteredTransport(session=session, timeout=cls.REQUEST_TIMEOUT)
         settings = Settings(strict=False)
         cls._client = zeep.Client(wsdl=cls.WSDL_URL, transport=transport, settings=settings)
 
@@ -119,8 +120,8 @@ class Form101Parser:
                                 date=data.get('dt'),
                                 pln=data.get('pln', ''),
                                 ap=int(data.get('ap', 0)),
-                                vitg=float(data.get('vitg', 0)),
-                                iitg=float(data.get('iitg', 0))
+                                vitg=None if data.get('vitg') is None else float(data['vitg']),
+                                iitg=None if data.get('iitg') is None else float(data['iitg'])
                         ))
                 return result
             return None
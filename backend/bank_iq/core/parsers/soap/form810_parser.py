@@ -10,9 +10,9 @@ from lxml.etree import iselement
 from lxml.html import tostring
 from requests.exceptions import RequestException
 from zeep import Settings
-from zeep.transports import Transport
 
 from core.parsers.soap.all_banks_parser import CbrAllBanksParser
+from core.utils.ingestion_meter import MeteredTransport
 
 
 logger = logging.getLogger(__name__)
@@ -29,7 +29,7 @@ class Form810Parser:
             return
         session = requests.Session()
         session.verify = True
-        transport = Transport(session=session, timeout=cls.REQUEST_TIMEOUT)
+        transport = MeteredTransport(session=session, timeout=cls.REQUEST_TIMEOUT)
         settings = Settings(strict=False)
         cls._client = zeep.Client(wsdl=cls.WSDL_URL, transport=transport, settings=settings)
 
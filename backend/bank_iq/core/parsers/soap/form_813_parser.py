@@ -10,9 +10,9 @@ from lxml.etree import iselement
 from lxml.html import tostring
 from requests.exceptions import RequestException
 from zeep import Settings
-from zeep.transports import Transport
 
 from core.parsers.soap.all_banks_parser import CbrAllBanksParser
+from core.utils.ingestion_meter import MeteredTransport
 
 
 logger = logging.getLogger(__name__)
@@ -29,7 +29,7 @@ class CbrF813MParser:
             return
         session = requests.Session()
         session.verify = True
-        transport = Transport(session=session, timeout=cls.REQUEST_TIMEOUT)
+        transport = MeteredTransport(session=session, timeout=cls.REQUEST_TIMEOUT)
         settings = Settings(strict=False)
         cls._client = zeep.Client(wsdl=cls.WSDL_URL, transport=transport, settings=settings)
 
@@ -147,7 +147,7 @@ if __name__ == '__main__':
         print(name, credorg_number)
         for datet in [datetime(2019, 1, 1), datetime(2019, 1, 31)]:
             for pr in [1, 2, 3, 4]:
-                parsed = CbrF813MParser.parse(credorg_number, datet, 1)
+                parsed = CbrF813MParser.parse(credorg_number, datet, pr)
                 print("on_date:", parsed.get('on_date'), "par:", pr, "rows count:", len(parsed.get('rows', [])))
                 if parsed.get('rows'):
                     for row in parsed['rows']:
@@ -0,0 +1,73 @@
+from collections import Counter
+
+from rest_framework import serializers
+
+from .models import FailedFetch, IngestionRun, IngestionRunItem
+
+
+class IngestionRunItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = IngestionRunItem
+        fields = ('id', 'reg_number', 'form_type', 'status', 'started_at', 'wall_seconds', 'soap_calls',
+                  'bytes_received', 'cache_hits', 'changed', 'unchanged', 'errors', 'error')
+
+
+class IngestionRunSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = IngestionRun
+        fields = ('id', 'task_name', 'task_id', 'mode', 'params', 'status', 'started_at', 'finished_at',
+                  'wall_seconds', 'banks_total', 'banks_processed', 'soap_calls', 'bytes_received', 'cache_hits',
+                  'changed', 'unchanged', 'error')
+
+
+class IngestionRunDetailSerializer(IngestionRunSerializer):
+    phases = serializers.SerializerMethodField(
+            help_text='Итоги по формам: суммарное время, число банков, обращения к SOAP, байты, изменения.')
+    slowest = serializers.SerializerMethodField(help_text='Самые долгие шаги (банк + форма).')
+
+    class Meta(IngestionRunSerializer.Meta):
+        fields = IngestionRunSerializer.Meta.fields + ('phases', 'slowest')
+
+    def get_phases(self, obj: IngestionRun) -> dict:
+        phases: dict[str, dict] = {}
+        for item in obj.items.all():
+            phase = phases.setdefault(item.form_type, {
+                'wall_seconds': 0.0, 'banks': 0, 'soap_calls': Counter(), 'bytes_received': 0,
+                'cache_hits': 0, 'changed': 0, 'unchanged': 0, 'errors': 0,
+            })
+            phase['wall_seconds'] += item.wall_seconds
+            phase['banks'] += 1
+            phase['soap_calls'].update(item.soap_calls or {})
+            for field in ('bytes_received', 'cache_hits', 'changed', 'unchanged', 'errors'):
+                phase[field] += getattr(item, field)
+        for phase in phases.values():
+            phase['soap_calls'] = dict(phase['soap_calls'])
+        return phases
+
+    def get_slowest(self, obj: IngestionRun) -> list[dict]:
+        limit = self.context.get('slowest_limit', 10)
+        items = sorted(obj.items.all(), key=lambda i: i.wall_seconds, reverse=True)[:limit]
+        return IngestionRunItemSerializer(items, many=True).data
+
+
+class IngestionPlanQuerySerializer(serializers.Serializer):
+    TASK_CHOICES = ('banks', 'reports')
+    MODE_CHOICES = ('incremental', 'backfill')
+    FORM_CHOICES = ('F101', 'F123', 'F810', 'F813')
+
+    task = serializers.ChoiceField(choices=TASK_CHOICES, default='banks',
+                                   help_text='banks — SOAP-формы банков, reports — ставки (REST).')
+    mode = serializers.ChoiceField(choices=MODE_CHOICES, default='incremental', help_text='Режим загрузки банков.')
+    reg_numbers = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False,
+                                        help_text='Ограничить план указанными банками.')
+    forms = serializers.ListField(child=serializers.ChoiceField(choices=FORM_CHOICES), required=False,
+                                  allow_empty=False, help_text='Формы (по умолчанию — все).')
+    top = serializers.IntegerField(min_value=0, max_value=500, default=20,
+                                   help_text='Сколько самых дорогих банков вернуть.')
+
+
+class FailedFetchSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = FailedFetch
+        fields = ('id', 'source', 'stage', 'reg_number', 'params', 'error_class', 'error', 'status', 'attempts',
+                  'next_attempt_at', 'last_attempt_at', 'resolved_at', 'created_at')
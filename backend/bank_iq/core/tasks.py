@@ -1,681 +1,221 @@
 import logging
-from concurrent.futures import as_completed, ThreadPoolExecutor
-from datetime import datetime
 
 from celery import shared_task
-from django.db import transaction
+from django.conf import settings
 from django.utils import timezone
-from django.utils.dateparse import parse_datetime
-
-from banks.models import Bank
-from banks.serializers import BankInfoSerializer
-from core.helpers.indicators_db_functions import (
-    _update_or_create_bank_indicator_data_response, _update_or_create_datetimes_response,
-    _update_or_create_indicators_response)
-from core.helpers.reports_db_functions import _create_or_get_request_atomic
-from core.one_time_tasks import form_f101, form_f123, form_f810
+
+from core.helpers.cadence_functions import _due_forms, REPORTS
+from core.helpers.compaction_functions import _compact_indicator_ranges
+from core.helpers.deadletter_functions import _record_failed_fetch
+from core.helpers.indicator_cache_functions import _flush_indicator_access, _warm_indicator_cache
+from core.helpers.indicators_db_functions import _collect_orphan_payloads, _sync_bank_registry
+from core.helpers.ingestion_functions import _run_bank_ingestion, ALL_BANK_FORMS, BACKFILL, INCREMENTAL
+from core.helpers.ledger_functions import _exclusive_task
+from core.helpers.partition_functions import _maintain_partitions
+from core.helpers.reports_db_functions import (
+    _create_or_get_request_atomic, _create_response_if_absent, _generate_year_pairs, CREDIT_PUBLICATIONS,
+    DEPOSIT_PUBLICATIONS, PUBLICATION_MEASURES)
+from core.helpers.redrive_functions import _redrive_failed_fetches
+from core.helpers.reports_ingestion_functions import _ingest_rates_period
 from core.parsers.rest.cbr_parser import CbrAPIParser
-from core.parsers.soap import all_banks_parser
-from core.parsers.soap.form101_parser import Form101Parser
-from core.parsers.soap.form123_parser import Form123Parser
-from core.parsers.soap.form810_parser import Form810Parser
-from indicators.models import (FormType)
 from reports.models import CbrApiDataRequest, CbrApiDataResponse
-from reports.serializers import CheckResponseSerializer, CheckYearsResponseSerializer, ResponseSerializer
+from reports.serializers import CheckResponseSerializer, CheckYearsResponseSerializer
 
 
 logger = logging.getLogger(__name__)
 
 
+def _bank_ingestion_locks(params: dict) -> list[str]:
+    """Блокировки загрузки по формам: запуски разных форм идут параллельно, запуск всех форм — ни с одной из них."""
+    return [f'bank_ingestion:{form}' for form in params.get('forms') or ALL_BANK_FORMS]
+
+
 @shared_task(bind=True, max_retries=3, default_retry_delay=60)
-def update_all_bank_api_info(self):
+@_exclusive_task(_bank_ingestion_locks)
+def update_all_bank_api_info(self, mode: str = INCREMENTAL, forms: list[str] | None = None, force: bool = False):
     """
-    Месячная задача:
-    - обновляем денежно-кредитную статистику из REST парсера или
+    Загрузка SOAP-форм (очередь высокого приоритета settings.INGESTION_PRIORITY_QUEUE). beat ежедневно ставит
+    отдельный запуск на каждую форму, со сдвигом по времени:
+    - блокировка берётся по каждой форме (bank_ingestion:<форма>): запуски разных форм не ждут друг друга,
+      а повторный запуск той же формы возвращает id уже выполняющейся задачи; запуск без forms берёт
+      блокировки всех форм
+    - в режиме incremental пропускает формы, для которых после последней полной загрузки ещё не вышла
+      новая публикация (settings.INGESTION_FORM_CADENCE); force=True — загрузить без проверки
     - берём список банков и для каждого запускаем парсеры SOAP
+    - в режиме incremental обрабатываем только новые отчётные даты
     - сравниваем результаты с БД и обновляем только если поменялось
-    :return: None
+    - сначала догружаем шаги, отложенные прошлыми запусками; укладываемся в окно
+      settings.INGESTION_WINDOW_SECONDS, а не успевшее — откладываем в очередь (drain_ingestion_backlog)
+    - после загрузки прогреваем кэш самых запрашиваемых данных
+    :param forms: формы для загрузки (по умолчанию все)
+    :return: dict — краткая сводка по запуску
     """
+    forms = list(forms or ALL_BANK_FORMS)
+    if mode == INCREMENTAL and not force:
+        forms, schedule = _due_forms(forms)
+        if not forms:
+            return {'skipped': True, 'reason': 'not_due', 'schedule': schedule}
+    result = _run_bank_ingestion(mode=mode, forms=forms, task_name=self.name, task_id=self.request.id,
+                                 time_budget=settings.INGESTION_WINDOW_SECONDS, use_backlog=True)
+    warm_indicator_cache.apply_async()
+    return result
 
-    started = timezone.now()
-    logger.info(f'[!] START update_all_bank_api_info at {started} [!]')
-
-    banks: dict = all_banks_parser.CbrAllBanksParser.parse()
-    if 'message' in banks or not banks.get('banks'):
-        logger.warning(f'[!!] RETURN EMPTY banks... STOP parsing. Message: {str(banks)} [!!]')
-        return
-    logger.info(f'[!!!] GOT {len(banks.get('banks', []))} banks [!!!]')
-
-    db_banks = Bank.objects.all()
-    banks_map = {b.reg_number: b for b in db_banks}
-    database_bank_reg_numbers = set(banks_map.keys())
-
-    for bank_data in banks.get('banks', []):
-        reg = bank_data["reg_number"]
-        logger.info(f'PARSING data for bank: name={bank_data["name"]}, reg_number={reg}')
-        if reg not in database_bank_reg_numbers:
-            serializer = BankInfoSerializer(data=bank_data)
-            if serializer.is_valid():
-                validated = serializer.validated_data
-                with transaction.atomic():
-                    bank_obj, created = Bank.objects.get_or_create(
-                            reg_number=validated['reg_number'],
-                            defaults={
-                                'bic': validated['bic'],
-                                'name': validated['name'],
-                                'internal_code': validated['internal_code'],
-                                'registration_date': validated['registration_date'],
-                                'region_code': validated['region_code'],
-                                'tax_id': validated['tax_id'],
-                            }
-                    )
-                    if created:
-                        banks_map[bank_obj.reg_number] = bank_obj
-                        database_bank_reg_numbers.add(reg)
-                        logger.info(f'CREATED new Bank {bank_obj}')
-            else:
-                logger.warning(f'Bank serializer invalid for bank: name={bank_data["name"]},'
-                               f' reg {reg}: {serializer.errors}')
-                continue
-        else:
-            bank_obj = banks_map[reg]
-
-        logger.info(f"{'=' * 10} START PARSE 101, 123, 810 FORMS {'=' * 10}")
-
-        def generate_f810_dates(start_year: int = 2000, end_year: int | None = None) -> list[str]:
-            """
-            Генерирует ISO-строки для дат 1 января и 1 апреля каждого года в диапазоне.
-            Формат: "YYYY-MM-DDT00:00:00Z" (timezone-aware строка с Z).
-            По умолчанию: с 2000 по текущий год (в часовом поясе Django).
-            """
-            if end_year is None:
-                # берем текущий год в том часовом поясе, который использует Django
-                end_year = timezone.now().year
-
-            dates: list[str] = []
-            for y in range(start_year, end_year + 1):
-                dates.append(f"{y:04d}-01-01T00:00:00Z")
-                dates.append(f"{y:04d}-04-01T00:00:00Z")
-            return dates
-
-        form810_obj = FormType.objects.get(title=form_f810()['title'])
-        f810_dates_iso = generate_f810_dates()
-
-        for dt in f810_dates_iso:
-            parsed_dt = parse_datetime(dt)
-            if parsed_dt is None:
-                logger.warning("Can't parse datetime %s for bank %s", parsed_dt, bank_obj.reg_number)
-                continue
-            if timezone.is_aware(parsed_dt):
-                parsed_dt = parsed_dt.replace(tzinfo=None)
-
-            bank_indicator_data = Form810Parser.parse(reg, parsed_dt)
-            if 'message' in bank_indicator_data or not bank_indicator_data:
-                logger.warning(
-                        f'[!!] RETURN EMPTY bank indicator data for form810 and bank {bank_data["name"]}. '
-                        f'STOP update bank indicator data. Message: {str(bank_indicator_data)} [!!]')
-            else:
-                created_or_updated, added, removed, canonical_obj = _update_or_create_bank_indicator_data_response(
-                        bank=bank_obj,
-                        form_type=form810_obj,
-                        bank_indicator_obj=bank_indicator_data,
-                        params={'reg_number': reg, 'dt': parsed_dt}
-                )
-                logger.debug(
-                        "Saved F810 for bank %s dt=%s -> upd=%s added=%d removed=%d",
-                        bank_data['name'], parsed_dt.isoformat(), created_or_updated,
-                        len(added) if added is not None else 0,
-                        len(removed) if removed is not None else 0
-                )
-
-        form123_obj = FormType.objects.get(title=form_f123()['title'])
-        datetimes_data = Form123Parser.get_dates_for_f123(reg)
-        if 'message' in datetimes_data or not datetimes_data.get('datetimes'):
-            logger.warning(f'[!!] RETURN EMPTY datetimes for form123 and bank {bank_data["name"]}. '
-                           f'STOP update datetimes. Message: {str(datetimes_data)} [!!]')
-        else:
-            created_or_updated, added, removed, datetimes_data = _update_or_create_datetimes_response(
-                    bank=bank_obj, form_type=form123_obj, datetimes_obj=datetimes_data)
-            if not datetimes_data:
-                continue
-            logger.debug(f'Updated datetimes for form123 and bank {bank_data["name"]} = {created_or_updated}'
-                        f' Added = {added}, removed = {removed}')
-
-            for dt in datetimes_data.get('datetimes', []):
-                parsed_dt = parse_datetime(dt)
-                if parsed_dt is None:
-                    logger.warning("Can't parse datetime %s for bank %s", parsed_dt, bank_obj.reg_number)
-                    continue
-                if timezone.is_aware(parsed_dt):
-                    parsed_dt = parsed_dt.replace(tzinfo=None)
-                indicators_data = Form123Parser.get_form123_indicators_from_data123(reg, parsed_dt)
-                if 'message' in indicators_data or not indicators_data.get('indicators'):
-                    logger.warning(f'[!!] RETURN EMPTY indicators for form123 and bank {bank_data["name"]}. '
-                                   f'STOP update indicators. Message: {str(indicators_data)} [!!]')
-                else:
-                    created_or_updated, added, removed, indicators_data = _update_or_create_indicators_response(
-                            bank=bank_obj, form_type=form123_obj, indicators_obj=indicators_data, params={
-                                'reg_number': reg, 'dt': parsed_dt})
-                    if not indicators_data:
-                        continue
-                    logger.debug(f'Updated indicators for form123 and bank {bank_data["name"]} = {created_or_updated}'
-                                f' Added = {added}, removed = {removed}')
-
-                    bank_indicator_data = Form123Parser.get_data123_form_full(reg, dt)
-                    if 'message' in bank_indicator_data or not bank_indicator_data:
-                        logger.warning(
-                                f'[!!] RETURN EMPTY bank indicator data for form123 and bank {bank_data["name"]}. '
-                                f'STOP update bank indicator data. Message: {str(bank_indicator_data)} [!!]')
-                    else:
-                        created_or_updated, added, removed, bank_indicator_data = (
-                            _update_or_create_bank_indicator_data_response(bank=bank_obj, form_type=form123_obj,
-                                                                           bank_indicator_obj=bank_indicator_data,
-                                                                           params={'reg_number': reg, 'dt': parsed_dt}))
-                        if not bank_indicator_data:
-                            continue
-                        logger.debug(
-                                f'Updated bank indicator data for form123 and bank {bank_data["name"]} = {created_or_updated}'
-                                f' Added = {added}, removed = {removed}')
-
-        form101_obj = FormType.objects.get(title=form_f101()['title'])
-        datetimes_data = Form101Parser.get_dates_for_f101(reg)
-        if 'message' in datetimes_data or not datetimes_data.get('datetimes'):
-            logger.warning(f'[!!] RETURN EMPTY datetimes for form101 and bank {bank_data["name"]}. '
-                           f'STOP update datetimes. Message: {str(datetimes_data)} [!!]')
-        else:
-            created_or_updated, added, removed, datetimes_data = _update_or_create_datetimes_response(
-                    bank=bank_obj, form_type=form101_obj, datetimes_obj=datetimes_data)
-            if not datetimes_data:
-                continue
-            logger.debug(f'Updated datetimes for form101 and bank {bank_data["name"]} = {created_or_updated}'
-                        f' Added = {added}, removed = {removed}')
-
-            MAX_WORKERS = 10  # число потоков для параллельных запросов
-            BATCH_SUBMIT = 300  # сколько задач отправлять в пул за раз
-
-            indicators_map: dict[str, set[datetime] | list[datetime]] = {}
-            unique_codes = set()
-            for dt in datetimes_data.get('datetimes', []):
-                parsed_dt = parse_datetime(dt)
-                if parsed_dt is None:
-                    logger.warning("Can't parse datetime %s for bank %s", parsed_dt, bank_obj.reg_number)
-                    continue
-                if timezone.is_aware(parsed_dt):
-                    parsed_dt = parsed_dt.replace(tzinfo=None)
-                indicators_data = Form101Parser.get_form101_indicators_from_data101(reg, parsed_dt)
-                if 'message' in indicators_data or not indicators_data.get('indicators'):
-                    logger.warning(f'[!!] RETURN EMPTY indicators for form101 and bank {bank_data["name"]}. '
-                                   f'STOP update indicators. Message: {str(indicators_data)} [!!]')
-                else:
-                    for ind in indicators_data.get('indicators', []):
-                        code = ind.get('ind_code')
-                        if not code:
-                            continue
-                        if code not in unique_codes:
-                            unique_codes.add(code)
-                            indicators_map.setdefault(code, []).append(parsed_dt)
-
-            def generate_all_pairs(dates_list):
-                length = len(dates_list)
-                for i in range(length):
-                    di = dates_list[i]
-                    for j in range(i, length):
-                        yield di, dates_list[j]
-
-            fetch_cache: dict[tuple, list] = {}
-
-            def _fetch_range(bank_reg, ind_code_local, date_from, date_to):
-                """
-                Возвращает (key, payload) — key для кеша, payload: list|dict (если ошибка — dict с 'message').
-                """
-                key = (ind_code_local, date_from.isoformat(), date_to.isoformat())
-                if key in fetch_cache:
-                    return key, fetch_cache[key]
-                try:
-                    res = Form101Parser.get_indicator_data(reg_number=bank_reg,
-                                                           ind_code=ind_code_local,
-                                                           date_from=date_from,
-                                                           date_to=date_to)
-                except Exception as e:
-                    res = {'message': f'exception: {e}'}
-                fetch_cache[key] = res
-                return key, res
-
-            for ind_code, dates_sorted in indicators_map.items():
-                if not dates_sorted:
-                    continue
-
-                dates_sorted = [i for i in dates_sorted if i.year >= 2018]
-
-                n = len(dates_sorted)
-                pair_count = n * (n + 1) // 2
-                logger.debug('Indicator %s: %d dates -> %d pairs', ind_code, n, pair_count)
-
-                pair_gen = generate_all_pairs(dates_sorted)
-
-                with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-                    futures_map = {}
-                    batch = []
-                    processed_pairs = 0
-
-                    for date_from, date_to in pair_gen:
-                        fut = executor.submit(_fetch_range, reg, ind_code, date_from, date_to)
-                        futures_map[fut] = (date_from, date_to)
-                        batch.append(fut)
-
-                        if len(batch) >= BATCH_SUBMIT:
-                            for fut_done in as_completed(batch):
-                                key, res = fut_done.result()
-                                df, dt = futures_map[fut_done]
-                                processed_pairs += 1
-
-                                if isinstance(res, dict) and res.get('message'):
-                                    logger.warning('Fetch error for %s %s..%s: %s', ind_code, df, dt,
-                                                   res.get('message'))
-                                    continue
-
-                                if isinstance(res, list):
-                                    payload_list = res
-                                elif isinstance(res, dict):
-                                    continue
-
-                                params_pair = {
-                                    'reg_number': reg,
-                                    'ind_code': ind_code,
-                                    'date_from': df,
-                                    'date_to': dt,
-                                }
-                                try:
-                                    created_or_updated, added, removed, canonical_obj = _update_or_create_bank_indicator_data_response(
-                                            bank=bank_obj,
-                                            form_type=form101_obj,
-                                            params=params_pair,
-                                            bank_indicator_obj=payload_list
-                                    )
-                                    logger.debug(f'Updated bank indicator data for form101 bank={bank_data["name"]}. '
-                                                'Pair %s..%s saved: upd=%s added=%d removed=%d',
-                                                df.isoformat(), dt.isoformat(), created_or_updated, len(added),
-                                                len(removed))
-                                except Exception as e:
-                                    logger.exception('DB save error for %s %s..%s: %s', ind_code, df, dt, e)
-
-                            batch = []
-
-                    if batch:
-                        for fut_done in as_completed(batch):
-                            key, res = fut_done.result()
-                            df, dt = futures_map[fut_done]
-                            processed_pairs += 1
-
-                            if isinstance(res, dict) and res.get('message'):
-                                logger.warning('Fetch error for %s %s..%s: %s', ind_code, df, dt, res.get('message'))
-                                continue
-
-                            if isinstance(res, list):
-                                payload_list = res
-                            elif isinstance(res, dict):
-                                continue
-
-                            params_pair = {
-                                'reg_number': reg,
-                                'ind_code': ind_code,
-                                'date_from': df,
-                                'date_to': dt,
-                            }
-                            try:
-                                created_or_updated, added, removed, canonical_obj = _update_or_create_bank_indicator_data_response(
-                                        bank=bank_obj,
-                                        form_type=form101_obj,
-                                        params=params_pair,
-                                        bank_indicator_obj=payload_list
-                                )
-                                logger.debug(f'Updated bank indicator data for form101 bank={bank_data["name"]}. '
-                                            'Pair %s..%s saved: upd=%s added=%d removed=%d',
-                                            df.isoformat(), dt.isoformat(), created_or_updated, len(added),
-                                            len(removed))
-                            except Exception as e:
-                                logger.exception('DB save error for %s %s..%s: %s', ind_code, df, dt, e)
-
-                logger.debug('Finished indicator %s: processed pairs=%d', ind_code, processed_pairs)
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+@_exclusive_task('bank_ingestion_backlog')
+def drain_ingestion_backlog(self, mode: str = INCREMENTAL, time_budget: float | None = None):
+    """
+    Ежедневная задача: догружает шаги (банк + форма), отложенные ежемесячной загрузкой из-за окна времени.
+    Блокировка своя (bank_ingestion_backlog): не выполняется одновременно сама с собой, но не ждёт
+    запусков update_all_bank_api_info по формам.
+    :param time_budget: бюджет времени в секундах (по умолчанию settings.INGESTION_WINDOW_SECONDS)
+    :return: dict — краткая сводка по запуску
+    """
+    if time_budget is None:
+        time_budget = settings.INGESTION_WINDOW_SECONDS
+    result = _run_bank_ingestion(mode=mode, task_name=self.name, task_id=self.request.id,
+                                 time_budget=time_budget, backlog_only=True)
+    if result.get('banks'):
+        warm_indicator_cache.apply_async()
+    return result
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=300)
+@_exclusive_task('bank_backfill')
+def backfill_bank_api_info(self, reg_numbers: list[int] | None = None):
+    """
+    Историческая загрузка (очередь settings.INGESTION_BACKFILL_QUEUE, отдельный пул воркеров):
+    проходит все доступные отчётные даты с троттлингом обращений к ЦБ РФ.
+    Никогда не выполняется в одной очереди с ежемесячным обновлением и интерактивными запросами.
+    :param reg_numbers: ограничить загрузку указанными банками (None — все банки)
+    :return: dict — краткая сводка по запуску
+    """
+    result = _run_bank_ingestion(mode=BACKFILL, reg_numbers=reg_numbers, task_name=self.name,
+                                 task_id=self.request.id)
+    warm_indicator_cache.apply_async(kwargs={'reg_numbers': reg_numbers})
+    return result
+
+
+@shared_task(bind=True, max_retries=2, default_retry_delay=30)
+def refresh_banks_api_info(self, reg_numbers: list[int], forms: list[str] | None = None):
+    """
+    Внеочередное обновление отдельных банков (интерактивная очередь settings.INGESTION_INTERACTIVE_QUEUE).
+    Использует тот же конвейер, что и ежемесячная задача; прогресс доступен через состояние задачи
+    (state=PROGRESS, meta={'done', 'total', 'current_reg_number'}).
+    :param reg_numbers: регистрационные номера банков
+    :param forms: подмножество форм ('F101', 'F123', 'F810', 'F813'); None — все формы
+    :return: dict — краткая сводка по запуску
+    """
+
+    def _progress(done: int, total: int, current: int | None) -> None:
+        self.update_state(state='PROGRESS', meta={'done': done, 'total': total, 'current_reg_number': current})
+
+    result = _run_bank_ingestion(mode=INCREMENTAL, reg_numbers=reg_numbers, forms=forms, progress=_progress,
+                                 task_name=self.name, task_id=self.request.id)
+    warm_indicator_cache.apply_async(kwargs={'reg_numbers': reg_numbers})
+    return result
 
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=60)
-def update_all_bank_api_info(self):
+def sync_bank_registry(self):
     """
-    Месячная задача:
-    - обновляем денежно-кредитную статистику из REST парсера или
-    - берём список банков и для каждого запускаем парсеры SOAP
-    - сравниваем результаты с БД и обновляем только если поменялось
-    :return: None
+    Синхронизация справочника банков с EnumBIC_XML (пакетные вставки/обновления).
+    :return: dict — рег. номера добавленных, обновлённых, пропавших из справочника ЦБ и пропущенных банков
     """
+    result = _sync_bank_registry()
+    if 'message' in result:
+        raise self.retry(exc=RuntimeError(result['message']))
+    return result
+
+
+@shared_task(bind=True)
+def warm_indicator_cache(self, top_n: int | None = None, time_budget: float | None = None,
+                         reg_numbers: list[int] | None = None):
+    """
+    Прогрев кэша после загрузки или деплоя: самые запрашиваемые ключи (форма, банк, индикатор, период)
+    материализуются в БД и кладутся в кэш, пока не исчерпан бюджет времени.
+    :param top_n: сколько ключей прогревать (по умолчанию settings.INDICATOR_CACHE_WARM_TOP_N)
+    :param time_budget: бюджет времени в секундах (по умолчанию settings.INDICATOR_CACHE_WARM_BUDGET_SECONDS)
+    :param reg_numbers: прогревать только ключи указанных банков
+    :return: dict — сводка прогрева
+    """
+    return _warm_indicator_cache(top_n=top_n, time_budget=time_budget, reg_numbers=reg_numbers)
+
+
+@shared_task(bind=True)
+@_exclusive_task('indicator_access_flush')
+def flush_indicator_access(self):
+    """
+    Ежеминутно: переносит накопленные в Redis обращения к ключам кэша в IndicatorAccessStat
+    (по ним выбираются ключи для прогрева и приоритет банков при загрузке).
+    :return: dict — сколько ключей и обращений перенесено
+    """
+    return _flush_indicator_access()
 
-    started = timezone.now()
-    logger.info(f'[!] START update_all_bank_api_info at {started} [!]')
-
-    banks: dict = all_banks_parser.CbrAllBanksParser.parse()
-    if 'message' in banks or not banks.get('banks'):
-        logger.warning(f'[!!] RETURN EMPTY banks... STOP parsing. Message: {str(banks)} [!!]')
-        return
-    logger.info(f'[!!!] GOT {len(banks.get('banks', []))} banks [!!!]')
-
-    db_banks = Bank.objects.all()
-    banks_map = {b.reg_number: b for b in db_banks}
-    database_bank_reg_numbers = set(banks_map.keys())
-
-    for bank_data in banks.get('banks', []):
-        reg = bank_data["reg_number"]
-        logger.info(f'PARSING data for bank: name={bank_data["name"]}, reg_number={reg}')
-        if reg not in database_bank_reg_numbers:
-            serializer = BankInfoSerializer(data=bank_data)
-            if serializer.is_valid():
-                validated = serializer.validated_data
-                with transaction.atomic():
-                    bank_obj, created = Bank.objects.get_or_create(
-                            reg_number=validated['reg_number'],
-                            defaults={
-                                'bic': validated['bic'],
-                                'name': validated['name'],
-                                'internal_code': validated['internal_code'],
-                                'registration_date': validated['registration_date'],
-                                'region_code': validated['region_code'],
-                                'tax_id': validated['tax_id'],
-                            }
-                    )
-                    if created:
-                        banks_map[bank_obj.reg_number] = bank_obj
-                        database_bank_reg_numbers.add(reg)
-                        logger.info(f'CREATED new Bank {bank_obj}')
-            else:
-                logger.warning(f'Bank serializer invalid for bank: name={bank_data["name"]},'
-                               f' reg {reg}: {serializer.errors}')
-                continue
-        else:
-            bank_obj = banks_map[reg]
-
-        logger.info(f"{'=' * 10} START PARSE 101, 123, 810 FORMS {'=' * 10}")
-
-        def generate_f810_dates(start_year: int = 2000, end_year: int | None = None) -> list[str]:
-            """
-            Генерирует ISO-строки для дат 1 января и 1 апреля каждого года в диапазоне.
-            Формат: "YYYY-MM-DDT00:00:00Z" (timezone-aware строка с Z).
-            По умолчанию: с 2000 по текущий год (в часовом поясе Django).
-            """
-            if end_year is None:
-                # берем текущий год в том часовом поясе, который использует Django
-                end_year = timezone.now().year
-
-            dates: list[str] = []
-            for y in range(start_year, end_year + 1):
-                dates.append(f"{y:04d}-01-01T00:00:00Z")
-                dates.append(f"{y:04d}-04-01T00:00:00Z")
-            return dates
-
-        form810_obj = FormType.objects.get(title=form_f810()['title'])
-        f810_dates_iso = generate_f810_dates()
-
-        for dt in f810_dates_iso:
-            parsed_dt = parse_datetime(dt)
-            if parsed_dt is None:
-                logger.warning("Can't parse datetime %s for bank %s", parsed_dt, bank_obj.reg_number)
-                continue
-            if timezone.is_aware(parsed_dt):
-                parsed_dt = parsed_dt.replace(tzinfo=None)
-
-            bank_indicator_data = Form810Parser.parse(reg, parsed_dt)
-            if 'message' in bank_indicator_data or not bank_indicator_data:
-                logger.warning(
-                        f'[!!] RETURN EMPTY bank indicator data for form810 and bank {bank_data["name"]}. '
-                        f'STOP update bank indicator data. Message: {str(bank_indicator_data)} [!!]')
-            else:
-                created_or_updated, added, removed, canonical_obj = _update_or_create_bank_indicator_data_response(
-                        bank=bank_obj,
-                        form_type=form810_obj,
-                        bank_indicator_obj=bank_indicator_data,
-                        params={'reg_number': reg, 'dt': parsed_dt}
-                )
-                logger.debug(
-                        "Saved F810 for bank %s dt=%s -> upd=%s added=%d removed=%d",
-                        bank_data['name'], parsed_dt.isoformat(), created_or_updated,
-                        len(added) if added is not None else 0,
-                        len(removed) if removed is not None else 0
-                )
-
-        form123_obj = FormType.objects.get(title=form_f123()['title'])
-        datetimes_data = Form123Parser.get_dates_for_f123(reg)
-        if 'message' in datetimes_data or not datetimes_data.get('datetimes'):
-            logger.warning(f'[!!] RETURN EMPTY datetimes for form123 and bank {bank_data["name"]}. '
-                           f'STOP update datetimes. Message: {str(datetimes_data)} [!!]')
-        else:
-            created_or_updated, added, removed, datetimes_data = _update_or_create_datetimes_response(
-                    bank=bank_obj, form_type=form123_obj, datetimes_obj=datetimes_data)
-            if not datetimes_data:
-                continue
-            logger.debug(f'Updated datetimes for form123 and bank {bank_data["name"]} = {created_or_updated}'
-                        f' Added = {added}, removed = {removed}')
-
-            for dt in datetimes_data.get('datetimes', []):
-                parsed_dt = parse_datetime(dt)
-                if parsed_dt is None:
-                    logger.warning("Can't parse datetime %s for bank %s", parsed_dt, bank_obj.reg_number)
-                    continue
-                if timezone.is_aware(parsed_dt):
-                    parsed_dt = parsed_dt.replace(tzinfo=None)
-                indicators_data = Form123Parser.get_form123_indicators_from_data123(reg, parsed_dt)
-                if 'message' in indicators_data or not indicators_data.get('indicators'):
-                    logger.warning(f'[!!] RETURN EMPTY indicators for form123 and bank {bank_data["name"]}. '
-                                   f'STOP update indicators. Message: {str(indicators_data)} [!!]')
-                else:
-                    created_or_updated, added, removed, indicators_data = _update_or_create_indicators_response(
-                            bank=bank_obj, form_type=form123_obj, indicators_obj=indicators_data, params={
-                                'reg_number': reg, 'dt': parsed_dt})
-                    if not indicators_data:
-                        continue
-                    logger.debug(f'Updated indicators for form123 and bank {bank_data["name"]} = {created_or_updated}'
-                                f' Added = {added}, removed = {removed}')
-
-                    bank_indicator_data = Form123Parser.get_data123_form_full(reg, dt)
-                    if 'message' in bank_indicator_data or not bank_indicator_data:
-                        logger.warning(
-                                f'[!!] RETURN EMPTY bank indicator data for form123 and bank {bank_data["name"]}. '
-                                f'STOP update bank indicator data. Message: {str(bank_indicator_data)} [!!]')
-                    else:
-                        created_or_updated, added, removed, bank_indicator_data = (
-                            _update_or_create_bank_indicator_data_response(bank=bank_obj, form_type=form123_obj,
-                                                                           bank_indicator_obj=bank_indicator_data,
-                                                                           params={'reg_number': reg, 'dt': parsed_dt}))
-                        if not bank_indicator_data:
-                            continue
-                        logger.debug(
-                                f'Updated bank indicator data for form123 and bank {bank_data["name"]} = {created_or_updated}'
-                                f' Added = {added}, removed = {removed}')
-
-        form101_obj = FormType.objects.get(title=form_f101()['title'])
-        datetimes_data = Form101Parser.get_dates_for_f101(reg)
-        if 'message' in datetimes_data or not datetimes_data.get('datetimes'):
-            logger.warning(f'[!!] RETURN EMPTY datetimes for form101 and bank {bank_data["name"]}. '
-                           f'STOP update datetimes. Message: {str(datetimes_data)} [!!]')
-        else:
-            created_or_updated, added, removed, datetimes_data = _update_or_create_datetimes_response(
-                    bank=bank_obj, form_type=form101_obj, datetimes_obj=datetimes_data)
-            if not datetimes_data:
-                continue
-            logger.debug(f'Updated datetimes for form101 and bank {bank_data["name"]} = {created_or_updated}'
-                        f' Added = {added}, removed = {removed}')
-
-            MAX_WORKERS = 10  # число потоков для параллельных запросов
-            BATCH_SUBMIT = 300  # сколько задач отправлять в пул за раз
-
-            indicators_map: dict[str, set[datetime] | list[datetime]] = {}
-            unique_codes = set()
-            for dt in datetimes_data.get('datetimes', []):
-                parsed_dt = parse_datetime(dt)
-                if parsed_dt is None:
-                    logger.warning("Can't parse datetime %s for bank %s", parsed_dt, bank_obj.reg_number)
-                    continue
-                if timezone.is_aware(parsed_dt):
-                    parsed_dt = parsed_dt.replace(tzinfo=None)
-                indicators_data = Form101Parser.get_form101_indicators_from_data101(reg, parsed_dt)
-                if 'message' in indicators_data or not indicators_data.get('indicators'):
-                    logger.warning(f'[!!] RETURN EMPTY indicators for form101 and bank {bank_data["name"]}. '
-                                   f'STOP update indicators. Message: {str(indicators_data)} [!!]')
-                else:
-                    for ind in indicators_data.get('indicators', []):
-                        code = ind.get('ind_code')
-                        if not code:
-                            continue
-                        if code not in unique_codes:
-                            unique_codes.add(code)
-                            indicators_map.setdefault(code, []).append(parsed_dt)
-
-            def generate_all_pairs(dates_list):
-                length = len(dates_list)
-                for i in range(length):
-                    di = dates_list[i]
-                    for j in range(i, length):
-                        yield di, dates_list[j]
-
-            fetch_cache: dict[tuple, list] = {}
-
-            def _fetch_range(bank_reg, ind_code_local, date_from, date_to):
-                """
-                Возвращает (key, payload) — key для кеша, payload: list|dict (если ошибка — dict с 'message').
-                """
-                key = (ind_code_local, date_from.isoformat(), date_to.isoformat())
-                if key in fetch_cache:
-                    return key, fetch_cache[key]
-                try:
-                    res = Form101Parser.get_indicator_data(reg_number=bank_reg,
-                                                           ind_code=ind_code_local,
-                                                           date_from=date_from,
-                                                           date_to=date_to)
-                except Exception as e:
-                    res = {'message': f'exception: {e}'}
-                fetch_cache[key] = res
-                return key, res
-
-            for ind_code, dates_sorted in indicators_map.items():
-                if not dates_sorted:
-                    continue
-
-                dates_sorted = [i for i in dates_sorted if i.year >= 2018]
-
-                n = len(dates_sorted)
-                pair_count = n * (n + 1) // 2
-                logger.debug('Indicator %s: %d dates -> %d pairs', ind_code, n, pair_count)
-
-                pair_gen = generate_all_pairs(dates_sorted)
-
-                with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-                    futures_map = {}
-                    batch = []
-                    processed_pairs = 0
-
-                    for date_from, date_to in pair_gen:
-                        fut = executor.submit(_fetch_range, reg, ind_code, date_from, date_to)
-                        futures_map[fut] = (date_from, date_to)
-                        batch.append(fut)
-
-                        if len(batch) >= BATCH_SUBMIT:
-                            for fut_done in as_completed(batch):
-                                key, res = fut_done.result()
-                                df, dt = futures_map[fut_done]
-                                processed_pairs += 1
-
-                                if isinstance(res, dict) and res.get('message'):
-                                    logger.warning('Fetch error for %s %s..%s: %s', ind_code, df, dt,
-                                                   res.get('message'))
-                                    continue
-
-                                if isinstance(res, list):
-                                    payload_list = res
-                                elif isinstance(res, dict):
-                                    continue
-
-                                params_pair = {
-                                    'reg_number': reg,
-                                    'ind_code': ind_code,
-                                    'date_from': df,
-                                    'date_to': dt,
-                                }
-                                try:
-                                    created_or_updated, added, removed, canonical_obj = _update_or_create_bank_indicator_data_response(
-                                            bank=bank_obj,
-                                            form_type=form101_obj,
-                                            params=params_pair,
-                                            bank_indicator_obj=payload_list
-                                    )
-                                    logger.debug(f'Updated bank indicator data for form101 bank={bank_data["name"]}. '
-                                                'Pair %s..%s saved: upd=%s added=%d removed=%d',
-                                                df.isoformat(), dt.isoformat(), created_or_updated, len(added),
-                                                len(removed))
-                                except Exception as e:
-                                    logger.exception('DB save error for %s %s..%s: %s', ind_code, df, dt, e)
-
-                            batch = []
-
-                    if batch:
-                        for fut_done in as_completed(batch):
-                            key, res = fut_done.result()
-                            df, dt = futures_map[fut_done]
-                            processed_pairs += 1
-
-                            if isinstance(res, dict) and res.get('message'):
-                                logger.warning('Fetch error for %s %s..%s: %s', ind_code, df, dt, res.get('message'))
-                                continue
-
-                            if isinstance(res, list):
-                                payload_list = res
-                            elif isinstance(res, dict):
-                                continue
-
-                            params_pair = {
-                                'reg_number': reg,
-                                'ind_code': ind_code,
-                                'date_from': df,
-                                'date_to': dt,
-                            }
-                            try:
-                                created_or_updated, added, removed, canonical_obj = _update_or_create_bank_indicator_data_response(
-                                        bank=bank_obj,
-                                        form_type=form101_obj,
-                                        params=params_pair,
-                                        bank_indicator_obj=payload_list
-                                )
-                                logger.debug(f'Updated bank indicator data for form101 bank={bank_data["name"]}. '
-                                            'Pair %s..%s saved: upd=%s added=%d removed=%d',
-                                            df.isoformat(), dt.isoformat(), created_or_updated, len(added),
-                                            len(removed))
-                            except Exception as e:
-                                logger.exception('DB save error for %s %s..%s: %s', ind_code, df, dt, e)
-
-                logger.debug('Finished indicator %s: processed pairs=%d', ind_code, processed_pairs)
+
+@shared_task(bind=True)
+@_exclusive_task('dead_letter_redrive')
+def redrive_failed_fetches(self, limit: int | None = None, time_budget: float | None = None):
+    """
+    Каждые 5 минут: повторяет сбойные обращения к ЦБ из FailedFetch (дата F810/F123/F101, раздел F813,
+    диапазон F101, подпериод ставок) с экспоненциальной задержкой, не дожидаясь следующей ежемесячной загрузки.
+    :param limit: сколько единиц повторить (по умолчанию settings.DEAD_LETTER_REDRIVE_BATCH)
+    :param time_budget: бюджет времени в секундах (по умолчанию settings.DEAD_LETTER_REDRIVE_BUDGET_SECONDS)
+    :return: dict — resolved / failed / stopped и счётчики FailedFetch
+    """
+    result = _redrive_failed_fetches(limit=limit,
+                                     time_budget=time_budget or settings.DEAD_LETTER_REDRIVE_BUDGET_SECONDS)
+    if result['resolved']:
+        warm_indicator_cache.apply_async()
+    return result
+
+
+@shared_task(bind=True)
+def collect_orphan_payloads(self, grace_hours: int | None = None):
+    """
+    Еженедельно: удаляет тела ответов IndicatorPayload, на которые больше не ссылается ни один ответ.
+    :param grace_hours: не трогать блобы моложе (по умолчанию settings.INDICATOR_PAYLOAD_GC_GRACE_HOURS)
+    :return: dict — сколько удалено и сколько блобов осталось
+    """
+    return _collect_orphan_payloads(grace_hours=grace_hours)
+
+
+@shared_task(bind=True)
+def compact_indicator_ranges(self, dry_run: bool = False):
+    """
+    Еженедельно (перед collect_orphan_payloads): удаляет запросы F101 по диапазонам, строго вложенным в другой
+    сохранённый диапазон того же банка и индикатора с совпадающими данными, и ставшие ничьими тела ответов.
+    :param dry_run: только посчитать, что было бы удалено
+    :return: dict — найдено/расходится/удалено запросов, блобов и освобождённых байт
+    """
+    return _compact_indicator_ranges(dry_run=dry_run)
+
+
+@shared_task(bind=True)
+def maintain_partitions(self):
+    """
+    Ежемесячно: создаёт годовые секции таблицы значений F101 наперёд и отсоединяет (или удаляет) устаревшие
+    по settings.INDICATOR_PARTITIONS_*. На СУБД без секционирования ничего не делает.
+    :return: dict — созданные и отсоединённые секции по таблицам
+    """
+    return _maintain_partitions()
 
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=60)
-def update_all_reports_api_info(self):
+@_exclusive_task('reports_ingestion', ledger_mode='reports')
+def update_all_reports_api_info(self, force: bool = False):
     """
-    Месячная задача:
+    Ежедневная задача (выполняется, только если после последней загрузки вышла новая публикация ставок
+    по календарю settings.INGESTION_FORM_CADENCE['reports']; force=True — без проверки):
     Проходит по всем возможным комбинациям publication/dataset/measure (по ограничению в сериализаторах),
     сохраняет результаты проверки доступных параметров (params check) и затем создаёт/сохраняет
     реальные запросы по кредитам и депозитам, перебирая все подпериоды начиная с 2018 года
     (или начиная с минимально доступного года, если он > 2018).
     """
-    CREDIT_PUBLICATIONS = {
-        14: {'datasets': (25, 26, 27, 28, 29)},
-        15: {'datasets': (30, 31, 32, 33, 34)},
-        16: {'datasets': (35, 36)}
-    }
-    DEPOSIT_PUBLICATIONS = {
-        18: {'datasets': (37, 38)},
-        19: {'datasets': (39, 40)}
-    }
-    PUBLICATION_MEASURES = {
-        14: (2, 3, 4),
-        15: (23, 42, 55, 64, 72, 87, 95, 106),
-        16: (7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21),
-        18: (2, 3, 4),
-        19: (23, 42, 55, 64, 72, 87, 95, 106)
-    }
+    if not force:
+        due, schedule = _due_forms([REPORTS])
+        if not due:
+            return {'skipped': True, 'reason': 'not_due', 'schedule': schedule}
 
     started = timezone.now()
     logger.info('[!] START update_all_reports_api_info at %s [!]', started)
@@ -741,13 +281,11 @@ def update_all_reports_api_info(self):
             return req, None
 
         try:
-            with transaction.atomic():
-                req_locked = CbrApiDataRequest.objects.select_for_update().get(pk=req.pk)
-                if hasattr(req_locked, 'response') and req_locked.response is not None:
-                    logger.debug('Another worker saved params-check response for %s', params)
-                    return req_locked, req_locked.response.processed_data
-                CbrApiDataResponse.objects.create(request=req_locked, processed_data=processed)
-                logger.debug('Saved params-check response for %s', params)
+            _create_response_if_absent(req, processed)
+            # если параллельный воркер успел сохранить ответ раньше — используем сохранённый
+            processed = CbrApiDataResponse.objects.filter(request=req).values_list(
+                    'processed_data', flat=True).first()
+            logger.debug('Saved params-check response for %s', params)
         except Exception:
             logger.exception('Failed to save params-check response for %s', params)
 
@@ -797,146 +335,37 @@ def update_all_reports_api_info(self):
                 except Exception:
                     logger.exception('Error params-check for pub=%s ds=%s measure=%s', pub, ds, m)
 
-    def _generate_year_pairs(available_from: int, available_to: int, min_start: int = 2018):
-        start = max(available_from, min_start)
-        if start > available_to:
-            return []
-        pairs = []
-        for fy in range(start, available_to + 1):
-            for ty in range(fy, available_to + 1):
-                pairs.append((fy, ty))
-        return pairs
-
-    # 3) Для кредитных публикаций — создаём/выполняем все подпериоды
-    for pub, meta in CREDIT_PUBLICATIONS.items():
-        datasets = meta.get('datasets', ())
-        measures = PUBLICATION_MEASURES.get(pub, ())
-        for ds in datasets:
-            for m in measures:
-                key = (pub, ds, m)
-                years = years_map.get(key)
-                if not years:
-                    logger.warning('No years info for credit combo pub=%s ds=%s measure=%s, skipping', pub, ds, m)
-                    continue
-                avail_from, avail_to = years
-                year_pairs = _generate_year_pairs(avail_from, avail_to, min_start=2018)
-                logger.debug('CREDIT pub=%s ds=%s measure=%s -> %d year pairs (from %s to %s)',
-                            pub, ds, m, len(year_pairs), avail_from, avail_to)
-
-                for from_year, to_year in year_pairs:
-                    params = {
-                        'publication_id': pub,
-                        'dataset_id': ds,
-                        'measure_id': m,
-                        'from_year': from_year,
-                        'to_year': to_year,
-                    }
-                    try:
-                        req_obj = _create_or_get_request_atomic(CbrApiDataRequest.RateType.CREDIT, params,
-                                                                with_years=True)
-                    except Exception:
-                        logger.exception('Failed to create/get CREDIT request for %s', params)
-                        continue
-
-                    if hasattr(req_obj, 'response') and req_obj.response is not None:
-                        continue
-
-                    try:
-                        data = CbrAPIParser.parse(publication_id=pub,
-                                                  dataset_id=ds,
-                                                  measure_id=m,
-                                                  from_year=from_year,
-                                                  to_year=to_year)
-                    except Exception as e:
-                        logger.exception('CbrAPIParser.parse exception for CREDIT %s: %s', params, e)
-                        continue
-
-                    if isinstance(data, dict) and data.get('message'):
-                        logger.warning('CbrAPIParser.parse returned message for CREDIT %s: %s', params,
-                                       data.get('message'))
-                        continue
-
-                    try:
-                        processed = ResponseSerializer(instance=data).data
-                    except Exception as e:
-                        logger.exception('Failed to serialize CREDIT response for %s: %s', params, e)
-                        continue
-
-                    try:
-                        with transaction.atomic():
-                            req_locked = CbrApiDataRequest.objects.select_for_update().get(pk=req_obj.pk)
-                            if hasattr(req_locked, 'response') and req_locked.response is not None:
-                                continue
-                            CbrApiDataResponse.objects.create(request=req_locked, processed_data=processed)
-                            logger.debug('Saved CREDIT response for %s', params)
-                    except Exception:
-                        logger.exception('Failed to save CREDIT response for %s', params)
-
-    # 4) Для депозитных публикаций — создаём/выполняем все подпериоды
-    for pub, meta in DEPOSIT_PUBLICATIONS.items():
-        datasets = meta.get('datasets', ())
-        measures = PUBLICATION_MEASURES.get(pub, ())
-        for ds in datasets:
-            for m in measures:
-                key = (pub, ds, m)
-                years = years_map.get(key)
-                if not years:
-                    logger.warning('No years info for deposit combo pub=%s ds=%s measure=%s, skipping', pub, ds, m)
-                    continue
-                avail_from, avail_to = years
-                year_pairs = _generate_year_pairs(avail_from, avail_to, min_start=2018)
-                logger.debug('DEPOSIT pub=%s ds=%s measure=%s -> %d year pairs (from %s to %s)',
-                            pub, ds, m, len(year_pairs), avail_from, avail_to)
-
-                for from_year, to_year in year_pairs:
-                    params = {
-                        'publication_id': pub,
-                        'dataset_id': ds,
-                        'measure_id': m,
-                        'from_year': from_year,
-                        'to_year': to_year,
-                    }
-                    try:
-                        req_obj = _create_or_get_request_atomic(CbrApiDataRequest.RateType.DEPOSIT, params,
-                                                                with_years=True)
-                    except Exception:
-                        logger.exception('Failed to create/get DEPOSIT request for %s', params)
-                        continue
-
-                    if hasattr(req_obj, 'response') and req_obj.response is not None:
-                        continue
-
-                    try:
-                        data = CbrAPIParser.parse(
-                                publication_id=pub,
-                                dataset_id=ds,
-                                measure_id=m,
-                                from_year=from_year,
-                                to_year=to_year,
-                        )
-                    except Exception as e:
-                        logger.exception('CbrAPIParser.parse exception for DEPOSIT %s: %s', params, e)
-                        continue
-
-                    if isinstance(data, dict) and data.get('message'):
-                        logger.warning('CbrAPIParser.parse returned message for DEPOSIT %s: %s', params,
-                                       data.get('message'))
-                        continue
-
-                    try:
-                        processed = ResponseSerializer(instance=data).data
-                    except Exception as e:
-                        logger.exception('Failed to serialize DEPOSIT response for %s: %s', params, e)
+    # 3-4) Для кредитных и депозитных публикаций — создаём/выполняем все подпериоды;
+    # сбойные подпериоды записываются в FailedFetch и повторяются задачей redrive_failed_fetches
+    for rate_type, publications in ((CbrApiDataRequest.RateType.CREDIT, CREDIT_PUBLICATIONS),
+                                    (CbrApiDataRequest.RateType.DEPOSIT, DEPOSIT_PUBLICATIONS)):
+        label = rate_type.value.upper()
+        for pub, meta in publications.items():
+            datasets = meta.get('datasets', ())
+            measures = PUBLICATION_MEASURES.get(pub, ())
+            for ds in datasets:
+                for m in measures:
+                    key = (pub, ds, m)
+                    years = years_map.get(key)
+                    if not years:
+                        logger.warning('No years info for %s combo pub=%s ds=%s measure=%s, skipping',
+                                       label.lower(), pub, ds, m)
                         continue
-
-                    try:
-                        with transaction.atomic():
-                            req_locked = CbrApiDataRequest.objects.select_for_update().get(pk=req_obj.pk)
-                            if hasattr(req_locked, 'response') and req_locked.response is not None:
-                                continue
-                            CbrApiDataResponse.objects.create(request=req_locked, processed_data=processed)
-                            logger.debug('Saved DEPOSIT response for %s', params)
-                    except Exception:
-                        logger.exception('Failed to save DEPOSIT response for %s', params)
+                    avail_from, avail_to = years
+                    year_pairs = _generate_year_pairs(avail_from, avail_to)
+                    logger.debug('%s pub=%s ds=%s measure=%s -> %d year pairs (from %s to %s)',
+                                 label, pub, ds, m, len(year_pairs), avail_from, avail_to)
+
+                    for from_year, to_year in year_pairs:
+                        params = {
+                            'publication_id': pub,
+                            'dataset_id': ds,
+                            'measure_id': m,
+                            'from_year': from_year,
+                            'to_year': to_year,
+                        }
+                        error = _ingest_rates_period(rate_type, params)
+                        if error:
+                            _record_failed_fetch(rate_type.value, 'period', None, params, error)
 
     logger.info('[!] FINISHED update_all_reports_api_info at %s [!]', timezone.now())
@@ -0,0 +1,259 @@
+import threading
+from datetime import datetime
+from unittest import mock
+
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from banks.models import Bank
+from core.helpers.compaction_functions import _compact_indicator_ranges, _delete_redundant
+from core.helpers.dormancy_functions import _update_bank_activity
+from core.helpers.indicators_db_functions import _collect_orphan_payloads, _store_indicator_payload, \
+    _upsert_hashed_response
+from core.utils.hash_utils import canonical_obj_and_hash
+from core.utils.indicator_cache import bump_cache_version, cache_get, cache_set, cache_version, \
+    indicator_cache_key, indicator_cache_scope
+from core.utils.request_keys import indicator_data_request_key, indicators_request_key
+from core.utils.upsert import upsert_if_hash_changed
+from indicators.models import BankIndicatorDataRequest, BankIndicatorDataResponse, BankIndicatorsRequest, \
+    BankIndicatorsResponse, FormType, IndicatorPayload
+
+
+def _make_request() -> BankIndicatorsRequest:
+    bank = Bank.objects.create(reg_number=1481, bic='044525225', name='Тестовый банк', internal_code='1',
+                               registration_date=datetime(2000, 1, 1), region_code='45', tax_id='7707083893')
+    form_type = FormType.objects.create(title='F101', description='')
+    dt = datetime(2025, 1, 1)
+    return BankIndicatorsRequest.objects.create(
+            bank=bank, form_type=form_type, reg_number=bank.reg_number, dt=dt,
+            request_key=indicators_request_key(bank.pk, form_type.pk, bank.reg_number, dt))
+
+
+def _response_values(request_pk: int, indicators, data_hash: str) -> dict:
+    return {'request_id': request_pk, 'indicators': indicators, 'data_hash': data_hash}
+
+
+class UpsertIfHashChangedTests(TestCase):
+    def setUp(self):
+        self.request = _make_request()
+        upsert_if_hash_changed(BankIndicatorsResponse, 'request_id',
+                               _response_values(self.request.pk, [{'code': 1}], 'a' * 64))
+        # сдвигаем метки в прошлое, чтобы отличить запись от пропуска
+        self.past = datetime(2020, 1, 1)
+        BankIndicatorsResponse.objects.update(created_at=self.past, updated_at=self.past)
+
+    def test_same_hash_is_noop(self):
+        written = upsert_if_hash_changed(BankIndicatorsResponse, 'request_id',
+                                         _response_values(self.request.pk, [{'code': 2}], 'a' * 64))
+
+        self.assertFalse(written)
+        response = BankIndicatorsResponse.objects.get(request=self.request)
+        self.assertEqual(response.updated_at, self.past)
+        self.assertEqual(response.indicators, [{'code': 1}])
+
+    def test_changed_hash_updates(self):
+        written = upsert_if_hash_changed(BankIndicatorsResponse, 'request_id',
+                                         _response_values(self.request.pk, [{'code': 2}], 'b' * 64))
+
+        self.assertTrue(written)
+        response = BankIndicatorsResponse.objects.get(request=self.request)
+        self.assertEqual(response.data_hash, 'b' * 64)
+        self.assertEqual(response.indicators, [{'code': 2}])
+        self.assertGreater(response.updated_at, self.past)
+        self.assertEqual(response.created_at, self.past)
+
+
+class UpsertHashedResponseTests(TestCase):
+    def setUp(self):
+        self.request = _make_request()
+
+    def test_unchanged_hash_is_noop(self):
+        _upsert_hashed_response(BankIndicatorsResponse, self.request.pk, 'indicators', [{'code': 1}], 'a' * 64)
+        past = datetime(2020, 1, 1)
+        BankIndicatorsResponse.objects.update(updated_at=past)
+
+        written, old = _upsert_hashed_response(BankIndicatorsResponse, self.request.pk, 'indicators',
+                                               [{'code': 1}], 'a' * 64)
+
+        self.assertFalse(written)
+        self.assertIsNone(old)
+        self.assertEqual(BankIndicatorsResponse.objects.get(request=self.request).updated_at, past)
+
+    def test_repeated_identical_write_issues_no_update(self):
+        _upsert_hashed_response(BankIndicatorsResponse, self.request.pk, 'indicators', [{'code': 1}], 'a' * 64)
+        past = datetime(2020, 1, 1)
+        BankIndicatorsResponse.objects.update(updated_at=past)
+
+        with CaptureQueriesContext(connection) as queries:
+            written, _ = _upsert_hashed_response(BankIndicatorsResponse, self.request.pk, 'indicators',
+                                                 [{'code': 1}], 'a' * 64)
+
+        self.assertFalse(written)
+        statements = [q['sql'].lstrip().split(' ', 1)[0].upper() for q in queries.captured_queries]
+        self.assertNotIn('UPDATE', statements)
+        self.assertNotIn('INSERT', statements)
+        self.assertEqual(BankIndicatorsResponse.objects.get(request=self.request).updated_at, past)
+
+    def test_changed_hash_updates_and_returns_old_payload(self):
+        _upsert_hashed_response(BankIndicatorsResponse, self.request.pk, 'indicators', [{'code': 1}], 'a' * 64)
+
+        written, old = _upsert_hashed_response(BankIndicatorsResponse, self.request.pk, 'indicators',
+                                               [{'code': 2}], 'b' * 64)
+
+        self.assertTrue(written)
+        self.assertEqual(old, [{'code': 1}])
+        self.assertEqual(BankIndicatorsResponse.objects.get(request=self.request).data_hash, 'b' * 64)
+
+    def test_racing_writer_with_same_hash_writes_once(self):
+        """Второй писатель прошёл оптимистичную проверку до записи первого: upsert сам пропускает запись."""
+        exists = mock.patch('django.db.models.query.QuerySet.exists', return_value=False)
+        with exists:
+            first, _ = _upsert_hashed_response(BankIndicatorsResponse, self.request.pk, 'indicators',
+                                               [{'code': 1}], 'a' * 64)
+            second, _ = _upsert_hashed_response(BankIndicatorsResponse, self.request.pk, 'indicators',
+                                                [{'code': 1}], 'a' * 64)
+
+        self.assertTrue(first)
+        self.assertFalse(second)
+        self.assertEqual(BankIndicatorsResponse.objects.filter(request=self.request).count(), 1)
+
+
+class ConcurrentUpsertTests(TransactionTestCase):
+    """Параллельные писатели в отдельных соединениях одновременно пишут ответ с одинаковым хэшем."""
+
+    def test_parallel_writers_with_same_hash(self):
+        request = _make_request()
+        barrier = threading.Barrier(4)
+        results, errors = [], []
+
+        def _write():
+            try:
+                barrier.wait(timeout=10)
+                results.append(upsert_if_hash_changed(BankIndicatorsResponse, 'request_id',
+                                                      _response_values(request.pk, [{'code': 1}], 'a' * 64)))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=_write) for _ in range(barrier.parties)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=30)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(results), [False] * 3 + [True])
+        self.assertEqual(BankIndicatorsResponse.objects.filter(request=request).count(), 1)
+
+
+class IndicatorCacheVersionTests(TestCase):
+    def test_ingestion_of_one_range_invalidates_overlapping_ranges(self):
+        cached = {'reg_number': 1481, 'ind_code': '20202', 'date_from': datetime(2024, 1, 1),
+                  'date_to': datetime(2024, 12, 1)}
+        loaded = {**cached, 'date_from': datetime(2024, 6, 1), 'date_to': datetime(2025, 6, 1)}
+        other_indicator = {**cached, 'ind_code': '30102'}
+        key, other_key = indicator_cache_key('F101', cached), indicator_cache_key('F101', other_indicator)
+        cache_set(key, cache_version(indicator_cache_scope('F101', cached)), ['stale'])
+        cache_set(other_key, cache_version(indicator_cache_scope('F101', other_indicator)), ['kept'])
+
+        bump_cache_version(indicator_cache_scope('F101', loaded))
+
+        self.assertIsNone(cache_get(key, cache_version(indicator_cache_scope('F101', cached))))
+        self.assertEqual(cache_get(other_key, cache_version(indicator_cache_scope('F101', other_indicator))),
+                         ['kept'])
+
+
+class OrphanPayloadCollectionTests(TestCase):
+    def setUp(self):
+        request = _make_request()
+        self.data_request = BankIndicatorDataRequest.objects.create(
+                bank=request.bank, form_type=request.form_type, reg_number=request.reg_number, dt=request.dt,
+                request_key=indicator_data_request_key(request.bank_id, request.form_type_id, request.reg_number,
+                                                       dt=request.dt))
+        for data_hash in ('a' * 64, 'b' * 64, 'c' * 64):
+            IndicatorPayload.objects.create(data_hash=data_hash, payload=[])
+        BankIndicatorDataResponse.objects.create(request=self.data_request, payload_id='a' * 64,
+                                                 data_hash='a' * 64)
+        IndicatorPayload.objects.update(created_at=datetime(2020, 1, 1))
+
+    def test_collects_only_old_unreferenced_payloads(self):
+        result = _collect_orphan_payloads(grace_hours=24)
+
+        self.assertEqual(result['deleted'], 2)
+        self.assertEqual(list(IndicatorPayload.objects.values_list('pk', flat=True)), ['a' * 64])
+
+    def test_unchanged_response_does_not_touch_payload(self):
+        store = mock.Mock(side_effect=lambda: _store_indicator_payload([], 'a' * 64))
+
+        with CaptureQueriesContext(connection) as queries:
+            written, _ = _upsert_hashed_response(BankIndicatorDataResponse, self.data_request.pk, 'payload_id',
+                                                 'a' * 64, 'a' * 64, before_write=store)
+
+        self.assertFalse(written)
+        store.assert_not_called()
+        self.assertFalse([q for q in queries.captured_queries if 'indicatorpayload' in q['sql'].lower()])
+        self.assertEqual(IndicatorPayload.objects.get(pk='a' * 64).created_at, datetime(2020, 1, 1))
+
+
+class CompactIndicatorRangesTests(TestCase):
+    def setUp(self):
+        request = _make_request()
+        self.bank, self.form_type = request.bank, request.form_type
+        year = [self._item(month, 100 + month) for month in range(1, 13)]
+        self.container = self._store(datetime(2024, 1, 1), datetime(2024, 12, 1), year)
+        self.subsumed = self._store(datetime(2024, 3, 1), datetime(2024, 4, 1), year[2:4])
+        self.corrected = self._store(datetime(2024, 6, 1), datetime(2024, 6, 1), [self._item(6, 999)])
+
+    @staticmethod
+    def _item(month: int, value: int) -> dict:
+        return {'date': datetime(2024, month, 1).isoformat(), 'pln': 'А', 'ap': 1, 'vitg': value, 'iitg': value}
+
+    def _store(self, date_from: datetime, date_to: datetime, items: list[dict]) -> BankIndicatorDataRequest:
+        canonical, data_hash = canonical_obj_and_hash(items)
+        request = BankIndicatorDataRequest.objects.create(
+                bank=self.bank, form_type=self.form_type, reg_number=self.bank.reg_number, ind_code='20202',
+                date_from=date_from, date_to=date_to,
+                request_key=indicator_data_request_key(self.bank.pk, self.form_type.pk, self.bank.reg_number,
+                                                       '20202', date_from, date_to))
+        _store_indicator_payload(canonical, data_hash)
+        BankIndicatorDataResponse.objects.create(request=request, payload_id=data_hash, data_hash=data_hash)
+        IndicatorPayload.objects.filter(pk=data_hash).update(created_at=datetime(2020, 1, 1))
+        return request
+
+    def test_deletes_only_subsumed_ranges_with_matching_rows(self):
+        result = _compact_indicator_ranges(pause_seconds=0)
+
+        self.assertEqual((result['subsumed'], result['mismatched'], result['requests']), (2, 1, 1))
+        self.assertEqual(sorted(BankIndicatorDataRequest.objects.values_list('pk', flat=True)),
+                         sorted([self.container.pk, self.corrected.pk]))
+
+    def test_keeps_request_rewritten_after_comparison(self):
+        compared = {'pk': self.subsumed.pk, 'hash': self.subsumed.response.data_hash,
+                    'container_pk': self.container.pk, 'container_hash': self.container.response.data_hash}
+        BankIndicatorDataResponse.objects.filter(request=self.subsumed).update(data_hash='f' * 64)
+
+        result = _delete_redundant([compared], dry_run=False)
+
+        self.assertEqual(result['requests'], 0)
+        self.assertTrue(BankIndicatorDataRequest.objects.filter(pk=self.subsumed.pk).exists())
+
+
+@override_settings(DORMANT_BANK_IDLE_PERIODS=2)
+class BankActivityTests(TestCase):
+    def setUp(self):
+        self.bank = _make_request().bank
+
+    def _run(self, started_at: datetime, form: str) -> Bank:
+        _update_bank_activity(Bank.objects.get(pk=self.bank.pk), started_at, [form])
+        return Bank.objects.get(pk=self.bank.pk)
+
+    def test_idle_period_counted_once_per_period(self):
+        for day in (1, 2, 3):
+            for form in ('F101', 'F123'):
+                bank = self._run(datetime(2024, 5, day), form)
+
+        self.assertEqual((bank.idle_periods, bank.status), (1, Bank.Status.ACTIVE))
+        bank = self._run(datetime(2024, 6, 1), 'F101')
+        self.assertEqual((bank.idle_periods, bank.status), (2, Bank.Status.DORMANT))
@@ -0,0 +1,26 @@
+from django.urls import path
+
+from .views import (FailedFetchListAPIView, FailedFetchStatsAPIView, IngestionPlanAPIView, IngestionRunDetailAPIView,
+                    IngestionRunItemsAPIView, IngestionRunListAPIView)
+
+
+urlpatterns = [
+    path("ingestion/runs/",
+         IngestionRunListAPIView.as_view(),
+         name='ingestion.runs'),
+    path("ingestion/runs/<int:pk>/",
+         IngestionRunDetailAPIView.as_view(),
+         name='ingestion.runs.detail'),
+    path("ingestion/runs/<int:pk>/items/",
+         IngestionRunItemsAPIView.as_view(),
+         name='ingestion.runs.items'),
+    path("ingestion/plan/",
+         IngestionPlanAPIView.as_view(),
+         name='ingestion.plan'),
+    path("ingestion/failures/",
+         FailedFetchListAPIView.as_view(),
+         name='ingestion.failures'),
+    path("ingestion/failures/stats/",
+         FailedFetchStatsAPIView.as_view(),
+         name='ingestion.failures.stats'),
+]
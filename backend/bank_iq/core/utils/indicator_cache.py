@@ -0,0 +1,97 @@
+import logging
+import uuid
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.utils.hash_utils import canonical_obj_and_hash
+
+
+logger = logging.getLogger(__name__)
+
+# Параметры, которые определяют ответ для каждой формы
+INDICATOR_KEY_FIELDS = {
+    'F101': ('reg_number', 'ind_code', 'date_from', 'date_to'),
+    'F123': ('reg_number', 'dt'),
+    'F810': ('reg_number', 'dt'),
+    'F813': ('reg_number', 'ind_code', 'dt'),
+}
+# Параметры области инвалидации: все периоды и даты одного (форма, банк, индикатор) сбрасываются вместе
+INDICATOR_SCOPE_FIELDS = ('reg_number', 'ind_code')
+
+
+def indicator_key_params(form_title: str, params: dict) -> dict:
+    """Оставляет только параметры, значимые для формы (лишние и пустые отбрасываются)."""
+    fields = INDICATOR_KEY_FIELDS.get(form_title, ('reg_number', 'ind_code', 'date_from', 'date_to', 'dt'))
+    return {f: params.get(f) for f in fields if params.get(f) is not None}
+
+
+def indicator_cache_key(form_title: str, params: dict) -> str:
+    """
+    Возвращает sha256 канонического представления (форма + параметры запроса).
+    Одинаковые запросы из API и из загрузчика дают один и тот же ключ.
+    """
+    _, digest = canonical_obj_and_hash({'form': form_title, **indicator_key_params(form_title, params)})
+    return digest
+
+
+def indicator_cache_scope(form_title: str, params: dict) -> str:
+    """Область инвалидации ключа: форма, банк и индикатор (без периода и даты)."""
+    key_params = indicator_key_params(form_title, params)
+    return ':'.join([form_title, *(str(key_params.get(f, '')) for f in INDICATOR_SCOPE_FIELDS)])
+
+
+def _version_key(scope: str) -> str:
+    return f'indicators:version:{scope}'
+
+
+def _full_key(key: str, version: str) -> str:
+    return f'indicators:data:{version}:{key}'
+
+
+def cache_version(scope: str) -> str | None:
+    """
+    Текущая версия области: входит в ключ кэша, поэтому смена версии разом делает устаревшими ответы
+    за любые диапазоны и даты этой области. Версию читают до обращения к БД и с ней же пишут результат —
+    ответ, собранный до загрузки, попадёт под старую версию и не будет прочитан.
+    Версия — случайная метка, а не счётчик: если Redis вытеснит её, новая не совпадёт ни с одной прежней.
+    None — кэш недоступен.
+    """
+    try:
+        version = cache.get(_version_key(scope))
+        if version is None:
+            cache.add(_version_key(scope), uuid.uuid4().hex[:12], timeout=None)
+            version = cache.get(_version_key(scope))
+        return version
+    except Exception as e:
+        logger.warning('Indicator cache version read failed: %s', e)
+        return None
+
+
+def bump_cache_version(scope: str) -> None:
+    """Сбрасывает все закэшированные ответы области (загрузчик вызывает после изменения данных)."""
+    try:
+        cache.set(_version_key(scope), uuid.uuid4().hex[:12], timeout=None)
+    except Exception as e:
+        logger.warning('Indicator cache version bump failed: %s', e)
+
+
+def cache_get(key: str, version: str | None) -> Any | None:
+    """Чтение из кэша; недоступность кэша не должна ломать запрос — просто промах."""
+    if version is None:
+        return None
+    try:
+        return cache.get(_full_key(key, version))
+    except Exception as e:
+        logger.warning('Indicator cache get failed: %s', e)
+        return None
+
+
+def cache_set(key: str, version: str | None, value: Any) -> None:
+    if version is None:
+        return
+    try:
+        cache.set(_full_key(key, version), value, timeout=getattr(settings, 'INDICATOR_CACHE_TIMEOUT', None))
+    except Exception as e:
+        logger.warning('Indicator cache set failed: %s', e)
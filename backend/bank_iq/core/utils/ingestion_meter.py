@@ -0,0 +1,132 @@
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from zeep.transports import Transport
+
+from core.utils.raw_archive import archive_response, is_replaying, replay_response, soap_call
+
+
+class IngestionMeter:
+    """
+    Потокобезопасный счётчик одного шага загрузки (банк + форма):
+    обращения к SOAP по методам, полученные байты, попадания в кэш, изменённые/неизменённые записи.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls: Counter[str] = Counter()
+        self.bytes_received = 0
+        self.cache_hits = 0
+        self.changed = 0
+        self.unchanged = 0
+        self.errors = 0
+
+    def record_call(self, method: str, nbytes: int, failed: bool = False) -> None:
+        with self._lock:
+            self.calls[method] += 1
+            self.bytes_received += nbytes
+            if failed:
+                self.errors += 1
+
+    def record_cache_hit(self, count: int = 1) -> None:
+        with self._lock:
+            self.cache_hits += count
+
+    def record_write(self, changed: bool) -> None:
+        with self._lock:
+            if changed:
+                self.changed += 1
+            else:
+                self.unchanged += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'soap_calls': dict(self.calls),
+                'bytes_received': self.bytes_received,
+                'cache_hits': self.cache_hits,
+                'changed': self.changed,
+                'unchanged': self.unchanged,
+                'errors': self.errors,
+            }
+
+
+_current_meter: ContextVar[IngestionMeter | None] = ContextVar('ingestion_meter', default=None)
+
+
+@contextmanager
+def metering(meter: IngestionMeter):
+    """
+    Делает meter текущим для кода внутри блока. Потоки ThreadPoolExecutor контекст не наследуют —
+    задачи нужно запускать через contextvars.copy_context().run.
+    """
+    token = _current_meter.set(meter)
+    try:
+        yield meter
+    finally:
+        _current_meter.reset(token)
+
+
+def current_meter() -> IngestionMeter | None:
+    return _current_meter.get()
+
+
+def record_cache_hit(count: int = 1) -> None:
+    meter = _current_meter.get()
+    if meter is not None and count:
+        meter.record_cache_hit(count)
+
+
+def record_write(changed: bool) -> None:
+    meter = _current_meter.get()
+    if meter is not None:
+        meter.record_write(changed)
+
+
+def _soap_method(headers: dict) -> str:
+    """Имя SOAP-метода из SOAPAction (SOAP 1.1) или action=... в Content-Type (SOAP 1.2)."""
+    action = headers.get('SOAPAction') or ''
+    if not action:
+        for part in (headers.get('Content-Type') or '').split(';'):
+            part = part.strip()
+            if part.startswith('action='):
+                action = part[len('action='):]
+    action = action.strip('"')
+    return action.rsplit('/', 1)[-1] if action else 'unknown'
+
+
+class MeteredTransport(Transport):
+    """
+    zeep Transport, который учитывает обращения к SOAP и объём ответов в текущем IngestionMeter
+    и архивирует сырые ответы (WSDL и тела SOAP) в MinIO. В режиме воспроизведения (raw_archive.replaying)
+    ответы берутся из архива без обращения к ЦБ.
+    """
+
+    def load(self, url):
+        if is_replaying():
+            return replay_response('document', 'load', {'url': url}, url).content
+        content = super().load(url)
+        archive_response('document', 'load', {'url': url}, url, content)
+        return content
+
+    def post_xml(self, address, envelope, headers):
+        call_method, call_args = soap_call(envelope)
+        if is_replaying():
+            return replay_response('soap', call_method, call_args, address)
+
+        meter = _current_meter.get()
+        method = _soap_method(headers)
+        try:
+            response = super().post_xml(address, envelope, headers)
+        except Exception:
+            if meter is not None:
+                meter.record_call(method, 0, failed=True)
+            raise
+        if meter is not None:
+            meter.record_call(method, len(response.content or b''), failed=response.status_code >= 400)
+        if response.status_code < 400:
+            archive_response('soap', call_method, call_args, address, response.content,
+                             response.headers.get('Content-Type'))
+        return response
@@ -0,0 +1,82 @@
+import logging
+from datetime import date
+
+from django.db import connection
+
+
+logger = logging.getLogger(__name__)
+
+# Секционированные таблицы (PostgreSQL, PARTITION BY RANGE) -> столбец-ключ секционирования.
+# Секции годовые: <таблица>_y<год> на [1 января; 1 января следующего года), плюс <таблица>_default для дат вне секций.
+PARTITIONED_TABLES = {
+    'indicators_bankindicatorvalue': 'report_date',
+}
+
+
+def partitioning_supported() -> bool:
+    return connection.vendor == 'postgresql'
+
+
+def partition_name(table: str, year: int) -> str:
+    return f'{table}_y{year}'
+
+
+def default_partition_name(table: str) -> str:
+    return f'{table}_default'
+
+
+def is_partitioned(table: str) -> bool:
+    if not partitioning_supported():
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+                       "WHERE c.relname = %s AND pg_table_is_visible(c.oid)", [table])
+        return cursor.fetchone() is not None
+
+
+def year_partitions(table: str) -> dict[int, str]:
+    """Присоединённые годовые секции таблицы: {год: имя секции}."""
+    prefix = f'{table}_y'
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT child.relname FROM pg_inherits i JOIN pg_class parent ON parent.oid = i.inhparent "
+                       "JOIN pg_class child ON child.oid = i.inhrelid "
+                       "WHERE parent.relname = %s AND pg_table_is_visible(parent.oid)", [table])
+        names = [row[0] for row in cursor.fetchall()]
+    return {int(name[len(prefix):]): name for name in names
+            if name.startswith(prefix) and name[len(prefix):].isdigit()}
+
+
+def create_year_partition(table: str, year: int) -> bool:
+    """Создаёт годовую секцию, если её ещё нет. Возвращает True, если секция создана."""
+    name = partition_name(table, year)
+    if year in year_partitions(table):
+        return False
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        # границы секции — литералы: параметры в DDL не поддерживаются
+        cursor.execute(f"CREATE TABLE {qn(name)} PARTITION OF {qn(table)} "
+                       f"FOR VALUES FROM ('{date(year, 1, 1)}') TO ('{date(year + 1, 1, 1)}')")
+    logger.info('Created partition %s', name)
+    return True
+
+
+def create_default_partition(table: str) -> None:
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE IF NOT EXISTS {qn(default_partition_name(table))} PARTITION OF {qn(table)} '
+                       f'DEFAULT')
+
+
+def detach_year_partition(table: str, year: int, drop: bool = False) -> str:
+    """
+    Отсоединяет годовую секцию от таблицы (дешёвая операция над метаданными, без перезаписи строк).
+    drop=True — отсоединённая секция удаляется, иначе остаётся отдельной таблицей (архив / ручной перенос).
+    """
+    name = partition_name(table, year)
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f'ALTER TABLE {qn(table)} DETACH PARTITION {qn(name)}')
+        if drop:
+            cursor.execute(f'DROP TABLE {qn(name)}')
+    logger.info('%s partition %s', 'Dropped' if drop else 'Detached', name)
+    return name
@@ -0,0 +1,166 @@
+import json
+import logging
+import struct
+import threading
+import time
+from typing import Any
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models
+
+
+logger = logging.getLogger(__name__)
+
+# Формат значения в bytea — первый байт определяет кодирование:
+#   b'J' + JSON (utf-8)                              — без сжатия (PAYLOAD_COMPRESSION=none или короткое тело)
+#   b'Z' + кадр zstd                                 — zstd без словаря
+#   b'D' + id словаря (4 байта, big-endian) + кадр   — zstd с общим словарём (CompressionDictionary)
+PLAIN, ZSTD, ZSTD_DICT = b'J', b'Z', b'D'
+NONE, ZSTD_MODE = 'none', 'zstd'
+
+_dicts: dict[int, Any] = {}
+_active_dict_id: int | None = None
+_active_dict_read_at = 0.0
+_dicts_lock = threading.Lock()
+
+
+def zstd_module():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImproperlyConfigured('Для PAYLOAD_COMPRESSION=zstd нужен пакет zstandard') from e
+    return zstandard
+
+
+def compression_mode() -> str:
+    return getattr(settings, 'PAYLOAD_COMPRESSION', NONE)
+
+
+def dump_json(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _load_dict(dict_id: int):
+    """Словарь по id (из CompressionDictionary, кэшируется в процессе на всё время работы)."""
+    zstd_dict = _dicts.get(dict_id)
+    if zstd_dict is None:
+        from core.models import CompressionDictionary
+
+        with _dicts_lock:
+            if dict_id not in _dicts:
+                row = CompressionDictionary.objects.get(dict_id=dict_id)
+                _dicts[dict_id] = zstd_module().ZstdCompressionDict(bytes(row.data))
+            zstd_dict = _dicts[dict_id]
+    return zstd_dict
+
+
+def active_dict():
+    """
+    Активный словарь для сжатия (или None). id активного словаря перечитывается из CompressionDictionary
+    не чаще раза в settings.PAYLOAD_COMPRESSION_DICT_TTL_SECONDS, поэтому новый словарь (train_payload_dictionary)
+    подхватывают уже запущенные воркеры; reset_dict_cache() — перечитать сразу.
+    """
+    global _active_dict_id, _active_dict_read_at
+    expired = time.monotonic() - _active_dict_read_at >= settings.PAYLOAD_COMPRESSION_DICT_TTL_SECONDS
+    if _active_dict_id is None or expired:
+        from core.models import CompressionDictionary
+
+        _active_dict_id = CompressionDictionary.objects.filter(is_active=True).values_list(
+                'dict_id', flat=True).first() or 0
+        _active_dict_read_at = time.monotonic()
+    return _load_dict(_active_dict_id) if _active_dict_id else None
+
+
+def reset_dict_cache() -> None:
+    global _active_dict_id
+    with _dicts_lock:
+        _dicts.clear()
+        _active_dict_id = None
+
+
+def register_dict(zstd_dict) -> None:
+    """Делает словарь доступным decode_payload без записи в CompressionDictionary (бенчмарк)."""
+    with _dicts_lock:
+        _dicts[zstd_dict.dict_id()] = zstd_dict
+
+
+def encode_payload(obj: Any, mode: str | None = None, zstd_dict=None, use_dict: bool = True,
+                   level: int | None = None) -> bytes:
+    """
+    Кодирует python-объект для CompressedJSONField. mode — 'none' или 'zstd' (по умолчанию
+    settings.PAYLOAD_COMPRESSION); тела короче PAYLOAD_COMPRESSION_MIN_BYTES не сжимаются.
+    zstd_dict — словарь сжатия (по умолчанию активный из CompressionDictionary); use_dict=False — без словаря.
+    level — уровень zstd (по умолчанию settings.PAYLOAD_COMPRESSION_LEVEL).
+    """
+    raw = dump_json(obj)
+    mode = mode or compression_mode()
+    if mode == NONE or len(raw) < settings.PAYLOAD_COMPRESSION_MIN_BYTES:
+        return PLAIN + raw
+    if mode != ZSTD_MODE:
+        raise ImproperlyConfigured(f'Неизвестный режим PAYLOAD_COMPRESSION: {mode}')
+
+    zstd = zstd_module()
+    if use_dict and zstd_dict is None:
+        zstd_dict = active_dict()
+    level = level if level is not None else settings.PAYLOAD_COMPRESSION_LEVEL
+    if not use_dict or zstd_dict is None:
+        return ZSTD + zstd.ZstdCompressor(level=level).compress(raw)
+    frame = zstd.ZstdCompressor(level=level, dict_data=zstd_dict).compress(raw)
+    return ZSTD_DICT + struct.pack('>I', zstd_dict.dict_id()) + frame
+
+
+def decode_payload(data: bytes | memoryview) -> Any:
+    """Обратное к encode_payload: формат определяется по первому байту, режим сжатия не важен."""
+    data = bytes(data)
+    header = data[:1]
+    if header == PLAIN:
+        return json.loads(data[1:])
+    if header == ZSTD:
+        return json.loads(zstd_module().ZstdDecompressor().decompress(data[1:]))
+    if header == ZSTD_DICT:
+        (dict_id,) = struct.unpack('>I', data[1:5])
+        return json.loads(zstd_module().ZstdDecompressor(dict_data=_load_dict(dict_id)).decompress(data[5:]))
+    raise ValueError(f'Неизвестный формат сохранённого payload: {header!r}')
+
+
+class CompressedJSONField(models.BinaryField):
+    """
+    JSON в столбце bytea: для кода модели — обычный python-объект (как JSONField), в БД — encode_payload
+    (без сжатия или zstd со словарём — по settings.PAYLOAD_COMPRESSION). Читаются значения любого формата,
+    поэтому режим можно включить в любой момент; старые строки пересжимает recompress_payloads.
+    """
+    description = 'JSON (bytea, опционально zstd)'
+
+    def from_db_value(self, value, expression, connection):
+        return None if value is None else decode_payload(value)
+
+    def to_python(self, value):
+        if isinstance(value, (bytes, memoryview)):
+            return decode_payload(value)
+        return value
+
+    def get_prep_value(self, value):
+        value = super(models.BinaryField, self).get_prep_value(value)
+        return None if value is None else encode_payload(value)
+
+    def value_to_string(self, obj):
+        return json.dumps(self.value_from_object(obj), ensure_ascii=False)
+
+
+def copy_field_values(app_label: str, model_name: str, source: str, target: str, batch_size: int = 500):
+    """Для миграций: RunPython, копирующий значения поля source в target (JSONField <-> CompressedJSONField)."""
+
+    def _copy(apps, schema_editor):
+        model = apps.get_model(app_label, model_name)
+        batch = []
+        for row in model.objects.only('pk', source).order_by('pk').iterator(chunk_size=batch_size):
+            setattr(row, target, getattr(row, source))
+            batch.append(row)
+            if len(batch) >= batch_size:
+                model.objects.bulk_update(batch, [target])
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, [target])
+
+    return _copy
@@ -0,0 +1,234 @@
+import atexit
+import gzip
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+import requests
+from django.conf import settings
+from requests.utils import get_encoding_from_headers
+
+from core.utils.hash_utils import canonical_obj_and_hash
+
+
+logger = logging.getLogger(__name__)
+
+# Сырые ответы ЦБ в MinIO (settings.RAW_ARCHIVE_BUCKET):
+#   raw/blobs/<sha256 тела>.gz — тело ответа (gzip); адресация по содержимому: одинаковые ответы хранятся один раз
+#   raw/index/<sha256 (вид, метод, аргументы)>.json — какой ответ последним получен на вызов
+BLOB_PREFIX = 'raw/blobs'
+INDEX_PREFIX = 'raw/index'
+
+ARCHIVE_MISS_MESSAGE = 'Ответ отсутствует в архиве'
+
+_replaying: ContextVar[bool] = ContextVar('raw_archive_replaying', default=False)
+_client = None
+_client_lock = threading.Lock()
+# Фоновая выгрузка: очередь и поток создаются лениво в каждом процессе (воркеры Celery — форки родителя)
+_uploads: queue.Queue | None = None
+_uploader_pid: int | None = None
+_uploader_lock = threading.Lock()
+# После ошибки выгрузки архив считается недоступным до этого момента (time.monotonic), ответы не копятся
+_unavailable_until = 0.0
+
+
+class ArchiveMiss(Exception):
+    """В режиме воспроизведения запрошенного вызова нет в архиве (обращения к ЦБ не выполняются)."""
+
+
+@contextmanager
+def replaying():
+    """
+    Внутри блока обращения к ЦБ (SOAP через MeteredTransport и REST через ArchivingSession) не выполняются:
+    ответы берутся из архива. Потоки ThreadPoolExecutor контекст не наследуют — задачи нужно запускать
+    через contextvars.copy_context().run.
+    """
+    token = _replaying.set(True)
+    try:
+        yield
+    finally:
+        _replaying.reset(token)
+
+
+def is_replaying() -> bool:
+    return _replaying.get()
+
+
+def archive_enabled() -> bool:
+    return bool(getattr(settings, 'RAW_ARCHIVE_ENABLED', False))
+
+
+def request_key(kind: str, method: str, args: dict) -> str:
+    """sha256 канонического представления вызова: вид (soap / rest / document), метод и аргументы."""
+    _, digest = canonical_obj_and_hash({'kind': kind, 'method': method, 'args': args})
+    return digest
+
+
+def _get_client():
+    """
+    Клиент MinIO с короткими таймаутами и без повторов (settings.RAW_ARCHIVE_TIMEOUT_SECONDS): недоступный архив
+    не должен задерживать ни выгрузку, ни воспроизведение. Если бакет недоступен, клиент не запоминается.
+    """
+    global _client
+    if _client is None:
+        from core.helpers.minio import ensure_bucket_exists, get_s3_client
+
+        with _client_lock:
+            if _client is None:
+                timeout = settings.RAW_ARCHIVE_TIMEOUT_SECONDS
+                client = get_s3_client(connect_timeout=timeout, read_timeout=timeout, retries={'max_attempts': 1})
+                if not ensure_bucket_exists(settings.RAW_ARCHIVE_BUCKET, client=client):
+                    raise RuntimeError(f'Raw archive bucket {settings.RAW_ARCHIVE_BUCKET} is unavailable')
+                _client = client
+    return _client
+
+
+def _blob_exists(client, key: str) -> bool:
+    try:
+        client.head_object(Bucket=settings.RAW_ARCHIVE_BUCKET, Key=key)
+        return True
+    except Exception:
+        return False
+
+
+def _write_response(kind: str, method: str, args: dict, url: str, body: bytes, content_type: str | None) -> None:
+    client = _get_client()
+    body_sha256 = hashlib.sha256(body).hexdigest()
+    blob_key = f'{BLOB_PREFIX}/{body_sha256}.gz'
+    if not _blob_exists(client, blob_key):
+        client.put_object(Bucket=settings.RAW_ARCHIVE_BUCKET, Key=blob_key, Body=gzip.compress(body),
+                          ContentType='application/gzip')
+    index = {'kind': kind, 'method': method, 'args': canonical_obj_and_hash(args)[0], 'url': url,
+             'body_sha256': body_sha256, 'content_type': content_type or '', 'size': len(body)}
+    client.put_object(Bucket=settings.RAW_ARCHIVE_BUCKET,
+                      Key=f'{INDEX_PREFIX}/{request_key(kind, method, args)}.json',
+                      Body=json.dumps(index, ensure_ascii=False).encode('utf-8'), ContentType='application/json')
+
+
+def _archive_unavailable() -> bool:
+    return time.monotonic() < _unavailable_until
+
+
+def _upload_loop(uploads: queue.Queue) -> None:
+    global _unavailable_until
+    while True:
+        item = uploads.get()
+        try:
+            if not _archive_unavailable():
+                _write_response(*item)
+        except Exception as e:
+            _unavailable_until = time.monotonic() + settings.RAW_ARCHIVE_COOLDOWN_SECONDS
+            logger.warning('Raw archive write failed for %s %s, archiving paused for %ss: %s',
+                           item[0], item[1], settings.RAW_ARCHIVE_COOLDOWN_SECONDS, e)
+        finally:
+            uploads.task_done()
+
+
+def _get_uploads() -> queue.Queue:
+    global _uploads, _uploader_pid
+    if _uploader_pid != os.getpid():
+        with _uploader_lock:
+            if _uploader_pid != os.getpid():
+                _uploads = queue.Queue(maxsize=settings.RAW_ARCHIVE_QUEUE_SIZE)
+                threading.Thread(target=_upload_loop, args=(_uploads,), name='raw-archive-upload',
+                                 daemon=True).start()
+                _uploader_pid = os.getpid()
+    return _uploads
+
+
+def flush_archive(timeout: float | None = None) -> bool:
+    """Ждёт выгрузки поставленных ответов (не дольше timeout секунд). True — очередь пуста."""
+    uploads = _uploads if _uploader_pid == os.getpid() else None
+    if uploads is None:
+        return True
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while uploads.unfinished_tasks:
+        if deadline is not None and time.monotonic() >= deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+@atexit.register
+def _flush_on_exit() -> None:
+    # короткие процессы (команды manage.py) не должны терять последние ответы
+    if not flush_archive(timeout=settings.RAW_ARCHIVE_TIMEOUT_SECONDS * 3):
+        logger.warning('Raw archive: pending uploads dropped on exit')
+
+
+def archive_response(kind: str, method: str, args: dict, url: str, body: bytes,
+                     content_type: str | None = None) -> None:
+    """
+    Ставит сырое тело ответа в очередь фоновой выгрузки в архив и сразу возвращает управление: обращения к MinIO
+    не задерживают загрузку. После ошибки выгрузки архив пропускается settings.RAW_ARCHIVE_COOLDOWN_SECONDS секунд;
+    при переполненной очереди (settings.RAW_ARCHIVE_QUEUE_SIZE) ответ не архивируется. Ошибки только логируются.
+    В режиме воспроизведения и при RAW_ARCHIVE_ENABLED=0 ничего не делает.
+    """
+    if not archive_enabled() or is_replaying() or body is None or _archive_unavailable():
+        return
+    try:
+        _get_uploads().put_nowait((kind, method, args, url, body, content_type))
+    except queue.Full:
+        logger.warning('Raw archive queue is full, response for %s %s not archived', kind, method)
+
+
+def load_response(kind: str, method: str, args: dict) -> tuple[bytes, str]:
+    """Возвращает (тело, content-type) последнего ответа на вызов из архива. Нет в архиве — ArchiveMiss."""
+    try:
+        client = _get_client()
+        raw_index = client.get_object(Bucket=settings.RAW_ARCHIVE_BUCKET,
+                                      Key=f'{INDEX_PREFIX}/{request_key(kind, method, args)}.json')['Body'].read()
+        index = json.loads(raw_index)
+        blob = client.get_object(Bucket=settings.RAW_ARCHIVE_BUCKET,
+                                 Key=f'{BLOB_PREFIX}/{index["body_sha256"]}.gz')['Body'].read()
+    except Exception as e:
+        raise ArchiveMiss(f'{ARCHIVE_MISS_MESSAGE}: {kind} {method} {args}') from e
+    return gzip.decompress(blob), index.get('content_type') or ''
+
+
+def replay_response(kind: str, method: str, args: dict, url: str) -> requests.Response:
+    """Ответ из архива в виде requests.Response (его разбирают zeep и парсеры REST как обычный ответ)."""
+    body, content_type = load_response(kind, method, args)
+    response = requests.Response()
+    response.status_code = 200
+    response._content = body
+    response.url = url
+    if content_type:
+        response.headers['Content-Type'] = content_type
+    response.encoding = get_encoding_from_headers(response.headers)
+    return response
+
+
+def _local_name(tag: Any) -> str:
+    tag = str(tag)
+    return tag.split('}', 1)[1] if tag.startswith('{') else tag
+
+
+def soap_call(envelope) -> tuple[str, dict]:
+    """(метод, аргументы) SOAP-вызова по конверту zeep: первый элемент Body и его дочерние элементы."""
+    body = next((el for el in envelope if _local_name(el.tag) == 'Body'), None)
+    operation = body[0] if body is not None and len(body) else None
+    if operation is None:
+        return 'unknown', {}
+    return _local_name(operation.tag), {_local_name(arg.tag): arg.text for arg in operation}
+
+
+class ArchivingSession(requests.Session):
+    """requests.Session для REST API ЦБ: архивирует успешные ответы, а в режиме воспроизведения отдаёт их из архива."""
+
+    def request(self, method, url, params=None, data=None, headers=None, json=None, **kwargs):
+        args = {'url': url, 'params': params or {}, 'data': data, 'json': json}
+        if is_replaying():
+            return replay_response('rest', method.upper(), args, url)
+        response = super().request(method, url, params=params, data=data, headers=headers, json=json, **kwargs)
+        if response.status_code < 400:
+            archive_response('rest', method.upper(), args, response.url, response.content,
+                             response.headers.get('Content-Type'))
+        return response
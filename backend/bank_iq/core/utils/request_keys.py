@@ -0,0 +1,70 @@
+from datetime import datetime
+
+from django.db.models import Count, F
+
+from core.utils.hash_utils import canonical_obj_and_hash
+
+
+# request_key — sha256 нормализованных параметров запроса к ЦБ. Один уникальный столбец вместо составных
+# unique_together с nullable-полями (NULL не участвует в уникальности): все поиски, get_or_create и upsert
+# запросов идут по нему. Отсутствующий параметр входит в ключ явно как None.
+
+
+def _key(kind: str, params: dict) -> str:
+    _, digest = canonical_obj_and_hash({'kind': kind, **params})
+    return digest
+
+
+def dates_request_key(bank_id: int, form_type_id: int | None, reg_number: int) -> str:
+    return _key('dates', {'bank': bank_id, 'form_type': form_type_id, 'reg_number': reg_number})
+
+
+def indicators_request_key(bank_id: int, form_type_id: int | None, reg_number: int, dt: datetime | None) -> str:
+    return _key('indicators', {'bank': bank_id, 'form_type': form_type_id, 'reg_number': reg_number, 'dt': dt})
+
+
+def indicator_data_request_key(bank_id: int, form_type_id: int | None, reg_number: int,
+                               ind_code: str | None = None, date_from: datetime | None = None,
+                               date_to: datetime | None = None, dt: datetime | None = None) -> str:
+    return _key('indicator_data', {
+        'bank': bank_id, 'form_type': form_type_id, 'reg_number': reg_number,
+        'ind_code': None if ind_code is None else str(ind_code),
+        'date_from': date_from, 'date_to': date_to, 'dt': dt,
+    })
+
+
+def rates_request_key(rate_type: str, publication_id: int | None, dataset_id: int | None,
+                      measure_id: int | None, from_year: int | None = None, to_year: int | None = None) -> str:
+    """Проверка параметров (params_check) ключуется без годов, загрузка ставок — с подпериодом."""
+    return _key('rates', {
+        'rate_type': str(rate_type), 'publication_id': publication_id, 'dataset_id': dataset_id,
+        'measure_id': measure_id, 'from_year': from_year, 'to_year': to_year,
+    })
+
+
+def fill_request_keys(app_label: str, model_name: str, fields: tuple[str, ...], key_of, batch_size: int = 1000):
+    """
+    Для миграций: RunPython, заполняющий request_key существующих запросов (key_of(row) по значениям fields).
+    Дубликаты с одинаковым ключом, которые пропускал unique_together с NULL-полями, удаляются: остаётся запрос
+    с ответом, обновлённый последним.
+    """
+
+    def _fill(apps, schema_editor):
+        model = apps.get_model(app_label, model_name)
+        batch = []
+        for row in model.objects.order_by('pk').values('pk', *fields).iterator(chunk_size=batch_size):
+            batch.append(model(pk=row['pk'], request_key=key_of(row)))
+            if len(batch) >= batch_size:
+                model.objects.bulk_update(batch, ['request_key'])
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, ['request_key'])
+
+        duplicated = (model.objects.values('request_key').annotate(n=Count('pk')).filter(n__gt=1)
+                      .values_list('request_key', flat=True))
+        for request_key in list(duplicated):
+            pks = list(model.objects.filter(request_key=request_key).order_by(
+                    F('response').desc(nulls_last=True), '-updated_at', '-pk').values_list('pk', flat=True))
+            model.objects.filter(pk__in=pks[1:]).delete()
+
+    return _fill
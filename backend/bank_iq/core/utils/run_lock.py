@@ -0,0 +1,86 @@
+import logging
+import threading
+import uuid
+
+from django.core.cache import cache
+
+
+logger = logging.getLogger(__name__)
+
+
+class RunLock:
+    """
+    Распределённая блокировка запуска на общем кэше (Redis) с арендой (lease) и heartbeat.
+
+    - acquire() — cache.add(key, {owner, token}, lease): удаётся, только если ключа нет. Повторный захват тем же
+      владельцем (повторная доставка той же задачи Celery) не считается успешным: ключ живёт, пока heartbeat
+      прежнего держателя продлевает аренду, и исчезает только после её истечения;
+    - пока блокировка удерживается, фоновый поток продлевает аренду каждые lease/3 секунд;
+    - refresh()/release() сверяют token захвата, а не только owner, поэтому копия той же задачи
+      не продлит и не снимет чужую блокировку;
+    - если процесс умер, аренда истекает сама и следующий запуск может захватить блокировку.
+
+    С локальным кэшем процесса (без CACHE_REDIS_URL) блокировка действует только внутри процесса.
+    """
+
+    def __init__(self, name: str, owner: str, lease_seconds: int = 600):
+        self.key = f'locks:run:{name}'
+        self.owner = owner
+        self.token = uuid.uuid4().hex
+        self.lease_seconds = int(lease_seconds)
+        self.acquired = False
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def holder(self) -> str | None:
+        value = cache.get(self.key)
+        return value.get('owner') if isinstance(value, dict) else value
+
+    def _is_ours(self) -> bool:
+        value = cache.get(self.key)
+        return isinstance(value, dict) and value.get('token') == self.token
+
+    def acquire(self) -> bool:
+        if cache.add(self.key, {'owner': self.owner, 'token': self.token}, timeout=self.lease_seconds):
+            self.acquired = True
+            self._start_heartbeat()
+        return self.acquired
+
+    def refresh(self) -> bool:
+        """Продлевает аренду, если блокировка всё ещё наша."""
+        if not self._is_ours():
+            return False
+        return cache.touch(self.key, timeout=self.lease_seconds)
+
+    def release(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        if self.acquired and self._is_ours():
+            cache.delete(self.key)
+        self.acquired = False
+
+    def _start_heartbeat(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._heartbeat, name=f'heartbeat:{self.key}', daemon=True)
+        self._thread.start()
+
+    def _heartbeat(self) -> None:
+        interval = max(self.lease_seconds / 3, 1)
+        while not self._stop.wait(interval):
+            try:
+                if not self.refresh():
+                    self.lost = True
+                    logger.warning('Run lock %s lost by %s (lease expired)', self.key, self.owner)
+                    return
+            except Exception as e:
+                logger.warning('Run lock %s heartbeat failed: %s', self.key, e)
+
+    def __enter__(self) -> 'RunLock':
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
@@ -0,0 +1,25 @@
+import threading
+import time
+
+
+class Throttle:
+    """
+    Простой потокобезопасный ограничитель частоты обращений к внешнему API.
+    Гарантирует, что между двумя вызовами wait() пройдёт не меньше min_interval секунд
+    (для всех потоков процесса суммарно). При min_interval <= 0 ничего не делает.
+    """
+
+    def __init__(self, min_interval: float = 0.0):
+        self.min_interval = max(float(min_interval or 0), 0.0)
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def wait(self) -> None:
+        if self.min_interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            sleep_for = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.min_interval
+        if sleep_for > 0:
+            time.sleep(sleep_for)
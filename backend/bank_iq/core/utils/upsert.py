@@ -0,0 +1,55 @@
+from typing import Any
+
+from django.db import connections, models, router, transaction
+from django.utils import timezone
+
+
+def upsert_if_hash_changed(model: type[models.Model], conflict_field: str, values: dict[str, Any],
+                           hash_field: str = 'data_hash') -> bool:
+    """
+    Одна инструкция без блокировок:
+        INSERT ... ON CONFLICT (conflict_field) DO UPDATE SET ...
+        WHERE <table>.data_hash IS NULL OR <table>.data_hash <> EXCLUDED.data_hash
+    created_at/updated_at проставляются автоматически (created_at при обновлении не меняется).
+    values — значения по именам полей модели (для FK допускается attname, например 'request_id').
+    Возвращает True, если строка была вставлена или обновлена (хэш отличался).
+    Для СУБД без ON CONFLICT (не PostgreSQL/SQLite) используется update_or_create в транзакции.
+    """
+    connection = connections[router.db_for_write(model)]
+    now = timezone.now()
+    values = {**values, 'created_at': now, 'updated_at': now}
+
+    if connection.vendor not in ('postgresql', 'sqlite'):
+        lookup = {conflict_field: values.pop(conflict_field)}
+        values.pop('created_at')
+        with transaction.atomic(using=connection.alias):
+            obj, created = model.objects.select_for_update().get_or_create(**lookup, defaults=values)
+            if created:
+                return True
+            if getattr(obj, hash_field) == values[hash_field]:
+                return False
+            for name, value in values.items():
+                setattr(obj, name, value)
+            obj.save()
+        return True
+
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    columns, params = [], []
+    for name, value in values.items():
+        field = model._meta.get_field(name)
+        columns.append(field.column)
+        params.append(field.get_db_prep_save(value, connection))
+
+    conflict_column = model._meta.get_field(conflict_field).column
+    hash_column = qn(model._meta.get_field(hash_field).column)
+    updates = ', '.join(f'{qn(c)} = EXCLUDED.{qn(c)}' for c in columns if c not in (conflict_column, 'created_at'))
+    sql = (
+        f'INSERT INTO {table} ({", ".join(qn(c) for c in columns)}) '
+        f'VALUES ({", ".join(["%s"] * len(columns))}) '
+        f'ON CONFLICT ({qn(conflict_column)}) DO UPDATE SET {updates} '
+        f'WHERE {table}.{hash_column} IS NULL OR {table}.{hash_column} <> EXCLUDED.{hash_column}'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount > 0
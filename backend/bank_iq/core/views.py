@@ -0,0 +1,199 @@
+from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
+from rest_framework import generics, permissions
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.helpers.deadletter_functions import _failed_fetch_stats
+from core.helpers.planner_functions import _plan_bank_ingestion, _plan_reports_ingestion
+from .models import FailedFetch, IngestionRun, IngestionRunItem
+from .serializers import (FailedFetchSerializer, IngestionPlanQuerySerializer, IngestionRunDetailSerializer, IngestionRunItemSerializer,
+                          IngestionRunSerializer)
+
+
+@extend_schema(
+        summary="Журнал запусков загрузки данных ЦБ",
+        description=(
+                "Список запусков загрузки SOAP-форм (от новых к старым) с итоговыми метриками: длительность, "
+                "обращения к SOAP по методам, полученные байты, попадания в кэш, изменённые/неизменённые записи.\n\n"
+                "Фильтры: `mode` (incremental / backfill), `status` (running / success / failed).\n\n"
+                "Доступно только администраторам."
+        ),
+        parameters=[
+            OpenApiParameter(name='mode', type=str, required=False, description='Режим загрузки'),
+            OpenApiParameter(name='status', type=str, required=False, description='Статус запуска'),
+        ],
+        responses={
+            200: IngestionRunSerializer(many=True),
+            401: OpenApiResponse(description="Unauthorized"),
+            403: OpenApiResponse(description="Forbidden"),
+        },
+)
+class IngestionRunListAPIView(generics.ListAPIView):
+    serializer_class = IngestionRunSerializer
+    permission_classes = (permissions.IsAdminUser,)
+    pagination_class = LimitOffsetPagination
+
+    def get_queryset(self):
+        qs = IngestionRun.objects.all()
+        for param in ('mode', 'status'):
+            value = self.request.query_params.get(param)
+            if value:
+                qs = qs.filter(**{param: value})
+        return qs
+
+
+@extend_schema(
+        summary="Запуск загрузки данных ЦБ",
+        description=(
+                "Метрики одного запуска: итоги, разбивка по формам (`phases`) и самые долгие шаги "
+                "банк + форма (`slowest`).\n\nДоступно только администраторам."
+        ),
+        responses={
+            200: IngestionRunDetailSerializer,
+            401: OpenApiResponse(description="Unauthorized"),
+            403: OpenApiResponse(description="Forbidden"),
+            404: OpenApiResponse(description="Запуск не найден"),
+        },
+)
+class IngestionRunDetailAPIView(generics.RetrieveAPIView):
+    queryset = IngestionRun.objects.prefetch_related('items')
+    serializer_class = IngestionRunDetailSerializer
+    permission_classes = (permissions.IsAdminUser,)
+
+
+@extend_schema(
+        summary="Шаги запуска загрузки (банк + форма)",
+        description=(
+                "Метрики по каждому банку и форме в рамках запуска, от самых долгих к быстрым.\n\n"
+                "Фильтры: `form_type` (F101 / F123 / F810 / F813), `reg_number`.\n\nДоступно только администраторам."
+        ),
+        parameters=[
+            OpenApiParameter(name='form_type', type=str, required=False, description='Код формы'),
+            OpenApiParameter(name='reg_number', type=int, required=False, description='Рег. номер банка'),
+        ],
+        responses={
+            200: IngestionRunItemSerializer(many=True),
+            401: OpenApiResponse(description="Unauthorized"),
+            403: OpenApiResponse(description="Forbidden"),
+        },
+)
+class IngestionRunItemsAPIView(generics.ListAPIView):
+    serializer_class = IngestionRunItemSerializer
+    permission_classes = (permissions.IsAdminUser,)
+    pagination_class = LimitOffsetPagination
+
+    def get_queryset(self):
+        qs = IngestionRunItem.objects.filter(run_id=self.kwargs['pk']).order_by('-wall_seconds')
+        for param in ('form_type', 'reg_number'):
+            value = self.request.query_params.get(param)
+            if value:
+                qs = qs.filter(**{param: value})
+        return qs
+
+
+class IngestionPlanAPIView(APIView):
+    permission_classes = (permissions.IsAdminUser,)
+
+    @extend_schema(
+            summary="План загрузки данных ЦБ (dry-run)",
+            description=(
+                    "Оценка запуска без обращений к ЦБ РФ: по банкам, отчётным датам и ответам, уже сохранённым "
+                    "в БД, считает число вызовов SOAP/REST, записей в БД, пропускаемых (сохранённых) дат и "
+                    "примерную длительность. Стоимость вызова берётся из журнала последних запусков режима, "
+                    "а если их нет — из `INGESTION_PLAN_CALL_SECONDS`.\n\n"
+                    "`task=banks` — `update_all_bank_api_info` (разбивка по формам и самые дорогие банки), "
+                    "`task=reports` — `update_all_reports_api_info`.\n\n"
+                    "Списки передаются через запятую: `?reg_numbers=1481,2673&forms=F101,F123`.\n\n"
+                    "Доступно только администраторам."
+            ),
+            parameters=[
+                OpenApiParameter(name='task', type=str, required=False, enum=IngestionPlanQuerySerializer.TASK_CHOICES,
+                                 description='Загрузка: banks (по умолчанию) или reports'),
+                OpenApiParameter(name='mode', type=str, required=False, enum=IngestionPlanQuerySerializer.MODE_CHOICES,
+                                 description='Режим загрузки банков (по умолчанию incremental)'),
+                OpenApiParameter(name='reg_numbers', type=str, required=False,
+                                 description='Рег. номера банков через запятую'),
+                OpenApiParameter(name='forms', type=str, required=False, description='Формы через запятую'),
+                OpenApiParameter(name='top', type=int, required=False,
+                                 description='Сколько самых дорогих банков вернуть (по умолчанию 20)'),
+            ],
+            responses={
+                200: OpenApiResponse(description="План запуска: totals, per_form / per_rate_type, per_bank, "
+                                                 "assumptions."),
+                400: OpenApiResponse(description="Ошибка валидации параметров."),
+                401: OpenApiResponse(description="Unauthorized"),
+                403: OpenApiResponse(description="Forbidden"),
+            },
+    )
+    def get(self, request: Request, *args, **kwargs) -> Response:
+        data = {key: value for key, value in request.query_params.items()}
+        for key in ('reg_numbers', 'forms'):
+            if key in data:
+                data[key] = [v.strip() for v in data[key].split(',') if v.strip()]
+        in_serializer = IngestionPlanQuerySerializer(data=data)
+        in_serializer.is_valid(raise_exception=True)
+        params = in_serializer.validated_data
+
+        if params['task'] == 'reports':
+            return Response(_plan_reports_ingestion())
+        return Response(_plan_bank_ingestion(mode=params['mode'], reg_numbers=params.get('reg_numbers'),
+                                             forms=params.get('forms'), top=params['top']))
+
+
+@extend_schema(
+        summary="Сбойные обращения к ЦБ (dead-letter)",
+        description=(
+                "Единицы работы, которые не удалось загрузить: дата F810/F123/F101, раздел F813 на дату, "
+                "список дат формы, диапазон индикатора F101, подпериод ставок. Задача `redrive_failed_fetches` повторяет их каждые 5 минут "
+                "с экспоненциальной задержкой.\n\n"
+                "Фильтры: `status` (pending / resolved / abandoned), `source`, `stage`, `error_class`, "
+                "`reg_number`.\n\nДоступно только администраторам."
+        ),
+        parameters=[
+            OpenApiParameter(name='status', type=str, required=False, description='Статус'),
+            OpenApiParameter(name='source', type=str, required=False, description='Форма или тип ставок'),
+            OpenApiParameter(name='stage', type=str, required=False, description='Единица работы'),
+            OpenApiParameter(name='error_class', type=str, required=False, description='Класс ошибки'),
+            OpenApiParameter(name='reg_number', type=int, required=False, description='Рег. номер банка'),
+        ],
+        responses={
+            200: FailedFetchSerializer(many=True),
+            401: OpenApiResponse(description="Unauthorized"),
+            403: OpenApiResponse(description="Forbidden"),
+        },
+)
+class FailedFetchListAPIView(generics.ListAPIView):
+    serializer_class = FailedFetchSerializer
+    permission_classes = (permissions.IsAdminUser,)
+    pagination_class = LimitOffsetPagination
+
+    def get_queryset(self):
+        qs = FailedFetch.objects.all()
+        for param in ('status', 'source', 'stage', 'error_class', 'reg_number'):
+            value = self.request.query_params.get(param)
+            if value:
+                qs = qs.filter(**{param: value})
+        return qs
+
+
+class FailedFetchStatsAPIView(APIView):
+    permission_classes = (permissions.IsAdminUser,)
+
+    @extend_schema(
+            summary="Счётчики сбойных обращений к ЦБ",
+            description=(
+                    "Число записей FailedFetch по статусам, а среди ожидающих повтора — по источникам и классам "
+                    "ошибок; `next_attempt_at` — ближайшая запланированная попытка.\n\n"
+                    "Доступно только администраторам."
+            ),
+            responses={
+                200: OpenApiResponse(description="by_status, pending_by_source, pending_by_error_class, "
+                                                 "next_attempt_at."),
+                401: OpenApiResponse(description="Unauthorized"),
+                403: OpenApiResponse(description="Forbidden"),
+            },
+    )
+    def get(self, request: Request, *args, **kwargs) -> Response:
+        return Response(_failed_fetch_stats())
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('banks', '0005_bank_dormant_since_bank_idle_periods_and_more'),
+        ('indicators', '0002_bankindicatordataresponse_data_hash_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankIndicatorValue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ind_code', models.CharField(help_text='Код индикатора (numsc / IndCode)', max_length=32)),
+                ('report_date', models.DateTimeField(help_text='Отчётная дата (обычно первый день месяца)')),
+                ('pln', models.CharField(blank=True, default='', help_text='Глава плана счетов: А, Б, В, Г, Д', max_length=4)),
+                ('ap', models.SmallIntegerField(help_text='Сторона: 1 — актив, 2 — пассив')),
+                ('vitg', models.DecimalField(decimal_places=4, help_text='Входящие остатки, итого, тыс. руб.', max_digits=24)),
+                ('iitg', models.DecimalField(decimal_places=4, help_text='Исходящие остатки, итого, тыс. руб.', max_digits=24)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('bank', models.ForeignKey(help_text='FK -> Bank', on_delete=django.db.models.deletion.CASCADE, related_name='indicator_values', to='banks.bank')),
+                ('form_type', models.ForeignKey(help_text='FK -> FormType', on_delete=django.db.models.deletion.CASCADE, to='indicators.formtype')),
+            ],
+            options={
+                'ordering': ('report_date',),
+                'indexes': [models.Index(fields=['form_type', 'ind_code', 'report_date'], name='indicators__form_ty_88a77e_idx')],
+                'unique_together': {('bank', 'form_type', 'ind_code', 'report_date', 'pln', 'ap')},
+            },
+        ),
+    ]
@@ -0,0 +1,96 @@
+from django.conf import settings
+from django.db import migrations
+from django.utils import timezone
+
+from core.utils.partitions import create_default_partition, create_year_partition
+
+
+TABLE = 'indicators_bankindicatorvalue'
+COLUMNS = 'id, ind_code, report_date, pln, ap, vitg, iitg, updated_at, created_at, bank_id, form_type_id'
+
+
+def _rename_aside(cursor, table: str, new_table: str) -> None:
+    """Переименовывает таблицу вместе с её индексами и последовательностью id, освобождая имена для новой."""
+    cursor.execute('SELECT pg_get_serial_sequence(%s, %s)', [table, 'id'])
+    sequence = cursor.fetchone()[0]
+    cursor.execute('SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid '
+                   'WHERE i.indrelid = %s::regclass', [table])
+    for (index,) in cursor.fetchall():
+        cursor.execute(f'ALTER INDEX "{index}" RENAME TO "{index[:58]}_old"')
+    cursor.execute(f'ALTER TABLE "{table}" RENAME TO "{new_table}"')
+    if sequence:
+        cursor.execute(f'ALTER SEQUENCE {sequence} RENAME TO "{TABLE}_id_seq_old"')
+
+
+def _add_keys(cursor) -> None:
+    cursor.execute(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{TABLE}_bank_id_fk_banks_bank_id" '
+                   f'FOREIGN KEY (bank_id) REFERENCES banks_bank (id) DEFERRABLE INITIALLY DEFERRED')
+    cursor.execute(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{TABLE}_form_type_id_fk_indicators_formtype_id" '
+                   f'FOREIGN KEY (form_type_id) REFERENCES indicators_formtype (id) DEFERRABLE INITIALLY DEFERRED')
+    cursor.execute(f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{TABLE}_value_key_uniq" '
+                   f'UNIQUE (bank_id, form_type_id, ind_code, report_date, pln, ap)')
+    cursor.execute(f'CREATE INDEX "indicators__form_ty_88a77e_idx" ON "{TABLE}" (form_type_id, ind_code, report_date)')
+
+
+def partition_table(apps, schema_editor):
+    """
+    PostgreSQL: BankIndicatorValue становится секционированной по report_date таблицей (годовые секции
+    с INDICATOR_PARTITIONS_START_YEAR до текущего года + INDICATOR_PARTITIONS_AHEAD_YEARS и секция по умолчанию).
+    Первичный ключ секционированной таблицы обязан включать ключ секционирования — (id, report_date).
+    На остальных СУБД миграция ничего не делает.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        _rename_aside(cursor, TABLE, f'{TABLE}_heap')
+        cursor.execute(f'''
+            CREATE TABLE "{TABLE}" (
+                id bigserial NOT NULL,
+                ind_code varchar(32) NOT NULL,
+                report_date timestamp NOT NULL,
+                pln varchar(4) NOT NULL,
+                ap smallint NOT NULL,
+                vitg numeric(24, 4) NOT NULL,
+                iitg numeric(24, 4) NOT NULL,
+                updated_at timestamp NOT NULL,
+                created_at timestamp NOT NULL,
+                bank_id bigint NOT NULL,
+                form_type_id bigint NOT NULL,
+                CONSTRAINT "{TABLE}_pkey" PRIMARY KEY (id, report_date)
+            ) PARTITION BY RANGE (report_date)
+        ''')
+        for year in range(settings.INDICATOR_PARTITIONS_START_YEAR,
+                          timezone.now().year + settings.INDICATOR_PARTITIONS_AHEAD_YEARS + 1):
+            create_year_partition(TABLE, year)
+        create_default_partition(TABLE)
+
+        cursor.execute(f'INSERT INTO "{TABLE}" ({COLUMNS}) SELECT {COLUMNS} FROM "{TABLE}_heap"')
+        cursor.execute(f'DROP TABLE "{TABLE}_heap"')
+        cursor.execute(f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), "
+                       f"COALESCE((SELECT MAX(id) FROM \"{TABLE}\"), 0) + 1, false)")
+        _add_keys(cursor)
+
+
+def unpartition_table(apps, schema_editor):
+    """Обратно в обычную таблицу: схема создаётся по модели, строки переносятся из секций."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        _rename_aside(cursor, TABLE, f'{TABLE}_partitioned')
+    schema_editor.create_model(apps.get_model('indicators', 'BankIndicatorValue'))
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'INSERT INTO "{TABLE}" ({COLUMNS}) SELECT {COLUMNS} FROM "{TABLE}_partitioned"')
+        cursor.execute(f'DROP TABLE "{TABLE}_partitioned" CASCADE')
+        cursor.execute(f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), "
+                       f"COALESCE((SELECT MAX(id) FROM \"{TABLE}\"), 0) + 1, false)")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('indicators', '0003_bankindicatorvalue'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_table, unpartition_table),
+    ]
@@ -0,0 +1,84 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+from core.utils.hash_utils import canonical_obj_and_hash
+
+
+BATCH_SIZE = 500
+
+
+def move_payloads(apps, schema_editor):
+    """Переносит bank_indicator_data в IndicatorPayload: одинаковые тела (по sha256) сохраняются один раз."""
+    IndicatorPayload = apps.get_model('indicators', 'IndicatorPayload')
+    BankIndicatorDataResponse = apps.get_model('indicators', 'BankIndicatorDataResponse')
+
+    def _flush(batch, payloads):
+        IndicatorPayload.objects.bulk_create([IndicatorPayload(data_hash=data_hash, payload=obj)
+                                              for data_hash, obj in payloads.items()], ignore_conflicts=True)
+        BankIndicatorDataResponse.objects.bulk_update(batch, ['payload', 'data_hash'])
+
+    batch, payloads = [], {}
+    qs = BankIndicatorDataResponse.objects.only('pk', 'bank_indicator_data', 'data_hash').order_by('pk')
+    for response in qs.iterator(chunk_size=BATCH_SIZE):
+        canonical_obj, data_hash = canonical_obj_and_hash(response.bank_indicator_data)
+        payloads[data_hash] = canonical_obj
+        response.payload_id = response.data_hash = data_hash
+        batch.append(response)
+        if len(batch) >= BATCH_SIZE:
+            _flush(batch, payloads)
+            batch, payloads = [], {}
+    if batch:
+        _flush(batch, payloads)
+
+
+def restore_payloads(apps, schema_editor):
+    BankIndicatorDataResponse = apps.get_model('indicators', 'BankIndicatorDataResponse')
+
+    batch = []
+    for response in BankIndicatorDataResponse.objects.select_related('payload').order_by('pk').iterator(
+            chunk_size=BATCH_SIZE):
+        response.bank_indicator_data = response.payload.payload
+        batch.append(response)
+        if len(batch) >= BATCH_SIZE:
+            BankIndicatorDataResponse.objects.bulk_update(batch, ['bank_indicator_data'])
+            batch = []
+    if batch:
+        BankIndicatorDataResponse.objects.bulk_update(batch, ['bank_indicator_data'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('indicators', '0004_partition_bankindicatorvalue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndicatorPayload',
+            fields=[
+                ('data_hash', models.CharField(help_text='sha256 канонического представления payload', max_length=64, primary_key=True, serialize=False)),
+                ('payload', models.JSONField(help_text='Список данных индикатора')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='bankindicatordataresponse',
+            name='payload',
+            field=models.ForeignKey(help_text='FK -> IndicatorPayload (данные индикатора)', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='responses', to='indicators.indicatorpayload'),
+        ),
+        migrations.AlterField(
+            model_name='bankindicatordataresponse',
+            name='bank_indicator_data',
+            field=models.JSONField(help_text='Список данных индикатора', null=True),
+        ),
+        migrations.RunPython(move_payloads, restore_payloads),
+        migrations.RemoveField(
+            model_name='bankindicatordataresponse',
+            name='bank_indicator_data',
+        ),
+        migrations.AlterField(
+            model_name='bankindicatordataresponse',
+            name='payload',
+            field=models.ForeignKey(help_text='FK -> IndicatorPayload (данные индикатора)', on_delete=django.db.models.deletion.PROTECT, related_name='responses', to='indicators.indicatorpayload'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+from django.db import migrations, models
+
+import core.utils.payload_codec
+from core.utils.payload_codec import copy_field_values
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_compressiondictionary'),
+        ('indicators', '0005_indicatorpayload'),
+    ]
+
+    operations = [
+        # indicatorpayload.payload: JSONField -> CompressedJSONField (bytea) через временный столбец payload_packed
+        migrations.AddField(
+            model_name='indicatorpayload',
+            name='payload_packed',
+            field=core.utils.payload_codec.CompressedJSONField(help_text='Список данных индикатора', null=True),
+        ),
+        migrations.AlterField(
+            model_name='indicatorpayload',
+            name='payload',
+            field=models.JSONField(help_text='Список данных индикатора', null=True),
+        ),
+        migrations.RunPython(copy_field_values('indicators', 'indicatorpayload', 'payload', 'payload_packed'),
+                             copy_field_values('indicators', 'indicatorpayload', 'payload_packed', 'payload')),
+        migrations.RemoveField(
+            model_name='indicatorpayload',
+            name='payload',
+        ),
+        migrations.RenameField(
+            model_name='indicatorpayload',
+            old_name='payload_packed',
+            new_name='payload',
+        ),
+        migrations.AlterField(
+            model_name='indicatorpayload',
+            name='payload',
+            field=core.utils.payload_codec.CompressedJSONField(help_text='Список данных индикатора'),
+        ),
+        # bankindicatorsresponse.indicators: JSONField -> CompressedJSONField (bytea) через временный столбец indicators_packed
+        migrations.AddField(
+            model_name='bankindicatorsresponse',
+            name='indicators_packed',
+            field=core.utils.payload_codec.CompressedJSONField(help_text='Список индикаторов', null=True),
+        ),
+        migrations.AlterField(
+            model_name='bankindicatorsresponse',
+            name='indicators',
+            field=models.JSONField(help_text='Список индикаторов', null=True),
+        ),
+        migrations.RunPython(copy_field_values('indicators', 'bankindicatorsresponse', 'indicators', 'indicators_packed'),
+                             copy_field_values('indicators', 'bankindicatorsresponse', 'indicators_packed', 'indicators')),
+        migrations.RemoveField(
+            model_name='bankindicatorsresponse',
+            name='indicators',
+        ),
+        migrations.RenameField(
+            model_name='bankindicatorsresponse',
+            old_name='indicators_packed',
+            new_name='indicators',
+        ),
+        migrations.AlterField(
+            model_name='bankindicatorsresponse',
+            name='indicators',
+            field=core.utils.payload_codec.CompressedJSONField(help_text='Список индикаторов'),
+        ),
+    ]
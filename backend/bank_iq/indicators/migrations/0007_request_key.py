@@ -0,0 +1,51 @@
+from django.db import migrations, models
+
+from core.utils.request_keys import fill_request_keys, indicator_data_request_key, indicators_request_key
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('indicators', '0006_compress_payloads'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bankindicatorsrequest',
+            name='request_key',
+            field=models.CharField(help_text='sha256 нормализованных параметров запроса (core.utils.request_keys)', max_length=64, null=True),
+        ),
+        migrations.RunPython(
+            fill_request_keys('indicators', 'bankindicatorsrequest', ('bank_id', 'form_type_id', 'reg_number', 'dt'),
+                              lambda r: indicators_request_key(r['bank_id'], r['form_type_id'], r['reg_number'], r['dt'])),
+            migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='bankindicatorsrequest',
+            name='request_key',
+            field=models.CharField(help_text='sha256 нормализованных параметров запроса (core.utils.request_keys)', max_length=64, unique=True),
+        ),
+        migrations.AlterUniqueTogether(
+            name='bankindicatorsrequest',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='bankindicatordatarequest',
+            name='request_key',
+            field=models.CharField(help_text='sha256 нормализованных параметров запроса (core.utils.request_keys)', max_length=64, null=True),
+        ),
+        migrations.RunPython(
+            fill_request_keys('indicators', 'bankindicatordatarequest', ('bank_id', 'form_type_id', 'reg_number', 'ind_code', 'date_from', 'date_to', 'dt'),
+                              lambda r: indicator_data_request_key(
+                                  r['bank_id'], r['form_type_id'], r['reg_number'], r['ind_code'], r['date_from'],
+                                  r['date_to'], r['dt'])),
+            migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='bankindicatordatarequest',
+            name='request_key',
+            field=models.CharField(help_text='sha256 нормализованных параметров запроса (core.utils.request_keys)', max_length=64, unique=True),
+        ),
+        migrations.AlterUniqueTogether(
+            name='bankindicatordatarequest',
+            unique_together=set(),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('banks', '0007_request_key'),
+        ('indicators', '0007_request_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankCapitalValue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_date', models.DateTimeField(help_text='Отчётная дата F123')),
+                ('own_funds', models.DecimalField(decimal_places=4, help_text='Собственные средства (капитал), итого', max_digits=24, null=True)),
+                ('base_capital', models.DecimalField(decimal_places=4, help_text='Базовый капитал, итого', max_digits=24, null=True)),
+                ('additional_capital', models.DecimalField(decimal_places=4, help_text='Дополнительный капитал, итого', max_digits=24, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('bank', models.ForeignKey(help_text='FK -> Bank', on_delete=django.db.models.deletion.CASCADE, related_name='capital_values', to='banks.bank')),
+            ],
+            options={
+                'ordering': ('report_date',),
+                'unique_together': {('bank', 'report_date')},
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('banks', '0007_request_key'),
+        ('indicators', '0008_bankcapitalvalue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankCapitalChangeRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_date', models.DateTimeField(help_text='Отчётная дата F810')),
+                ('num_str', models.CharField(help_text='Номер строки формы (NUM_STR, например "5.1")', max_length=16)),
+                ('label', models.CharField(blank=True, default='', help_text='Наименование строки (LABEL)', max_length=512)),
+                ('num_p', models.CharField(blank=True, default='', help_text='Номер пояснения (NUM_P)', max_length=64)),
+                ('ustkap', models.DecimalField(decimal_places=4, help_text='Уставный капитал', max_digits=24, null=True)),
+                ('sob_ak', models.DecimalField(decimal_places=4, help_text='Собственные акции', max_digits=24, null=True)),
+                ('emis_doh', models.DecimalField(decimal_places=4, help_text='Эмиссионный доход', max_digits=24, null=True)),
+                ('per_cb', models.DecimalField(decimal_places=4, help_text='Переоценка ценных бумаг', max_digits=24, null=True)),
+                ('per_os', models.DecimalField(decimal_places=4, help_text='Переоценка основных средств', max_digits=24, null=True)),
+                ('deltadvr', models.DecimalField(decimal_places=4, help_text='Дельта ДВР', max_digits=24, null=True)),
+                ('per_ih', models.DecimalField(decimal_places=4, help_text='Переоценка инструментов хеджирования', max_digits=24, null=True)),
+                ('rezervf', models.DecimalField(decimal_places=4, help_text='Резервный фонд', max_digits=24, null=True)),
+                ('vkl_v_im', models.DecimalField(decimal_places=4, help_text='Вклады в имущество', max_digits=24, null=True)),
+                ('nerasp_pu', models.DecimalField(decimal_places=4, help_text='Нераспределённая прибыль (убыток)', max_digits=24, null=True)),
+                ('itogo_ik', models.DecimalField(decimal_places=4, help_text='Итого источники капитала', max_digits=24, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('bank', models.ForeignKey(help_text='FK -> Bank', on_delete=django.db.models.deletion.CASCADE, related_name='capital_change_rows', to='banks.bank')),
+            ],
+            options={
+                'ordering': ('report_date',),
+                'indexes': [models.Index(fields=['num_str', 'report_date'], name='indicators__num_str_2d17cd_idx')],
+                'unique_together': {('bank', 'report_date', 'num_str')},
+            },
+        ),
+    ]
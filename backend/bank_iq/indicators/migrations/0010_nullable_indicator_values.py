@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('indicators', '0009_bankcapitalchangerow'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bankindicatorvalue',
+            name='iitg',
+            field=models.DecimalField(decimal_places=4, help_text='Исходящие остатки, итого, тыс. руб. (NULL — значения нет в ответе ЦБ)', max_digits=24, null=True),
+        ),
+        migrations.AlterField(
+            model_name='bankindicatorvalue',
+            name='vitg',
+            field=models.DecimalField(decimal_places=4, help_text='Входящие остатки, итого, тыс. руб. (NULL — значения нет в ответе ЦБ)', max_digits=24, null=True),
+        ),
+    ]
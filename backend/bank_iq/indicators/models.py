@@ -1,5 +1,7 @@
 from django.db import models
 
+from core.utils.payload_codec import CompressedJSONField
+
 
 class FormType(models.Model):
     title = models.CharField(db_index=True, unique=True,
@@ -24,6 +26,8 @@ class BankIndicatorsRequest(models.Model):
     form_type = models.ForeignKey(FormType, on_delete=models.SET_NULL, null=True, help_text='FK -> FormType')
     reg_number = models.IntegerField(help_text='Регистрационный номер банка в базе ЦБ')
     dt = models.DateTimeField(help_text='Целевая дата')
+    request_key = models.CharField(max_length=64, unique=True,
+                                   help_text='sha256 нормализованных параметров запроса (core.utils.request_keys)')
 
     updated_at = models.DateTimeField(auto_now=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -33,13 +37,12 @@ class BankIndicatorsRequest(models.Model):
 
     class Meta:
         ordering = ('-created_at',)
-        unique_together = (('bank', 'form_type', 'reg_number', 'dt'),)
 
 
 class BankIndicatorsResponse(models.Model):
     request = models.OneToOneField(BankIndicatorsRequest, on_delete=models.CASCADE, related_name='response',
                                    help_text='Ответ')
-    indicators = models.JSONField(help_text='Список индикаторов')
+    indicators = CompressedJSONField(help_text='Список индикаторов')
 
     data_hash = models.CharField(max_length=64, null=True, blank=True, db_index=True,
                                  help_text='sha256 хэш представления indicators')
@@ -63,6 +66,8 @@ class BankIndicatorDataRequest(models.Model):
     date_from = models.DateTimeField(null=True, help_text='Дата с')
     date_to = models.DateTimeField(null=True, help_text='Дата по')
     dt = models.DateTimeField(null=True, help_text='Целевая дата')
+    request_key = models.CharField(max_length=64, unique=True,
+                                   help_text='sha256 нормализованных параметров запроса (core.utils.request_keys)')
 
     updated_at = models.DateTimeField(auto_now=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -72,17 +77,37 @@ class BankIndicatorDataRequest(models.Model):
 
     class Meta:
         ordering = ('-created_at',)
-        unique_together = (('bank', 'form_type', 'reg_number', 'ind_code', 'date_from', 'date_to', 'dt'),)
+
+
+class IndicatorPayload(models.Model):
+    """
+    Тело ответа по данным индикатора, адресуемое по содержимому: одинаковые ответы (пересекающиеся диапазоны F101,
+    пустые результаты, повторяющиеся F123) хранятся один раз. Блобы без ссылок удаляет collect_orphan_payloads.
+    """
+    data_hash = models.CharField(max_length=64, primary_key=True,
+                                 help_text='sha256 канонического представления payload')
+    payload = CompressedJSONField(help_text='Список данных индикатора')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'IndicatorPayload:{self.data_hash[:12]}'
 
 
 class BankIndicatorDataResponse(models.Model):
     request = models.OneToOneField(BankIndicatorDataRequest, on_delete=models.CASCADE, related_name='response',
                                    help_text='Ответ')
-    bank_indicator_data = models.JSONField(help_text='Список данных индикатора')
+    payload = models.ForeignKey(IndicatorPayload, on_delete=models.PROTECT, related_name='responses',
+                                help_text='FK -> IndicatorPayload (данные индикатора)')
 
     data_hash = models.CharField(max_length=64, null=True, blank=True, db_index=True,
                                  help_text='sha256 хэш представления bank_indicator_data')
 
+    @property
+    def bank_indicator_data(self):
+        """Список данных индикатора (из IndicatorPayload)."""
+        return self.payload.payload
+
     updated_at = models.DateTimeField(auto_now=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -91,3 +116,97 @@ class BankIndicatorDataResponse(models.Model):
 
     class Meta:
         ordering = ('-created_at',)
+
+
+class BankIndicatorValue(models.Model):
+    """
+    Значения индикаторов F101 в виде временного ряда: одна строка на (банк, форма, индикатор, отчётная дата,
+    глава, сторона). Перекрывающиеся диапазоны BankIndicatorDataResponse сводятся к одним и тем же строкам.
+    """
+    bank = models.ForeignKey('banks.Bank', on_delete=models.CASCADE, related_name='indicator_values',
+                             help_text='FK -> Bank')
+    form_type = models.ForeignKey(FormType, on_delete=models.CASCADE, help_text='FK -> FormType')
+    ind_code = models.CharField(max_length=32, help_text='Код индикатора (numsc / IndCode)')
+    report_date = models.DateTimeField(help_text='Отчётная дата (обычно первый день месяца)')
+    pln = models.CharField(max_length=4, blank=True, default='',
+                           help_text='Глава плана счетов: А, Б, В, Г, Д')
+    ap = models.SmallIntegerField(help_text='Сторона: 1 — актив, 2 — пассив')
+    vitg = models.DecimalField(max_digits=24, decimal_places=4, null=True,
+                               help_text='Входящие остатки, итого, тыс. руб. (NULL — значения нет в ответе ЦБ)')
+    iitg = models.DecimalField(max_digits=24, decimal_places=4, null=True,
+                               help_text='Исходящие остатки, итого, тыс. руб. (NULL — значения нет в ответе ЦБ)')
+
+    updated_at = models.DateTimeField(auto_now=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'IndicatorValue:{self.ind_code} ({self.bank_id}) {self.report_date:%Y-%m-%d}'
+
+    class Meta:
+        ordering = ('report_date',)
+        unique_together = (('bank', 'form_type', 'ind_code', 'report_date', 'pln', 'ap'),)
+        indexes = [models.Index(fields=['form_type', 'ind_code', 'report_date'])]
+
+
+class BankCapitalValue(models.Model):
+    """
+    Капитал банка по F123 в виде временного ряда: одна строка на (банк, отчётная дата) с тремя итоговыми
+    строками формы. Заполняется при загрузке F123 из изменившегося ответа (_upsert_capital_value).
+    """
+    bank = models.ForeignKey('banks.Bank', on_delete=models.CASCADE, related_name='capital_values',
+                             help_text='FK -> Bank')
+    report_date = models.DateTimeField(help_text='Отчётная дата F123')
+    own_funds = models.DecimalField(max_digits=24, decimal_places=4, null=True,
+                                    help_text='Собственные средства (капитал), итого')
+    base_capital = models.DecimalField(max_digits=24, decimal_places=4, null=True,
+                                       help_text='Базовый капитал, итого')
+    additional_capital = models.DecimalField(max_digits=24, decimal_places=4, null=True,
+                                             help_text='Дополнительный капитал, итого')
+
+    updated_at = models.DateTimeField(auto_now=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'CapitalValue:{self.bank_id} {self.report_date:%Y-%m-%d}'
+
+    class Meta:
+        ordering = ('report_date',)
+        unique_together = (('bank', 'report_date'),)
+
+
+class BankCapitalChangeRow(models.Model):
+    """
+    Строки формы F810 (отчёт об изменениях в капитале) с типизированными столбцами: одна строка на (банк,
+    отчётная дата, номер строки NUM_STR). Заполняется при загрузке F810 из изменившегося ответа.
+    """
+    bank = models.ForeignKey('banks.Bank', on_delete=models.CASCADE, related_name='capital_change_rows',
+                             help_text='FK -> Bank')
+    report_date = models.DateTimeField(help_text='Отчётная дата F810')
+    num_str = models.CharField(max_length=16, help_text='Номер строки формы (NUM_STR, например "5.1")')
+    label = models.CharField(max_length=512, blank=True, default='', help_text='Наименование строки (LABEL)')
+    num_p = models.CharField(max_length=64, blank=True, default='', help_text='Номер пояснения (NUM_P)')
+    ustkap = models.DecimalField(max_digits=24, decimal_places=4, null=True, help_text='Уставный капитал')
+    sob_ak = models.DecimalField(max_digits=24, decimal_places=4, null=True, help_text='Собственные акции')
+    emis_doh = models.DecimalField(max_digits=24, decimal_places=4, null=True, help_text='Эмиссионный доход')
+    per_cb = models.DecimalField(max_digits=24, decimal_places=4, null=True, help_text='Переоценка ценных бумаг')
+    per_os = models.DecimalField(max_digits=24, decimal_places=4, null=True,
+                                 help_text='Переоценка основных средств')
+    deltadvr = models.DecimalField(max_digits=24, decimal_places=4, null=True, help_text='Дельта ДВР')
+    per_ih = models.DecimalField(max_digits=24, decimal_places=4, null=True,
+                                 help_text='Переоценка инструментов хеджирования')
+    rezervf = models.DecimalField(max_digits=24, decimal_places=4, null=True, help_text='Резервный фонд')
+    vkl_v_im = models.DecimalField(max_digits=24, decimal_places=4, null=True, help_text='Вклады в имущество')
+    nerasp_pu = models.DecimalField(max_digits=24, decimal_places=4, null=True,
+                                    help_text='Нераспределённая прибыль (убыток)')
+    itogo_ik = models.DecimalField(max_digits=24, decimal_places=4, null=True, help_text='Итого источники капитала')
+
+    updated_at = models.DateTimeField(auto_now=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'CapitalChangeRow:{self.bank_id} {self.report_date:%Y-%m-%d} {self.num_str}'
+
+    class Meta:
+        ordering = ('report_date',)
+        unique_together = (('bank', 'report_date', 'num_str'),)
+        indexes = [models.Index(fields=['num_str', 'report_date'])]
@@ -120,6 +120,7 @@ class BankIndicator101DataSerializer(serializers.Serializer):
     )
     vitg = serializers.FloatField(
             required=True,
+            allow_null=True,
             help_text=(
                 "Входящий итог (VITG) — сумма на начало периода или входящее сальдо, единицы: тыс. руб.\n"
                 "Примечание: в исходных DBF/SOAP ответах числовые поля обычно содержат 4 знака после запятой —"
@@ -128,6 +129,7 @@ class BankIndicator101DataSerializer(serializers.Serializer):
     )
     iitg = serializers.FloatField(
             required=True,
+            allow_null=True,
             help_text=(
                 "Исходящий итог (IITG) — итог/сальдо на конец периода, единицы: тыс. руб.\n"
                 "Примечание: см. VITG по единицам."
@@ -168,6 +170,49 @@ class BankIndicator123DataSerializer(serializers.Serializer):
             help_text="Значение показателя.")
 
 
+class CapitalSeries123RequestSerializer(serializers.Serializer):
+    reg_numbers = serializers.ListField(
+            child=serializers.IntegerField(min_value=1),
+            min_length=1,
+            max_length=500,
+            help_text="Регистрационные номера банков (1–500). Пример: [1481, 1000]."
+    )
+    date_from = serializers.DateTimeField(
+            required=False,
+            help_text="Начальная отчётная дата (ISO-8601, включительно); по умолчанию — весь ряд."
+    )
+    date_to = serializers.DateTimeField(
+            required=False,
+            help_text="Конечная отчётная дата (ISO-8601, включительно); по умолчанию — весь ряд."
+    )
+
+    def to_internal_value(self, data):
+        validated = super().to_internal_value(data)
+        for k in ('date_from', 'date_to'):
+            dt = validated.get(k)
+            if dt is not None and dt.tzinfo is not None:
+                validated[k] = dt.replace(tzinfo=None)
+        return validated
+
+
+class CapitalValue123Serializer(serializers.Serializer):
+    bank_reg_number = serializers.CharField(
+            required=True,
+            help_text="Регистрационный номер банка.")
+    date = serializers.DateTimeField(
+            required=True,
+            help_text="Отчётная дата F123 (ISO-8601).")
+    own_funds = serializers.FloatField(
+            allow_null=True,
+            help_text="Собственные средства (капитал), итого.")
+    base_capital = serializers.FloatField(
+            allow_null=True,
+            help_text="Базовый капитал, итого.")
+    additional_capital = serializers.FloatField(
+            allow_null=True,
+            help_text="Дополнительный капитал, итого.")
+
+
 class BankIndicator810DataSerializer(serializers.Serializer):
     NUM_STR = serializers.FloatField(required=True, help_text="Номер строки (например, 1.0, 5.1).")
     LABEL = serializers.CharField(required=True,
@@ -185,3 +230,39 @@ class BankIndicator810DataSerializer(serializers.Serializer):
     VKL_V_IM = serializers.FloatField(required=True, help_text="Вклады в имущество.")
     NERASP_PU = serializers.FloatField(required=True, help_text="Нераспределенная прибыль (убыток).")
     ITOGO_IK = serializers.FloatField(required=True, help_text="Итого источники капитала.")
+
+
+class CapitalChangeRows810RequestSerializer(serializers.Serializer):
+    reg_numbers = serializers.ListField(
+            child=serializers.IntegerField(min_value=1),
+            min_length=1,
+            max_length=500,
+            help_text="Регистрационные номера банков (1–500). Пример: [1481, 1000]."
+    )
+    date_from = serializers.DateTimeField(
+            required=False,
+            help_text="Начальная отчётная дата (ISO-8601, включительно); по умолчанию — все даты."
+    )
+    date_to = serializers.DateTimeField(
+            required=False,
+            help_text="Конечная отчётная дата (ISO-8601, включительно); по умолчанию — все даты."
+    )
+    num_strs = serializers.ListField(
+            child=serializers.CharField(),
+            required=False,
+            help_text="Номера строк формы (NUM_STR, например ['1', '5.1']); по умолчанию — все строки."
+    )
+
+    def to_internal_value(self, data):
+        validated = super().to_internal_value(data)
+        for k in ('date_from', 'date_to'):
+            dt = validated.get(k)
+            if dt is not None and dt.tzinfo is not None:
+                validated[k] = dt.replace(tzinfo=None)
+        return validated
+
+
+class CapitalChangeRow810Serializer(BankIndicator810DataSerializer):
+    bank_reg_number = serializers.CharField(help_text="Регистрационный номер банка.")
+    date = serializers.DateTimeField(help_text="Отчётная дата F810 (ISO-8601).")
+    NUM_STR = serializers.CharField(help_text="Номер строки (например, '1', '5.1').")
@@ -1,13 +1,17 @@
 from django.urls import path
 
 from indicators.views import BankIndicator101APIView, BankIndicator123APIView, BankIndicator810APIView, \
-    Indicators101APIView, Indicators123APIView, UniqueIndicators101APIView
+    CapitalChangeRows810APIView, CapitalSeries123APIView, Indicators101APIView, Indicators123APIView, \
+    UniqueIndicators101APIView
 
 
 urlpatterns = [
     path("indicators/f810/bank-indicator-data/",
          BankIndicator810APIView.as_view(),
          name="indicators.f810.bank.indicator.data"),
+    path("indicators/f810/rows/",
+         CapitalChangeRows810APIView.as_view(),
+         name="indicators.f810.rows"),
     path("indicators/f101/form-indicators/",
          Indicators101APIView.as_view(),
          name='indicators.f101.form.indicators'),
@@ -24,5 +28,8 @@ urlpatterns = [
     path("indicators/f123/bank-indicator-data/",
          BankIndicator123APIView.as_view(),
          name='indicators.f123.bank.indicator.data'),
+    path("indicators/f123/capital-series/",
+         CapitalSeries123APIView.as_view(),
+         name='indicators.f123.capital.series'),
 
 ]
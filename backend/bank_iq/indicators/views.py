@@ -9,16 +9,17 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from banks.models import Bank
-from core.helpers.indicators_db_functions import _create_or_get_bank_indicators_data_request_atomic, \
-    _create_or_get_indicators_request_atomic, _find_existing_bank_indicators_data_request, \
+from core.helpers.indicator_cache_functions import _get_bank_indicator_data, _record_indicator_access
+from core.helpers.indicator_values_functions import _get_capital_change_rows, _get_capital_series
+from core.helpers.indicators_db_functions import _create_or_get_indicators_request_atomic, \
     _find_existing_indicators_request
 from core.parsers.soap.form101_parser import Form101Parser
 from core.parsers.soap.form123_parser import Form123Parser
-from core.parsers.soap.form810_parser import Form810Parser
-from .models import BankIndicatorDataResponse, BankIndicatorsResponse, FormType
+from .models import BankIndicatorsResponse, FormType
 from .serializers import BankIndicator101DataSerializer, BankIndicator101RequestSerializer, \
-    BankIndicator123DataSerializer, BankIndicator810DataSerializer, Indicators101Serializer, Indicators123Serializer, \
-    RegNumAndDatetimeSerializer
+    BankIndicator123DataSerializer, BankIndicator810DataSerializer, CapitalChangeRow810Serializer, \
+    CapitalChangeRows810RequestSerializer, CapitalSeries123RequestSerializer, CapitalValue123Serializer, \
+    Indicators101Serializer, Indicators123Serializer, RegNumAndDatetimeSerializer
 
 
 class Indicators101APIView(APIView):
@@ -130,6 +131,8 @@ class BankIndicator101APIView(APIView):
                     "- `date_from` (datetime, ISO-8601) — начало диапазона (включительно).\n"
                     "- `date_to` (datetime, ISO-8601) — конец диапазона (включительно).\n\n"
                     "Формат дат: ожидается naive datetime в теле запроса.\n\n"
+                    "Диапазон может быть любым: ответ собирается из сохранённых помесячных значений, к ЦБ "
+                    "запрашиваются только отсутствующие в БД отчётные даты.\n\n"
                     "Возвращаемые поля (в каждом элементе массива):\n"
                     "- `bank_reg_number` (string) — регистрационный номер банка.\n"
                     "- `date` (datetime) — дата записи (поле dt/DT в исходной форме F101).\n"
@@ -138,8 +141,8 @@ class BankIndicator101APIView(APIView):
                     "    - 'А' — балансовые счета; 'Б' — счета доверительного управления; 'В' — внебалансовые счета; "
                     "'Г' — срочные операции; 'Д' — счета Депо.\n"
                     "- `ap` (integer) — признак стороны: 1 — актив (A_P = '1'), 2 — пассив (A_P = '2').\n"
-                    "- `vitg` (float) — входящие остатки (VITG) — итого, тыс. руб.\n"
-                    "- `iitg` (float) — исходящие остатки (IITG) — итого, тыс. руб.\n\n"
+                    "- `vitg` (float | null) — входящие остатки (VITG) — итого, тыс. руб.; null — значения нет в ответе ЦБ.\n"
+                    "- `iitg` (float | null) — исходящие остатки (IITG) — итого, тыс. руб.\n\n"
             ),
             request=BankIndicator101RequestSerializer,
             examples=[
@@ -201,23 +204,11 @@ class BankIndicator101APIView(APIView):
         in_serializer.is_valid(raise_exception=True)
         params = in_serializer.validated_data
 
-        bank = Bank.objects.get(reg_number=params['reg_number'])
-        form_type = FormType.objects.get(title='F101')
-        existing = _find_existing_bank_indicators_data_request(bank, form_type, **params)
-        if existing and hasattr(existing, 'response'):
-            return Response(existing.response.bank_indicator_data, status=status.HTTP_200_OK)
-
-        data: list[dict] = Form101Parser.get_indicator_data(**params)
+        _record_indicator_access('F101', params)
+        data = _get_bank_indicator_data('F101', params)
         if 'message' in data:
             return Response(data, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
-
-        processed_data = BankIndicator101DataSerializer(instance=data, many=True).data
-        req_obj = _create_or_get_bank_indicators_data_request_atomic(bank, form_type, **params)
-        if hasattr(req_obj, 'response') and req_obj.response is not None:
-            return Response(req_obj.response.bank_indicator_data, status=status.HTTP_200_OK)
-
-        BankIndicatorDataResponse.objects.create(request=req_obj, bank_indicator_data=processed_data)
-        return Response(processed_data, status=status.HTTP_200_OK)
+        return Response(data, status=status.HTTP_200_OK)
 
 
 class UniqueIndicators101APIView(APIView):
@@ -396,24 +387,71 @@ class BankIndicator123APIView(APIView):
         in_serializer = RegNumAndDatetimeSerializer(data=request.data)
         in_serializer.is_valid(raise_exception=True)
         params = in_serializer.validated_data
-        bank = Bank.objects.get(reg_number=params['reg_number'])
-        form_type = FormType.objects.get(title='F123')
 
-        existing = _find_existing_bank_indicators_data_request(bank, form_type, **params)
-        if existing and hasattr(existing, 'response'):
-            return Response(existing.response.bank_indicator_data, status=status.HTTP_200_OK)
-
-        data = Form123Parser.get_data123_form_full(params['reg_number'], params['dt'])
+        _record_indicator_access('F123', params)
+        data = _get_bank_indicator_data('F123', params)
         if 'message' in data:
             return Response(data, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+        return Response(data, status=status.HTTP_200_OK)
 
-        processed_data = BankIndicator123DataSerializer(instance=data, many=True).data
-        req_obj = _create_or_get_bank_indicators_data_request_atomic(bank, form_type, **params)
-        if hasattr(req_obj, 'response') and req_obj.response is not None:
-            return Response(req_obj.response.bank_indicator_data, status=status.HTTP_200_OK)
 
-        BankIndicatorDataResponse.objects.create(request=req_obj, bank_indicator_data=processed_data)
-        return Response(processed_data, status=status.HTTP_200_OK)
+class CapitalSeries123APIView(APIView):
+    authentication_classes = []
+
+    @extend_schema(
+            summary="Ряды капитала F123 для одного или нескольких банков",
+            description=(
+                    "Возвращает по отчётным датам собственные средства (капитал), базовый и дополнительный капитал "
+                    "из материализованного ряда F123 (заполняется при загрузке). Один индексированный запрос "
+                    "к БД, без обращений к ЦБ.\n\n"
+                    "Вход (JSON): `{ \"reg_numbers\": [<int>, ...], \"date_from\": \"<ISO-8601>\", "
+                    "\"date_to\": \"<ISO-8601>\" }` (даты необязательны).\n\n"
+                    "Возвращаемая структура: массив объектов, упорядоченных по банку и дате.\n\n"
+                    "Коды ответов:\n"
+                    "- 200 — OK (массив значений; пустой, если ряда ещё нет)\n"
+                    "- 400 — неверный формат запроса"
+            ),
+            request=CapitalSeries123RequestSerializer,
+            examples=[
+                OpenApiExample(
+                        name="Пример запроса",
+                        value={
+                            "reg_numbers": [1481, 1000],
+                            "date_from": "2023-01-01T00:00:00",
+                        },
+                        request_only=True,
+                        media_type='application/json'
+                )
+            ],
+            responses={
+                200: OpenApiResponse(
+                        response=CapitalValue123Serializer(many=True),
+                        description="Успешный ответ — ряды капитала",
+                        examples=[
+                            OpenApiExample(
+                                    name="Пример успешного ответа",
+                                    value=[
+                                        {
+                                            "bank_reg_number": "1481",
+                                            "date": "2024-06-01T00:00:00",
+                                            "own_funds": 6500000000.0,
+                                            "base_capital": 5500000000.0,
+                                            "additional_capital": 1000000000.0
+                                        }
+                                    ]
+                            )
+                        ]
+                ),
+                400: OpenApiResponse(description="Ошибка валидации запроса."),
+            }
+    )
+    def post(self, request: Request, *args, **kwargs) -> Response:
+        in_serializer = CapitalSeries123RequestSerializer(data=request.data)
+        in_serializer.is_valid(raise_exception=True)
+        params = in_serializer.validated_data
+
+        data = _get_capital_series(params['reg_numbers'], params.get('date_from'), params.get('date_to'))
+        return Response(data, status=status.HTTP_200_OK)
 
 
 class BankIndicator810APIView(APIView):
@@ -530,20 +568,55 @@ class BankIndicator810APIView(APIView):
         in_serializer = RegNumAndDatetimeSerializer(data=request.data)
         in_serializer.is_valid(raise_exception=True)
         params = in_serializer.validated_data
-        bank = Bank.objects.get(reg_number=params['reg_number'])
-        form_type = FormType.objects.get(title='F810')
-
-        existing = _find_existing_bank_indicators_data_request(bank, form_type, **params)
-        if existing and hasattr(existing, 'response'):
-            return Response(existing.response.bank_indicator_data, status=status.HTTP_200_OK)
 
-        data = Form810Parser.parse(params['reg_number'], params['dt'])
+        _record_indicator_access('F810', params)
+        data = _get_bank_indicator_data('F810', params)
         if 'message' in data:
             return Response(data, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
-        processed_data = BankIndicator810DataSerializer(instance=data, many=True).data
-        req_obj = _create_or_get_bank_indicators_data_request_atomic(bank, form_type, **params)
-        if hasattr(req_obj, 'response') and req_obj.response is not None:
-            return Response(req_obj.response.bank_indicator_data, status=status.HTTP_200_OK)
+        return Response(data, status=status.HTTP_200_OK)
 
-        BankIndicatorDataResponse.objects.create(request=req_obj, bank_indicator_data=processed_data)
-        return Response(processed_data, status=status.HTTP_200_OK)
+
+class CapitalChangeRows810APIView(APIView):
+    authentication_classes = []
+
+    @extend_schema(
+            summary="Строки формы F810 для одного или нескольких банков за период",
+            description=(
+                    "Возвращает типизированные строки отчёта об изменениях в капитале (F810) из БД "
+                    "(заполняются при загрузке) — для сравнения банков между собой и дат между собой "
+                    "одним индексированным запросом, без обращений к ЦБ.\n\n"
+                    "Вход (JSON): `{ \"reg_numbers\": [<int>, ...], \"date_from\": \"<ISO-8601>\", "
+                    "\"date_to\": \"<ISO-8601>\", \"num_strs\": [\"<NUM_STR>\", ...] }` "
+                    "(все поля, кроме reg_numbers, необязательны).\n\n"
+                    "Возвращаемая структура: массив строк в формате ответа F810 с полями `bank_reg_number` и `date`, "
+                    "упорядоченный по банку, дате и порядку строк в форме."
+            ),
+            request=CapitalChangeRows810RequestSerializer,
+            examples=[
+                OpenApiExample(
+                        name="Пример запроса",
+                        value={
+                            "reg_numbers": [1481, 1000],
+                            "date_from": "2023-01-01T00:00:00",
+                            "num_strs": ["5.1"],
+                        },
+                        request_only=True,
+                        media_type='application/json'
+                )
+            ],
+            responses={
+                200: OpenApiResponse(
+                        response=CapitalChangeRow810Serializer(many=True),
+                        description="Успешный ответ — строки F810 (пустой массив, если данных ещё нет)",
+                ),
+                400: OpenApiResponse(description="Ошибка валидации запроса."),
+            }
+    )
+    def post(self, request: Request, *args, **kwargs) -> Response:
+        in_serializer = CapitalChangeRows810RequestSerializer(data=request.data)
+        in_serializer.is_valid(raise_exception=True)
+        params = in_serializer.validated_data
+
+        data = _get_capital_change_rows(params['reg_numbers'], params.get('date_from'), params.get('date_to'),
+                                        params.get('num_strs'))
+        return Response(data, status=status.HTTP_200_OK)
@@ -0,0 +1,42 @@
+from django.db import migrations, models
+
+import core.utils.payload_codec
+from core.utils.payload_codec import copy_field_values
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_compressiondictionary'),
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        # cbrapidataresponse.processed_data: JSONField -> CompressedJSONField (bytea) через временный столбец processed_data_packed
+        migrations.AddField(
+            model_name='cbrapidataresponse',
+            name='processed_data_packed',
+            field=core.utils.payload_codec.CompressedJSONField(help_text='Обработанные и нормализованные данные для аналитики', null=True),
+        ),
+        migrations.AlterField(
+            model_name='cbrapidataresponse',
+            name='processed_data',
+            field=models.JSONField(help_text='Обработанные и нормализованные данные для аналитики', null=True),
+        ),
+        migrations.RunPython(copy_field_values('reports', 'cbrapidataresponse', 'processed_data', 'processed_data_packed'),
+                             copy_field_values('reports', 'cbrapidataresponse', 'processed_data_packed', 'processed_data')),
+        migrations.RemoveField(
+            model_name='cbrapidataresponse',
+            name='processed_data',
+        ),
+        migrations.RenameField(
+            model_name='cbrapidataresponse',
+            old_name='processed_data_packed',
+            new_name='processed_data',
+        ),
+        migrations.AlterField(
+            model_name='cbrapidataresponse',
+            name='processed_data',
+            field=core.utils.payload_codec.CompressedJSONField(help_text='Обработанные и нормализованные данные для аналитики', null=True),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations, models
+
+from core.utils.request_keys import fill_request_keys, rates_request_key
+
+
+def _key_of(row: dict) -> str:
+    # проверка параметров ключуется без годов, ставки — с подпериодом (как в _create_or_get_request_atomic)
+    years = (None, None) if row['rate_type'] == 'params_check' else (row['from_year'], row['to_year'])
+    return rates_request_key(row['rate_type'], row['publication_id'], row['dataset_id'], row['measure_id'], *years)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_compress_payloads'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cbrapidatarequest',
+            name='request_key',
+            field=models.CharField(help_text='sha256 нормализованных параметров запроса (core.utils.request_keys)', max_length=64, null=True),
+        ),
+        migrations.RunPython(
+            fill_request_keys('reports', 'cbrapidatarequest',
+                              ('rate_type', 'publication_id', 'dataset_id', 'measure_id', 'from_year', 'to_year'),
+                              _key_of),
+            migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='cbrapidatarequest',
+            name='request_key',
+            field=models.CharField(help_text='sha256 нормализованных параметров запроса (core.utils.request_keys)', max_length=64, unique=True),
+        ),
+        migrations.AlterUniqueTogether(
+            name='cbrapidatarequest',
+            unique_together=set(),
+        ),
+        migrations.RemoveIndex(
+            model_name='cbrapidatarequest',
+            name='reports_cbr_rate_ty_b0b672_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='cbrapidatarequest',
+            name='reports_cbr_rate_ty_c05ad0_idx',
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.7 on 2026-10-19 07:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0003_request_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateElement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dataset_id', models.IntegerField(help_text='ID набора данных в API ЦБ РФ')),
+                ('element_id', models.IntegerField(help_text='ID элемента в наборе данных')),
+                ('name', models.CharField(help_text='Название элемента (например, «До 30 дней»)', max_length=255)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'unique_together': {('dataset_id', 'element_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='RateObservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rate_type', models.CharField(choices=[('credit', 'Кредитные ставки'), ('deposit', 'Депозитные ставки'), ('params_check', 'Проверка параметров')], help_text='Тип ставок: кредитные или депозитные', max_length=15)),
+                ('publication_id', models.IntegerField(help_text='ID публикации в API ЦБ РФ')),
+                ('dataset_id', models.IntegerField(help_text='ID набора данных в API ЦБ РФ')),
+                ('measure_id', models.IntegerField(help_text='ID разреза (measure) в API ЦБ РФ')),
+                ('element_id', models.IntegerField(help_text='ID элемента (RateElement)')),
+                ('date', models.DateTimeField(help_text='Дата наблюдения')),
+                ('obs_val', models.DecimalField(decimal_places=4, help_text='Значение ставки', max_digits=12)),
+                ('unit', models.CharField(blank=True, default='', help_text='Единица измерения (например, % годовых)', max_length=64)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ('date',),
+                'indexes': [models.Index(fields=['publication_id', 'element_id', 'date'], name='reports_rat_publica_06dd1a_idx')],
+                'unique_together': {('dataset_id', 'measure_id', 'element_id', 'date')},
+            },
+        ),
+    ]
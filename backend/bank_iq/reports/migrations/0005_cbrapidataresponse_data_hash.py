@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0004_rateobservation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cbrapidataresponse',
+            name='data_hash',
+            field=models.CharField(blank=True, db_index=True, help_text='sha256 хэш представления processed_data', max_length=64, null=True),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 
+from core.utils.payload_codec import CompressedJSONField
+
 
 class CbrApiDataRequest(models.Model):
     class RateType(models.TextChoices):
@@ -17,6 +19,8 @@ class CbrApiDataRequest(models.Model):
                                      help_text='ID разреза (measure) в API ЦБ РФ', null=True, )
     from_year = models.IntegerField(help_text='Начальный год периода запроса', null=True, )
     to_year = models.IntegerField(help_text='Конечный год периода запроса', null=True, )
+    request_key = models.CharField(max_length=64, unique=True,
+                                   help_text='sha256 нормализованных параметров запроса (core.utils.request_keys)')
 
     updated_at = models.DateTimeField(auto_now=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -26,21 +30,15 @@ class CbrApiDataRequest(models.Model):
 
     class Meta:
         ordering = ('-created_at',)
-        unique_together = (
-            ('rate_type', 'publication_id', 'dataset_id', 'measure_id', 'from_year', 'to_year'),
-            ('rate_type', 'publication_id', 'dataset_id', 'measure_id',),
-        )
-        indexes = [
-            models.Index(fields=['rate_type', 'publication_id', 'dataset_id', 'measure_id', 'from_year', 'to_year']),
-            models.Index(fields=['rate_type', 'publication_id', 'dataset_id', 'measure_id']),
-        ]
 
 
 class CbrApiDataResponse(models.Model):
     request = models.OneToOneField(CbrApiDataRequest, on_delete=models.CASCADE,
                                    related_name='response', help_text='FK -> CbrApiDataRequest')
-    processed_data = models.JSONField(help_text='Обработанные и нормализованные данные для аналитики',
-                                      null=True)
+    processed_data = CompressedJSONField(help_text='Обработанные и нормализованные данные для аналитики',
+                                         null=True)
+    data_hash = models.CharField(max_length=64, null=True, blank=True, db_index=True,
+                                 help_text='sha256 хэш представления processed_data')
 
     updated_at = models.DateTimeField(auto_now=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -51,3 +49,46 @@ class CbrApiDataResponse(models.Model):
 
     class Meta:
         ordering = ('-created_at',)
+
+
+class RateElement(models.Model):
+    """Элемент (строка) набора данных ставок ЦБ: срок, категория заёмщика и т.п. — из headerData ответа."""
+    dataset_id = models.IntegerField(help_text='ID набора данных в API ЦБ РФ')
+    element_id = models.IntegerField(help_text='ID элемента в наборе данных')
+    name = models.CharField(max_length=255, help_text='Название элемента (например, «До 30 дней»)')
+
+    updated_at = models.DateTimeField(auto_now=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'RateElement:{self.dataset_id}-{self.element_id} {self.name}'
+
+    class Meta:
+        unique_together = (('dataset_id', 'element_id'),)
+
+
+class RateObservation(models.Model):
+    """
+    Наблюдения процентных ставок ЦБ: одна строка на (набор данных, разрез, элемент, дата). Заполняется при
+    загрузке из RawData; ответы за пересекающиеся подпериоды сводятся к одним и тем же строкам.
+    """
+    rate_type = models.CharField(max_length=15, choices=CbrApiDataRequest.RateType,
+                                 help_text='Тип ставок: кредитные или депозитные')
+    publication_id = models.IntegerField(help_text='ID публикации в API ЦБ РФ')
+    dataset_id = models.IntegerField(help_text='ID набора данных в API ЦБ РФ')
+    measure_id = models.IntegerField(help_text='ID разреза (measure) в API ЦБ РФ')
+    element_id = models.IntegerField(help_text='ID элемента (RateElement)')
+    date = models.DateTimeField(help_text='Дата наблюдения')
+    obs_val = models.DecimalField(max_digits=12, decimal_places=4, help_text='Значение ставки')
+    unit = models.CharField(max_length=64, blank=True, default='', help_text='Единица измерения (например, % годовых)')
+
+    updated_at = models.DateTimeField(auto_now=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'RateObservation:{self.dataset_id}-{self.measure_id}-{self.element_id} {self.date:%Y-%m-%d}'
+
+    class Meta:
+        ordering = ('date',)
+        unique_together = (('dataset_id', 'measure_id', 'element_id', 'date'),)
+        indexes = [models.Index(fields=['publication_id', 'element_id', 'date'])]
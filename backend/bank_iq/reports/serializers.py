@@ -225,3 +225,47 @@ class CheckResponseSerializer(serializers.Serializer):
 
 class CheckYearsResponseSerializer(serializers.Serializer):
     years = serializers.ListSerializer(child=serializers.IntegerField(), help_text="Список [FromYear, ToYear]")
+
+
+class RateObservationsRequestSerializer(serializers.Serializer):
+    dataset_ids = serializers.ListField(
+            child=serializers.IntegerField(),
+            min_length=1,
+            max_length=20,
+            help_text="ID наборов данных (например, [25, 37]) — кредитные и депозитные наборы можно сравнивать вместе."
+    )
+    measure_ids = serializers.ListField(
+            child=serializers.IntegerField(),
+            required=False,
+            help_text="ID разрезов (валюты, федеральные округа, виды деятельности); по умолчанию — все."
+    )
+    element_ids = serializers.ListField(
+            child=serializers.IntegerField(),
+            required=False,
+            help_text="ID элементов (сроки, категории); по умолчанию — все."
+    )
+    from_year = serializers.IntegerField(required=False, help_text="Год начала периода (включительно).")
+    to_year = serializers.IntegerField(required=False, help_text="Год окончания периода (включительно).")
+    pivot = serializers.ChoiceField(
+            choices=('dataset', 'measure', 'element'),
+            required=False,
+            help_text="Свести значения измерения в столбцы '<pivot>_<id>' (например, measure — сравнение округов)."
+    )
+
+    def validate(self, data):
+        from_year = data.get("from_year")
+        to_year = data.get("to_year")
+        if from_year and to_year and from_year > to_year:
+            raise serializers.ValidationError({"message": "from_year не может быть больше to_year"})
+        return data
+
+
+class RateObservationSerializer(serializers.Serializer):
+    publication_id = serializers.IntegerField(help_text="ID публикации.")
+    dataset_id = serializers.IntegerField(help_text="ID набора данных.")
+    measure_id = serializers.IntegerField(help_text="ID разреза.")
+    element_id = serializers.IntegerField(help_text="ID элемента.")
+    date = serializers.DateTimeField(help_text="Дата наблюдения (первое число месяца, следующего за отчётным).")
+    element_name = serializers.CharField(allow_null=True, help_text="Название элемента.")
+    obs_val = serializers.FloatField(help_text="Значение ставки.")
+    unit = serializers.CharField(help_text="Единица измерения (например, '% годовых').")
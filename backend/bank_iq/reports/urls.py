@@ -1,6 +1,7 @@
 from django.urls import path
 
-from .views import CheckValidDataAPIView, InterestRatesCreditAPIView, InterestRatesDepositAPIView
+from .views import CheckValidDataAPIView, InterestRatesCreditAPIView, InterestRatesDepositAPIView, \
+    RateObservationsAPIView
 
 
 urlpatterns = [
@@ -15,4 +16,8 @@ urlpatterns = [
     path("reports/interest-rates/deposit/",
          InterestRatesDepositAPIView.as_view(),
          name="reports.interest_rates.deposit"),
+
+    path("reports/interest-rates/observations/",
+         RateObservationsAPIView.as_view(),
+         name="reports.interest_rates.observations"),
 ]
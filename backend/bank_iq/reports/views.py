@@ -4,12 +4,14 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from core.helpers.rate_values_functions import _get_rate_series, _pivot_rate_observations, _upsert_rate_observations
 from core.helpers.reports_db_functions import _create_or_get_request_atomic, _find_existing_request
 from core.parsers.rest.cbr_parser import CbrAPIParser
 from .models import CbrApiDataRequest, CbrApiDataResponse
 from .serializers import (CheckRequestSerializer, CheckResponseSerializer,
                           CheckYearsResponseSerializer, InterestRatesCreditSerializer,
-                          InterestRatesDepositSerializer, ResponseSerializer)
+                          InterestRatesDepositSerializer, RateObservationSerializer,
+                          RateObservationsRequestSerializer, ResponseSerializer)
 
 
 class CheckValidDataAPIView(APIView):
@@ -261,6 +263,7 @@ class InterestRatesCreditAPIView(APIView):
             return Response(req_obj.response.processed_data, status=status.HTTP_200_OK)
 
         CbrApiDataResponse.objects.create(request=req_obj, processed_data=processed)
+        _upsert_rate_observations(rate, params, processed)
         return Response(processed, status=status.HTTP_200_OK)
 
 
@@ -358,4 +361,53 @@ class InterestRatesDepositAPIView(APIView):
             return Response(req_obj.response.processed_data, status=status.HTTP_200_OK)
 
         CbrApiDataResponse.objects.create(request=req_obj, processed_data=processed)
+        _upsert_rate_observations(rate, params, processed)
         return Response(processed, status=status.HTTP_200_OK)
+
+
+class RateObservationsAPIView(APIView):
+    authentication_classes = []
+
+    @extend_schema(
+            summary="Наблюдения процентных ставок из БД: ряды, произвольный период, сводные таблицы",
+            description=(
+                    "Ставки по кредитам и депозитам из таблицы наблюдений (заполняется при загрузке), "
+                    "без обращений к ЦБ и без разбора сохранённых ответов: один индексированный запрос.\n\n"
+                    "Без `pivot` возвращается массив наблюдений, упорядоченный по набору, разрезу, элементу "
+                    "и дате. С `pivot` (`dataset` | `measure` | `element`) значения выбранного измерения "
+                    "сводятся в столбцы `<pivot>_<id>`: `{\"columns\": [...], \"rows\": [...]}` — например, "
+                    "сравнение федеральных округов по одному набору данных."
+            ),
+            request=RateObservationsRequestSerializer,
+            responses={
+                200: OpenApiResponse(
+                        response=RateObservationSerializer(many=True),
+                        description="Наблюдения (или сводная таблица при pivot).",
+                        examples=[
+                            OpenApiExample(
+                                    name="Сводная таблица по округам",
+                                    value={
+                                        "columns": ["measure_23", "measure_42"],
+                                        "rows": [{"dataset_id": 30, "element_id": 2, "date": "2025-02-01T00:00:00",
+                                                  "measure_23": 21.4, "measure_42": 22.05}],
+                                    },
+                            )
+                        ],
+                ),
+                400: OpenApiResponse(description="Ошибка валидации входных данных."),
+            },
+            examples=[
+                OpenApiExample(name="Сравнение округов по ставкам для физлиц за 2023–2025",
+                               value={"dataset_ids": [32], "element_ids": [2], "from_year": 2023, "to_year": 2025,
+                                      "pivot": "measure"}),
+            ],
+    )
+    def post(self, request: Request, *args, **kwargs) -> Response:
+        serializer = RateObservationsRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        params = dict(serializer.validated_data)
+
+        pivot = params.pop('pivot', None)
+        if pivot:
+            return Response(_pivot_rate_observations(pivot, **params), status=status.HTTP_200_OK)
+        return Response(_get_rate_series(**params), status=status.HTTP_200_OK)